@@ -1,45 +1,114 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, has_request_context
+from flask.json.provider import DefaultJSONProvider
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from datetime import datetime, timedelta
 import os
 import csv
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-from apscheduler.schedulers.background import BackgroundScheduler
+import json
+import gzip
+import shutil
+import logging
+import logging.handlers
+import queue
+import sqlite3
+import re
+import html
+from pathlib import Path
+from types import SimpleNamespace
+from contextlib import contextmanager
 import atexit
 import hashlib
 import hmac
-import webbrowser
+import importlib
 import threading
 import signal
 import sys
 import time
-from functools import wraps
-from collections import defaultdict
-from colorama import init, Fore, Style
-
-# Try to import bcrypt for secure PIN hashing, fallback to hashlib if not available
-try:
-    import bcrypt
-    BCrypt_AVAILABLE = True
-except ImportError:
-    BCrypt_AVAILABLE = False
-    print(Fore.YELLOW + "⚠️ Warning: bcrypt not available. Install with: pip install bcrypt")
-    print(Fore.YELLOW + "⚠️ Using SHA-256 (less secure). Consider upgrading.")
-
-# Initialize colorama for Windows console colors
-init(autoreset=True)
+from functools import cache, wraps
+from collections import defaultdict, deque
+from itertools import islice
+
+# Run as a script this module is __main__ - register it as 'app' as well, so the
+# 'app:...' job references stored by the scheduler resolve to it (not a second copy)
+if __name__ == '__main__':
+    sys.modules.setdefault('app', sys.modules[__name__])
+
+# ===== LOGGING =====
+
+# Per-category loggers - all records propagate to the 'diary' logger, which only
+# enqueues them. Formatting, console output and file writes happen on a single
+# listener thread (see setup_logging) so request threads never block on I/O.
+log = logging.getLogger('diary')
+auth_log = logging.getLogger('diary.auth')
+access_log = logging.getLogger('diary.auth.access')  # Also written to settings_access.log
+report_log = logging.getLogger('diary.report')
+backup_log = logging.getLogger('diary.backup')
+scheduler_log = logging.getLogger('diary.scheduler')
+lifecycle_log = logging.getLogger('diary.lifecycle')  # Also written to shutdown_log.txt
+
+log_queue = queue.SimpleQueue()
+log.setLevel(logging.INFO)
+log.addHandler(logging.handlers.QueueHandler(log_queue))
+log.propagate = False
+
+# ===== DEFERRED IMPORTS =====
+
+# Heavy optional libraries are imported on first use (or by warm_up_deferred_imports
+# once the server is listening) so the app starts serving as early as possible.
+# Benchmark import cost with: python benchmarks/startup_importtime.py
+DEFERRED_IMPORTS = (
+    'bcrypt',
+    'smtplib',
+    'email.mime.multipart',
+    'email.mime.text',
+    'reportlab.platypus',
+    'reportlab.lib.styles',
+    'reportlab.lib.units',
+    'reportlab.lib.pagesizes',
+    'apscheduler.schedulers.background',
+    'googleapiclient.discovery',
+    'googleapiclient.http',
+    'google_auth_oauthlib.flow',
+)
+
+_bcrypt_module = None
+_bcrypt_checked = False
+_bcrypt_lock = threading.Lock()
+
+def get_bcrypt():
+    """Import bcrypt on first use for secure PIN hashing - returns None (SHA-256 fallback) if not installed"""
+    global _bcrypt_module, _bcrypt_checked
+    if not _bcrypt_checked:
+        with _bcrypt_lock:
+            if not _bcrypt_checked:
+                try:
+                    import bcrypt
+                    _bcrypt_module = bcrypt
+                except ImportError:
+                    auth_log.warning("⚠️ Warning: bcrypt not available. Install with: pip install bcrypt")
+                    auth_log.warning("⚠️ Using SHA-256 (less secure). Consider upgrading.")
+                _bcrypt_checked = True
+    return _bcrypt_module
+
+def warm_up_deferred_imports():
+    """Import the deferred libraries in the background so the first report/email/login is not slowed down"""
+    started = time.perf_counter()
+    for module_name in DEFERRED_IMPORTS:
+        try:
+            importlib.import_module(module_name)
+        except ImportError:
+            pass  # Optional dependency not installed - the feature reports this when used
+    get_bcrypt()
+    log.info(f"Background imports warmed up in {time.perf_counter() - started:.2f}s")
 
 # ===== PIN HASHING AND VERIFICATION =====
 
 def hash_pin(pin):
     """Hash a PIN using bcrypt (if available) or SHA-256 as fallback"""
-    if BCrypt_AVAILABLE:
+    bcrypt = get_bcrypt()
+    if bcrypt:
         # bcrypt requires bytes
         return bcrypt.hashpw(pin.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
     else:
@@ -51,12 +120,13 @@ def verify_pin_hash(pin, hashed):
     if not hashed:
         return False
     
-    if BCrypt_AVAILABLE and (hashed.startswith('$2a$') or hashed.startswith('$2b$') or hashed.startswith('$2y$')):
+    bcrypt = get_bcrypt() if hashed.startswith(('$2a$', '$2b$', '$2y$')) else None
+    if bcrypt:
         # bcrypt hash (starts with $2a$, $2b$, or $2y$)
         try:
             return bcrypt.checkpw(pin.encode('utf-8'), hashed.encode('utf-8'))
         except Exception as e:
-            print(Fore.RED + f"Error verifying bcrypt PIN: {e}")
+            auth_log.error(f"Error verifying bcrypt PIN: {e}")
             return False
     else:
         # SHA-256 hash - use constant-time comparison
@@ -65,8 +135,44 @@ def verify_pin_hash(pin, hashed):
 
 # ===== RATE LIMITING =====
 
-# Rate limiting storage (in-memory, resets on restart)
-rate_limit_storage = defaultdict(list)
+# Attempts are kept in instance/rate_limit.db rather than in memory, so the limit
+# holds across all server processes (see --serve) and across restarts
+RATE_LIMIT_RETENTION_SECONDS = 24 * 3600
+rate_limit_db_ready = False
+
+def get_rate_limit_db():
+    """Open the rate limit database (autocommit mode, so transactions are explicit)"""
+    global rate_limit_db_ready
+    conn = sqlite3.connect(os.path.join(BASE_PATH, 'instance', 'rate_limit.db'), timeout=10, isolation_level=None)
+    if not rate_limit_db_ready:
+        conn.execute("CREATE TABLE IF NOT EXISTS attempt (client_id TEXT NOT NULL, attempted REAL NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_attempt_client_id_attempted ON attempt (client_id, attempted)")
+        rate_limit_db_ready = True
+    return conn
+
+def record_rate_limited_attempt(client_id, max_attempts, window):
+    """
+    Record an attempt unless the client already reached the limit within the window.
+    
+    Returns:
+        True if the attempt is allowed (and was recorded), False if rate limited
+    """
+    current_time = time.time()
+    conn = get_rate_limit_db()
+    try:
+        # Take the write lock first so concurrent processes can't both pass the check
+        conn.execute("BEGIN IMMEDIATE")
+        # Clean up old attempts outside the time window (and anyone else's stale attempts)
+        conn.execute("DELETE FROM attempt WHERE client_id = ? AND attempted <= ?", (client_id, current_time - window))
+        conn.execute("DELETE FROM attempt WHERE attempted <= ?", (current_time - RATE_LIMIT_RETENTION_SECONDS,))
+        attempts = conn.execute("SELECT COUNT(*) FROM attempt WHERE client_id = ?", (client_id,)).fetchone()[0]
+        allowed = attempts < max_attempts
+        if allowed:
+            conn.execute("INSERT INTO attempt (client_id, attempted) VALUES (?, ?)", (client_id, current_time))
+        conn.execute("COMMIT")
+        return allowed
+    finally:
+        conn.close()
 
 def rate_limit(max_attempts=5, window=300):
     """
@@ -79,24 +185,14 @@ def rate_limit(max_attempts=5, window=300):
         def decorated_function(*args, **kwargs):
             # Get client identifier (IP address)
             client_id = request.remote_addr
-            current_time = time.time()
             
-            # Clean up old attempts outside the time window
-            rate_limit_storage[client_id] = [
-                attempt_time for attempt_time in rate_limit_storage[client_id]
-                if current_time - attempt_time < window
-            ]
-            
-            # Check if rate limit exceeded
-            if len(rate_limit_storage[client_id]) >= max_attempts:
+            # Check if rate limit exceeded, recording this attempt if not
+            if not record_rate_limited_attempt(client_id, max_attempts, window):
                 return jsonify({
                     'success': False,
                     'error': f'Too many attempts. Please try again in {window // 60} minutes.'
                 }), 429  # HTTP 429 Too Many Requests
             
-            # Record this attempt
-            rate_limit_storage[client_id].append(current_time)
-            
             # Call the original function
             return f(*args, **kwargs)
         return decorated_function
@@ -124,6 +220,368 @@ def get_resource_path(relative_path):
 # Get base path for application (must be defined before loading config)
 BASE_PATH = get_base_path()
 
+# ===== LOG FILE ACCESS =====
+
+# Append-only logs (diary.jsonl, settings_access.log, shutdown_log.txt) are rotated into
+# gzip-compressed segments once they reach this size or when the month changes
+LOG_ROTATE_MAX_BYTES = 1024 * 1024  # 1 MB
+LOG_TAIL_BLOCK_SIZE = 8192  # Bytes read per backwards seek when tailing a log
+LOG_LOCK_RETRY_SECONDS = 0.005  # Appends hold the lock for a few milliseconds
+
+# Serialises appends, rotation and index updates across threads - with locked_log_file()
+# also across processes (served processes and report workers all write the same logs)
+log_file_lock = threading.Lock()
+
+def acquire_file_lock(path, wait=False, retry_seconds=0.2):
+    """
+    Take an exclusive lock on a file (released automatically if the process exits).
+    
+    Args:
+        path: Lock file path
+        wait: Keep trying until the lock is free, rather than giving up straight away
+        retry_seconds: How long to sleep between tries when waiting
+    
+    Returns:
+        The open lock file (keep it open to hold the lock), or None if another process holds it
+    """
+    while True:
+        lock_file = open(path, 'a+')
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return lock_file
+        except OSError:
+            lock_file.close()
+            if not wait:
+                return None
+            time.sleep(retry_seconds)
+
+def release_file_lock(lock_file):
+    """Release a lock taken with acquire_file_lock()"""
+    if os.name == 'nt':
+        import msvcrt
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+    lock_file.close()
+
+@contextmanager
+def locked_log_file(log_file):
+    """Hold the lock on a log file's appends, rotation and index, across threads and processes"""
+    with log_file_lock:
+        lock_file = acquire_file_lock(log_file + '.lock', wait=True, retry_seconds=LOG_LOCK_RETRY_SECONDS)
+        try:
+            yield
+        finally:
+            release_file_lock(lock_file)
+
+def get_log_path(file_name):
+    """Get the path of a file in the logs directory, creating the directory if needed"""
+    log_dir = os.path.join(BASE_PATH, 'logs')
+    os.makedirs(log_dir, exist_ok=True)
+    return os.path.join(log_dir, file_name)
+
+def get_log_segments(log_file):
+    """Get rotated (compressed) segments of a log file, newest first"""
+    import glob
+    return sorted(glob.glob(glob.escape(log_file) + '.*.gz'), reverse=True)
+
+def count_log_lines(log_file, opener=open):
+    """Count lines in a log file by reading it in blocks (never loads the whole file)"""
+    count = 0
+    with opener(log_file, 'rb') as f:
+        for block in iter(lambda: f.read(64 * 1024), b''):
+            count += block.count(b'\n')
+    return count
+
+def read_log_index(log_file):
+    """
+    Read the sidecar line-count index (<log>.idx) for a log file.
+    
+    The index is rebuilt by counting lines if it is missing or no longer matches
+    the size of the log file (e.g. the file was edited or deleted by hand).
+    
+    Returns:
+        Dictionary with 'lines' (current file), 'archived_lines' (rotated segments)
+        and 'size' (current file size in bytes)
+    """
+    index_file = log_file + '.idx'
+    size = os.path.getsize(log_file) if os.path.exists(log_file) else 0
+    
+    try:
+        with open(index_file, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('size') == size:
+            return index
+    except (OSError, ValueError):
+        pass  # Missing or corrupt index - rebuild below
+    
+    index = {
+        'lines': count_log_lines(log_file) if size else 0,
+        'archived_lines': sum(count_log_lines(segment, gzip.open) for segment in get_log_segments(log_file)),
+        'size': size
+    }
+    write_log_index(log_file, index)
+    return index
+
+def write_log_index(log_file, index):
+    """Write the sidecar line-count index for a log file"""
+    try:
+        with open(log_file + '.idx', 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+    except OSError as e:
+        log.warning(f"Warning: Could not write log index for {log_file}: {e}")
+
+def rotate_log_file(log_file, index):
+    """
+    Compress the current log file into a timestamped .gz segment and start a new one.
+    
+    The file is renamed aside first, so the next append starts a new file and a reader
+    that has the old file open keeps reading it. On Windows the rename fails while a
+    reader has the file open - the file is then left as it is (nothing is lost) and
+    rotation is tried again on a later append.
+    
+    Returns:
+        True if the file was rotated
+    """
+    archive_path = f"{log_file}.{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.gz"
+    rotating_path = archive_path[:-len('.gz')] + '.rotating'
+    try:
+        os.replace(log_file, rotating_path)
+    except OSError:
+        return False
+    
+    # Compressed under a temporary name, so readers never see a partial segment
+    with open(rotating_path, 'rb') as src, gzip.open(archive_path + '.tmp', 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.replace(archive_path + '.tmp', archive_path)
+    os.remove(rotating_path)
+    
+    index['archived_lines'] += index['lines']
+    index['lines'] = 0
+    index['size'] = 0
+    log.info(f"Rotated log file: {os.path.basename(archive_path)}")
+    return True
+
+def append_log_line(log_file, line):
+    """
+    Append a single line to an append-only log file.
+    
+    Rotates the file first if it has reached LOG_ROTATE_MAX_BYTES or was last
+    written in a previous month, then updates the sidecar line-count index.
+    """
+    with locked_log_file(log_file):
+        index = read_log_index(log_file)
+        
+        if os.path.exists(log_file) and index['size'] > 0:
+            last_written = datetime.fromtimestamp(os.path.getmtime(log_file))
+            now = datetime.now()
+            if (index['size'] >= LOG_ROTATE_MAX_BYTES or
+                    (last_written.year, last_written.month) != (now.year, now.month)):
+                rotate_log_file(log_file, index)
+        
+        with open(log_file, 'a', encoding='utf-8') as f:
+            f.write(line.rstrip('\n') + '\n')
+        
+        index['lines'] += 1
+        index['size'] = os.path.getsize(log_file)
+        write_log_index(log_file, index)
+
+def iter_log_lines_reversed(log_file):
+    """
+    Yield the lines of a log file newest first.
+    
+    The current file is read backwards from the end in LOG_TAIL_BLOCK_SIZE blocks,
+    so only as much of the file as is consumed is ever read. Older history continues
+    into the rotated .gz segments (each bounded by LOG_ROTATE_MAX_BYTES).
+    """
+    def decode(raw_line):
+        return raw_line.decode('utf-8', errors='replace').rstrip('\r')
+    
+    if os.path.exists(log_file):
+        with open(log_file, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            remainder = b''
+            while position > 0:
+                read_size = min(LOG_TAIL_BLOCK_SIZE, position)
+                position -= read_size
+                f.seek(position)
+                lines = (f.read(read_size) + remainder).split(b'\n')
+                remainder = lines.pop(0)  # May be a partial line - completed by the next block
+                for raw_line in reversed(lines):
+                    if raw_line.strip():
+                        yield decode(raw_line)
+            if remainder.strip():
+                yield decode(remainder)
+    
+    for segment in get_log_segments(log_file):
+        with gzip.open(segment, 'rb') as f:
+            lines = f.read().split(b'\n')
+        for raw_line in reversed(lines):
+            if raw_line.strip():
+                yield decode(raw_line)
+
+def read_log_tail(log_file, limit=50, offset=0):
+    """
+    Get a page of lines from the end of a log file, newest first.
+    
+    Args:
+        log_file: Path to the log file
+        limit: Maximum number of lines to return
+        offset: Number of newest lines to skip (for paging further back)
+    
+    Returns:
+        Tuple of (list of lines, total line count across all segments)
+    """
+    with locked_log_file(log_file):
+        index = read_log_index(log_file)
+    total_count = index['lines'] + index['archived_lines']
+    lines = list(islice(iter_log_lines_reversed(log_file), offset, offset + limit))
+    return lines, total_count
+
+# Listener that drains log_queue into the configured handlers (started by setup_logging)
+log_listener = None
+
+class IndexedLogFileHandler(logging.Handler):
+    """Logging handler that appends to a log file through append_log_line (rotation + line index)"""
+    
+    def __init__(self, file_name):
+        super().__init__()
+        self.file_name = file_name
+    
+    def emit(self, record):
+        try:
+            append_log_line(get_log_path(self.file_name), self.format(record))
+        except Exception:
+            self.handleError(record)
+
+class JsonLinesFormatter(logging.Formatter):
+    """Format log records as one JSON object per line for logs/diary.jsonl"""
+    
+    def format(self, record):
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created).isoformat(timespec='seconds'),
+            'level': record.levelname,
+            'category': record.name.split('.')[1] if '.' in record.name else 'app',
+            'message': record.getMessage()
+        }
+        if getattr(record, 'data', None):
+            entry['data'] = record.data
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class ConsoleFormatter(logging.Formatter):
+    """Colour console output by level (colorama), matching the app's previous console style"""
+    
+    level_colors = None
+    
+    def format(self, record):
+        if self.level_colors is None:
+            # Colour codes are loaded by the listener thread on the first record, off the startup path
+            from colorama import Fore, Style
+            self.reset = Style.RESET_ALL
+            self.level_colors = {
+                logging.DEBUG: Style.DIM,
+                logging.INFO: Fore.CYAN,
+                logging.WARNING: Fore.YELLOW,
+                logging.ERROR: Fore.RED,
+                logging.CRITICAL: Fore.RED + Style.BRIGHT
+            }
+        return self.level_colors.get(record.levelno, '') + super().format(record) + self.reset
+
+def setup_logging():
+    """
+    Start the background log listener.
+    
+    Handlers (all run on the listener thread):
+    - Console: coloured messages
+    - logs/diary.jsonl: every record as JSON lines (queried by /api/logs)
+    - logs/settings_access.log: 'diary.auth.access' records in the original text format
+    - logs/shutdown_log.txt: 'diary.lifecycle' records in the original text format
+    """
+    global log_listener
+    if log_listener is not None:
+        return
+    
+    if os.name == 'nt':
+        # Windows consoles need colorama to wrap stdout (turning colour codes into console
+        # calls) before the handler takes its reference to the stream
+        from colorama import init
+        init(autoreset=True)
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(ConsoleFormatter('%(message)s'))
+    
+    jsonl_handler = IndexedLogFileHandler('diary.jsonl')
+    jsonl_handler.setFormatter(JsonLinesFormatter())
+    
+    text_formatter = logging.Formatter('[%(asctime)s] %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+    access_handler = IndexedLogFileHandler('settings_access.log')
+    access_handler.addFilter(logging.Filter(access_log.name))
+    access_handler.setFormatter(text_formatter)
+    lifecycle_handler = IndexedLogFileHandler('shutdown_log.txt')
+    lifecycle_handler.addFilter(logging.Filter(lifecycle_log.name))
+    lifecycle_handler.setFormatter(text_formatter)
+    
+    log_listener = logging.handlers.QueueListener(
+        log_queue, console_handler, jsonl_handler, access_handler, lifecycle_handler,
+        respect_handler_level=True
+    )
+    log_listener.start()
+    # Flush queued records on exit (registered first, so it runs after other exit handlers)
+    atexit.register(log_listener.stop)
+
+def query_log_records(category=None, level=None, since=None, search=None, limit=100, offset=0):
+    """
+    Query recent structured log records from logs/diary.jsonl, newest first.
+    
+    Args:
+        category: Only records from this category (e.g. 'auth', 'report', 'backup', 'scheduler')
+        level: Minimum level name (e.g. 'WARNING')
+        since: Only records at or after this datetime
+        search: Case-insensitive substring of the message
+        limit: Maximum number of records to return
+        offset: Number of matching records to skip
+    
+    Returns:
+        List of record dictionaries
+    """
+    min_level = logging.getLevelName(level.upper()) if level else None
+    if not isinstance(min_level, int):
+        min_level = None
+    since_str = since.isoformat(timespec='seconds') if since else None
+    search = search.lower() if search else None
+    
+    def matches(entry):
+        if category and entry.get('category') != category:
+            return False
+        if min_level is not None and logging.getLevelName(entry.get('level')) < min_level:
+            return False
+        if search and search not in entry.get('message', '').lower():
+            return False
+        return True
+    
+    def records():
+        for line in iter_log_lines_reversed(get_log_path('diary.jsonl')):
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # Skip partially written or corrupt lines
+            # Records are in time order, so stop once we pass the start of the window
+            if since_str and entry.get('timestamp', '') < since_str:
+                return
+            if matches(entry):
+                yield entry
+    
+    return list(islice(records(), offset, offset + limit))
+
+setup_logging()
+
 # Import configuration from config.py
 def load_email_config():
     """Load email configuration from config.py, handling both script and .exe modes"""
@@ -152,11 +610,11 @@ def load_email_config():
             try:
                 import shutil
                 shutil.copy2(example_config_path, config_path)
-                print(Fore.GREEN + f"✓ Created config.py from config.example.py")
-                print(Fore.YELLOW + "⚠️ Please update config.py with your email credentials!")
+                log.info("✓ Created config.py from config.example.py")
+                log.warning("⚠️ Please update config.py with your email credentials!")
             except Exception as e:
-                print(Fore.YELLOW + f"⚠️ Could not create config.py from example: {e}")
-                print(Fore.YELLOW + "⚠️ Using default email configuration")
+                log.warning(f"⚠️ Could not create config.py from example: {e}")
+                log.warning("⚠️ Using default email configuration")
                 return {
                     'smtp_server': 'smtp.gmail.com',
                     'smtp_port': 587,
@@ -165,9 +623,9 @@ def load_email_config():
                     'recipient': 'recipient@example.com'
                 }
         else:
-            print(Fore.YELLOW + f"⚠️ config.py not found at {config_path}")
-            print(Fore.YELLOW + "⚠️ config.example.py also not found")
-            print(Fore.YELLOW + "⚠️ Using default email configuration")
+            log.warning(f"⚠️ config.py not found at {config_path}")
+            log.warning("⚠️ config.example.py also not found")
+            log.warning("⚠️ Using default email configuration")
             return {
                 'smtp_server': 'smtp.gmail.com',
                 'smtp_port': 587,
@@ -183,7 +641,7 @@ def load_email_config():
     # Try importing config first
     try:
         from config import EMAIL_CONFIG
-        print(Fore.GREEN + "✓ Email configuration loaded from config.py")
+        log.info("✓ Email configuration loaded from config.py")
         return EMAIL_CONFIG
     except ImportError as import_err:
         # If import fails, try loading the file directly
@@ -192,11 +650,11 @@ def load_email_config():
             spec = importlib.util.spec_from_file_location("config", config_path)
             config_module = importlib.util.module_from_spec(spec)
             spec.loader.exec_module(config_module)
-            print(Fore.GREEN + "✓ Email configuration loaded from config.py")
+            log.info("✓ Email configuration loaded from config.py")
             return config_module.EMAIL_CONFIG
         except Exception as load_err:
-            print(Fore.YELLOW + f"⚠️ Error loading config.py: {load_err}")
-            print(Fore.YELLOW + "⚠️ Using default email configuration")
+            log.warning(f"⚠️ Error loading config.py: {load_err}")
+            log.warning("⚠️ Using default email configuration")
             return {
                 'smtp_server': 'smtp.gmail.com',
                 'smtp_port': 587,
@@ -206,8 +664,8 @@ def load_email_config():
             }
     except Exception as e:
         # Other unexpected errors
-        print(Fore.YELLOW + f"⚠️ Unexpected error loading config: {e}")
-        print(Fore.YELLOW + "⚠️ Using default email configuration")
+        log.warning(f"⚠️ Unexpected error loading config: {e}")
+        log.warning("⚠️ Using default email configuration")
         return {
             'smtp_server': 'smtp.gmail.com',
             'smtp_port': 587,
@@ -224,9 +682,73 @@ instance_dir = os.path.join(BASE_PATH, 'instance')
 os.makedirs(instance_dir, exist_ok=True)
 templates_dir = os.path.join(BASE_PATH, 'templates')
 os.makedirs(templates_dir, exist_ok=True)
+static_dir = os.path.join(BASE_PATH, 'static')
+
+# ===== JSON RESPONSES =====
+
+@cache  # Looked up once, not on every response
+def get_orjson():
+    """Get the orjson module if installed (optional - the standard json module is used otherwise)"""
+    try:
+        import orjson
+        return orjson
+    except ImportError:
+        return None
+
+def to_columns(rows):
+    """
+    Convert a list of dicts to the columnar layout: keys once, rows as arrays.
+    
+    Returns:
+        {'columns': [key, ...], 'rows': [[value, ...], ...]} - keys missing from a row are null
+    """
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    return {'columns': columns, 'rows': [[row.get(column) for column in columns] for row in rows]}
+
+def is_row_list(value):
+    """True for a non-empty list of dicts (a collection that can be sent as columns)"""
+    return isinstance(value, list) and bool(value) and all(isinstance(row, dict) for row in value)
+
+class DiaryJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider for jsonify() - serializes with orjson when it is installed, and sends
+    collections in the columnar layout when the request asks for ?format=columns.
+    """
+    def __init__(self, app):
+        super().__init__(app)
+        self.orjson = get_orjson()
+    
+    def dumps(self, obj, **kwargs):
+        if self.orjson and not kwargs:
+            return self.dump_bytes(obj).decode('utf-8')
+        return super().dumps(obj, **kwargs)
+    
+    def dump_bytes(self, obj):
+        """Serialize to compact UTF-8 JSON bytes, matching the standard provider's output"""
+        if self.orjson:
+            try:
+                # Dates go through the standard provider's default so they render the same either way
+                return self.orjson.dumps(obj, default=self.default, option=(
+                    self.orjson.OPT_SORT_KEYS | self.orjson.OPT_NON_STR_KEYS | self.orjson.OPT_PASSTHROUGH_DATETIME))
+            except TypeError:
+                pass  # e.g. integers too large for orjson
+        return super().dumps(obj).encode('utf-8')
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if has_request_context() and request.args.get('format') == 'columns':
+            if is_row_list(obj):
+                obj = to_columns(obj)
+            elif isinstance(obj, dict):
+                obj = {key: to_columns(value) if is_row_list(value) else value for key, value in obj.items()}
+        if self._app.debug:
+            # Keep the readable indented output while debugging
+            return self._app.response_class(f"{super().dumps(obj, indent=2)}\n", mimetype=self.mimetype)
+        return self._app.response_class(self.dump_bytes(obj), mimetype=self.mimetype)
 
 # Initialize Flask app
-app = Flask(__name__, template_folder=templates_dir)
+app = Flask(__name__, template_folder=templates_dir, static_folder=static_dir)
+app.json = DiaryJSONProvider(app)
 app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{os.path.join(instance_dir, "diary.db")}'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db = SQLAlchemy(app)
@@ -240,6 +762,13 @@ class DailyOccurrence(db.Model):
     reported_by = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=False)
     sent = db.Column(db.Boolean, default=False)
+    flat_id = db.Column(db.Integer)  # Flat.id of flat_number (None if blank)
+    
+    __table_args__ = (
+        db.Index('ix_daily_occurrence_timestamp', 'timestamp'),  # Daily report / missed report lookups
+        db.Index('ix_daily_occurrence_flat_number', 'flat_number', 'timestamp'),  # Search by flat
+        db.Index('ix_daily_occurrence_flat_id', 'flat_id', 'timestamp', 'id'),  # Flat history
+    )
 
 class StaffRota(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -263,12 +792,73 @@ class CCTVFault(db.Model):
     additional_notes = db.Column(db.Text)
     status = db.Column(db.String(20), default='open')  # open, in_progress, closed
     resolved_date = db.Column(db.DateTime)
+    flat_id = db.Column(db.Integer)  # Flat.id of flat_number (None if blank)
+    
+    __table_args__ = (
+        db.Index('ix_cctv_fault_flat_number', 'flat_number', 'timestamp'),  # Search by flat
+        db.Index('ix_cctv_fault_flat_id', 'flat_id', 'timestamp', 'id'),  # Flat history
+    )
+
+class Flat(db.Model):
+    """A flat occurrences and faults are recorded against, keyed by its normalized number"""
+    id = db.Column(db.Integer, primary_key=True)
+    flat_key = db.Column(db.String(20), nullable=False, unique=True)  # normalize_flat_number() of the flat number
+    flat_number = db.Column(db.String(20), nullable=False)  # As first entered
+    block_number = db.Column(db.String(20))  # Latest recorded on a fault
+    floor_number = db.Column(db.String(20))
+
+class FlatStats(db.Model):
+    """Occurrence and fault counts per flat, including archived years (kept up to date on insert/delete)"""
+    flat_id = db.Column(db.Integer, primary_key=True)
+    occurrence_count = db.Column(db.Integer, nullable=False, default=0)
+    fault_count = db.Column(db.Integer, nullable=False, default=0)
+    open_fault_count = db.Column(db.Integer, nullable=False, default=0)  # Faults not closed
+    first_seen = db.Column(db.DateTime)
+    last_seen = db.Column(db.DateTime)
 
 class WaterTemperature(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     timestamp = db.Column(db.DateTime, default=datetime.now)
     temperature = db.Column(db.Float, nullable=False)
     time_recorded = db.Column(db.String(5), nullable=False)  # Format: HH:MM
+    
+    __table_args__ = (
+        db.Index('ix_water_temperature_timestamp', 'timestamp'),  # Date range lookups
+    )
+
+class WaterTemperatureRollup(db.Model):
+    """Min/max/mean of water temperature readings per hour, day and week (kept up to date on insert/delete)"""
+    __table_args__ = (
+        db.UniqueConstraint('resolution', 'bucket_start', name='uq_water_temperature_rollup_bucket'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    resolution = db.Column(db.String(10), nullable=False)  # hour, day, week
+    bucket_start = db.Column(db.DateTime, nullable=False)  # Start of the hour / day / week (Monday)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Float, nullable=False, default=0)  # Sum of readings, mean = total / count
+    min_temperature = db.Column(db.Float, nullable=False)
+    max_temperature = db.Column(db.Float, nullable=False)
+
+class WaterTemperatureDailyStats(db.Model):
+    """Cached compliance statistics for a closed day of water temperature readings"""
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, nullable=False, unique=True)
+    thresholds = db.Column(db.String(50), nullable=False)  # Thresholds used, recomputed if they change
+    count = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Float, nullable=False, default=0)
+    total_squares = db.Column(db.Float, nullable=False, default=0)  # For the standard deviation
+    min_temperature = db.Column(db.Float)
+    max_temperature = db.Column(db.Float)
+    below_count = db.Column(db.Integer, nullable=False, default=0)  # Below the Legionella minimum
+    warning_count = db.Column(db.Integer, nullable=False, default=0)  # Above the scalding warning level
+    danger_count = db.Column(db.Integer, nullable=False, default=0)  # Above the scalding danger level
+    time_below_seconds = db.Column(db.Float, nullable=False, default=0)
+    monitored_seconds = db.Column(db.Float, nullable=False, default=0)
+    gap_count = db.Column(db.Integer, nullable=False, default=0)
+    longest_gap_seconds = db.Column(db.Float, nullable=False, default=0)
+    first_reading = db.Column(db.DateTime)
+    last_reading = db.Column(db.DateTime)
+    computed_at = db.Column(db.DateTime, default=datetime.now)
 
 class EmailLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -276,6 +866,10 @@ class EmailLog(db.Model):
     recipient = db.Column(db.String(200), nullable=False)
     subject = db.Column(db.String(200), nullable=False)
     pdf_path = db.Column(db.String(500), nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_email_log_subject', 'subject'),  # "Daily Report - <date>" lookups for missed reports
+    )
 
 class ScheduleSettings(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -306,6 +900,9 @@ class ShiftLeader(db.Model):
     last_login = db.Column(db.DateTime)
 
 class ActivityLog(db.Model):
+    __table_args__ = (
+        db.Index('ix_activity_log_timestamp_id', 'timestamp', 'id'),  # Keyset paging / date range
+    )
     id = db.Column(db.Integer, primary_key=True)
     timestamp = db.Column(db.DateTime, default=datetime.now)
     user_name = db.Column(db.String(100), nullable=False)  # Shift leader name
@@ -316,6 +913,9 @@ class ActivityLog(db.Model):
     ip_address = db.Column(db.String(50))
 
 class Overtime(db.Model):
+    __table_args__ = (
+        db.Index('ix_overtime_date', 'date'),  # Date range filters and period summaries
+    )
     id = db.Column(db.Integer, primary_key=True)
     staff_name = db.Column(db.String(100), nullable=False)
     date = db.Column(db.Date, nullable=False)
@@ -325,8 +925,201 @@ class Overtime(db.Model):
     created_date = db.Column(db.DateTime, default=datetime.now)
     updated_date = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
 
-# Initialize scheduler
-scheduler = BackgroundScheduler()
+class OvertimePeriodSummary(db.Model):
+    """Cached overtime totals per staff member for a closed week/month/pay period"""
+    __table_args__ = (
+        db.UniqueConstraint('period_type', 'period_start', name='uq_overtime_period_summary'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    period_type = db.Column(db.String(20), nullable=False)  # week, month or pay_period
+    period_start = db.Column(db.Date, nullable=False)
+    data = db.Column(db.Text, nullable=False)  # JSON: staff name -> totals
+    computed_at = db.Column(db.DateTime, default=datetime.now)
+
+class JobRun(db.Model):
+    __table_args__ = (
+        db.Index('ix_job_run_job_id_started', 'job_id', 'started'),  # Latest runs per job
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.String(100), nullable=False)  # Scheduler job id, e.g. 'daily_gdrive_backup'
+    scheduled_time = db.Column(db.DateTime)  # When the run was due (missed runs only)
+    started = db.Column(db.DateTime, default=datetime.now)
+    finished = db.Column(db.DateTime)
+    duration_seconds = db.Column(db.Float)
+    status = db.Column(db.String(20), nullable=False)  # success, failed, error, missed
+    error = db.Column(db.Text)
+    rows_processed = db.Column(db.Integer, default=0)  # Rows reported, deleted or archived
+    bytes_written = db.Column(db.Integer, default=0)  # Report files written / backup bytes uploaded
+    query_count = db.Column(db.Integer, default=0)  # Database queries run by the job
+    query_seconds = db.Column(db.Float, default=0)  # Time spent in those queries
+
+class ReportJob(db.Model):
+    """A report generation request, queued by the web server and run by a report worker process"""
+    __table_args__ = (
+        db.Index('ix_report_job_status_id', 'status', 'id'),  # Next queued job
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    job_type = db.Column(db.String(50), nullable=False)  # test_export, reprint_report, test_email
+    params = db.Column(db.Text)  # JSON keyword arguments for the job function
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done, failed
+    created = db.Column(db.DateTime, default=datetime.now)
+    started = db.Column(db.DateTime)
+    finished = db.Column(db.DateTime)
+    worker_pid = db.Column(db.Integer)
+    result = db.Column(db.Text)  # JSON response of the finished job
+    error = db.Column(db.Text)
+
+class IdempotencyKey(db.Model):
+    """Client-generated key of a created entry, so a replayed write returns the entry instead of adding it again"""
+    __table_args__ = (
+        db.Index('ix_idempotency_key_created', 'created'),  # Expiry cleanup
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(100), nullable=False, unique=True)
+    entry_type = db.Column(db.String(20), nullable=False)  # occurrence, water_temperature, fault
+    entry_id = db.Column(db.Integer, nullable=False)
+    created = db.Column(db.DateTime, default=datetime.now)
+
+# Scheduler is created on first use by get_scheduler() (APScheduler is imported lazily).
+# Jobs are kept in instance/scheduler.db so pending runs survive a restart - a run missed
+# while the app was closed still fires (once) on startup if within its misfire grace time
+scheduler = None
+SCHEDULER_DB_PATH = os.path.join(instance_dir, 'scheduler.db')
+
+# How late a missed run may still fire, in seconds
+JOB_MISFIRE_GRACE_SECONDS = {
+    'daily_report': 60 * 60,  # Later days are caught up by check_missed_reports (the report is for "today")
+    'daily_gdrive_backup': 20 * 60 * 60,
+    'cleanup_old_leave': 20 * 60 * 60,
+    'archive_old_data': 20 * 60 * 60,
+}
+
+def get_scheduler():
+    """Get the background scheduler, creating it on first use"""
+    global scheduler
+    if scheduler is None:
+        from apscheduler.schedulers.background import BackgroundScheduler
+        from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+        from apscheduler.events import EVENT_JOB_MISSED
+        scheduler = BackgroundScheduler(
+            jobstores={'default': SQLAlchemyJobStore(url=f'sqlite:///{SCHEDULER_DB_PATH}')},
+            job_defaults={'coalesce': True, 'max_instances': 1, 'misfire_grace_time': 60 * 60}
+        )
+        scheduler.add_listener(record_missed_job_run, EVENT_JOB_MISSED)
+    return scheduler
+
+def schedule_daily_job(job_id, func, hour, minute):
+    """
+    Add or update a daily cron job in the persistent job store.
+    
+    An existing job keeps its pending run time unless the time of day changed, so a
+    run that was due while the app was closed is still detected as misfired.
+    
+    The job is stored with the textual reference 'app:<function name>', which is the
+    same whether the app runs as python app.py (__main__) or under wsgi.py, so
+    stored jobs are restored after switching between the two.
+    """
+    from apscheduler.triggers.cron import CronTrigger
+    trigger = CronTrigger(hour=hour, minute=minute)
+    misfire_grace_time = JOB_MISFIRE_GRACE_SECONDS.get(job_id, 60 * 60)
+    func_ref = f'app:{func.__name__}'
+    
+    sched = get_scheduler()
+    job = sched.get_job(job_id) if sched.running else None
+    if job is None:
+        sched.add_job(func_ref, trigger, id=job_id, replace_existing=True,
+                      misfire_grace_time=misfire_grace_time, coalesce=True)
+        return
+    
+    job.modify(func=func_ref, misfire_grace_time=misfire_grace_time, coalesce=True)
+    if str(job.trigger) != str(trigger):
+        job.reschedule(trigger)
+
+def record_missed_job_run(event):
+    """Scheduler listener - record a run that was skipped because it was too late"""
+    with app.app_context():
+        try:
+            db.session.add(JobRun(
+                job_id=event.job_id,
+                scheduled_time=event.scheduled_run_time.replace(tzinfo=None),
+                started=datetime.now(),
+                status='missed'
+            ))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            scheduler_log.error(f"Error recording missed run of {event.job_id}: {e}")
+    scheduler_log.warning(f"⚠️ Scheduled job {event.job_id} missed its {event.scheduled_run_time:%Y-%m-%d %H:%M} run")
+
+# The JobRun being recorded on this thread, so queries and add_job_metrics() calls
+# made while a scheduled job runs are counted against it
+job_metrics_local = threading.local()
+
+# The request being profiled on this thread (see REQUEST PROFILING), so its queries are counted too
+request_metrics_local = threading.local()
+
+def add_job_metrics(rows=0, bytes_written=0):
+    """Add rows processed / bytes written to the scheduled job running on this thread (no-op otherwise)"""
+    run = getattr(job_metrics_local, 'run', None)
+    if run is not None:
+        run.rows_processed += rows
+        run.bytes_written += bytes_written
+
+def get_query_metric_targets():
+    """Get the JobRun being recorded and/or the request being profiled on this thread"""
+    return [target for target in (getattr(job_metrics_local, 'run', None), getattr(request_metrics_local, 'current', None))
+            if target is not None]
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def query_started(conn, cursor, statement, parameters, context, executemany):
+    """Time database queries made by a scheduled job or profiled request on this thread"""
+    if get_query_metric_targets():
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def query_finished(conn, cursor, statement, parameters, context, executemany):
+    """Count a finished query against the scheduled job or profiled request on this thread"""
+    targets = get_query_metric_targets()
+    started = conn.info.get('query_started')
+    if targets and started:
+        elapsed = time.perf_counter() - started.pop()
+        for target in targets:
+            target.query_count += 1
+            target.query_seconds += elapsed
+
+def record_job_run(job_id):
+    """Decorator for scheduled job wrappers - runs with app context and records the run (with metrics) in JobRun"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with app.app_context():
+                run = JobRun(job_id=job_id, started=datetime.now(), status='success',
+                             rows_processed=0, bytes_written=0, query_count=0, query_seconds=0.0)
+                job_metrics_local.run = run
+                started = time.perf_counter()
+                try:
+                    result = func(*args, **kwargs)
+                    if result is False:
+                        run.status = 'failed'
+                    return result
+                except Exception as e:
+                    run.status = 'error'
+                    run.error = str(e)
+                    raise
+                finally:
+                    job_metrics_local.run = None
+                    run.finished = datetime.now()
+                    run.duration_seconds = round(time.perf_counter() - started, 3)
+                    run.query_seconds = round(run.query_seconds, 3)
+                    try:
+                        db.session.rollback()  # Discard anything the job left uncommitted
+                        db.session.add(run)
+                        db.session.commit()
+                    except Exception as e:
+                        db.session.rollback()
+                        scheduler_log.error(f"Error recording run of {job_id}: {e}")
+        return wrapper
+    return decorator
 
 # Rotation Pattern Constants (reused across multiple functions)
 # Reference date for rotation calculation - September 29, 2025 (Monday of Week 1)
@@ -433,21 +1226,34 @@ def get_staff_off_for_date(date, porter_groups, include_night_shift=True):
     
     return staff_off
 
-# Wrapper functions for scheduled tasks that need app context
+# Wrapper functions for scheduled tasks - provide Flask app context and record each run
+@record_job_run('daily_report')
 def send_daily_report_with_context(report_date=None):
     """Wrapper for send_daily_report that provides Flask app context"""
-    with app.app_context():
-        return send_daily_report(report_date)
+    sent = send_daily_report(report_date)
+    if report_date is None:
+        # Entries saved on earlier, already reported days (sent late from a browser outbox) go out now too
+        check_missed_reports(RECORDED_AT_MAX_AGE_DAYS)
+    return sent
 
+@record_job_run('cleanup_old_leave')
 def cleanup_old_leave_data_with_context():
     """Wrapper for cleanup_old_leave_data that provides Flask app context"""
-    with app.app_context():
-        return cleanup_old_leave_data()
+    deleted = cleanup_old_leave_data()
+    add_job_metrics(rows=deleted or 0)
+    return deleted
+
+@record_job_run('archive_old_data')
+def archive_old_data_with_context():
+    """Wrapper for archive_old_data that provides Flask app context"""
+    results = archive_old_data()
+    add_job_metrics(rows=sum(results.values()))
+    return results
 
+@record_job_run('daily_gdrive_backup')
 def backup_database_to_gdrive_with_context():
     """Wrapper for backup_database_to_gdrive that provides Flask app context"""
-    with app.app_context():
-        return backup_database_to_gdrive()
+    return backup_database_to_gdrive()
 
 def get_porter_groups():
     """Get porter groups from database"""
@@ -476,7 +1282,7 @@ def send_daily_report(report_date=None):
         # Check if email is enabled
         settings = ScheduleSettings.query.first()
         if not settings or not settings.email_enabled:
-            print(Fore.YELLOW + "Email sending is disabled")
+            report_log.warning("Email sending is disabled")
             return
         
         # Use provided date or default to today
@@ -499,6 +1305,8 @@ def send_daily_report(report_date=None):
         csv_path = generate_daily_csv(occurrences, report_date)
         
         # Send email FIRST - only log if successful
+        add_job_metrics(rows=len(occurrences),
+                        bytes_written=os.path.getsize(pdf_path) + os.path.getsize(csv_path))
         email_sent = send_email(f"Daily Report - {report_date}", settings.recipient_email)
         
         if email_sent:
@@ -518,25 +1326,27 @@ def send_daily_report(report_date=None):
             # Single commit for both email log and sent status
             db.session.commit()
             
-            print(Fore.GREEN + f"Daily report sent successfully for {report_date}")
-            print(Fore.CYAN + f"Local backups saved - PDF: {pdf_path}, CSV: {csv_path}")
+            report_log.info(f"Daily report sent successfully for {report_date}")
+            report_log.info(f"Local backups saved - PDF: {pdf_path}, CSV: {csv_path}")
         else:
-            print(Fore.YELLOW + f"⚠️ Email failed to send for {report_date}, but PDF/CSV saved locally")
-            print(Fore.CYAN + f"PDF: {pdf_path}")
-            print(Fore.CYAN + f"CSV: {csv_path}")
+            report_log.warning(f"⚠️ Email failed to send for {report_date}, but PDF/CSV saved locally")
+            report_log.info(f"PDF: {pdf_path}")
+            report_log.info(f"CSV: {csv_path}")
         
         return email_sent
     except Exception as e:
-        print(Fore.RED + f"Error sending daily report: {e}")
+        report_log.error(f"Error sending daily report: {e}")
         # Rollback any uncommitted database changes
         try:
             db.session.rollback()
         except Exception as rollback_error:
-            print(Fore.YELLOW + f"Warning: Error during database rollback: {rollback_error}")
+            report_log.warning(f"Warning: Error during database rollback: {rollback_error}")
         return False
 
 def generate_daily_pdf(occurrences, report_date=None):
     """Generate PDF report of daily occurrences"""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
     from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
     from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
     from reportlab.lib.units import inch
@@ -701,8 +1511,6 @@ def generate_daily_pdf(occurrences, report_date=None):
         story.append(Spacer(1, 10))
     else:
         # Create table data with proper text wrapping using Paragraph objects
-        from reportlab.lib.styles import ParagraphStyle
-        
         # Define paragraph style for wrapped text
         wrap_style = ParagraphStyle(
             'WrapStyle',
@@ -774,10 +1582,7 @@ def generate_daily_pdf(occurrences, report_date=None):
     today_start = datetime.combine(report_date, datetime.min.time())
     today_end = datetime.combine(report_date, datetime.max.time())
     
-    water_temps = WaterTemperature.query.filter(
-        WaterTemperature.timestamp >= today_start,
-        WaterTemperature.timestamp <= today_end
-    ).order_by(WaterTemperature.time_recorded).all()
+    water_temps = sorted(get_water_temperatures(today_start, today_end), key=lambda t: t.time_recorded)
     
     if water_temps and len(water_temps) > 0:
         # Format temperatures as comma-separated text: "01:00 [53], 02:00 [57.1], ..."
@@ -825,6 +1630,18 @@ def generate_daily_pdf(occurrences, report_date=None):
         ]))
         
         story.append(temp_table)
+        
+        # Compliance summary (breaches, time below the Legionella minimum, gaps)
+        compliance = summarize_compliance(get_daily_compliance(report_date, report_date))
+        story.append(Spacer(1, 6))
+        story.append(Paragraph(format_compliance_summary(compliance), ParagraphStyle(
+            'TempCompliance',
+            parent=styles['Normal'],
+            fontSize=9,
+            leading=12,
+            leftIndent=10,
+            textColor=colors.darkred if compliance['below_count'] or compliance['warning_count'] or compliance['gap_count'] else colors.darkgreen
+        )))
     else:
         # No temperature readings
         no_temp_style = ParagraphStyle(
@@ -982,10 +1799,7 @@ def generate_email_html(occurrences, report_date=None):
     # Get water temperatures
     today_start = datetime.combine(report_date, datetime.min.time())
     today_end = datetime.combine(report_date, datetime.max.time())
-    water_temps = WaterTemperature.query.filter(
-        WaterTemperature.timestamp >= today_start,
-        WaterTemperature.timestamp <= today_end
-    ).order_by(WaterTemperature.time_recorded).all()
+    water_temps = sorted(get_water_temperatures(today_start, today_end), key=lambda t: t.time_recorded)
     
     # Build HTML email using list for efficient string building
     html_parts = []
@@ -1223,10 +2037,15 @@ def generate_email_html(occurrences, report_date=None):
         
         temp_text = ", ".join(temp_entries)
         
+        compliance = summarize_compliance(get_daily_compliance(report_date, report_date))
+        compliance_color = '#dc3545' if compliance['below_count'] or compliance['warning_count'] or compliance['gap_count'] else '#28a745'
         html_parts.append(f"""
                 <div style="background: white; border: 2px solid #dee2e6; border-radius: 8px; padding: 20px; font-size: 1em; line-height: 1.6;">
                     {temp_text}
                 </div>
+                <div style="margin-top: 10px; color: {compliance_color}; font-size: 0.9em;">
+                    {format_compliance_summary(compliance)}
+                </div>
 """)
     else:
         html_parts.append("""
@@ -1250,6 +2069,10 @@ def generate_email_html(occurrences, report_date=None):
 
 def send_email(subject, recipient=None):
     """Send email with HTML content - supports multiple recipients"""
+    import smtplib
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+    
     # Ensure we're in app context (needed for scheduler jobs)
     # Check if we're in app context by trying to access current_app
     try:
@@ -1326,12 +2149,12 @@ def send_email(subject, recipient=None):
             server = None  # Mark as closed only after successful quit
         except Exception as quit_error:
             # If quit() fails, let finally block handle cleanup
-            print(Fore.YELLOW + f"Warning: Error during email server quit: {quit_error}")
+            report_log.warning(f"Warning: Error during email server quit: {quit_error}")
         
-        print(Fore.GREEN + f"Email sent successfully from {sender_email} to: {', '.join(recipients)}")
+        report_log.info(f"Email sent successfully from {sender_email} to: {', '.join(recipients)}")
         return True
     except Exception as e:
-        print(Fore.RED + f"Error sending email: {e}")
+        report_log.error(f"Error sending email: {e}")
         return False
     finally:
         # Ensure connection is always closed, even if an error occurred
@@ -1346,28 +2169,189 @@ def send_email(subject, recipient=None):
             finally:
                 server = None  # Always mark as closed after cleanup attempt
 
+# ===== KEYSET PAGINATION =====
+
+def encode_keyset_cursor(timestamp, row_id):
+    """Encode the (timestamp, id) of the last row on a page as an opaque cursor string"""
+    return f"{timestamp.isoformat()}|{row_id}"
+
+def decode_keyset_cursor(cursor):
+    """Decode a cursor from encode_keyset_cursor - raises ValueError if malformed"""
+    timestamp_str, _, row_id = cursor.rpartition('|')
+    return datetime.fromisoformat(timestamp_str), int(row_id)
+
+def apply_keyset_page(query, timestamp_column, id_column, cursor, limit):
+    """
+    Fetch one page of a query ordered newest first by (timestamp, id).
+    
+    Rows after the cursor are selected with a (timestamp, id) comparison so the
+    database seeks directly via the (timestamp, id) index instead of using OFFSET.
+    cursor is the (timestamp, id) from decode_keyset_cursor(), or None for the first page.
+    
+    Returns:
+        Tuple of (rows, next_cursor) - next_cursor is None on the last page
+    """
+    if cursor:
+        cursor_timestamp, cursor_id = cursor
+        query = query.filter(db.or_(
+            timestamp_column < cursor_timestamp,
+            db.and_(timestamp_column == cursor_timestamp, id_column < cursor_id)
+        ))
+    
+    # Fetch one extra row to know whether another page exists
+    rows = query.order_by(timestamp_column.desc(), id_column.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_keyset_cursor(getattr(last, timestamp_column.key), getattr(last, id_column.key))
+    return rows, next_cursor
+
+# ===== RESPONSE COMPRESSION =====
+
+# Responses smaller than this aren't worth compressing
+COMPRESSION_MIN_BYTES = 1024
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/html', 'text/plain', 'text/csv', 'text/css', 'text/javascript'}
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # Fast enough to compress per response; static bundles use the maximum
+
+@cache  # A failed import isn't cached by Python, so don't retry it for every response
+def get_brotli():
+    """Get the brotli module if installed (optional - gzip is used otherwise)"""
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+@app.after_request
+def compress_response(response):
+    """Compress text/JSON responses with brotli or gzip when the client accepts it"""
+    if (response.direct_passthrough or response.is_streamed or response.content_encoding
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    data = response.get_data()
+    if len(data) < COMPRESSION_MIN_BYTES:
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    brotli = get_brotli()
+    if brotli and request.accept_encodings['br']:
+        response.set_data(brotli.compress(data, quality=BROTLI_QUALITY))
+        response.content_encoding = 'br'
+    elif request.accept_encodings['gzip']:
+        response.set_data(gzip.compress(data, compresslevel=GZIP_LEVEL))
+        response.content_encoding = 'gzip'
+    else:
+        return response
+    
+    # The bytes differ from the uncompressed response, so the ETag can only be a weak match
+    etag, is_weak = response.get_etag()
+    if etag and not is_weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+# ===== STATIC ASSETS =====
+
+# CSS/JS bundles for index.html. Each is served from /assets/ under a name that
+# includes a hash of its content, so browsers can cache it forever - a changed
+# file gets a new URL. Compressed variants are built once and kept in memory.
+STATIC_ASSETS = ('css/diary.css', 'js/diary.js', 'js/pin-auth.js')
+STATIC_ASSET_MIMETYPES = {'.css': 'text/css', '.js': 'text/javascript'}
+STATIC_ASSET_MAX_AGE = 365 * 24 * 3600
+
+static_assets = {}  # Fingerprinted name -> {'mimetype', 'etag', 'variants': {encoding: bytes}}
+static_asset_urls = {}  # Asset path -> fingerprinted URL
+index_page_cache = {}  # 'html' and 'etag' of the rendered index page
+static_assets_lock = threading.Lock()
+
+def build_static_assets():
+    """Fingerprint and pre-compress the static bundles and render the index page (once)"""
+    if index_page_cache and not app.debug:
+        return
+    with static_assets_lock:
+        # In debug mode rebuild every time so edits show up on reload
+        if index_page_cache and not app.debug:
+            return
+        brotli = get_brotli()
+        assets, urls = {}, {}
+        for path in STATIC_ASSETS:
+            with open(os.path.join(app.static_folder, path), 'rb') as f:
+                content = f.read()
+            digest = hashlib.sha256(content).hexdigest()[:12]
+            base, extension = os.path.splitext(path)
+            name = f'{base}.{digest}{extension}'
+            variants = {'identity': content, 'gzip': gzip.compress(content, compresslevel=9, mtime=0)}
+            if brotli:
+                variants['br'] = brotli.compress(content, quality=11)
+            assets[name] = {'mimetype': STATIC_ASSET_MIMETYPES[extension], 'etag': digest, 'variants': variants}
+            urls[path] = f'/assets/{name}'
+        static_assets.clear()
+        static_assets.update(assets)
+        static_asset_urls.clear()
+        static_asset_urls.update(urls)
+        
+        html = render_template('index.html')
+        index_page_cache['html'] = html
+        index_page_cache['etag'] = hashlib.sha256(html.encode('utf-8')).hexdigest()[:16]
+
+@app.template_global()
+def asset_url(path):
+    """Fingerprinted URL of a static bundle (for templates)"""
+    return static_asset_urls[path]
+
+@app.route('/assets/<path:name>')
+def static_asset(name):
+    """Serve a fingerprinted bundle, pre-compressed for the client, with a long-lived cache"""
+    build_static_assets()
+    asset = static_assets.get(name)
+    if not asset:
+        return jsonify({'success': False, 'error': 'Asset not found'}), 404
+    
+    response = Response(mimetype=asset['mimetype'])
+    response.set_etag(asset['etag'])
+    response.headers['Cache-Control'] = f'public, max-age={STATIC_ASSET_MAX_AGE}, immutable'
+    response.vary.add('Accept-Encoding')
+    if request.if_none_match.contains_weak(asset['etag']):
+        response.status_code = 304
+        return response
+    
+    accepted = request.accept_encodings
+    encoding = next((encoding for encoding in ('br', 'gzip') if encoding in asset['variants'] and accepted[encoding]), 'identity')
+    response.set_data(asset['variants'][encoding])
+    if encoding != 'identity':
+        response.content_encoding = encoding
+    return response
+
 # Routes
 @app.route('/')
 def index():
-    return render_template('index.html')
+    build_static_assets()
+    # The page itself is static - browsers revalidate it and get a 304 if unchanged
+    response = Response(index_page_cache['html'], mimetype='text/html')
+    response.set_etag(index_page_cache['etag'])
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
 
 @app.route('/api/daily-occurrences', methods=['GET', 'POST'])
 def daily_occurrences():
     if request.method == 'POST':
         try:
-            data = request.json
-            occurrence = DailyOccurrence(
-                time=data['time'],
-                flat_number=data['flat_number'],
-                reported_by=data['reported_by'],
-                description=data['description']
-            )
-            db.session.add(occurrence)
-            db.session.commit()
-            return jsonify({'success': True, 'id': occurrence.id})
+            data = request.get_json(silent=True) or {}
+            values = get_occurrence_values(data)
+            key = get_idempotency_key(request.headers.get('Idempotency-Key'))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        try:
+            (occurrence_id, duplicate), = save_entries([('occurrence', values)], [key])
+            return jsonify({'success': True, 'id': occurrence_id, 'duplicate': duplicate,
+                            'recorded_at_ignored': is_recorded_at_ignored(data, values)})
+        except IdempotencyKeyConflict as e:
+            return jsonify({'success': False, 'error': str(e)}), 409
         except Exception as e:
             db.session.rollback()
-            print(Fore.RED + f"Error creating daily occurrence: {e}")
+            log.error(f"Error creating daily occurrence: {e}")
             return jsonify({'success': False, 'error': str(e)}), 500
     
     # GET request - return today's occurrences
@@ -1389,7 +2373,7 @@ def daily_occurrences():
             'timestamp': o.timestamp.isoformat()
         } for o in occurrences])
     except Exception as e:
-        print(Fore.RED + f"Error fetching daily occurrences: {e}")
+        log.error(f"Error fetching daily occurrences: {e}")
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -1405,11 +2389,144 @@ def delete_daily_occurrence(occurrence_id):
         description = f"Deleted occurrence: {occurrence.time} - Flat {occurrence.flat_number} - {occurrence.description[:50]}..."
         log_activity(user_name, 'delete', 'occurrence', description, occurrence_id, request.remote_addr)
         
+        flat_id = occurrence.flat_id
         db.session.delete(occurrence)
+        refresh_flat_stats(flat_id)
         db.session.commit()
         return jsonify({'success': True})
     return jsonify({'success': False, 'error': 'Occurrence not found'}), 404
 
+# ===== OCCURRENCE HISTORY =====
+
+OCCURRENCE_HISTORY_DEFAULT_DAYS = 7
+OCCURRENCE_HISTORY_DEFAULT_LIMIT = 100
+OCCURRENCE_HISTORY_MAX_LIMIT = 1000
+
+def get_occurrence_history_item(occurrence, archived=False):
+    """History entry for a daily occurrence (live row or archived SimpleNamespace)"""
+    return {
+        'id': occurrence.id,
+        'time': occurrence.time,
+        'flat_number': occurrence.flat_number,
+        'reported_by': occurrence.reported_by,
+        'description': occurrence.description,
+        'timestamp': occurrence.timestamp.isoformat(),
+        'sent': bool(occurrence.sent),
+        'archived': archived
+    }
+
+def get_occurrence_history(start, end, sent, cursor, limit):
+    """
+    Get one page of daily occurrences in a range (newest first) and the per-day counts.
+    
+    Live rows are paged with apply_keyset_page() on the timestamp index. Archived
+    years in the range are read with the same (timestamp, id) seek, limit + 1 rows
+    each, and merged in. Archived rows are always sent, so sent=False skips them.
+    
+    Args:
+        start, end: Timestamp range (datetimes)
+        sent: True/False to only include sent/unsent occurrences, or None for all
+        cursor: (timestamp, id) from decode_keyset_cursor(), or None for the first page
+        limit: Page size
+    
+    Returns:
+        Tuple of (items, next_cursor, histogram) - histogram is a list of
+        {date, count, unsent} for each day with occurrences, oldest first
+    """
+    filters = [DailyOccurrence.timestamp >= start, DailyOccurrence.timestamp <= end]
+    if sent is not None:
+        filters.append(DailyOccurrence.sent == sent)
+    
+    rows, next_cursor = apply_keyset_page(
+        DailyOccurrence.query.filter(*filters), DailyOccurrence.timestamp, DailyOccurrence.id, cursor, limit
+    )
+    candidates = [(row.timestamp, row.id, get_occurrence_history_item(row)) for row in rows]
+    
+    day = db.func.date(DailyOccurrence.timestamp)
+    histogram = {
+        date: {'date': date, 'count': count, 'unsent': unsent or 0}
+        for date, count, unsent in db.session.query(
+            day, db.func.count(DailyOccurrence.id), db.func.sum(db.case((DailyOccurrence.sent == False, 1), else_=0))
+        ).filter(*filters).group_by(day)
+    }
+    
+    years = [year for year in get_archive_years() if start.year <= year <= end.year] if sent is not False else []
+    if years:
+        where = "timestamp >= ? AND timestamp <= ?"
+        params = [start.strftime('%Y-%m-%d %H:%M:%S'), end.strftime('%Y-%m-%d %H:%M:%S.%f')]
+        page_where, page_params = where, list(params)
+        if cursor:
+            cursor_timestamp, cursor_id = cursor
+            cursor_value = cursor_timestamp.strftime('%Y-%m-%d %H:%M:%S.%f')
+            page_where += " AND (timestamp < ? OR (timestamp = ? AND id < ?))"
+            page_params += [cursor_value, cursor_value, cursor_id]
+        
+        with open_archive_connection(years) as (conn, schemas):
+            conn.row_factory = sqlite3.Row
+            for schema in get_archive_schemas_with_column(conn, schemas, 'daily_occurrence', 'timestamp'):
+                for row in conn.execute(
+                    f"SELECT id, timestamp, time, flat_number, reported_by, description, sent FROM {schema}.daily_occurrence "
+                    f"WHERE {page_where} ORDER BY timestamp DESC, id DESC LIMIT ?", page_params + [limit + 1]
+                ):
+                    row = SimpleNamespace(**dict(row))
+                    row.timestamp = datetime.fromisoformat(row.timestamp)
+                    candidates.append((row.timestamp, row.id, get_occurrence_history_item(row, archived=True)))
+                for date, count in conn.execute(
+                    f"SELECT date(timestamp), COUNT(*) FROM {schema}.daily_occurrence WHERE {where} GROUP BY 1", params
+                ):
+                    histogram.setdefault(date, {'date': date, 'count': 0, 'unsent': 0})['count'] += count
+        
+        candidates.sort(key=lambda candidate: candidate[:2], reverse=True)
+        has_more = len(candidates) > limit or next_cursor is not None
+        next_cursor = encode_keyset_cursor(*candidates[limit - 1][:2]) if has_more else None
+        candidates = candidates[:limit]
+    
+    return [candidate[2] for candidate in candidates], next_cursor, [histogram[date] for date in sorted(histogram)]
+
+@app.route('/api/daily-occurrences/history', methods=['GET'])
+def daily_occurrence_history():
+    """Get daily occurrences for a date range with keyset pagination and per-day counts, including archived years"""
+    try:
+        end_date = datetime.strptime(request.args['end_date'], '%Y-%m-%d').date() if request.args.get('end_date') else datetime.now().date()
+        start_date = (datetime.strptime(request.args['start_date'], '%Y-%m-%d').date() if request.args.get('start_date')
+                      else end_date - timedelta(days=OCCURRENCE_HISTORY_DEFAULT_DAYS - 1))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+    if start_date > end_date:
+        return jsonify({'success': False, 'error': 'start_date must not be after end_date'}), 400
+    
+    sent = request.args.get('sent')
+    if sent not in (None, 'true', 'false'):
+        return jsonify({'success': False, 'error': 'sent must be true or false'}), 400
+    limit = min(max(request.args.get('limit', OCCURRENCE_HISTORY_DEFAULT_LIMIT, type=int), 1), OCCURRENCE_HISTORY_MAX_LIMIT)
+    try:
+        cursor = decode_keyset_cursor(request.args['cursor']) if request.args.get('cursor') else None
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid cursor'}), 400
+    
+    try:
+        items, next_cursor, histogram = get_occurrence_history(
+            datetime.combine(start_date, datetime.min.time()),
+            datetime.combine(end_date, datetime.max.time()),
+            None if sent is None else sent == 'true',
+            cursor,
+            limit
+        )
+    except Exception as e:
+        db.session.rollback()
+        log.error(f"Error fetching occurrence history: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+    
+    return jsonify({
+        'success': True,
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'occurrences': items,
+        'total': sum(day['count'] for day in histogram),
+        'next_cursor': next_cursor,
+        'histogram': histogram
+    })
+
 @app.route('/api/staff-rota', methods=['GET', 'POST'])
 def staff_rota():
     if request.method == 'POST':
@@ -1428,7 +2545,7 @@ def staff_rota():
             return jsonify({'success': True, 'id': rota.id})
         except Exception as e:
             db.session.rollback()
-            print(Fore.RED + f"Error creating staff rota entry: {e}")
+            log.error(f"Error creating staff rota entry: {e}")
             return jsonify({'success': False, 'error': str(e)}), 500
     
     # GET request
@@ -1693,10 +2810,47 @@ def staff_schedule(staff_id):
         'schedule': schedule
     })
 
-@app.route('/api/porter-rota', methods=['GET'])
-def porter_rota():
-    """Get porter rota schedule based on 4-week rotation pattern"""
-    start_date = request.args.get('start_date', datetime.now().date().isoformat())
+# Shift rotation: Alternating pattern - Weeks 1&3 have Late, Weeks 2&4 have Early for Shift 1
+# Week 1: Shift 1 = Late (2pm-10pm), Shift 2 = Early (7am-2pm), Night Shift = (10pm-7am)
+# Week 2: Shift 1 = Early (7am-2pm), Shift 2 = Late (2pm-10pm), Night Shift = (10pm-7am)
+# Week 3: Shift 1 = Late (2pm-10pm), Shift 2 = Early (7am-2pm), Night Shift = (10pm-7am)
+# Week 4: Shift 1 = Early (7am-2pm), Shift 2 = Late (2pm-10pm), Night Shift = (10pm-7am)
+ROTATION_SHIFT_TIMES = {
+    1: {'shift1': 'Late (2pm-10pm)', 'shift2': 'Early (7am-2pm)', 'shift3': 'Night (10pm-7am)'},
+    2: {'shift1': 'Early (7am-2pm)', 'shift2': 'Late (2pm-10pm)', 'shift3': 'Night (10pm-7am)'},
+    3: {'shift1': 'Late (2pm-10pm)', 'shift2': 'Early (7am-2pm)', 'shift3': 'Night (10pm-7am)'},
+    4: {'shift1': 'Early (7am-2pm)', 'shift2': 'Late (2pm-10pm)', 'shift3': 'Night (10pm-7am)'}
+}
+SHIFT_TIME_RANGES = {'Early (7am-2pm)': '07:00-14:00', 'Late (2pm-10pm)': '14:00-22:00', 'Night (10pm-7am)': '22:00-07:00'}
+ROTA_CALENDAR_MAX_DAYS = 366 * 2
+
+def get_rotation_staff_off(pattern_key, porter_groups):
+    """
+    Get the staff scheduled off for a rotation key, day shifts first.
+    
+    Returns:
+        List of dicts with name, shift and color
+    """
+    staff_off_list = []
+    
+    # Day shifts (1 & 2) - only apply rotation to day shift colors (red, yellow, green, blue)
+    for color in normalize_colors(DAY_SHIFT_ROTATION_PATTERN.get(pattern_key)):
+        if color in ['red', 'yellow', 'green', 'blue'] and color in porter_groups:
+            for shift in (1, 2):
+                if f'shift{shift}' in porter_groups[color]:
+                    staff_off_list.append({'name': porter_groups[color][f'shift{shift}'], 'shift': shift, 'color': color})
+    
+    # Night shift (shift 3) rotation pattern
+    for color in normalize_colors(NIGHT_SHIFT_ROTATION_PATTERN.get(pattern_key)):
+        if color in porter_groups and 'shift3' in porter_groups[color]:
+            staff_off_list.append({'name': porter_groups[color]['shift3'], 'shift': 3, 'color': color})
+    
+    return staff_off_list
+
+@app.route('/api/porter-rota', methods=['GET'])
+def porter_rota():
+    """Get porter rota schedule based on 4-week rotation pattern"""
+    start_date = request.args.get('start_date', datetime.now().date().isoformat())
     end_date = request.args.get('end_date', (datetime.now() + timedelta(days=365)).date().isoformat())
     
     start = datetime.strptime(start_date, '%Y-%m-%d').date()
@@ -1705,76 +2859,26 @@ def porter_rota():
     # Get staff members from database
     porter_groups, all_staff_by_shift = get_porter_groups()
     
-    # Shift rotation: Alternating pattern - Weeks 1&3 have Late, Weeks 2&4 have Early for Shift 1
-    # Week 1: Shift 1 = Late (2pm-10pm), Shift 2 = Early (7am-2pm), Night Shift = (10pm-7am)
-    # Week 2: Shift 1 = Early (7am-2pm), Shift 2 = Late (2pm-10pm), Night Shift = (10pm-7am)
-    # Week 3: Shift 1 = Late (2pm-10pm), Shift 2 = Early (7am-2pm), Night Shift = (10pm-7am)
-    # Week 4: Shift 1 = Early (7am-2pm), Shift 2 = Late (2pm-10pm), Night Shift = (10pm-7am)
-    shift_schedule = {
-        1: {'shift1': 'Late (2pm-10pm)', 'shift2': 'Early (7am-2pm)', 'shift3': 'Night (10pm-7am)'},
-        2: {'shift1': 'Early (7am-2pm)', 'shift2': 'Late (2pm-10pm)', 'shift3': 'Night (10pm-7am)'},
-        3: {'shift1': 'Late (2pm-10pm)', 'shift2': 'Early (7am-2pm)', 'shift3': 'Night (10pm-7am)'},
-        4: {'shift1': 'Early (7am-2pm)', 'shift2': 'Late (2pm-10pm)', 'shift3': 'Night (10pm-7am)'}
-    }
-    
     schedule = []
     current = start
     while current <= end:
         # Calculate which week in the 4-week cycle
         pattern_key = get_rotation_key(current)
-        week_in_cycle = pattern_key[0]
-        week_number = week_in_cycle + 1
+        week_number = pattern_key[0] + 1
         
-        # Get which color group(s) are off
+        # Get which color group(s) are off, for display purposes join colors if multiple
         colors_off = normalize_colors(DAY_SHIFT_ROTATION_PATTERN.get(pattern_key))
-        
-        # Build staff off list with shift information
-        staff_off_list = []
-        
-        # Day shifts (1 & 2)
-        if colors_off:
-            for color in colors_off:
-                # Only apply rotation to day shift colors (red, yellow, green, blue)
-                if color in ['red', 'yellow', 'green', 'blue'] and color in porter_groups:
-                    if 'shift1' in porter_groups[color]:
-                        staff_off_list.append({
-                            'name': porter_groups[color]['shift1'],
-                            'shift': 1,
-                            'color': color
-                        })
-                    if 'shift2' in porter_groups[color]:
-                        staff_off_list.append({
-                            'name': porter_groups[color]['shift2'],
-                            'shift': 2,
-                            'color': color
-                        })
-        
-        # Night shift (shift 3) rotation pattern
-        night_colors_off = normalize_colors(NIGHT_SHIFT_ROTATION_PATTERN.get(pattern_key))
-        
-        # Add night shift staff who are off
-        if night_colors_off:
-            for color in night_colors_off:
-                if color in porter_groups:
-                    if 'shift3' in porter_groups[color]:
-                        staff_off_list.append({
-                            'name': porter_groups[color]['shift3'],
-                            'shift': 3,
-                            'color': color
-                        })
-        
-        # For display purposes, join colors if multiple
         color_off_display = ', '.join(colors_off) if colors_off else None
         
         # Get shift times for this week
-        shift_times = shift_schedule.get(week_number, {})
+        shift_times = ROTATION_SHIFT_TIMES.get(week_number, {})
         
         schedule.append({
             'date': current.isoformat(),
             'day_name': current.strftime('%A'),
             'week_in_cycle': week_number,
             'color_off': color_off_display,
-            'staff_off': staff_off_list,
+            'staff_off': get_rotation_staff_off(pattern_key, porter_groups),
             'shift1_time': shift_times.get('shift1', ''),
             'shift2_time': shift_times.get('shift2', ''),
             'shift3_time': shift_times.get('shift3', ''),
@@ -1785,38 +2889,100 @@ def porter_rota():
     
     return jsonify(schedule)
 
+@app.route('/api/rota-calendar', methods=['GET'])
+def rota_calendar():
+    """
+    Get the porter rota with leave merged in, grouped by month in a compact columnar layout.
+    
+    Staff are sent once and referenced by index; each month holds one array per
+    column (day of month, week in cycle, colour off, staff off, leave).
+    """
+    try:
+        start = datetime.strptime(request.args['start_date'], '%Y-%m-%d').date() if request.args.get('start_date') else datetime.now().date()
+        end = datetime.strptime(request.args['end_date'], '%Y-%m-%d').date() if request.args.get('end_date') else start + timedelta(days=180)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+    if start > end:
+        return jsonify({'success': False, 'error': 'start_date must not be after end_date'}), 400
+    if (end - start).days >= ROTA_CALENDAR_MAX_DAYS:
+        return jsonify({'success': False, 'error': f'Date range must not exceed {ROTA_CALENDAR_MAX_DAYS} days'}), 400
+    
+    porter_groups, _ = get_porter_groups()
+    staff = []
+    staff_index = {}
+    
+    def get_staff_index(name, shift=None, color=None):
+        if name not in staff_index:
+            staff_index[name] = len(staff)
+            staff.append([name, shift, color])
+        return staff_index[name]
+    
+    for member in StaffMember.query.filter_by(active=True).order_by(StaffMember.shift, StaffMember.color, StaffMember.name):
+        get_staff_index(member.name, member.shift, member.color)
+    
+    # Leave overlays by date - later entries for the same person and day win
+    leave_by_date = defaultdict(dict)
+    for day, staff_name, status in db.session.query(StaffRota.date, StaffRota.staff_name, StaffRota.status).filter(
+        StaffRota.date >= start,
+        StaffRota.date <= end
+    ).order_by(StaffRota.date, StaffRota.id):
+        leave_by_date[day][get_staff_index(staff_name)] = status
+    
+    # The rotation repeats every 4 weeks, so work out who is off once per rotation day
+    off_by_key = {}
+    months = []
+    current = start
+    while current <= end:
+        if not months or current.day == 1:
+            months.append({'month': current.strftime('%Y-%m'), 'day': [], 'week': [], 'color_off': [], 'off': [], 'leave': []})
+        month = months[-1]
+        pattern_key = get_rotation_key(current)
+        if pattern_key not in off_by_key:
+            colors_off = normalize_colors(DAY_SHIFT_ROTATION_PATTERN.get(pattern_key))
+            off_by_key[pattern_key] = (
+                ', '.join(colors_off) if colors_off else None,
+                [get_staff_index(off['name']) for off in get_rotation_staff_off(pattern_key, porter_groups)]
+            )
+        color_off, off = off_by_key[pattern_key]
+        
+        month['day'].append(current.day)
+        month['week'].append(pattern_key[0] + 1)
+        month['color_off'].append(color_off)
+        month['off'].append(off)
+        month['leave'].append([[index, status] for index, status in leave_by_date.get(current, {}).items()])
+        current += timedelta(days=1)
+    
+    return jsonify({
+        'success': True,
+        'start_date': start.isoformat(),
+        'end_date': end.isoformat(),
+        'today': datetime.now().date().isoformat(),
+        'staff': staff,
+        'shift_times': {
+            week: [SHIFT_TIME_RANGES[times[f'shift{shift}']] for shift in (1, 2, 3)]
+            for week, times in ROTATION_SHIFT_TIMES.items()
+        },
+        'months': months
+    })
+
 @app.route('/api/cctv-faults', methods=['GET', 'POST'])
 def cctv_faults():
     if request.method == 'POST':
         try:
-            data = request.json
-            # Build location string from components for backwards compatibility
-            location_parts = []
-            if data.get('flat_number'):
-                location_parts.append(f"Flat {data['flat_number']}")
-            if data.get('block_number'):
-                location_parts.append(f"Block {data['block_number']}")
-            if data.get('floor_number'):
-                location_parts.append(f"Floor {data['floor_number']}")
-            location_string = ' | '.join(location_parts) if location_parts else data.get('location', '')
-            
-            fault = CCTVFault(
-                fault_type=data['fault_type'],
-                flat_number=data.get('flat_number', ''),
-                block_number=data.get('block_number', ''),
-                floor_number=data.get('floor_number', ''),
-                location=location_string,
-                description=data['description'],
-                contact_details=data.get('contact_details', ''),
-                additional_notes=data.get('additional_notes', ''),
-                status=data.get('status', 'open')
-            )
-            db.session.add(fault)
-            db.session.commit()
-            return jsonify({'success': True, 'id': fault.id})
+            data = request.get_json(silent=True) or {}
+            values = get_fault_values(data)
+            key = get_idempotency_key(request.headers.get('Idempotency-Key'))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        try:
+            (fault_id, duplicate), = save_entries([('fault', values)], [key])
+            return jsonify({'success': True, 'id': fault_id, 'duplicate': duplicate,
+                            'recorded_at_ignored': is_recorded_at_ignored(data, values)})
+        except IdempotencyKeyConflict as e:
+            return jsonify({'success': False, 'error': str(e)}), 409
         except Exception as e:
             db.session.rollback()
-            print(Fore.RED + f"Error creating CCTV fault: {e}")
+            log.error(f"Error creating CCTV fault: {e}")
             return jsonify({'success': False, 'error': str(e)}), 500
     
     # GET request
@@ -1840,26 +3006,20 @@ def cctv_faults():
 def water_temperature():
     if request.method == 'POST':
         try:
-            data = request.json
-            # Validate temperature input
-            if not data.get('temperature') or data['temperature'] == '':
-                return jsonify({'success': False, 'error': 'Temperature is required'}), 400
-            
-            try:
-                temperature_value = float(data['temperature'])
-            except (ValueError, TypeError):
-                return jsonify({'success': False, 'error': 'Invalid temperature value'}), 400
-            
-            temp = WaterTemperature(
-                temperature=temperature_value,
-                time_recorded=data['time']
-            )
-            db.session.add(temp)
-            db.session.commit()
-            return jsonify({'success': True, 'id': temp.id})
+            data = request.get_json(silent=True) or {}
+            values = get_water_temperature_values(data)
+            key = get_idempotency_key(request.headers.get('Idempotency-Key'))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        try:
+            (temp_id, duplicate), = save_entries([('water_temperature', values)], [key])
+            return jsonify({'success': True, 'id': temp_id, 'duplicate': duplicate,
+                            'recorded_at_ignored': is_recorded_at_ignored(data, values)})
+        except IdempotencyKeyConflict as e:
+            return jsonify({'success': False, 'error': str(e)}), 409
         except Exception as e:
             db.session.rollback()
-            print(Fore.RED + f"Error creating water temperature entry: {e}")
+            log.error(f"Error creating water temperature entry: {e}")
             return jsonify({'success': False, 'error': str(e)}), 500
     
     # GET request with optional date range parameters
@@ -1875,10 +3035,8 @@ def water_temperature():
             start_datetime = datetime.combine(start_date, datetime.min.time())
             end_datetime = datetime.combine(end_date, datetime.max.time())
             
-            temps = WaterTemperature.query.filter(
-                WaterTemperature.timestamp >= start_datetime,
-                WaterTemperature.timestamp <= end_datetime
-            ).order_by(WaterTemperature.timestamp.desc()).all()
+            # Includes archived years when the range reaches past the archive horizon
+            temps = get_water_temperatures(start_datetime, end_datetime)[::-1]
         except ValueError:
             return jsonify({'success': False, 'error': 'Invalid date format'}), 400
     else:
@@ -1903,9 +3061,59 @@ def delete_water_temperature(temp_id):
         return jsonify({'success': False, 'error': 'Temperature record not found'}), 404
     
     db.session.delete(temp)
+    db.session.flush()
+    refresh_water_temperature_rollups(temp.timestamp)
+    invalidate_daily_compliance(temp.timestamp.date())
     db.session.commit()
     return jsonify({'success': True})
 
+@app.route('/api/water-temperature/series', methods=['GET'])
+def water_temperature_series():
+    """Get water temperatures for charting - raw readings or hourly/daily/weekly min/max/mean"""
+    date_from = request.args.get('date_from')
+    date_to = request.args.get('date_to')
+    resolution = request.args.get('resolution', 'auto')
+    if resolution not in ('auto', 'raw') + WATER_TEMPERATURE_RESOLUTIONS:
+        return jsonify({'success': False, 'error': 'resolution must be auto, raw, hour, day or week'}), 400
+    
+    try:
+        end_date = datetime.strptime(date_to, '%Y-%m-%d').date() if date_to else datetime.now().date()
+        start_date = datetime.strptime(date_from, '%Y-%m-%d').date() if date_from else end_date - timedelta(days=30)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid date format'}), 400
+    
+    start_datetime = datetime.combine(start_date, datetime.min.time())
+    end_datetime = datetime.combine(end_date, datetime.max.time())
+    resolution, points = get_water_temperature_series(start_datetime, end_datetime, resolution)
+    
+    return jsonify({
+        'success': True,
+        'date_from': start_date.isoformat(),
+        'date_to': end_date.isoformat(),
+        'resolution': resolution,
+        'points': points
+    })
+
+@app.route('/api/water-temperature/compliance', methods=['GET'])
+def water_temperature_compliance():
+    """Get Legionella/scalding compliance analytics (breaches, time below threshold, gaps, rolling stats)"""
+    try:
+        end_date = datetime.strptime(request.args['date_to'], '%Y-%m-%d').date() if request.args.get('date_to') else datetime.now().date()
+        start_date = datetime.strptime(request.args['date_from'], '%Y-%m-%d').date() if request.args.get('date_from') else end_date - timedelta(days=30)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid date format'}), 400
+    if start_date > end_date:
+        return jsonify({'success': False, 'error': 'date_from must not be after date_to'}), 400
+    rolling_days = min(max(request.args.get('rolling_days', 7, type=int), 1), 90)
+    
+    try:
+        result = get_water_temperature_compliance(start_date, end_date, rolling_days)
+        return jsonify(dict(result, success=True, date_from=start_date.isoformat(), date_to=end_date.isoformat()))
+    except Exception as e:
+        db.session.rollback()
+        log.error(f"Error computing water temperature compliance: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/update-fault-status', methods=['POST'])
 def update_fault_status():
     data = request.json
@@ -1914,6 +3122,7 @@ def update_fault_status():
         fault.status = data['status']
         if data['status'] == 'closed':
             fault.resolved_date = datetime.now()
+        refresh_flat_stats(fault.flat_id)
         db.session.commit()
         return jsonify({'success': True})
     return jsonify({'success': False})
@@ -1924,50 +3133,594 @@ def delete_fault(fault_id):
     if fault:
         # Only allow deletion of closed faults
         if fault.status == 'closed':
+            flat_id = fault.flat_id
             db.session.delete(fault)
+            refresh_flat_stats(flat_id)
             db.session.commit()
             return jsonify({'success': True})
         else:
             return jsonify({'success': False, 'error': 'Only closed faults can be deleted'})
     return jsonify({'success': False, 'error': 'Fault not found'})
 
-@app.route('/api/test-export', methods=['POST'])
-def test_export():
-    """Test function to export PDF and CSV without sending email"""
+# ===== BATCH WRITES =====
+
+# /api/batch creates many occurrences, water temperature readings and faults in
+# one request and one transaction (one commit instead of one per entry), for
+# catching up on the logbook. Every operation is validated before anything is
+# written, so a batch is saved completely or not at all.
+# Writes may carry a client-generated idempotency key (the Idempotency-Key header,
+# or idempotency_key on a batch operation). The browser's offline outbox replays
+# queued writes until it sees a response, so the same write can arrive twice - a
+# key that was already used returns the original entry instead of a new one.
+# Writes may also carry recorded_at, the time the entry was captured, so entries
+# sent late from the outbox keep their own time instead of the time they arrived.
+BATCH_MAX_OPERATIONS = 500
+FAULT_STATUSES = ('open', 'in_progress', 'closed')
+IDEMPOTENCY_KEY_PATTERN = re.compile(r'[A-Za-z0-9_-]{1,100}')
+IDEMPOTENCY_KEY_RETENTION_DAYS = 30  # Used keys are forgotten after this (by the daily cleanup)
+RECORDED_AT_MAX_AGE_DAYS = 14  # Oldest capture time accepted (well inside the key retention)
+RECORDED_AT_MAX_CLOCK_SKEW = timedelta(minutes=5)  # A client clock this far ahead is taken as now
+
+def get_required_text(data, field, label):
+    """Get a required text field from request data (ValueError if missing or blank)"""
+    value = data.get(field)
+    if value is None or not str(value).strip():
+        raise ValueError(f'{label} is required')
+    return str(value)
+
+def get_recorded_at(data):
+    """
+    Get the optional recorded_at capture time from request data as server local time.
+    
+    A capture time older than RECORDED_AT_MAX_AGE_DAYS is ignored, so the entry is
+    still saved (with the time it arrived) - see is_recorded_at_ignored().
+    
+    Returns:
+        Datetime (never later than now), or None if not given or too old - raises
+        ValueError if malformed or in the future
+    """
+    value = data.get('recorded_at')
+    if value is None or value == '':
+        return None
     try:
-        # Get today's occurrences
-        today = datetime.now().date()
-        next_day = today + timedelta(days=1)
-        occurrences = DailyOccurrence.query.filter(
-            DailyOccurrence.timestamp >= today,
-            DailyOccurrence.timestamp < next_day,
-            DailyOccurrence.sent == False
-        ).all()
-        
-        # Generate PDF regardless of whether there are occurrences
-        pdf_path = generate_daily_pdf(occurrences, today)
-        
-        # Generate CSV backup for safety
-        csv_path = generate_daily_csv(occurrences, today)
-        
-        if not occurrences or len(occurrences) == 0:
-            return jsonify({
-                'success': True, 
-                'message': f'Reports exported successfully:\nPDF: {pdf_path}\nCSV: {csv_path}\n(No occurrences recorded)',
-                'count': 0
-            })
+        recorded_at = datetime.fromisoformat(value)
+    except (ValueError, TypeError):
+        raise ValueError('recorded_at must be an ISO 8601 date and time')
+    if recorded_at.tzinfo:
+        recorded_at = recorded_at.astimezone().replace(tzinfo=None)
+    
+    now = datetime.now()
+    if recorded_at > now + RECORDED_AT_MAX_CLOCK_SKEW:
+        raise ValueError('recorded_at is in the future')
+    if recorded_at < now - timedelta(days=RECORDED_AT_MAX_AGE_DAYS):
+        log.warning(f"recorded_at {value} is more than {RECORDED_AT_MAX_AGE_DAYS} days ago - using the time it arrived")
+        return None
+    return min(recorded_at, now)
+
+def is_recorded_at_ignored(data, values):
+    """Whether a write's recorded_at was too old, so it was saved with the time it arrived"""
+    return bool(data.get('recorded_at')) and values['timestamp'] is None
+
+def get_occurrence_values(data):
+    """Column values for a new daily occurrence from request data (ValueError if invalid)"""
+    return {
+        'time': get_required_text(data, 'time', 'Time'),
+        'flat_number': str(data.get('flat_number') or ''),
+        'reported_by': get_required_text(data, 'reported_by', 'Reported by'),
+        'description': get_required_text(data, 'description', 'Description'),
+        'timestamp': get_recorded_at(data)
+    }
+
+def get_water_temperature_values(data):
+    """Column values for a new water temperature reading from request data (ValueError if invalid)"""
+    if data.get('temperature') is None or data['temperature'] == '':
+        raise ValueError('Temperature is required')
+    try:
+        temperature = float(data['temperature'])
+    except (ValueError, TypeError):
+        raise ValueError('Invalid temperature value')
+    return {
+        'temperature': temperature,
+        'time_recorded': get_required_text(data, 'time', 'Time'),
+        'timestamp': get_recorded_at(data)
+    }
+
+def get_fault_values(data):
+    """Column values for a new CCTV/intercom fault from request data (ValueError if invalid)"""
+    status = data.get('status') or 'open'
+    if status not in FAULT_STATUSES:
+        raise ValueError(f"Status must be one of: {', '.join(FAULT_STATUSES)}")
+    
+    # Build location string from components for backwards compatibility
+    location_parts = []
+    if data.get('flat_number'):
+        location_parts.append(f"Flat {data['flat_number']}")
+    if data.get('block_number'):
+        location_parts.append(f"Block {data['block_number']}")
+    if data.get('floor_number'):
+        location_parts.append(f"Floor {data['floor_number']}")
+    
+    return {
+        'fault_type': get_required_text(data, 'fault_type', 'Fault type'),
+        'flat_number': str(data.get('flat_number') or ''),
+        'block_number': str(data.get('block_number') or ''),
+        'floor_number': str(data.get('floor_number') or ''),
+        'location': ' | '.join(location_parts) if location_parts else data.get('location', ''),
+        'description': get_required_text(data, 'description', 'Description'),
+        'contact_details': data.get('contact_details', ''),
+        'additional_notes': data.get('additional_notes', ''),
+        'status': status,
+        'timestamp': get_recorded_at(data)
+    }
+
+# Operation type: (model, function turning request data into column values)
+BATCH_OPERATION_TYPES = {
+    'occurrence': (DailyOccurrence, get_occurrence_values),
+    'water_temperature': (WaterTemperature, get_water_temperature_values),
+    'fault': (CCTVFault, get_fault_values),
+}
+
+def insert_batch_rows(operations):
+    """
+    Insert validated operations, one multi-row INSERT per type, and update the
+    flats, flat stats and water temperature rollups with one upsert each
+    (in the current transaction - caller commits).
+    
+    Entries without a recorded_at timestamp get the current time. Readings
+    recorded on an earlier day clear that day's cached compliance.
+    
+    Args:
+        operations: List of (operation type, column values) - values from BATCH_OPERATION_TYPES
+    
+    Returns:
+        List of new row ids, in the order of operations
+    """
+    from sqlalchemy import insert
+    
+    now = datetime.now()
+    ids = [None] * len(operations)
+    flat_ids = get_or_create_flats([values for operation_type, values in operations if operation_type != 'water_temperature'])
+    flat_entries, readings = [], []
+    
+    for operation_type, (model, _) in BATCH_OPERATION_TYPES.items():
+        indexes = [i for i, (item_type, _) in enumerate(operations) if item_type == operation_type]
+        if not indexes:
+            continue
+        
+        rows = []
+        for i in indexes:
+            row = dict(operations[i][1])
+            row['timestamp'] = row.get('timestamp') or now
+            if operation_type != 'water_temperature':
+                row['flat_id'] = flat_ids.get(normalize_flat_number(row['flat_number']))
+            rows.append(row)
+        
+        # Ids are assigned in row order within the transaction, but RETURNING order
+        # isn't guaranteed (and sort_by_parameter_order makes SQLite insert row by row)
+        new_ids = sorted(db.session.execute(insert(model.__table__).returning(model.id), rows).scalars())
+        
+        for i, row, new_id in zip(indexes, rows, new_ids):
+            ids[i] = new_id
+            if operation_type == 'water_temperature':
+                readings.append((row['timestamp'], row['temperature']))
+            else:
+                flat_entries.append((row['flat_id'], row['timestamp'], operation_type, row.get('status') != 'closed'))
+    
+    add_to_flat_stats(flat_entries)
+    add_water_temperature_to_rollups(readings)
+    for day in {timestamp.date() for timestamp, _ in readings if timestamp.date() < now.date()}:
+        invalidate_daily_compliance(day)
+    return ids
+
+def get_idempotency_key(value):
+    """Check a client idempotency key - None if not given (ValueError if malformed)"""
+    if value is None or value == '':
+        return None
+    if not isinstance(value, str) or not IDEMPOTENCY_KEY_PATTERN.fullmatch(value):
+        raise ValueError('Idempotency key must be 1-100 letters, digits, "-" or "_"')
+    return value
+
+class IdempotencyKeyConflict(ValueError):
+    """Idempotency keys already used for another type of entry - errors is {operation index: message}"""
+    def __init__(self, errors):
+        super().__init__('; '.join(errors.values()))
+        self.errors = errors
+
+def save_entries(operations, keys):
+    """
+    Create entries and commit, skipping those whose idempotency key was already used.
+    
+    A replayed write (same key) gets the entry created the first time, so client
+    retries never add a row twice. Keys are saved in the same transaction as their
+    entries. If another request saves one of the keys first, the commit fails on the
+    unique key and the whole write is retried once (now finding that key). A key
+    that was used for a different type of entry raises IdempotencyKeyConflict and
+    nothing is saved.
+    
+    Args:
+        operations: List of (operation type, column values) - see insert_batch_rows()
+        keys: Idempotency key of each operation (None for no key)
+    
+    Returns:
+        List of (entry id, duplicate) in the order of operations - duplicate is True for replays
+    """
+    from sqlalchemy import insert
+    from sqlalchemy.exc import IntegrityError
+    
+    for attempt in range(2):
+        given = [key for key in keys if key]
+        used = {key: (entry_type, entry_id) for key, entry_type, entry_id in db.session.execute(
+            db.select(IdempotencyKey.key, IdempotencyKey.entry_type, IdempotencyKey.entry_id).where(IdempotencyKey.key.in_(given))
+        )} if given else {}
+        conflicts = {i: f'Idempotency key was already used for another type of entry ({used[key][0]})'
+                     for i, key in enumerate(keys) if key in used and used[key][0] != operations[i][0]}
+        if conflicts:
+            db.session.rollback()
+            raise IdempotencyKeyConflict(conflicts)
+        new = [i for i, key in enumerate(keys) if key not in used]
+        try:
+            ids = insert_batch_rows([operations[i] for i in new])
+            receipts = [{'key': keys[i], 'entry_type': operations[i][0], 'entry_id': new_id}
+                        for i, new_id in zip(new, ids) if keys[i]]
+            if receipts:
+                db.session.execute(insert(IdempotencyKey), receipts)
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            if attempt:
+                raise
+            continue
         
+        new_ids = dict(zip(new, ids))
+        return [(new_ids[i], False) if i in new_ids else (used[keys[i]][1], True) for i in range(len(operations))]
+
+@app.route('/api/batch', methods=['POST'])
+def batch_write():
+    """Create occurrences, water temperature readings and faults in one transaction"""
+    data = request.get_json(silent=True)
+    operations = data.get('operations') if isinstance(data, dict) else None
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'success': False, 'error': 'operations must be a non-empty list'}), 400
+    if len(operations) > BATCH_MAX_OPERATIONS:
+        return jsonify({'success': False, 'error': f'At most {BATCH_MAX_OPERATIONS} operations per batch'}), 400
+    
+    # Validate everything before writing anything
+    validated, keys, results = [], [], []
+    for index, operation in enumerate(operations):
+        operation_type = operation.get('type') if isinstance(operation, dict) else None
+        result = {'index': index, 'type': operation_type, 'success': False}
+        try:
+            if operation_type not in BATCH_OPERATION_TYPES:
+                raise ValueError(f"type must be one of: {', '.join(BATCH_OPERATION_TYPES)}")
+            values = BATCH_OPERATION_TYPES[operation_type][1](operation)
+            key = get_idempotency_key(operation.get('idempotency_key'))
+            if key and key in keys:
+                raise ValueError('idempotency_key is used more than once in this batch')
+            validated.append((operation_type, values))
+            keys.append(key)
+        except ValueError as e:
+            result['error'] = str(e)
+        results.append(result)
+    
+    invalid = sum('error' in result for result in results)
+    if invalid:
+        return jsonify({
+            'success': False,
+            'error': f'{invalid} of {len(operations)} operations are invalid - nothing was saved',
+            'results': results
+        }), 400
+    
+    try:
+        saved = save_entries(validated, keys)
+    except IdempotencyKeyConflict as e:
+        for index, error in e.errors.items():
+            results[index]['error'] = error
         return jsonify({
+            'success': False,
+            'error': f'{len(e.errors)} of {len(operations)} operations reuse the idempotency key of another type of entry - nothing was saved',
+            'results': results
+        }), 409
+    except Exception as e:
+        db.session.rollback()
+        log.error(f"Error saving batch of {len(validated)} operations: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+    
+    for result, operation, (_, values), (entry_id, duplicate) in zip(results, operations, validated, saved):
+        result.update(success=True, id=entry_id, duplicate=duplicate,
+                      recorded_at_ignored=is_recorded_at_ignored(operation, values))
+    duplicates = sum(duplicate for _, duplicate in saved)
+    counts = {operation_type: sum(item_type == operation_type for (item_type, _), (_, duplicate) in zip(validated, saved) if not duplicate)
+              for operation_type in BATCH_OPERATION_TYPES}
+    log.info("Batch saved: " + (', '.join(f"{count} {operation_type}" for operation_type, count in counts.items() if count) or 'nothing new') +
+             (f" ({duplicates} already saved)" if duplicates else ''))
+    return jsonify({'success': True, 'count': len(saved) - duplicates, 'duplicates': duplicates, 'results': results})
+
+# ===== REPORT JOBS =====
+
+# PDF/CSV generation and test emails requested from the web interface run in separate
+# report worker processes, so ReportLab holding the GIL never stalls other requests.
+# Endpoints queue a ReportJob and return its id; clients poll /api/report-jobs/<id>.
+REPORT_WORKERS_DEFAULT = 1  # Worker processes (--report-workers N); 0 runs jobs on a thread instead
+REPORT_JOB_POLL_SECONDS = 0.5  # How often idle workers check for queued jobs
+REPORT_JOB_RETENTION_DAYS = 30
+
+report_workers = []  # Worker processes (or the thread) started by the scheduler process
+report_worker_count = REPORT_WORKERS_DEFAULT  # Pool size used when this process becomes the scheduler process
+
+def get_unsent_occurrences_for_today():
+    """Today's occurrences not yet sent in a daily report"""
+    today = datetime.now().date()
+    next_day = today + timedelta(days=1)
+    return DailyOccurrence.query.filter(
+        DailyOccurrence.timestamp >= today,
+        DailyOccurrence.timestamp < next_day,
+        DailyOccurrence.sent == False
+    ).all()
+
+def run_test_export_job():
+    """Export today's PDF and CSV without sending email"""
+    today = datetime.now().date()
+    occurrences = get_unsent_occurrences_for_today()
+    
+    # Generate PDF regardless of whether there are occurrences
+    pdf_path = generate_daily_pdf(occurrences, today)
+    
+    # Generate CSV backup for safety
+    csv_path = generate_daily_csv(occurrences, today)
+    
+    if not occurrences or len(occurrences) == 0:
+        return {
             'success': True, 
-            'message': f'Reports exported successfully:\nPDF: {pdf_path}\nCSV: {csv_path}',
-            'count': len(occurrences)
-        })
+            'message': f'Reports exported successfully:\nPDF: {pdf_path}\nCSV: {csv_path}\n(No occurrences recorded)',
+            'count': 0
+        }
+    
+    return {
+        'success': True, 
+        'message': f'Reports exported successfully:\nPDF: {pdf_path}\nCSV: {csv_path}',
+        'count': len(occurrences)
+    }
+
+def run_reprint_report_job(date):
+    """Regenerate the PDF report for a date (YYYY-MM-DD)"""
+    report_date = datetime.strptime(date, '%Y-%m-%d').date()
+    
+    # Get occurrences and water temperatures for the report date (including archived years)
+    today_start = datetime.combine(report_date, datetime.min.time())
+    today_end = datetime.combine(report_date, datetime.max.time())
+    occurrences = sorted(get_occurrences_for_range(today_start, today_end), key=lambda o: o.time)
+    water_temps = get_water_temperatures(today_start, today_end)
+    
+    # Generate the PDF
+    pdf_path = generate_daily_pdf(occurrences, report_date)
+    
+    # Get the filename
+    pdf_filename = os.path.basename(pdf_path)
+    
+    report_log.info(f"✓ Reprinted report for {report_date}: {pdf_filename}")
+    report_log.info(f"  - Occurrences: {len(occurrences)}")
+    report_log.info(f"  - Water temps: {len(water_temps)}")
+    
+    return {
+        'success': True,
+        'message': 'PDF report generated successfully',
+        'pdf_path': pdf_path,
+        'pdf_filename': pdf_filename,
+        'occurrences_count': len(occurrences),
+        'water_temps_count': len(water_temps)
+    }
+
+def run_test_email_job():
+    """Send a test email with today's data (settings are checked before the job is queued)"""
+    settings = ScheduleSettings.query.first()
+    report_log.info(f"\n{'='*50}")
+    report_log.info("SENDING TEST EMAIL")
+    report_log.info(f"{'='*50}")
+    report_log.info(f"From: {settings.sender_email}")
+    report_log.info(f"To: {settings.recipient_email}")
+    report_log.info(f"SMTP Server: {settings.smtp_server}:{settings.smtp_port}")
+    
+    # Get today's occurrences
+    today = datetime.now().date()
+    occurrences = get_unsent_occurrences_for_today()
+    
+    report_log.info(f"Occurrences found: {len(occurrences)}")
+    
+    # Generate PDF and CSV for local backup (not sent via email)
+    pdf_path = generate_daily_pdf(occurrences, today)
+    csv_path = generate_daily_csv(occurrences, today)
+    report_log.info(f"PDF generated for local backup: {pdf_path}")
+    report_log.info(f"CSV generated for local backup: {csv_path}")
+    
+    # Send test email with HTML styling
+    report_log.info("Attempting to send HTML email...")
+    email_sent = send_email(
+        f"TEST - Daily Report - {today}", 
+        settings.recipient_email
+    )
+    
+    if email_sent:
+        occurrence_count = len(occurrences) if occurrences else 0
+        report_log.info("✓ HTML email sent successfully!")
+        report_log.info(f"{'='*50}\n")
+        return {
+            'success': True,
+            'message': f'Test email sent successfully to {settings.recipient_email}!\n\nEmail includes:\n- Beautiful HTML styling\n- {occurrence_count} occurrence(s)\n- Staff schedule in 3 columns\n- Water temperature readings\n\nCheck your inbox!',
+            'count': occurrence_count
+        }
+    
+    report_log.error("✗ Email failed to send!")
+    report_log.info(f"{'='*50}\n")
+    return {
+        'success': False,
+        'error': 'Failed to send test email. Check console for details. Common issues:\n- Wrong email/password\n- Gmail: Need App Password, not regular password\n- Firewall blocking SMTP\n- Check spam folder'
+    }
+
+def run_missed_reports_job(days):
+    """Send the daily reports missed in the last `days` days (email is checked before the job is queued)"""
+    missed = check_missed_reports(days)
+    return {
+        'success': True,
+        'days': days,
+        'missed': [dict(report, date=report['date'].isoformat()) for report in missed]
+    }
+
+REPORT_JOB_TYPES = {
+    'test_export': run_test_export_job,
+    'reprint_report': run_reprint_report_job,
+    'test_email': run_test_email_job,
+    'missed_reports': run_missed_reports_job,
+}
+
+def submit_report_job(job_type, **params):
+    """Queue a report job - returns the 202 response pointing at its status"""
+    job = ReportJob(job_type=job_type, params=json.dumps(params), status='queued')
+    db.session.add(job)
+    db.session.commit()
+    return jsonify({
+        'success': True,
+        'queued': True,
+        'job_id': job.id,
+        'status_url': f'/api/report-jobs/{job.id}'
+    }), 202
+
+def claim_report_job():
+    """Mark the oldest queued job as running for this worker (None if the queue is empty)"""
+    while True:
+        job = ReportJob.query.filter_by(status='queued').order_by(ReportJob.id).first()
+        if job is None:
+            return None
+        # Only one worker wins the conditional update if several pick the same job
+        claimed = ReportJob.query.filter_by(id=job.id, status='queued').update(
+            {'status': 'running', 'started': datetime.now(), 'worker_pid': os.getpid()},
+            synchronize_session=False
+        )
+        db.session.commit()
+        if claimed:
+            db.session.refresh(job)
+            return job
+
+def execute_report_job(job):
+    """Run a claimed job and store its result"""
+    started = time.perf_counter()
+    try:
+        result = REPORT_JOB_TYPES[job.job_type](**json.loads(job.params or '{}'))
+        job.status = 'done'
+    except Exception as e:
+        db.session.rollback()
+        report_log.error(f"Report job {job.id} ({job.job_type}) failed: {e}")
+        result = {'success': False, 'error': str(e)}
+        job.status = 'failed'
+        job.error = str(e)
+    job.result = json.dumps(result, default=str)
+    job.finished = datetime.now()
+    db.session.commit()
+    report_log.info(f"Report job {job.id} ({job.job_type}) {job.status} in {time.perf_counter() - started:.2f}s")
+
+def run_report_worker():
+    """Report worker loop - runs queued jobs one at a time until the parent process exits"""
+    import multiprocessing
+    parent = multiprocessing.parent_process()
+    with app.app_context():
+        while parent is None or parent.is_alive():
+            try:
+                job = claim_report_job()
+            except Exception as e:
+                db.session.rollback()
+                report_log.error(f"Error checking report job queue: {e}")
+                job = None
+            if job is None:
+                time.sleep(REPORT_JOB_POLL_SECONDS)
+                continue
+            execute_report_job(job)
+            db.session.remove()
+
+def start_report_workers(count=REPORT_WORKERS_DEFAULT):
+    """
+    Start the report workers (scheduler process only, so there is one pool).
+    
+    Jobs left running by workers that stopped are marked failed rather than re-run,
+    since a test email may already have been sent.
+    """
+    with app.app_context():
+        interrupted = ReportJob.query.filter_by(status='running').update(
+            {'status': 'failed', 'error': 'Report worker stopped before the job finished', 'finished': datetime.now()},
+            synchronize_session=False
+        )
+        ReportJob.query.filter(
+            ReportJob.status.in_(['done', 'failed']),
+            ReportJob.created < datetime.now() - timedelta(days=REPORT_JOB_RETENTION_DAYS)
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        if interrupted:
+            report_log.warning(f"⚠️ {interrupted} report job(s) were interrupted by a restart")
+    
+    if count < 1:
+        # No worker processes - run jobs on a background thread of this process
+        worker = threading.Thread(target=run_report_worker, name='report-worker', daemon=True)
+        worker.start()
+        report_workers.append(worker)
+        report_log.info("Report jobs run on a background thread (no worker processes)")
+        return
+    
+    import multiprocessing
+    # spawn (the only option on Windows) gives each worker a fresh interpreter - no forked
+    # database connections, scheduler or log listener threads
+    context = multiprocessing.get_context('spawn')
+    for number in range(count):
+        worker = context.Process(target=run_report_worker, name=f'report-worker-{number + 1}', daemon=True)
+        worker.start()
+        report_workers.append(worker)
+    report_log.info(f"✓ Started {count} report worker process(es)")
+
+def get_report_job_status(job):
+    """Status response for a report job"""
+    status = {
+        'id': job.id,
+        'type': job.job_type,
+        'status': job.status,
+        'created': job.created.isoformat(timespec='seconds') if job.created else None,
+        'started': job.started.isoformat(timespec='seconds') if job.started else None,
+        'finished': job.finished.isoformat(timespec='seconds') if job.finished else None,
+        'duration_seconds': round((job.finished - job.started).total_seconds(), 2) if job.finished and job.started else None,
+        'error': job.error,
+        'result': json.loads(job.result) if job.result else None
+    }
+    if job.status == 'queued':
+        status['queue_position'] = ReportJob.query.filter(ReportJob.status == 'queued', ReportJob.id < job.id).count() + 1
+    return status
+
+@app.route('/api/report-jobs/<int:job_id>', methods=['GET'])
+def report_job_status(job_id):
+    """Get a report job's status (answers straight away - clients poll until it is done or failed)"""
+    job = db.session.get(ReportJob, job_id)
+    if not job:
+        return jsonify({'success': False, 'error': 'Report job not found'}), 404
+    return jsonify({'success': True, 'job': get_report_job_status(job)})
+
+@app.route('/api/report-jobs', methods=['GET'])
+def report_jobs():
+    """List recent report jobs, newest first"""
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 200)
+    jobs = ReportJob.query.order_by(ReportJob.id.desc()).limit(limit).all()
+    return jsonify({
+        'success': True,
+        'workers': len(report_workers),
+        'queued': ReportJob.query.filter_by(status='queued').count(),
+        'jobs': [get_report_job_status(job) for job in jobs]
+    })
+
+@app.route('/api/test-export', methods=['POST'])
+def test_export():
+    """Queue an export of today's PDF and CSV without sending email"""
+    try:
+        return submit_report_job('test_export')
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/api/reprint-report', methods=['POST'])
 def reprint_report():
-    """Reprint a report for a specific date (from Settings tab)"""
+    """Queue a reprint of the report for a specific date (from Settings tab)"""
     try:
         data = request.json
         date_str = data.get('date')
@@ -1975,53 +3728,18 @@ def reprint_report():
         if not date_str:
             return jsonify({'success': False, 'error': 'Date parameter required'}), 400
         
-        # Parse the date
-        report_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-        next_day = report_date + timedelta(days=1)
-        
-        # Get occurrences for the report date
-        occurrences = DailyOccurrence.query.filter(
-            DailyOccurrence.timestamp >= report_date,
-            DailyOccurrence.timestamp < next_day
-        ).order_by(DailyOccurrence.time).all()
-        
-        # Get water temperatures for the report date
-        today_start = datetime.combine(report_date, datetime.min.time())
-        today_end = datetime.combine(report_date, datetime.max.time())
-        water_temps = WaterTemperature.query.filter(
-            WaterTemperature.timestamp >= today_start,
-            WaterTemperature.timestamp <= today_end
-        ).all()
-        
-        # Generate the PDF
-        pdf_path = generate_daily_pdf(occurrences, report_date)
-        
-        # Get the filename
-        pdf_filename = os.path.basename(pdf_path)
-        
-        print(Fore.GREEN + f"✓ Reprinted report for {report_date}: {pdf_filename}")
-        print(Fore.CYAN + f"  - Occurrences: {len(occurrences)}")
-        print(Fore.CYAN + f"  - Water temps: {len(water_temps)}")
-        
-        return jsonify({
-            'success': True,
-            'message': 'PDF report generated successfully',
-            'pdf_path': pdf_path,
-            'pdf_filename': pdf_filename,
-            'occurrences_count': len(occurrences),
-            'water_temps_count': len(water_temps)
-        })
+        # Validate the date now so a bad request fails straight away
+        datetime.strptime(date_str, '%Y-%m-%d')
+        return submit_report_job('reprint_report', date=date_str)
     except ValueError as e:
         return jsonify({'success': False, 'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
     except Exception as e:
-        print(Fore.RED + f"Error reprinting report: {e}")
-        import traceback
-        traceback.print_exc()
+        report_log.error(f"Error queueing report reprint: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/test-email', methods=['POST'])
 def test_email():
-    """Send a test email with today's data"""
+    """Queue a test email with today's data"""
     try:
         # Get settings
         settings = ScheduleSettings.query.first()
@@ -2044,77 +3762,22 @@ def test_email():
                 'error': 'Recipient email not configured. Please enter a recipient email address.'
             })
         
-        print(Fore.CYAN + Style.BRIGHT + f"\n{'='*50}")
-        print(Fore.CYAN + Style.BRIGHT + f"SENDING TEST EMAIL")
-        print(Fore.CYAN + Style.BRIGHT + f"{'='*50}")
-        print(Fore.CYAN + f"From: {settings.sender_email}")
-        print(Fore.CYAN + f"To: {settings.recipient_email}")
-        print(Fore.CYAN + f"SMTP Server: {settings.smtp_server}:{settings.smtp_port}")
-        
-        # Get today's occurrences
-        today = datetime.now().date()
-        next_day = today + timedelta(days=1)
-        occurrences = DailyOccurrence.query.filter(
-            DailyOccurrence.timestamp >= today,
-            DailyOccurrence.timestamp < next_day,
-            DailyOccurrence.sent == False
-        ).all()
-        
-        print(Fore.CYAN + f"Occurrences found: {len(occurrences)}")
-        
-        # Generate PDF and CSV for local backup (not sent via email)
-        pdf_path = generate_daily_pdf(occurrences, today)
-        csv_path = generate_daily_csv(occurrences, today)
-        print(Fore.CYAN + f"PDF generated for local backup: {pdf_path}")
-        print(Fore.CYAN + f"CSV generated for local backup: {csv_path}")
-        
-        # Send test email with HTML styling
-        print(Fore.CYAN + f"Attempting to send HTML email...")
-        email_sent = send_email(
-            f"TEST - Daily Report - {today}", 
-            settings.recipient_email
-        )
-        
-        if email_sent:
-            occurrence_count = len(occurrences) if occurrences else 0
-            print(Fore.GREEN + f"✓ HTML email sent successfully!")
-            print(Fore.CYAN + Style.BRIGHT + f"{'='*50}\n")
-            return jsonify({
-                'success': True,
-                'message': f'Test email sent successfully to {settings.recipient_email}!\n\nEmail includes:\n- Beautiful HTML styling\n- {occurrence_count} occurrence(s)\n- Staff schedule in 3 columns\n- Water temperature readings\n\nCheck your inbox!',
-                'count': occurrence_count
-            })
-        else:
-            print(Fore.RED + f"✗ Email failed to send!")
-            print(Fore.CYAN + Style.BRIGHT + f"{'='*50}\n")
-            return jsonify({
-                'success': False,
-                'error': 'Failed to send test email. Check console for details. Common issues:\n- Wrong email/password\n- Gmail: Need App Password, not regular password\n- Firewall blocking SMTP\n- Check spam folder'
-            })
-            
+        return submit_report_job('test_email')
     except Exception as e:
-        print(Fore.RED + f"✗ ERROR: {str(e)}")
-        print(Fore.CYAN + Style.BRIGHT + f"{'='*50}\n")
-        import traceback
-        traceback.print_exc()
+        report_log.error(f"✗ ERROR: {str(e)}")
         return jsonify({'success': False, 'error': f'Error sending test email: {str(e)}'})
 
 @app.route('/api/test-clear', methods=['POST'])
 def test_clear():
     """Test function to clear today's diary entries"""
     try:
-        # Get today's occurrences
-        today = datetime.now().date()
-        occurrences = DailyOccurrence.query.filter(
-            DailyOccurrence.timestamp >= today
-        ).all()
-        
-        count = len(occurrences)
-        
-        # Delete all today's occurrences
-        for occurrence in occurrences:
-            db.session.delete(occurrence)
-        
+        # Delete all today's occurrences with set-based DELETEs (no ORM objects loaded)
+        today_start = datetime.combine(datetime.now().date(), datetime.min.time())
+        flat_ids = db.session.execute(
+            db.select(DailyOccurrence.flat_id).where(DailyOccurrence.timestamp >= today_start).distinct()
+        ).scalars().all()
+        count = delete_in_chunks(DailyOccurrence, DailyOccurrence.timestamp >= today_start)
+        refresh_flat_stats(*flat_ids)
         db.session.commit()
         
         return jsonify({
@@ -2123,19 +3786,20 @@ def test_clear():
             'message': f'Cleared {count} diary entries'
         })
     except Exception as e:
+        db.session.rollback()
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/api/backup-to-gdrive', methods=['POST'])
 def manual_backup_to_gdrive():
     """Manually trigger a Google Drive backup"""
     try:
-        print(Fore.CYAN + Style.BRIGHT + "\n" + "=" * 50)
-        print(Fore.CYAN + Style.BRIGHT + "MANUAL GOOGLE DRIVE BACKUP")
-        print(Fore.CYAN + Style.BRIGHT + "=" * 50)
+        backup_log.info("\n" + "=" * 50)
+        backup_log.info("MANUAL GOOGLE DRIVE BACKUP")
+        backup_log.info("=" * 50)
         
         success = backup_database_to_gdrive()
         
-        print(Fore.CYAN + Style.BRIGHT + "=" * 50 + "\n")
+        backup_log.info("=" * 50 + "\n")
         
         if success:
             return jsonify({
@@ -2148,32 +3812,90 @@ def manual_backup_to_gdrive():
                 'error': 'Backup failed. Check console for details.\n\nCommon issues:\n- service_account.json file missing\n- Invalid credentials\n- No internet connection\n- Google Drive API not enabled'
             })
     except Exception as e:
-        print(Fore.RED + f"✗ Error in manual backup: {str(e)}")
-        print(Fore.CYAN + Style.BRIGHT + "=" * 50 + "\n")
+        backup_log.error(f"✗ Error in manual backup: {str(e)}")
+        backup_log.info("=" * 50 + "\n")
         return jsonify({
             'success': False,
             'error': f'Error triggering backup: {str(e)}'
         })
 
-def log_settings_access(staff_name, action, success, ip_address=None):
-    """Log all settings access attempts to a file"""
-    try:
-        log_dir = os.path.join(BASE_PATH, 'logs')
-        os.makedirs(log_dir, exist_ok=True)
-        log_file = os.path.join(log_dir, 'settings_access.log')
-        
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        status = 'SUCCESS' if success else 'FAILED'
-        ip_info = f" from {ip_address}" if ip_address else ""
-        
-        log_entry = f"[{timestamp}] {status} - {staff_name} - {action}{ip_info}\n"
-        
-        with open(log_file, 'a', encoding='utf-8') as f:
-            f.write(log_entry)
-        
-        print(Fore.CYAN + f"Settings access logged: {log_entry.strip()}")
-    except Exception as e:
-        print(Fore.RED + f"Error logging settings access: {e}")
+@app.route('/api/archive', methods=['GET', 'POST'])
+def data_archive():
+    """GET: list archive databases and row counts, POST: archive old data now"""
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        horizon_days = data.get('horizon_days')
+        if horizon_days is not None:
+            try:
+                horizon_days = int(horizon_days)
+            except (ValueError, TypeError):
+                return jsonify({'success': False, 'error': 'horizon_days must be a whole number'}), 400
+            if horizon_days < 30:
+                return jsonify({'success': False, 'error': 'horizon_days must be at least 30'}), 400
+        
+        results = archive_old_data(horizon_days)
+        log_activity(data.get('user_name', 'Unknown'), 'modify', 'archive',
+                     f"Archived old data: {results}", None, request.remote_addr)
+        return jsonify({'success': True, 'archived': results})
+    
+    archives = []
+    for year in get_archive_years():
+        with open_archive_connection([year]) as (conn, schemas):
+            tables = {}
+            for table in ARCHIVE_POLICY:
+                if conn.execute(f"SELECT 1 FROM {schemas[0]}.sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone():
+                    tables[table] = conn.execute(f"SELECT COUNT(*) FROM {schemas[0]}.{table}").fetchone()[0]
+        archives.append({
+            'year': year,
+            'file': os.path.basename(get_archive_path(year)),
+            'size_kb': round(os.path.getsize(get_archive_path(year)) / 1024, 2),
+            'tables': tables
+        })
+    
+    return jsonify({
+        'success': True,
+        'archives': archives,
+        'policy': {table: {'timestamp_column': column, 'horizon_days': days}
+                   for table, (column, days, _) in ARCHIVE_POLICY.items()}
+    })
+
+@app.route('/api/missed-reports', methods=['GET', 'POST'])
+def missed_reports():
+    """GET: list days with data but no daily report sent, POST: queue a report job sending them"""
+    data = (request.get_json(silent=True) or {}) if request.method == 'POST' else request.args
+    try:
+        days = int(data.get('days', MISSED_REPORT_WINDOW_DAYS))
+    except (ValueError, TypeError):
+        return jsonify({'success': False, 'error': 'days must be a whole number'}), 400
+    if days < 1 or days > MISSED_REPORT_MAX_WINDOW_DAYS:
+        return jsonify({'success': False, 'error': f'days must be between 1 and {MISSED_REPORT_MAX_WINDOW_DAYS}'}), 400
+    
+    if request.method == 'POST':
+        # Up to a year of reports to render and email - sent by a report worker, not this request
+        settings = ScheduleSettings.query.first()
+        if not settings or not settings.email_enabled:
+            return jsonify({'success': False, 'error': 'Email sending is disabled. Please enable it in settings first.'}), 400
+        log_activity(data.get('user_name', 'Unknown'), 'add', 'email',
+                     f"Missed report check queued over {days} days", None, request.remote_addr)
+        return submit_report_job('missed_reports', days=days)
+    
+    missed = find_missed_report_dates(days)
+    return jsonify({
+        'success': True,
+        'days': days,
+        'missed': [dict(report, date=report['date'].isoformat()) for report in missed]
+    })
+
+def log_settings_access(staff_name, action, success, ip_address=None):
+    """Log all settings access attempts (written to logs/settings_access.log by the access logger)"""
+    status = 'SUCCESS' if success else 'FAILED'
+    ip_info = f" from {ip_address}" if ip_address else ""
+    
+    access_log.log(
+        logging.INFO if success else logging.WARNING,
+        f"{status} - {staff_name} - {action}{ip_info}",
+        extra={'data': {'staff_name': staff_name, 'action': action, 'success': success, 'ip_address': ip_address}}
+    )
 
 def log_activity(user_name, action_type, entity_type, description, entity_id=None, ip_address=None):
     """Log user activity to database"""
@@ -2188,44 +3910,18 @@ def log_activity(user_name, action_type, entity_type, description, entity_id=Non
         )
         db.session.add(activity)
         db.session.commit()
-        print(Fore.CYAN + f"Activity logged: {user_name} - {description}")
+        log.info(f"Activity logged: {user_name} - {description}")
     except Exception as e:
-        print(Fore.RED + f"Error logging activity: {e}")
+        log.error(f"Error logging activity: {e}")
         db.session.rollback()
 
 def log_shutdown(reason="Normal shutdown"):
-    """Log application shutdown to a text file"""
-    try:
-        log_dir = os.path.join(BASE_PATH, 'logs')
-        os.makedirs(log_dir, exist_ok=True)
-        log_file = os.path.join(log_dir, 'shutdown_log.txt')
-        
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        log_entry = f"[{timestamp}] APPLICATION STOPPED - Reason: {reason}\n"
-        
-        with open(log_file, 'a', encoding='utf-8') as f:
-            f.write(log_entry)
-        
-        print(Fore.CYAN + f"Shutdown logged: {log_entry.strip()}")
-    except Exception as e:
-        print(Fore.RED + f"Error logging shutdown: {e}")
+    """Log application shutdown (written to logs/shutdown_log.txt by the lifecycle logger)"""
+    lifecycle_log.info(f"APPLICATION STOPPED - Reason: {reason}", extra={'data': {'event': 'stop', 'reason': reason}})
 
 def log_startup():
-    """Log application startup to a text file"""
-    try:
-        log_dir = os.path.join(BASE_PATH, 'logs')
-        os.makedirs(log_dir, exist_ok=True)
-        log_file = os.path.join(log_dir, 'shutdown_log.txt')
-        
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        log_entry = f"[{timestamp}] APPLICATION STARTED\n"
-        
-        with open(log_file, 'a', encoding='utf-8') as f:
-            f.write(log_entry)
-        
-        print(Fore.GREEN + f"Startup logged: {log_entry.strip()}")
-    except Exception as e:
-        print(Fore.RED + f"Error logging startup: {e}")
+    """Log application startup (written to logs/shutdown_log.txt by the lifecycle logger)"""
+    lifecycle_log.info("APPLICATION STARTED", extra={'data': {'event': 'start'}})
 
 @app.route('/api/verify-settings-pin', methods=['POST'])
 @rate_limit(max_attempts=5, window=300)
@@ -2260,7 +3956,7 @@ def verify_settings_pin():
         return jsonify({'success': False, 'error': 'Invalid PIN'})
         
     except Exception as e:
-        print(Fore.RED + f"Error verifying settings PIN: {e}")
+        auth_log.error(f"Error verifying settings PIN: {e}")
         log_settings_access('Unknown', f'Settings Access Error: {str(e)}', False, request.remote_addr)
         return jsonify({'success': False, 'error': str(e)})
 
@@ -2300,7 +3996,7 @@ def verify_leave_pin():
         return jsonify({'success': False, 'error': 'Invalid PIN or unauthorized access. Only Super Users can access this section.'})
         
     except Exception as e:
-        print(Fore.RED + f"Error verifying leave PIN: {e}")
+        auth_log.error(f"Error verifying leave PIN: {e}")
         log_settings_access('Unknown', f'Leave/Overtime Access Error: {str(e)}', False, request.remote_addr)
         return jsonify({'success': False, 'error': str(e)})
 
@@ -2378,6 +4074,7 @@ def overtime():
                 created_by=super_user.name
             )
             db.session.add(overtime_entry)
+            invalidate_overtime_summaries(date_obj)
             db.session.commit()
             
             return jsonify({'success': True, 'id': overtime_entry.id})
@@ -2385,7 +4082,7 @@ def overtime():
         except Exception as e:
             db.session.rollback()
             error_msg = str(e)
-            print(Fore.RED + f"Error saving overtime entry: {error_msg}")
+            log.error(f"Error saving overtime entry: {error_msg}")
             return jsonify({'success': False, 'error': f'Error saving overtime entry: {error_msg}'}), 500
     
     # GET request - filter by date range and staff
@@ -2445,12 +4142,14 @@ def overtime_entry(overtime_id):
         return jsonify({'success': False, 'error': 'Overtime entry not found'}), 404
     
     if request.method == 'DELETE':
+        invalidate_overtime_summaries(overtime_entry.date)
         db.session.delete(overtime_entry)
         db.session.commit()
         return jsonify({'success': True})
     
     # PUT request - update
     data = request.json
+    previous_date = overtime_entry.date
     overtime_entry.staff_name = data.get('staff_name', overtime_entry.staff_name)
     if 'date' in data:
         overtime_entry.date = datetime.strptime(data['date'], '%Y-%m-%d').date()
@@ -2459,76 +4158,636 @@ def overtime_entry(overtime_id):
     if 'description' in data:
         overtime_entry.description = data['description']
     overtime_entry.updated_date = datetime.now()
-    
+
+    invalidate_overtime_summaries(previous_date, overtime_entry.date)
     db.session.commit()
     return jsonify({'success': True})
 
+# ===== OVERTIME SUMMARY =====
+
+# Pay periods are 4-week blocks aligned with the rotation cycle
+PAY_PERIOD_REFERENCE_DATE = ROTATION_REFERENCE_DATE
+PAY_PERIOD_DAYS = 28
+OVERTIME_PERIOD_TYPES = ('week', 'month', 'pay_period')
+OVERTIME_SUMMARY_MAX_DAYS = 366 * 5
+
+def get_overtime_period_start(day, period_type):
+    """Get the first day of the week (Monday), month or pay period containing a date"""
+    if period_type == 'week':
+        return day - timedelta(days=day.weekday())
+    if period_type == 'month':
+        return day.replace(day=1)
+    offset = (day - PAY_PERIOD_REFERENCE_DATE).days
+    return day - timedelta(days=offset % PAY_PERIOD_DAYS)
+
+def get_overtime_period_end(period_start, period_type):
+    """Get the last day of the period starting on period_start"""
+    if period_type == 'week':
+        return period_start + timedelta(days=6)
+    if period_type == 'month':
+        next_month = (period_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return next_month - timedelta(days=1)
+    return period_start + timedelta(days=PAY_PERIOD_DAYS - 1)
+
+def get_overtime_period_key(period_type):
+    """
+    SQL expression giving the period start ('YYYY-MM-DD') of Overtime.date,
+    matching get_overtime_period_start() so totals can be grouped in the database.
+    """
+    if period_type == 'week':
+        # Step back 6 days, then forward to the next Monday
+        return db.func.date(Overtime.date, '-6 days', 'weekday 1')
+    if period_type == 'month':
+        return db.func.strftime('%Y-%m-01', Overtime.date)
+    days = db.cast(db.func.julianday(Overtime.date) - db.func.julianday(PAY_PERIOD_REFERENCE_DATE.isoformat()), db.Integer)
+    # Floor to a multiple of PAY_PERIOD_DAYS (SQLite's % keeps the sign of negative offsets)
+    offset = days - (days % PAY_PERIOD_DAYS + PAY_PERIOD_DAYS) % PAY_PERIOD_DAYS
+    return db.func.date(PAY_PERIOD_REFERENCE_DATE.isoformat(), db.func.printf('%+d days', offset))
+
+def compute_overtime_period_totals(period_type, start_date, end_date):
+    """
+    Total overtime per staff member per period, flagging hours worked on rotation days off.
+
+    Args:
+        period_type: 'week', 'month' or 'pay_period'
+        start_date: First day (a period start)
+        end_date: Last day (a period end)
+
+    Returns:
+        Dict of period start date -> {staff name: totals dict}
+    """
+    period_key = get_overtime_period_key(period_type).label('period_start')
+    in_range = (Overtime.date >= start_date, Overtime.date <= end_date)
+    totals = defaultdict(dict)
+
+    for staff_name, period_start, hours, entries in db.session.query(
+        Overtime.staff_name, period_key, db.func.sum(Overtime.hours), db.func.count(Overtime.id)
+    ).filter(*in_range).group_by(Overtime.staff_name, period_key):
+        totals[datetime.strptime(period_start, '%Y-%m-%d').date()][staff_name] = {
+            'hours': round(hours, 2),
+            'entries': entries,
+            'off_day_hours': 0,
+            'off_day_entries': 0,
+            'off_days': []
+        }
+
+    # Overtime on a day the rotation has the porter off - the rotation repeats every
+    # 4 weeks, so look the staff off up once per rotation day rather than per date
+    porter_groups, _ = get_porter_groups()
+    staff_off_by_key = {}
+    for staff_name, day, hours, entries in db.session.query(
+        Overtime.staff_name, Overtime.date, db.func.sum(Overtime.hours), db.func.count(Overtime.id)
+    ).filter(*in_range).group_by(Overtime.staff_name, Overtime.date):
+        rotation_key = get_rotation_key(day)
+        if rotation_key not in staff_off_by_key:
+            staff_off_by_key[rotation_key] = set(get_staff_off_for_date(day, porter_groups))
+        if staff_name not in staff_off_by_key[rotation_key]:
+            continue
+        staff_totals = totals[get_overtime_period_start(day, period_type)][staff_name]
+        staff_totals['off_day_hours'] = round(staff_totals['off_day_hours'] + hours, 2)
+        staff_totals['off_day_entries'] += entries
+        staff_totals['off_days'].append({'date': day.isoformat(), 'hours': round(hours, 2)})
+
+    return totals
+
+def get_overtime_summary(period_type, start_date, end_date, staff_name=None):
+    """
+    Get overtime totals per staff member for each period overlapping a date range.
+
+    Closed periods (ended before today) are cached in OvertimePeriodSummary, so only
+    uncached periods and the current one are totalled from the overtime entries.
+
+    Returns:
+        Dict with the periods (oldest first) and totals per staff member across them
+    """
+    today = datetime.now().date()
+    period_starts = []
+    period_start = get_overtime_period_start(start_date, period_type)
+    while period_start <= end_date:
+        period_starts.append(period_start)
+        period_start = get_overtime_period_end(period_start, period_type) + timedelta(days=1)
+
+    cached = {
+        row.period_start: json.loads(row.data)
+        for row in OvertimePeriodSummary.query.filter(
+            OvertimePeriodSummary.period_type == period_type,
+            OvertimePeriodSummary.period_start >= period_starts[0],
+            OvertimePeriodSummary.period_start <= period_starts[-1]
+        )
+    }
+    missing = [period_start for period_start in period_starts if period_start not in cached]
+
+    if missing:
+        totals = compute_overtime_period_totals(period_type, missing[0], get_overtime_period_end(missing[-1], period_type))
+        for period_start in missing:
+            cached[period_start] = totals.get(period_start, {})
+            if get_overtime_period_end(period_start, period_type) < today:
+                db.session.add(OvertimePeriodSummary(period_type=period_type, period_start=period_start,
+                                                     data=json.dumps(cached[period_start])))
+        db.session.commit()
+
+    periods = []
+    staff_totals = {}
+    for period_start in period_starts:
+        period_end = get_overtime_period_end(period_start, period_type)
+        staff = [dict(totals, staff_name=name) for name, totals in sorted(cached[period_start].items())
+                 if not staff_name or name == staff_name]
+        for totals in staff:
+            overall = staff_totals.setdefault(totals['staff_name'], {'staff_name': totals['staff_name'], 'hours': 0,
+                                                                      'entries': 0, 'off_day_hours': 0, 'off_day_entries': 0})
+            for field in ('hours', 'entries', 'off_day_hours', 'off_day_entries'):
+                overall[field] += totals[field]
+        periods.append({
+            'period_start': period_start.isoformat(),
+            'period_end': period_end.isoformat(),
+            'closed': period_end < today,
+            'hours': round(sum(totals['hours'] for totals in staff), 2),
+            'off_day_hours': round(sum(totals['off_day_hours'] for totals in staff), 2),
+            'staff': staff
+        })
+
+    for overall in staff_totals.values():
+        overall['hours'] = round(overall['hours'], 2)
+        overall['off_day_hours'] = round(overall['off_day_hours'], 2)
+
+    return {
+        'period': period_type,
+        'start_date': period_starts[0].isoformat(),
+        'end_date': get_overtime_period_end(period_starts[-1], period_type).isoformat(),
+        'hours': round(sum(overall['hours'] for overall in staff_totals.values()), 2),
+        'staff_totals': sorted(staff_totals.values(), key=lambda overall: overall['staff_name']),
+        'periods': periods
+    }
+
+def invalidate_overtime_summaries(*days):
+    """Forget cached overtime totals for the periods containing these dates (caller commits)"""
+    for day in set(days):
+        for period_type in OVERTIME_PERIOD_TYPES:
+            OvertimePeriodSummary.query.filter_by(
+                period_type=period_type,
+                period_start=get_overtime_period_start(day, period_type)
+            ).delete(synchronize_session=False)
+
+@app.route('/api/overtime/summary', methods=['GET'])
+def overtime_summary():
+    """Get overtime totals per staff member per week, month or pay period (payroll summaries)"""
+    period_type = request.args.get('period', 'month')
+    if period_type not in OVERTIME_PERIOD_TYPES:
+        return jsonify({'success': False, 'error': f"period must be one of: {', '.join(OVERTIME_PERIOD_TYPES)}"}), 400
+    try:
+        end_date = datetime.strptime(request.args['end_date'], '%Y-%m-%d').date() if request.args.get('end_date') else datetime.now().date()
+        start_date = datetime.strptime(request.args['start_date'], '%Y-%m-%d').date() if request.args.get('start_date') else end_date.replace(month=1, day=1)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+    if start_date > end_date:
+        return jsonify({'success': False, 'error': 'start_date must not be after end_date'}), 400
+    if (end_date - start_date).days > OVERTIME_SUMMARY_MAX_DAYS:
+        return jsonify({'success': False, 'error': f'Date range must not exceed {OVERTIME_SUMMARY_MAX_DAYS} days'}), 400
+
+    try:
+        result = get_overtime_summary(period_type, start_date, end_date, request.args.get('staff_name'))
+        return jsonify(dict(result, success=True))
+    except Exception as e:
+        db.session.rollback()
+        log.error(f"Error computing overtime summary: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/settings-access-logs', methods=['GET'])
 def get_settings_access_logs():
-    """Get recent settings access logs"""
+    """Get recent settings access logs (newest first, pageable with offset)"""
     try:
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+        offset = max(request.args.get('offset', 0, type=int), 0)
         log_file = os.path.join(BASE_PATH, 'logs', 'settings_access.log')
         
-        if not os.path.exists(log_file):
+        if not os.path.exists(log_file) and not get_log_segments(log_file):
             return jsonify({'logs': [], 'message': 'No access logs yet'})
         
-        # Read last 50 lines from log file
-        with open(log_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        # Get last 50 lines (most recent)
-        recent_logs = lines[-50:] if len(lines) > 50 else lines
-        recent_logs.reverse()  # Show newest first
+        # Seek from the end of the file rather than reading the whole history
+        recent_logs, total_count = read_log_tail(log_file, limit, offset)
         
         return jsonify({
-            'logs': [line.strip() for line in recent_logs],
-            'total_count': len(lines)
+            'logs': recent_logs,
+            'total_count': total_count,
+            'offset': offset,
+            'has_more': offset + len(recent_logs) < total_count
         })
         
     except Exception as e:
-        print(Fore.RED + f"Error reading access logs: {e}")
+        log.error(f"Error reading access logs: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/api/logs', methods=['GET'])
+def get_log_records():
+    """Query recent structured application log records (logs/diary.jsonl)"""
+    try:
+        hours = request.args.get('hours', type=int)
+        since = datetime.now() - timedelta(hours=hours) if hours else None
+        limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        
+        records = query_log_records(
+            category=request.args.get('category'),
+            level=request.args.get('level'),
+            since=since,
+            search=request.args.get('search'),
+            limit=limit,
+            offset=offset
+        )
+        
+        return jsonify({
+            'success': True,
+            'records': records,
+            'offset': offset,
+            'has_more': len(records) == limit
+        })
+    except Exception as e:
+        log.error(f"Error querying log records: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+# ===== JOB METRICS =====
+
+# Upper bounds (seconds) of the scheduled job duration histogram buckets
+JOB_DURATION_BUCKETS = (1, 5, 15, 60, 300, 900, 1800, 3600)
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (None if empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(int(round(pct / 100 * len(ordered))) - 1, 0)]
+
+def get_job_windows():
+    """
+    Seconds from each scheduled job's next start until the next other job starts.
+    
+    All jobs are daily, so this is how long a job can run before it overlaps the
+    next one. Empty if the scheduler isn't running.
+    """
+    if scheduler is None or not scheduler.running:
+        return {}
+    starts = {job.id: job.next_run_time for job in scheduler.get_jobs() if job.next_run_time}
+    windows = {}
+    for job_id, start in starts.items():
+        gaps = [(other - start).total_seconds() % 86400 for other_id, other in starts.items() if other_id != job_id]
+        windows[job_id] = min([gap for gap in gaps if gap > 0], default=86400)
+    return windows
+
+def get_job_run_stats(since=None):
+    """
+    Summarise recorded scheduled job runs per job.
+    
+    Args:
+        since: Only include runs started after this datetime (default: all runs)
+    
+    Returns:
+        Dict of job_id -> stats (status counts, duration percentiles and histogram,
+        rows/bytes/query totals, last run, next run and window headroom)
+    """
+    query = JobRun.query
+    if since:
+        query = query.filter(JobRun.started >= since)
+    
+    runs_by_job = defaultdict(list)
+    for run in query.order_by(JobRun.started, JobRun.id).all():
+        runs_by_job[run.job_id].append(run)
+    
+    next_runs = {}
+    if scheduler is not None and scheduler.running:
+        next_runs = {job.id: job.next_run_time for job in scheduler.get_jobs()}
+        for job_id in next_runs:
+            runs_by_job.setdefault(job_id, [])
+    windows = get_job_windows()
+    
+    stats = {}
+    for job_id, runs in runs_by_job.items():
+        durations = [run.duration_seconds for run in runs if run.duration_seconds is not None]
+        status_counts = defaultdict(int)
+        for run in runs:
+            status_counts[run.status] += 1
+        last = runs[-1] if runs else None
+        max_duration = max(durations, default=None)
+        window = windows.get(job_id)
+        
+        stats[job_id] = {
+            'runs': len(runs),
+            'status_counts': dict(status_counts),
+            'duration_seconds': {
+                'avg': round(sum(durations) / len(durations), 3) if durations else None,
+                'p50': percentile(durations, 50),
+                'p95': percentile(durations, 95),
+                'max': max_duration,
+                'total': round(sum(durations), 3)
+            },
+            # Cumulative counts like a Prometheus histogram: runs that took <= le seconds
+            'histogram': [{'le': bucket, 'count': sum(1 for d in durations if d <= bucket)}
+                          for bucket in JOB_DURATION_BUCKETS] + [{'le': '+Inf', 'count': len(durations)}],
+            'rows_processed': sum(run.rows_processed or 0 for run in runs),
+            'bytes_written': sum(run.bytes_written or 0 for run in runs),
+            'query_count': sum(run.query_count or 0 for run in runs),
+            'query_seconds': round(sum(run.query_seconds or 0 for run in runs), 3),
+            'last_run': {
+                'started': last.started.isoformat(),
+                'status': last.status,
+                'duration_seconds': last.duration_seconds,
+                'rows_processed': last.rows_processed,
+                'bytes_written': last.bytes_written,
+                'query_count': last.query_count,
+                'error': last.error
+            } if last else None,
+            'next_run': next_runs[job_id].isoformat() if next_runs.get(job_id) else None,
+            'window_seconds': window,
+            # How much longer the slowest run could take before reaching the next job's start
+            'headroom_seconds': round(window - max_duration, 3) if window is not None and max_duration is not None else None
+        }
+    return stats
+
+@app.route('/api/metrics/jobs', methods=['GET'])
+def get_job_metrics():
+    """Get scheduled job run metrics (durations, rows/bytes handled, queries, outcome)"""
+    try:
+        days = request.args.get('days', 30, type=int)
+        since = datetime.now() - timedelta(days=days) if days > 0 else None
+        return jsonify({
+            'success': True,
+            'days': days if since else None,
+            'buckets': list(JOB_DURATION_BUCKETS),
+            'jobs': get_job_run_stats(since)
+        })
+    except Exception as e:
+        scheduler_log.error(f"Error getting job metrics: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Scheduled job metrics (all recorded runs) in Prometheus text exposition format"""
+    stats = get_job_run_stats()
+    lines = []
+    
+    def metric(name, metric_type, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for labels, value in samples:
+            label_text = ','.join(f'{key}="{val}"' for key, val in labels.items())
+            lines.append(f"{name}{{{label_text}}} {value}")
+    
+    metric('diary_job_runs_total', 'counter', 'Scheduled job runs by outcome',
+           [({'job': job, 'status': status}, count)
+            for job, job_stats in stats.items() for status, count in job_stats['status_counts'].items()])
+    
+    lines.append("# HELP diary_job_duration_seconds Scheduled job run duration")
+    lines.append("# TYPE diary_job_duration_seconds histogram")
+    for job, job_stats in stats.items():
+        for bucket in job_stats['histogram']:
+            lines.append(f'diary_job_duration_seconds_bucket{{job="{job}",le="{bucket["le"]}"}} {bucket["count"]}')
+        lines.append(f'diary_job_duration_seconds_sum{{job="{job}"}} {job_stats["duration_seconds"]["total"]}')
+        lines.append(f'diary_job_duration_seconds_count{{job="{job}"}} {job_stats["histogram"][-1]["count"]}')
+    
+    metric('diary_job_rows_processed_total', 'counter', 'Rows reported, deleted or archived by scheduled jobs',
+           [({'job': job}, job_stats['rows_processed']) for job, job_stats in stats.items()])
+    metric('diary_job_bytes_written_total', 'counter', 'Report bytes written and backup bytes uploaded by scheduled jobs',
+           [({'job': job}, job_stats['bytes_written']) for job, job_stats in stats.items()])
+    metric('diary_job_queries_total', 'counter', 'Database queries run by scheduled jobs',
+           [({'job': job}, job_stats['query_count']) for job, job_stats in stats.items()])
+    metric('diary_job_query_seconds_total', 'counter', 'Time spent in database queries by scheduled jobs',
+           [({'job': job}, job_stats['query_seconds']) for job, job_stats in stats.items()])
+    metric('diary_job_last_run_timestamp_seconds', 'gauge', 'Start time of the last run (Unix time)',
+           [({'job': job}, datetime.fromisoformat(job_stats['last_run']['started']).timestamp())
+            for job, job_stats in stats.items() if job_stats['last_run']])
+    metric('diary_job_last_duration_seconds', 'gauge', 'Duration of the last run',
+           [({'job': job}, job_stats['last_run']['duration_seconds'])
+            for job, job_stats in stats.items() if job_stats['last_run'] and job_stats['last_run']['duration_seconds'] is not None])
+    metric('diary_job_last_success', 'gauge', '1 if the last run succeeded',
+           [({'job': job}, int(job_stats['last_run']['status'] == 'success'))
+            for job, job_stats in stats.items() if job_stats['last_run']])
+    metric('diary_job_headroom_seconds', 'gauge', 'Time left before the next job starts if a run takes as long as the slowest so far',
+           [({'job': job}, job_stats['headroom_seconds'])
+            for job, job_stats in stats.items() if job_stats['headroom_seconds'] is not None])
+    
+    return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
+
+# ===== REQUEST PROFILING =====
+
+# Opt-in (start with --profile, or POST /api/metrics) per-request latency, SQL and
+# response size metrics, kept in memory. With cprofile on, each request is also run
+# under cProfile and the profiles of the slowest requests are kept.
+REQUEST_METRICS_BUFFER_SIZE = 5000  # Most recent requests kept
+REQUEST_PROFILES_KEPT = 5  # Slowest request profiles kept
+REQUEST_PROFILE_LINES = 40  # Functions listed per profile
+
+request_profiling = {'enabled': False, 'cprofile': False, 'since': None}
+request_metrics = deque(maxlen=REQUEST_METRICS_BUFFER_SIZE)
+slowest_request_profiles = []  # Sorted slowest first
+request_metrics_lock = threading.Lock()
+
+@app.before_request
+def start_request_profiling():
+    """Start timing the request (and counting its queries) when profiling is enabled"""
+    if not request_profiling['enabled'] or request.path.startswith('/api/metrics'):
+        return
+    current = SimpleNamespace(started=time.perf_counter(), query_count=0, query_seconds=0.0, profiler=None)
+    if request_profiling['cprofile']:
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            current.profiler = profiler
+        except ValueError:
+            pass  # Another request is already being profiled (only one profiler can be active at a time)
+    request_metrics_local.current = current
+
+@app.after_request
+def record_request_metrics(response):
+    """Record latency, query count/time and response size of a profiled request"""
+    current = getattr(request_metrics_local, 'current', None)
+    if current is None:
+        return response
+    request_metrics_local.current = None
+    if current.profiler:
+        current.profiler.disable()
+    
+    duration_ms = (time.perf_counter() - current.started) * 1000
+    record = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'endpoint': request.endpoint or request.path,
+        'method': request.method,
+        'path': request.full_path.rstrip('?'),
+        'status': response.status_code,
+        'duration_ms': round(duration_ms, 2),
+        'query_count': current.query_count,
+        'query_ms': round(current.query_seconds * 1000, 2),
+        'response_bytes': response.calculate_content_length() or 0
+    }
+    request_metrics.append(record)
+    
+    if current.profiler:
+        with request_metrics_lock:
+            is_slow = (len(slowest_request_profiles) < REQUEST_PROFILES_KEPT or
+                       duration_ms > slowest_request_profiles[-1]['duration_ms'])
+        if is_slow:
+            import io
+            import pstats
+            output = io.StringIO()
+            pstats.Stats(current.profiler, stream=output).sort_stats('cumulative').print_stats(REQUEST_PROFILE_LINES)
+            with request_metrics_lock:
+                slowest_request_profiles.append(dict(record, profile=output.getvalue()))
+                slowest_request_profiles.sort(key=lambda entry: -entry['duration_ms'])
+                del slowest_request_profiles[REQUEST_PROFILES_KEPT:]
+    return response
+
+@app.teardown_request
+def stop_request_profiling(error=None):
+    """Make sure a failed request doesn't leave profiling state on the thread"""
+    current = getattr(request_metrics_local, 'current', None)
+    if current is not None:
+        request_metrics_local.current = None
+        if current.profiler:
+            current.profiler.disable()
+
+@app.route('/api/metrics', methods=['GET', 'POST'])
+def request_metrics_summary():
+    """GET: per-endpoint latency/SQL/response size metrics, POST: turn profiling on/off or reset"""
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        if 'enabled' in data:
+            request_profiling['enabled'] = bool(data['enabled'])
+        if 'cprofile' in data:
+            request_profiling['cprofile'] = bool(data['cprofile'])
+            if request_profiling['cprofile']:
+                request_profiling['enabled'] = True
+        if data.get('reset'):
+            with request_metrics_lock:
+                request_metrics.clear()
+                slowest_request_profiles.clear()
+            request_profiling['since'] = None
+        if request_profiling['enabled'] and not request_profiling['since']:
+            request_profiling['since'] = datetime.now().isoformat(timespec='seconds')
+        log.info(f"Request profiling {'enabled' if request_profiling['enabled'] else 'disabled'}"
+                 f"{' (with cProfile)' if request_profiling['cprofile'] else ''}")
+    
+    with request_metrics_lock:
+        records = list(request_metrics)
+        profiles = [dict(entry) for entry in slowest_request_profiles]
+    
+    by_endpoint = defaultdict(list)
+    for record in records:
+        by_endpoint[(record['method'], record['endpoint'])].append(record)
+    
+    endpoints = []
+    for (method, endpoint), entries in by_endpoint.items():
+        durations = [entry['duration_ms'] for entry in entries]
+        queries = [entry['query_count'] for entry in entries]
+        endpoints.append({
+            'endpoint': endpoint,
+            'method': method,
+            'count': len(entries),
+            'errors': sum(1 for entry in entries if entry['status'] >= 500),
+            'latency_ms': {
+                'p50': percentile(durations, 50),
+                'p95': percentile(durations, 95),
+                'p99': percentile(durations, 99),
+                'max': max(durations),
+                'avg': round(sum(durations) / len(durations), 2)
+            },
+            'queries': {
+                'avg': round(sum(queries) / len(queries), 1),
+                'max': max(queries),
+                'p95_ms': percentile([entry['query_ms'] for entry in entries], 95)
+            },
+            'response_bytes': {
+                'avg': round(sum(entry['response_bytes'] for entry in entries) / len(entries)),
+                'max': max(entry['response_bytes'] for entry in entries)
+            }
+        })
+    endpoints.sort(key=lambda entry: -entry['latency_ms']['p95'])
+    
+    if request.args.get('profiles') != '1':
+        for entry in profiles:
+            entry.pop('profile', None)
+    
+    return jsonify({
+        'success': True,
+        'enabled': request_profiling['enabled'],
+        'cprofile': request_profiling['cprofile'],
+        'since': request_profiling['since'],
+        'requests_recorded': len(records),
+        'buffer_size': REQUEST_METRICS_BUFFER_SIZE,
+        'endpoints': endpoints,
+        'slowest_requests': profiles
+    })
+
 @app.route('/api/activity-logs', methods=['GET'])
 def get_activity_logs():
-    """Get recent activity logs with filtering options"""
+    """Get activity logs with filtering, keyset pagination and optional grouped summary"""
+    try:
+        cursor = decode_keyset_cursor(request.args['cursor']) if request.args.get('cursor') else None
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid cursor'}), 400
+    
     try:
         # Get filter parameters
         days = request.args.get('days', 7, type=int)  # Default last 7 days
         user_name = request.args.get('user', None)
         action_type = request.args.get('action', None)
-        limit = request.args.get('limit', 100, type=int)
+        limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+        summary = request.args.get('summary')  # e.g. "user,action,day"
         
         # Calculate date range
         start_date = datetime.now() - timedelta(days=days)
         
-        # Build query
-        query = ActivityLog.query.filter(ActivityLog.timestamp >= start_date)
-        
+        # Build filters (shared by the page, count and summary queries)
+        filters = [ActivityLog.timestamp >= start_date]
         if user_name:
-            query = query.filter(ActivityLog.user_name == user_name)
+            filters.append(ActivityLog.user_name == user_name)
         if action_type:
-            query = query.filter(ActivityLog.action_type == action_type)
+            filters.append(ActivityLog.action_type == action_type)
+        
+        # Real total for the filters, counted in SQL via the timestamp index
+        total = db.session.query(db.func.count(ActivityLog.id)).filter(*filters).scalar()
+        
+        if summary:
+            # Grouped counts computed in SQL instead of shipping rows to the browser
+            group_columns = {
+                'user': ActivityLog.user_name,
+                'action': ActivityLog.action_type,
+                'entity': ActivityLog.entity_type,
+                'day': db.func.date(ActivityLog.timestamp)
+            }
+            groups = {}
+            for group_name in [g.strip() for g in summary.split(',') if g.strip()]:
+                if group_name not in group_columns:
+                    return jsonify({'success': False, 'error': f'Invalid summary group: {group_name}'}), 400
+                column = group_columns[group_name]
+                rows = db.session.query(column, db.func.count(ActivityLog.id)).filter(
+                    *filters
+                ).group_by(column).order_by(column).all()
+                groups[group_name] = [{'key': key, 'count': count} for key, count in rows]
+            
+            return jsonify({'success': True, 'summary': groups, 'total': total})
         
-        # Execute query
-        logs = query.order_by(ActivityLog.timestamp.desc()).limit(limit).all()
+        # Execute query - one page, newest first
+        logs, next_cursor = apply_keyset_page(
+            ActivityLog.query.filter(*filters), ActivityLog.timestamp, ActivityLog.id, cursor, limit
+        )
         
         return jsonify({
             'success': True,
             'logs': [{
-                'id': log.id,
-                'timestamp': log.timestamp.isoformat(),
-                'user_name': log.user_name,
-                'action_type': log.action_type,
-                'entity_type': log.entity_type,
-                'entity_id': log.entity_id,
-                'description': log.description,
-                'ip_address': log.ip_address
-            } for log in logs],
-            'total': len(logs)
+                'id': entry.id,
+                'timestamp': entry.timestamp.isoformat(),
+                'user_name': entry.user_name,
+                'action_type': entry.action_type,
+                'entity_type': entry.entity_type,
+                'entity_id': entry.entity_id,
+                'description': entry.description,
+                'ip_address': entry.ip_address
+            } for entry in logs],
+            'total': total,
+            'next_cursor': next_cursor
         })
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+        log.error(f"Error fetching activity logs: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/schedule-settings', methods=['GET', 'POST'])
 def schedule_settings():
@@ -2560,7 +4819,7 @@ def schedule_settings():
             db.session.commit()
         except Exception as e:
             db.session.rollback()
-            print(Fore.RED + f"Error updating schedule settings: {e}")
+            log.error(f"Error updating schedule settings: {e}")
             return jsonify({'success': False, 'error': str(e)}), 500
         
         # Update the scheduler
@@ -2631,6 +4890,7 @@ def staff_members():
                 active=data.get('active', True)
             )
             db.session.add(staff)
+            OvertimePeriodSummary.query.delete(synchronize_session=False)
             db.session.commit()
             
             # Log the addition
@@ -2640,7 +4900,7 @@ def staff_members():
             return jsonify({'success': True, 'id': staff.id})
         except Exception as e:
             db.session.rollback()
-            print(Fore.RED + f"Error creating staff member: {e}")
+            log.error(f"Error creating staff member: {e}")
             return jsonify({'success': False, 'error': str(e)}), 500
     
     # GET request - return all active staff members
@@ -2676,6 +4936,8 @@ def staff_member(staff_id):
         staff.color = data.get('color', staff.color)
         staff.shift = data.get('shift', staff.shift)
         staff.active = data.get('active', staff.active)
+        # Rotation days off depend on colours and shifts, so cached overtime flags may be stale
+        OvertimePeriodSummary.query.delete(synchronize_session=False)
         db.session.commit()
         
         # Log the modification
@@ -2695,6 +4957,7 @@ def staff_member(staff_id):
         
         # Soft delete - just mark as inactive
         staff.active = False
+        OvertimePeriodSummary.query.delete(synchronize_session=False)
         db.session.commit()
         return jsonify({'success': True})
 
@@ -2754,108 +5017,1414 @@ def change_pin():
     if not name or not old_pin or not new_pin:
         return jsonify({'success': False, 'error': 'All fields are required'}), 400
     
-    if len(new_pin) < 4:
-        return jsonify({'success': False, 'error': 'PIN must be at least 4 digits'}), 400
+    if len(new_pin) < 4:
+        return jsonify({'success': False, 'error': 'PIN must be at least 4 digits'}), 400
+    
+    # Find shift leader by name
+    leader = ShiftLeader.query.filter(
+        db.func.lower(ShiftLeader.name) == name.lower(),
+        ShiftLeader.active == True
+    ).first()
+    
+    if not leader:
+        return jsonify({'success': False, 'error': 'Shift leader not found'}), 401
+    
+    # Verify old PIN using secure comparison
+    if not verify_pin_hash(old_pin, leader.pin):
+        return jsonify({'success': False, 'error': 'Current PIN is incorrect'}), 401
+    
+    # Update to new PIN using secure hashing
+    leader.pin = hash_pin(new_pin)
+    db.session.commit()
+    
+    # Log the PIN change
+    description = f"Changed PIN for shift leader: {leader.name}"
+    log_activity(leader.name, 'modify', 'pin', description, leader.id, request.remote_addr)
+    
+    return jsonify({'success': True, 'message': 'PIN changed successfully'})
+
+def initialize_shift_leaders():
+    """Initialize shift leaders with default PINs (default: 1234) and set super users"""
+    try:
+        shift_leader_names = ['Ricardo', 'Arpad', 'Carlos', 'Brian', 'Kojo', 'Peter', 'Konrad']
+        super_users = ['Arpad', 'Carlos']  # Super users with special privileges
+        default_pin = '1234'
+        hashed_default_pin = None  # Only hashed (bcrypt is slow) if a leader actually needs creating
+        
+        # Load existing leaders once instead of querying per name
+        existing_leaders = {leader.name.lower(): leader for leader in ShiftLeader.query.all()}
+        
+        added_count = 0
+        updated_count = 0
+        for name in shift_leader_names:
+            # Check if leader already exists
+            existing = existing_leaders.get(name.lower())
+            
+            is_super = name in super_users
+            
+            if not existing:
+                if hashed_default_pin is None:
+                    hashed_default_pin = hash_pin(default_pin)
+                leader = ShiftLeader(
+                    name=name,
+                    pin=hashed_default_pin,
+                    active=True,
+                    is_super_user=is_super
+                )
+                db.session.add(leader)
+                added_count += 1
+                user_type = "Super User" if is_super else "Shift Leader"
+                auth_log.info(f"✓ Added {user_type}: {name} (default PIN: {default_pin})")
+            else:
+                # Update existing leader if super user status changed
+                if existing.is_super_user != is_super:
+                    existing.is_super_user = is_super
+                    updated_count += 1
+                    user_type = "Super User" if is_super else "Shift Leader"
+                    auth_log.info(f"✓ Updated {existing.name} to {user_type}")
+        
+        if added_count > 0 or updated_count > 0:
+            db.session.commit()
+            if added_count > 0:
+                auth_log.warning(f"\n{'='*50}")
+                auth_log.warning(f"IMPORTANT: {added_count} user(s) created with default PIN: {default_pin}")
+                auth_log.warning("Please change PINs immediately for security!")
+                auth_log.warning(f"{'='*50}\n")
+            if updated_count > 0:
+                auth_log.info(f"✓ Updated {updated_count} user(s) with new privileges")
+        else:
+            auth_log.info("All shift leaders already exist in database with correct privileges.")
+            
+    except Exception as e:
+        auth_log.error(f"Error initializing shift leaders: {e}")
+        db.session.rollback()
+
+# Maximum rows removed per DELETE statement by maintenance jobs, so the
+# database write lock is only held briefly while web requests are served
+MAINTENANCE_DELETE_CHUNK_SIZE = 500
+
+def delete_in_chunks(model, *criteria, chunk_size=MAINTENANCE_DELETE_CHUNK_SIZE):
+    """
+    Delete all rows of a model matching the criteria using set-based DELETE statements.
+    
+    Each statement removes at most chunk_size rows (DELETE ... WHERE id IN (SELECT id ... LIMIT n))
+    and is committed on its own, so a large backlog never holds the write lock for long.
+    No ORM objects are loaded.
+    
+    Returns:
+        Total number of rows deleted
+    """
+    total_deleted = 0
+    while True:
+        chunk_ids = db.select(model.id).where(*criteria).limit(chunk_size).scalar_subquery()
+        result = db.session.execute(
+            db.delete(model).where(model.id.in_(chunk_ids)).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        total_deleted += result.rowcount
+        if result.rowcount < chunk_size:
+            return total_deleted
+
+def reclaim_free_pages():
+    """Return free pages left by large deletes to the filesystem (if incremental auto-vacuum is enabled)"""
+    from sqlalchemy import text
+    
+    with db.engine.connect() as conn:
+        auto_vacuum = conn.execute(text("PRAGMA auto_vacuum")).scalar()
+        if auto_vacuum != 2:  # 2 = INCREMENTAL
+            scheduler_log.info("Incremental vacuum skipped (auto_vacuum is not INCREMENTAL for this database)")
+            return False
+        free_pages = conn.execute(text("PRAGMA freelist_count")).scalar()
+        conn.execute(text("PRAGMA incremental_vacuum"))
+        conn.commit()
+    scheduler_log.info(f"✓ Reclaimed {free_pages} free database page(s)")
+    return True
+
+def cleanup_old_leave_data(vacuum=True):
+    """Delete holiday and sick leave records older than 2 years (and expired idempotency keys)"""
+    try:
+        two_years_ago = datetime.now().date() - timedelta(days=730)  # 2 years = 730 days
+        
+        # Delete old leave records (holiday, sick, off status) in SQL
+        count = delete_in_chunks(
+            StaffRota,
+            StaffRota.date < two_years_ago,
+            StaffRota.status.in_(['holiday', 'sick', 'off'])
+        )
+        
+        # Writes are only replayed for a few days - older keys can't be used again
+        expired = delete_in_chunks(
+            IdempotencyKey,
+            IdempotencyKey.created < datetime.now() - timedelta(days=IDEMPOTENCY_KEY_RETENTION_DAYS)
+        )
+        if expired:
+            scheduler_log.info(f"✓ Removed {expired} expired idempotency key(s)")
+        
+        if count:
+            scheduler_log.info(f"✓ Cleaned up {count} old leave record(s) from before {two_years_ago}")
+            if vacuum:
+                reclaim_free_pages()
+        else:
+            scheduler_log.info(f"No old leave records to clean up (older than {two_years_ago})")
+        return count + expired
+            
+    except Exception as e:
+        scheduler_log.error(f"Error cleaning up old leave data: {e}")
+        db.session.rollback()
+
+# ===== DATA ARCHIVE =====
+
+# Rows older than the horizon are moved out of diary.db into per-year archive
+# databases (instance/archive/diary_archive_<year>.db). Archives are attached
+# read-only on demand, so history queries still see archived rows.
+# table: (timestamp column, horizon in days, extra condition a row must meet to be archived)
+ARCHIVE_POLICY = {
+    'activity_log': ('timestamp', 365, None),
+    'email_log': ('sent_date', 365, None),
+    'water_temperature': ('timestamp', 730, None),
+    'daily_occurrence': ('timestamp', 730, 'sent = 1'),  # Never archive occurrences not yet reported
+    'job_run': ('started', 365, None),
+}
+
+# Indexes archive tables need besides the timestamp index: table -> [(index name, columns)]
+ARCHIVE_INDEXES = {
+    'daily_occurrence': [
+        ('ix_daily_occurrence_flat_number', 'flat_number, timestamp'),  # Search by flat
+        ('ix_daily_occurrence_flat_id', 'flat_id, timestamp, id'),  # Flat history
+    ],
+}
+
+def get_archive_dir():
+    """Get the directory holding the per-year archive databases"""
+    return os.path.join(BASE_PATH, 'instance', 'archive')
+
+def get_archive_path(year):
+    """Get the path of the archive database for a year"""
+    return os.path.join(get_archive_dir(), f'diary_archive_{int(year)}.db')
+
+def get_archive_years():
+    """Get the years that have an archive database, oldest first"""
+    if not os.path.isdir(get_archive_dir()):
+        return []
+    years = []
+    for file_name in os.listdir(get_archive_dir()):
+        match = re.fullmatch(r'diary_archive_(\d{4})\.db', file_name)
+        if match:
+            years.append(int(match.group(1)))
+    return sorted(years)
+
+def ensure_archive_table(conn, table, timestamp_column):
+    """Create (or add missing columns to) a table in the attached 'archive' database to match main"""
+    from sqlalchemy import text
+    
+    exists = conn.execute(text(
+        "SELECT 1 FROM archive.sqlite_master WHERE type = 'table' AND name = :name"
+    ), {'name': table}).scalar()
+    
+    if not exists:
+        create_sql = conn.execute(text(
+            "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = :name"
+        ), {'name': table}).scalar()
+        create_sql = re.sub(r'^CREATE TABLE\s+["`\[]?' + table + r'["`\]]?', f'CREATE TABLE archive.{table}', create_sql, count=1)
+        conn.execute(text(create_sql))
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS archive.ix_{table}_{timestamp_column} ON {table} ({timestamp_column})"))
+    else:
+        # Main table may have gained columns since the archive was created
+        main_columns = conn.execute(text(f"PRAGMA main.table_info({table})")).all()
+        archive_columns = {row[1] for row in conn.execute(text(f"PRAGMA archive.table_info({table})")).all()}
+        for row in main_columns:
+            if row[1] not in archive_columns:
+                conn.execute(text(f"ALTER TABLE archive.{table} ADD COLUMN {row[1]} {row[2]}"))
+    
+    for index_name, columns in ARCHIVE_INDEXES.get(table, []):
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS archive.{index_name} ON {table} ({columns})"))
+
+def archive_old_data(horizon_days=None):
+    """
+    Move rows older than the archive horizon into per-year archive databases.
+    
+    Each (table, year) batch is copied and deleted in one transaction spanning the
+    live and archive databases, so a failure never loses or duplicates rows.
+    
+    Args:
+        horizon_days: Override the per-table horizon from ARCHIVE_POLICY
+    
+    Returns:
+        Dictionary of table name -> number of rows archived
+    """
+    from sqlalchemy import text
+    
+    results = {}
+    try:
+        os.makedirs(get_archive_dir(), exist_ok=True)
+        
+        with db.engine.connect() as conn:
+            for table, (timestamp_column, default_horizon, condition) in ARCHIVE_POLICY.items():
+                cutoff = datetime.now() - timedelta(days=horizon_days or default_horizon)
+                where = f"{timestamp_column} < :cutoff" + (f" AND {condition}" if condition else "")
+                params = {'cutoff': cutoff.strftime('%Y-%m-%d %H:%M:%S')}
+                
+                years = [row[0] for row in conn.execute(text(
+                    f"SELECT DISTINCT strftime('%Y', {timestamp_column}) FROM {table} WHERE {where}"
+                ), params).all() if row[0]]
+                conn.commit()
+                
+                moved = 0
+                for year in years:
+                    # ATTACH/DETACH are not allowed inside a transaction
+                    conn.execute(text("ATTACH DATABASE :path AS archive"), {'path': get_archive_path(year)})
+                    try:
+                        ensure_archive_table(conn, table, timestamp_column)
+                        columns = ', '.join(row[1] for row in conn.execute(text(f"PRAGMA main.table_info({table})")).all())
+                        year_where = f"{where} AND strftime('%Y', {timestamp_column}) = :year"
+                        year_params = dict(params, year=year)
+                        
+                        conn.execute(text(
+                            f"INSERT OR REPLACE INTO archive.{table} ({columns}) SELECT {columns} FROM main.{table} WHERE {year_where}"
+                        ), year_params)
+                        moved += conn.execute(text(f"DELETE FROM main.{table} WHERE {year_where}"), year_params).rowcount
+                        if table in SEARCH_INDEXES:
+                            # Archived rows stay searchable through the archive's own index
+                            ensure_archive_search_index(conn, table)
+                            fts_table = SEARCH_INDEXES[table][0]
+                            conn.execute(text(f"INSERT INTO archive.{fts_table}({fts_table}) VALUES ('rebuild')"))
+                        conn.commit()
+                    except Exception:
+                        conn.rollback()
+                        raise
+                    finally:
+                        conn.execute(text("DETACH DATABASE archive"))
+                        conn.commit()
+                
+                results[table] = moved
+                if moved:
+                    scheduler_log.info(f"✓ Archived {moved} {table} row(s) older than {cutoff.date()}")
+        
+        if not any(results.values()):
+            scheduler_log.info("No data old enough to archive")
+    except Exception as e:
+        scheduler_log.error(f"Error archiving old data: {e}")
+    return results
+
+@contextmanager
+def open_archive_connection(years):
+    """
+    Open a read-only SQLite connection with the given archive years attached read-only.
+    
+    Each archive is attached as 'archive_<year>'; years without an archive file are skipped.
+    
+    Yields:
+        Tuple of (sqlite3 connection, list of attached schema names)
+    """
+    main_db_path = db.engine.url.database
+    conn = sqlite3.connect(Path(main_db_path).as_uri() + '?mode=ro', uri=True)
+    try:
+        schemas = []
+        for year in years:
+            path = get_archive_path(year)
+            if os.path.exists(path):
+                schema = f'archive_{int(year)}'
+                conn.execute(f"ATTACH DATABASE ? AS {schema}", (Path(path).as_uri() + '?mode=ro',))
+                schemas.append(schema)
+        yield conn, schemas
+    finally:
+        conn.close()
+
+def get_archive_schemas_with_column(conn, schemas, table, column):
+    """Attached archive schemas whose copy of a table has a column (archives may predate it)"""
+    return [schema for schema in schemas
+            if any(row[1] == column for row in conn.execute(f"PRAGMA {schema}.table_info({table})"))]
+
+def query_archived_rows(model, timestamp_column, start, end, condition=None):
+    """
+    Get archived rows of a model for a timestamp range from the archive databases.
+    
+    Returns:
+        List of SimpleNamespace objects with the same attributes as the model
+        (DateTime/Date/Boolean values converted back to Python types)
+    """
+    years = [year for year in get_archive_years() if start.year <= year <= end.year]
+    if not years:
+        return []
+    
+    table = model.__table__
+    columns = [column.name for column in table.columns]
+    converters = {}
+    for column in table.columns:
+        if isinstance(column.type, db.DateTime):
+            converters[column.name] = datetime.fromisoformat
+        elif isinstance(column.type, db.Date):
+            converters[column.name] = lambda value: datetime.fromisoformat(value).date()
+        elif isinstance(column.type, db.Boolean):
+            converters[column.name] = bool
+    
+    where = f"{timestamp_column} >= ? AND {timestamp_column} <= ?" + (f" AND {condition}" if condition else "")
+    params = (start.strftime('%Y-%m-%d %H:%M:%S'), end.strftime('%Y-%m-%d %H:%M:%S.%f'))
+    
+    rows = []
+    with open_archive_connection(years) as (conn, schemas):
+        if not schemas:
+            return []
+        # Years created before this table was archived may not contain it
+        schemas = [schema for schema in schemas if conn.execute(
+            f"SELECT 1 FROM {schema}.sqlite_master WHERE type = 'table' AND name = ?", (table.name,)
+        ).fetchone()]
+        if not schemas:
+            return []
+        sql = ' UNION ALL '.join(
+            f"SELECT {', '.join(columns)} FROM {schema}.{table.name} WHERE {where}" for schema in schemas
+        )
+        for values in conn.execute(sql, params * len(schemas)):
+            row = {}
+            for name, value in zip(columns, values):
+                row[name] = converters[name](value) if value is not None and name in converters else value
+            rows.append(SimpleNamespace(**row))
+    return rows
+
+def get_water_temperatures(start_datetime, end_datetime):
+    """Get water temperature readings in a range, including archived years, oldest first"""
+    temps = WaterTemperature.query.filter(
+        WaterTemperature.timestamp >= start_datetime,
+        WaterTemperature.timestamp <= end_datetime
+    ).all()
+    temps.extend(query_archived_rows(WaterTemperature, 'timestamp', start_datetime, end_datetime))
+    return sorted(temps, key=lambda t: t.timestamp)
+
+# ===== FULL-TEXT SEARCH =====
+
+# SQLite FTS5 indexes over occurrence and fault text. They are external content
+# tables (the text is read from the table itself, not stored twice), kept in sync
+# by triggers on the live tables. Archive databases get their own copy of the
+# index, rebuilt whenever rows are archived, so /api/search covers every year.
+# table: (FTS table, indexed columns, result type)
+SEARCH_INDEXES = {
+    'daily_occurrence': ('daily_occurrence_fts', ('description', 'reported_by', 'flat_number'), 'occurrence'),
+    'cctv_fault': ('cctv_fault_fts', ('description', 'additional_notes', 'flat_number'), 'fault'),
+}
+SEARCH_TOKENIZER = 'unicode61 remove_diacritics 2'
+SEARCH_DEFAULT_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+SEARCH_SNIPPET_TOKENS = 12
+SEARCH_MATCH_START = '\x02'  # Snippet markers, replaced with <mark> after HTML escaping
+SEARCH_MATCH_END = '\x03'
+
+def get_search_index_create_sql(table, schema='main'):
+    """CREATE VIRTUAL TABLE statement for a table's search index"""
+    fts_table, columns, _ = SEARCH_INDEXES[table]
+    return (f"CREATE VIRTUAL TABLE IF NOT EXISTS {schema}.{fts_table} USING fts5("
+            f"{', '.join(columns)}, content='{table}', content_rowid='id', tokenize='{SEARCH_TOKENIZER}')")
+
+def create_search_indexes():
+    """
+    Create the search indexes and their sync triggers on the live tables (needs app context).
+    
+    Returns:
+        List of tables whose index was newly created (and so needs rebuilding)
+    """
+    from sqlalchemy import text
+    
+    created = []
+    with db.engine.connect() as conn:
+        for table, (fts_table, columns, _) in SEARCH_INDEXES.items():
+            exists = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"
+            ), {'name': fts_table}).scalar()
+            if not exists:
+                conn.execute(text(get_search_index_create_sql(table)))
+                created.append(table)
+            
+            column_list = ', '.join(columns)
+            delete_old = (f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) "
+                          f"VALUES ('delete', old.id, {', '.join(f'old.{column}' for column in columns)});")
+            insert_new = (f"INSERT INTO {fts_table}(rowid, {column_list}) "
+                          f"VALUES (new.id, {', '.join(f'new.{column}' for column in columns)});")
+            conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {fts_table}_insert AFTER INSERT ON {table} BEGIN {insert_new} END"))
+            conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {fts_table}_delete AFTER DELETE ON {table} BEGIN {delete_old} END"))
+            # Only edits to indexed columns touch the index (not e.g. marking occurrences sent)
+            conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {fts_table}_update AFTER UPDATE OF {column_list} ON {table} "
+                              f"BEGIN {delete_old} {insert_new} END"))
+        conn.commit()
+    return created
+
+def ensure_archive_search_index(conn, table):
+    """Create a table's search index (and its other indexes) in the attached 'archive' database"""
+    from sqlalchemy import text
+    
+    ensure_archive_table(conn, table, ARCHIVE_POLICY[table][0])
+    conn.execute(text(get_search_index_create_sql(table, schema='archive')))
+
+def rebuild_search_index():
+    """
+    Rebuild the search indexes from the live tables and every archive database.
+    
+    Returns:
+        Dictionary of table (or archive_<year>.table) -> rows indexed
+    """
+    from sqlalchemy import text
+    
+    results = {}
+    with db.engine.connect() as conn:
+        for table, (fts_table, _, _) in SEARCH_INDEXES.items():
+            conn.execute(text(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')"))
+            results[table] = conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+        conn.commit()
+        
+        for year in get_archive_years():
+            # ATTACH/DETACH are not allowed inside a transaction
+            conn.execute(text("ATTACH DATABASE :path AS archive"), {'path': get_archive_path(year)})
+            try:
+                for table, (fts_table, _, _) in SEARCH_INDEXES.items():
+                    if not conn.execute(text(
+                        "SELECT 1 FROM archive.sqlite_master WHERE type = 'table' AND name = :name"
+                    ), {'name': table}).scalar():
+                        continue
+                    ensure_archive_search_index(conn, table)
+                    conn.execute(text(f"INSERT INTO archive.{fts_table}({fts_table}) VALUES ('rebuild')"))
+                    results[f'archive_{year}.{table}'] = conn.execute(text(f"SELECT COUNT(*) FROM archive.{table}")).scalar()
+                conn.commit()
+            finally:
+                conn.execute(text("DETACH DATABASE archive"))
+                conn.commit()
+    return results
+
+def build_search_match(query_text):
+    """
+    Turn free text into an FTS5 query: every word must match, as a prefix (so
+    "leak" finds "leaking"). Each word is quoted, so user input is never an FTS5
+    syntax error. Returns None if the text has no searchable words.
+    """
+    words = re.findall(r'\w+', query_text or '')
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
+
+def format_search_snippet(snippet):
+    """HTML-escape a snippet and wrap the matched words in <mark>"""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(SEARCH_MATCH_START, '<mark>').replace(SEARCH_MATCH_END, '</mark>')
+
+def search_records(match, types, start, end, flat_id, sort, limit, offset):
+    """
+    Search occurrences and faults in the live database and the archives.
+    
+    Args:
+        match: FTS5 query from build_search_match(), or None to list by flat only
+        types: Result types to include ('occurrence', 'fault')
+        start, end: Timestamp range (datetimes)
+        flat_id: Only entries for this Flat id, or None
+        sort: 'rank' (best match first) or 'newest'
+        limit, offset: Page of results
+    
+    Returns:
+        Tuple of (total matching rows, list of result dicts)
+    """
+    years = [year for year in get_archive_years() if start.year <= year <= end.year]
+    with open_archive_connection(years) as (conn, archive_schemas):
+        arms, params = [], []
+        for table, (fts_table, _, result_type) in SEARCH_INDEXES.items():
+            if result_type not in types:
+                continue
+            schemas = ['main']
+            if table in ARCHIVE_POLICY:
+                # Archives made before search existed have no index until --rebuild-search-index
+                schemas += [schema for schema in archive_schemas if conn.execute(
+                    f"SELECT 1 FROM {schema}.sqlite_master WHERE type = 'table' AND name = ?", (fts_table,)
+                ).fetchone()]
+                if flat_id is not None:
+                    # Archives made before flats existed have no flat_id (as in flat histories)
+                    schemas = ['main'] + get_archive_schemas_with_column(conn, schemas[1:], table, 'flat_id')
+            fields = "r.reported_by, NULL, NULL" if result_type == 'occurrence' else "NULL, r.fault_type, r.status"
+            
+            for schema in schemas:
+                where = ["r.timestamp >= ?", "r.timestamp <= ?"]
+                arm_params = [start.strftime('%Y-%m-%d %H:%M:%S'), end.strftime('%Y-%m-%d %H:%M:%S.%f')]
+                if flat_id is not None:
+                    where.append("r.flat_id = ?")
+                    arm_params.append(flat_id)
+                if match:
+                    # FTS5 functions need the index's own name, not an alias
+                    source = f"{schema}.{fts_table} JOIN {schema}.{table} r ON r.id = {fts_table}.rowid"
+                    where.append(f"{fts_table} MATCH ?")
+                    arm_params.append(match)
+                    ranked = (f"snippet({fts_table}, -1, '{SEARCH_MATCH_START}', '{SEARCH_MATCH_END}', '…', "
+                              f"{SEARCH_SNIPPET_TOKENS}), bm25({fts_table})")
+                else:
+                    source = f"{schema}.{table} r"
+                    ranked = "NULL, NULL"
+                arms.append(f"SELECT '{result_type}', r.id, r.timestamp, r.flat_number, r.description, {fields}, "
+                            f"{ranked}, {int(schema != 'main')} FROM {source} WHERE {' AND '.join(where)}")
+                params.extend(arm_params)
+        
+        if not arms:
+            return 0, []
+        union = ' UNION ALL '.join(arms)
+        total = conn.execute(f"SELECT COUNT(*) FROM ({union})", params).fetchone()[0]
+        # Ordered by column number: 10 is the bm25 rank (lower is better), 3 the timestamp, 2 the id
+        order = "10, 3 DESC, 2 DESC" if match and sort == 'rank' else "3 DESC, 2 DESC"
+        rows = conn.execute(f"{union} ORDER BY {order} LIMIT ? OFFSET ?", params + [limit, offset]).fetchall()
+    
+    results = []
+    for result_type, row_id, timestamp, flat_number, description, reported_by, fault_type, status, snippet, rank, archived in rows:
+        result = {
+            'type': result_type,
+            'id': row_id,
+            'timestamp': datetime.fromisoformat(timestamp).isoformat() if timestamp else None,
+            'flat_number': flat_number,
+            'description': description,
+            'snippet': format_search_snippet(snippet),
+            'rank': rank,
+            'archived': bool(archived)
+        }
+        if result_type == 'occurrence':
+            result['reported_by'] = reported_by
+        else:
+            result['fault_type'] = fault_type
+            result['status'] = status
+        results.append(result)
+    return total, results
+
+@app.route('/api/search', methods=['GET'])
+def search():
+    """Full-text search over occurrences and CCTV/intercom faults, including archived years"""
+    query_text = request.args.get('q', '').strip()
+    flat = request.args.get('flat', '').strip() or None
+    match = build_search_match(query_text)
+    if not match and not flat:
+        return jsonify({'success': False, 'error': 'Enter search text (q) or a flat number (flat)'}), 400
+    
+    types = request.args.get('type', 'occurrence,fault').split(',')
+    if not set(types) <= {'occurrence', 'fault'}:
+        return jsonify({'success': False, 'error': 'type must be occurrence, fault or both'}), 400
+    
+    sort = request.args.get('sort', 'rank')
+    if sort not in ('rank', 'newest'):
+        return jsonify({'success': False, 'error': 'sort must be rank or newest'}), 400
+    
+    try:
+        start = datetime.strptime(request.args.get('date_from', '1900-01-01'), '%Y-%m-%d')
+        end_date = datetime.strptime(request.args['date_to'], '%Y-%m-%d').date() if request.args.get('date_to') else datetime.now().date()
+        end = datetime.combine(end_date, datetime.max.time())
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+    
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', SEARCH_DEFAULT_PAGE_SIZE, type=int), 1), SEARCH_MAX_PAGE_SIZE)
+    
+    # Flat numbers are matched like /api/flats - "12a" finds "Flat 12A" and "012A"
+    flat_id = None
+    if flat:
+        flat_key = normalize_flat_number(flat)
+        flat_id = db.session.execute(db.select(Flat.id).where(Flat.flat_key == flat_key)).scalar() if flat_key else None
+        if flat_id is None:
+            return jsonify({'success': True, 'query': query_text, 'total': 0, 'page': page,
+                            'per_page': per_page, 'has_more': False, 'results': []})
+    
+    try:
+        total, results = search_records(match, types, start, end, flat_id, sort, per_page, (page - 1) * per_page)
+    except Exception as e:
+        log.error(f"Search error: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+    
+    return jsonify({
+        'success': True,
+        'query': query_text,
+        'total': total,
+        'page': page,
+        'per_page': per_page,
+        'has_more': page * per_page < total,
+        'results': results
+    })
+
+# ===== FLAT HISTORY =====
+
+# Occurrences and faults record the flat as free text ("12a", "Flat 12A", "012A").
+# Each distinct flat gets a Flat row keyed by its normalized number, rows point at
+# it through flat_id, and FlatStats holds per-flat counts, kept up to date on
+# insert/delete like the water temperature rollups. Archived occurrences keep
+# their flat_id, so histories and counts cover every year.
+FLAT_HISTORY_TYPES = ('fault', 'occurrence')  # Order of equal timestamps, oldest first
+FLAT_HISTORY_DEFAULT_LIMIT = 50
+FLAT_HISTORY_MAX_LIMIT = 200
+FLAT_LIST_MAX_LIMIT = 500
+
+def normalize_flat_number(flat_number):
+    """Normalized flat number used as the Flat key - ' flat 012a ' -> '12A' (None if blank)"""
+    value = re.sub(r'\s+', '', (flat_number or '').upper())
+    value = re.sub(r'^(FLAT|APARTMENT|APT\.?)(NO\.?)?|^#', '', value)
+    value = re.sub(r'^0+(?=\d)', '', value)
+    return value or None
+
+def get_or_create_flats(entries):
+    """
+    Get the Flat ids for the flat numbers of new entries, creating the new flats
+    (in the current transaction - caller commits).
+    
+    All flats are written with one upsert and read back with one query. Block and
+    floor numbers, when given, replace the ones recorded for the flat (the last
+    entry giving them wins).
+    
+    Args:
+        entries: Column values with flat_number and optionally block_number and floor_number
+    
+    Returns:
+        Dictionary of normalize_flat_number() key -> Flat id (blank flat numbers are left out)
+    """
+    from sqlalchemy.dialects.sqlite import insert
+    
+    flats = {}
+    for entry in entries:
+        flat_key = normalize_flat_number(entry['flat_number'])
+        if not flat_key:
+            continue
+        flat = flats.setdefault(flat_key, {'flat_key': flat_key, 'flat_number': entry['flat_number'].strip(),
+                                           'block_number': None, 'floor_number': None})
+        for name in ('block_number', 'floor_number'):
+            if entry.get(name):
+                flat[name] = entry[name]
+    if not flats:
+        return {}
+    
+    # Flats without a block/floor keep the recorded ones
+    statement = insert(Flat.__table__)
+    db.session.execute(statement.on_conflict_do_update(
+        index_elements=['flat_key'],
+        set_={name: db.func.coalesce(getattr(statement.excluded, name), getattr(Flat, name))
+              for name in ('block_number', 'floor_number')}
+    ), list(flats.values()))
+    return dict(db.session.execute(db.select(Flat.flat_key, Flat.id).where(Flat.flat_key.in_(list(flats)))).all())
+
+def add_to_flat_stats(entries):
+    """
+    Count new occurrences and faults in their flats' stats, totalled per flat and
+    written with one upsert (in the current transaction - caller commits).
+    
+    Args:
+        entries: List of (flat id, timestamp, 'occurrence' or 'fault', is open) - entries without a flat are skipped
+    """
+    from sqlalchemy.dialects.sqlite import insert
+    
+    stats = {}
+    for flat_id, timestamp, result_type, is_open in entries:
+        if flat_id is None:
+            continue
+        entry = stats.setdefault(flat_id, {'flat_id': flat_id, 'occurrence_count': 0, 'fault_count': 0,
+                                           'open_fault_count': 0, 'first_seen': timestamp, 'last_seen': timestamp})
+        entry['occurrence_count'] += result_type == 'occurrence'
+        entry['fault_count'] += result_type == 'fault'
+        entry['open_fault_count'] += result_type == 'fault' and is_open
+        entry['first_seen'] = min(entry['first_seen'], timestamp)
+        entry['last_seen'] = max(entry['last_seen'], timestamp)
+    if not stats:
+        return
+    
+    statement = insert(FlatStats.__table__)
+    db.session.execute(statement.on_conflict_do_update(
+        index_elements=['flat_id'],
+        set_={
+            'occurrence_count': FlatStats.occurrence_count + statement.excluded.occurrence_count,
+            'fault_count': FlatStats.fault_count + statement.excluded.fault_count,
+            'open_fault_count': FlatStats.open_fault_count + statement.excluded.open_fault_count,
+            'first_seen': db.func.min(FlatStats.first_seen, statement.excluded.first_seen),
+            'last_seen': db.func.max(FlatStats.last_seen, statement.excluded.last_seen)
+        }
+    ), list(stats.values()))
+
+def compute_flat_stats(flat_ids=None):
+    """
+    Count occurrences and faults per flat from the live tables and the archives.
+    
+    Args:
+        flat_ids: Only these flats (default: all)
+    
+    Returns:
+        Dictionary of flat id -> FlatStats column values
+    """
+    stats = {}
+    
+    def add(flat_id, occurrence_count, fault_count, open_fault_count, first_seen, last_seen):
+        entry = stats.setdefault(flat_id, {'flat_id': flat_id, 'occurrence_count': 0, 'fault_count': 0,
+                                           'open_fault_count': 0, 'first_seen': first_seen, 'last_seen': last_seen})
+        entry['occurrence_count'] += occurrence_count
+        entry['fault_count'] += fault_count
+        entry['open_fault_count'] += open_fault_count
+        entry['first_seen'] = min(entry['first_seen'], first_seen)
+        entry['last_seen'] = max(entry['last_seen'], last_seen)
+    
+    for model in (DailyOccurrence, CCTVFault):
+        is_fault = model is CCTVFault
+        open_count = db.func.sum(db.case((model.status != 'closed', 1), else_=0)) if is_fault else db.literal(0)
+        query = db.select(model.flat_id, db.func.count(), open_count, db.func.min(model.timestamp), db.func.max(model.timestamp)) \
+            .where(model.flat_id.isnot(None)).group_by(model.flat_id)
+        if flat_ids is not None:
+            query = query.where(model.flat_id.in_(flat_ids))
+        for flat_id, count, open_faults, first_seen, last_seen in db.session.execute(query):
+            add(flat_id, 0 if is_fault else count, count if is_fault else 0, open_faults or 0, first_seen, last_seen)
+    
+    # Faults are never archived, occurrences may be
+    with open_archive_connection(get_archive_years()) as (conn, schemas):
+        where = "flat_id IS NOT NULL"
+        if flat_ids is not None:
+            where += f" AND flat_id IN ({', '.join(str(int(flat_id)) for flat_id in flat_ids) or 'NULL'})"
+        for schema in get_archive_schemas_with_column(conn, schemas, 'daily_occurrence', 'flat_id'):
+            for flat_id, count, first_seen, last_seen in conn.execute(
+                f"SELECT flat_id, COUNT(*), MIN(timestamp), MAX(timestamp) FROM {schema}.daily_occurrence "
+                f"WHERE {where} GROUP BY flat_id"
+            ):
+                add(flat_id, count, 0, 0, datetime.fromisoformat(first_seen), datetime.fromisoformat(last_seen))
+    return stats
+
+def refresh_flat_stats(*flat_ids):
+    """Recompute the stats of flats from their rows (after a delete or fault status change - caller commits)"""
+    flat_ids = [flat_id for flat_id in set(flat_ids) if flat_id is not None]
+    if not flat_ids:
+        return
+    db.session.flush()
+    stats = compute_flat_stats(flat_ids)
+    FlatStats.query.filter(FlatStats.flat_id.in_(flat_ids)).delete(synchronize_session=False)
+    if stats:
+        db.session.execute(db.insert(FlatStats), list(stats.values()))
+
+def rebuild_flats():
+    """
+    Create flats for every flat number recorded (including archived years), point
+    every occurrence and fault at its flat and rebuild the flat stats.
+    
+    Existing flats keep their ids, so links to /api/flats/<id> stay valid.
+    
+    Returns:
+        Number of flats
+    """
+    from sqlalchemy import text
+    
+    numbers = set(db.session.execute(db.select(DailyOccurrence.flat_number).distinct()).scalars())
+    numbers |= set(db.session.execute(db.select(CCTVFault.flat_number).distinct()).scalars())
+    with open_archive_connection(get_archive_years()) as (conn, schemas):
+        for schema in get_archive_schemas_with_column(conn, schemas, 'daily_occurrence', 'flat_number'):
+            numbers |= {row[0] for row in conn.execute(f"SELECT DISTINCT flat_number FROM {schema}.daily_occurrence")}
+    
+    # Latest block/floor recorded for each flat on a fault
+    locations = {}
+    for flat_number, block_number, floor_number in db.session.execute(
+        db.select(CCTVFault.flat_number, CCTVFault.block_number, CCTVFault.floor_number).order_by(CCTVFault.timestamp)
+    ):
+        location = locations.setdefault(normalize_flat_number(flat_number), {})
+        if block_number:
+            location['block_number'] = block_number
+        if floor_number:
+            location['floor_number'] = floor_number
+    
+    flats = {flat.flat_key: flat for flat in Flat.query.all()}
+    for flat_number in sorted(number for number in numbers if number):
+        flat_key = normalize_flat_number(flat_number)
+        if flat_key and flat_key not in flats:
+            flats[flat_key] = Flat(flat_key=flat_key, flat_number=flat_number.strip())
+            db.session.add(flats[flat_key])
+        if flat_key:
+            for name, value in locations.get(flat_key, {}).items():
+                setattr(flats[flat_key], name, value)
+    db.session.flush()
+    
+    flat_ids = [{'b_flat_number': number, 'b_flat_id': flats[normalize_flat_number(number)].id if normalize_flat_number(number) else None}
+                for number in numbers if number is not None]
+    if flat_ids:
+        for model in (DailyOccurrence, CCTVFault):
+            table = model.__table__
+            db.session.execute(table.update().where(table.c.flat_number == db.bindparam('b_flat_number'))
+                               .values(flat_id=db.bindparam('b_flat_id')), flat_ids)
+    db.session.commit()
+    
+    # Archived occurrences (ATTACH/DETACH are not allowed inside a transaction)
+    with db.engine.connect() as conn:
+        for year in get_archive_years():
+            conn.execute(text("ATTACH DATABASE :path AS archive"), {'path': get_archive_path(year)})
+            try:
+                if conn.execute(text(
+                    "SELECT 1 FROM archive.sqlite_master WHERE type = 'table' AND name = 'daily_occurrence'"
+                )).scalar():
+                    ensure_archive_table(conn, 'daily_occurrence', 'timestamp')
+                    if flat_ids:
+                        conn.execute(text("UPDATE archive.daily_occurrence SET flat_id = :b_flat_id "
+                                          "WHERE flat_number = :b_flat_number"), flat_ids)
+                conn.commit()
+            finally:
+                conn.execute(text("DETACH DATABASE archive"))
+                conn.commit()
+    
+    FlatStats.query.delete()
+    stats = compute_flat_stats()
+    if stats:
+        db.session.execute(db.insert(FlatStats), list(stats.values()))
+    db.session.commit()
+    return len(flats)
+
+def get_flat_dict(flat, stats):
+    """Flat details with its counts"""
+    return {
+        'id': flat.id,
+        'flat_number': flat.flat_number,
+        'flat_key': flat.flat_key,
+        'block_number': flat.block_number,
+        'floor_number': flat.floor_number,
+        'occurrence_count': stats.occurrence_count if stats else 0,
+        'fault_count': stats.fault_count if stats else 0,
+        'open_fault_count': stats.open_fault_count if stats else 0,
+        'first_seen': stats.first_seen.isoformat() if stats and stats.first_seen else None,
+        'last_seen': stats.last_seen.isoformat() if stats and stats.last_seen else None
+    }
+
+def encode_flat_history_cursor(timestamp, result_type, row_id):
+    """Encode the last item on a history page as an opaque cursor string"""
+    return f"{timestamp.isoformat()}|{result_type}|{row_id}"
+
+def decode_flat_history_cursor(cursor):
+    """Decode a cursor from encode_flat_history_cursor - raises ValueError if malformed"""
+    timestamp_str, result_type, row_id = cursor.rsplit('|', 2)
+    if result_type not in FLAT_HISTORY_TYPES:
+        raise ValueError(f"Unknown history type: {result_type}")
+    return datetime.fromisoformat(timestamp_str), result_type, int(row_id)
+
+def get_flat_history_item(result_type, row, archived=False):
+    """History entry for an occurrence or fault"""
+    item = {
+        'type': result_type,
+        'id': row.id,
+        'timestamp': row.timestamp.isoformat(),
+        'flat_number': row.flat_number,
+        'description': row.description,
+        'archived': archived
+    }
+    if result_type == 'occurrence':
+        item.update(time=row.time, reported_by=row.reported_by)
+    else:
+        item.update(
+            fault_type=row.fault_type,
+            status=row.status,
+            block_number=row.block_number,
+            floor_number=row.floor_number,
+            additional_notes=row.additional_notes,
+            resolved_date=row.resolved_date.isoformat() if row.resolved_date else None
+        )
+    return item
+
+def get_flat_history_page(flat_id, cursor, limit, types):
+    """
+    Get one page of a flat's occurrences and faults, newest first.
+    
+    Each source (live occurrences, live faults, each archive year) is read with a
+    keyset seek on its (flat_id, timestamp, id) index for at most limit + 1 rows,
+    and the sources are merged - so deep pages cost the same as the first.
+    
+    Args:
+        flat_id: Flat id
+        cursor: (timestamp, type, id) of the last item on the previous page, or None
+        limit: Page size
+        types: History types to include
+    
+    Returns:
+        Tuple of (items, next_cursor) - next_cursor is None on the last page
+    """
+    candidates = []
+    
+    def after_cursor(result_type):
+        """(SQL condition, params) selecting rows of a type that sort after the cursor"""
+        cursor_timestamp, cursor_type, cursor_id = cursor
+        timestamp = cursor_timestamp.strftime('%Y-%m-%d %H:%M:%S.%f')
+        type_order = FLAT_HISTORY_TYPES.index(result_type) - FLAT_HISTORY_TYPES.index(cursor_type)
+        if type_order < 0:
+            return "timestamp <= ?", [timestamp]
+        if type_order > 0:
+            return "timestamp < ?", [timestamp]
+        return "(timestamp < ? OR (timestamp = ? AND id < ?))", [timestamp, timestamp, cursor_id]
+    
+    for result_type, model in (('occurrence', DailyOccurrence), ('fault', CCTVFault)):
+        if result_type not in types:
+            continue
+        query = model.query.filter(model.flat_id == flat_id)
+        if cursor:
+            cursor_timestamp, cursor_type, cursor_id = cursor
+            type_order = FLAT_HISTORY_TYPES.index(result_type) - FLAT_HISTORY_TYPES.index(cursor_type)
+            if type_order < 0:
+                query = query.filter(model.timestamp <= cursor_timestamp)
+            elif type_order > 0:
+                query = query.filter(model.timestamp < cursor_timestamp)
+            else:
+                query = query.filter(db.or_(model.timestamp < cursor_timestamp,
+                                            db.and_(model.timestamp == cursor_timestamp, model.id < cursor_id)))
+        for row in query.order_by(model.timestamp.desc(), model.id.desc()).limit(limit + 1):
+            candidates.append((row.timestamp, FLAT_HISTORY_TYPES.index(result_type), row.id, get_flat_history_item(result_type, row)))
+    
+    if 'occurrence' in types:
+        with open_archive_connection(get_archive_years()) as (conn, schemas):
+            conn.row_factory = sqlite3.Row
+            condition, params = after_cursor('occurrence') if cursor else ("1 = 1", [])
+            for schema in get_archive_schemas_with_column(conn, schemas, 'daily_occurrence', 'flat_id'):
+                for row in conn.execute(
+                    f"SELECT id, timestamp, time, flat_number, reported_by, description FROM {schema}.daily_occurrence "
+                    f"WHERE flat_id = ? AND {condition} ORDER BY timestamp DESC, id DESC LIMIT ?",
+                    [flat_id] + params + [limit + 1]
+                ):
+                    row = SimpleNamespace(**dict(row))
+                    row.timestamp = datetime.fromisoformat(row.timestamp)
+                    candidates.append((row.timestamp, FLAT_HISTORY_TYPES.index('occurrence'), row.id,
+                                       get_flat_history_item('occurrence', row, archived=True)))
+    
+    candidates.sort(key=lambda candidate: candidate[:3], reverse=True)
+    next_cursor = None
+    if len(candidates) > limit:
+        last = candidates[limit - 1]
+        next_cursor = encode_flat_history_cursor(last[0], FLAT_HISTORY_TYPES[last[1]], last[2])
+    return [candidate[3] for candidate in candidates[:limit]], next_cursor
+
+@app.route('/api/flats', methods=['GET'])
+def flats():
+    """List flats with their occurrence and fault counts - most recent activity first"""
+    sort = request.args.get('sort', 'recent')
+    if sort not in ('recent', 'count', 'flat'):
+        return jsonify({'success': False, 'error': 'sort must be recent, count or flat'}), 400
+    limit = min(max(request.args.get('limit', 100, type=int), 1), FLAT_LIST_MAX_LIMIT)
+    
+    query = db.session.query(Flat, FlatStats).outerjoin(FlatStats, FlatStats.flat_id == Flat.id)
+    if request.args.get('flat_number'):
+        query = query.filter(Flat.flat_key == normalize_flat_number(request.args['flat_number']))
+    if sort == 'recent':
+        query = query.order_by(FlatStats.last_seen.desc(), Flat.id)
+    elif sort == 'count':
+        query = query.order_by((FlatStats.occurrence_count + FlatStats.fault_count).desc(), Flat.id)
+    else:
+        query = query.order_by(Flat.flat_key)
+    
+    return jsonify({
+        'success': True,
+        'flats': [get_flat_dict(flat, stats) for flat, stats in query.limit(limit)]
+    })
+
+@app.route('/api/flats/<int:flat_id>', methods=['GET'])
+def flat_details(flat_id):
+    """Get a flat with its occurrence and fault counts"""
+    flat = db.session.get(Flat, flat_id)
+    if not flat:
+        return jsonify({'success': False, 'error': 'Flat not found'}), 404
+    return jsonify({'success': True, 'flat': get_flat_dict(flat, db.session.get(FlatStats, flat_id))})
+
+@app.route('/api/flats/<int:flat_id>/history', methods=['GET'])
+def flat_history(flat_id):
+    """Get a flat's occurrences and faults merged newest first, including archived years (keyset paged)"""
+    flat = db.session.get(Flat, flat_id)
+    if not flat:
+        return jsonify({'success': False, 'error': 'Flat not found'}), 404
+    
+    types = request.args.get('type', 'occurrence,fault').split(',')
+    if not set(types) <= set(FLAT_HISTORY_TYPES):
+        return jsonify({'success': False, 'error': 'type must be occurrence, fault or both'}), 400
+    limit = min(max(request.args.get('limit', FLAT_HISTORY_DEFAULT_LIMIT, type=int), 1), FLAT_HISTORY_MAX_LIMIT)
+    try:
+        cursor = decode_flat_history_cursor(request.args['cursor']) if request.args.get('cursor') else None
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid cursor'}), 400
+    
+    items, next_cursor = get_flat_history_page(flat_id, cursor, limit, types)
+    return jsonify({
+        'success': True,
+        'flat': get_flat_dict(flat, db.session.get(FlatStats, flat_id)),
+        'items': items,
+        'next_cursor': next_cursor
+    })
+
+# ===== WATER TEMPERATURE ROLLUPS =====
+
+WATER_TEMPERATURE_RESOLUTIONS = ('hour', 'day', 'week')
+WATER_TEMPERATURE_MAX_POINTS = 500  # The finest resolution returning at most this many points is used
+
+def get_rollup_bucket_start(timestamp, resolution):
+    """Get the start of the hour, day or week (Monday) a reading falls in"""
+    if resolution == 'hour':
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    day_start = datetime.combine(timestamp.date(), datetime.min.time())
+    if resolution == 'day':
+        return day_start
+    return day_start - timedelta(days=day_start.weekday())
+
+def add_water_temperature_to_rollups(readings):
+    """
+    Add new readings to their hour/day/week rollups, totalled per bucket and
+    written with one upsert (in the current transaction - caller commits).
+    
+    Args:
+        readings: List of (timestamp, temperature)
+    """
+    from sqlalchemy.dialects.sqlite import insert
+    
+    rollups = {}
+    for timestamp, temperature in readings:
+        for resolution in WATER_TEMPERATURE_RESOLUTIONS:
+            bucket_start = get_rollup_bucket_start(timestamp, resolution)
+            rollup = rollups.setdefault((resolution, bucket_start), {
+                'resolution': resolution, 'bucket_start': bucket_start, 'count': 0, 'total': 0.0,
+                'min_temperature': temperature, 'max_temperature': temperature
+            })
+            rollup['count'] += 1
+            rollup['total'] += temperature
+            rollup['min_temperature'] = min(rollup['min_temperature'], temperature)
+            rollup['max_temperature'] = max(rollup['max_temperature'], temperature)
+    if not rollups:
+        return
+    
+    statement = insert(WaterTemperatureRollup.__table__)
+    db.session.execute(statement.on_conflict_do_update(
+        index_elements=['resolution', 'bucket_start'],
+        set_={
+            'count': WaterTemperatureRollup.count + statement.excluded.count,
+            'total': WaterTemperatureRollup.total + statement.excluded.total,
+            'min_temperature': db.func.min(WaterTemperatureRollup.min_temperature, statement.excluded.min_temperature),
+            'max_temperature': db.func.max(WaterTemperatureRollup.max_temperature, statement.excluded.max_temperature)
+        }
+    ), list(rollups.values()))
+
+def refresh_water_temperature_rollups(timestamp):
+    """Recompute the hour/day/week rollups containing a timestamp from the readings (after a delete)"""
+    for resolution in WATER_TEMPERATURE_RESOLUTIONS:
+        bucket_start = get_rollup_bucket_start(timestamp, resolution)
+        bucket_end = bucket_start + (timedelta(hours=1) if resolution == 'hour' else
+                                     timedelta(days=1) if resolution == 'day' else timedelta(weeks=1))
+        readings = [t.temperature for t in get_water_temperatures(bucket_start, bucket_end)
+                    if t.timestamp < bucket_end]
+        
+        rollup = WaterTemperatureRollup.query.filter_by(resolution=resolution, bucket_start=bucket_start).first()
+        if not readings:
+            if rollup:
+                db.session.delete(rollup)
+            continue
+        if not rollup:
+            rollup = WaterTemperatureRollup(resolution=resolution, bucket_start=bucket_start)
+            db.session.add(rollup)
+        rollup.count = len(readings)
+        rollup.total = sum(readings)
+        rollup.min_temperature = min(readings)
+        rollup.max_temperature = max(readings)
+
+def rebuild_water_temperature_rollups():
+    """Rebuild all rollups from the readings, including archived years - returns the number of rollup rows"""
+    temps = get_water_temperatures(datetime.min, datetime.max)
+    buckets = {}
+    for temp in temps:
+        for resolution in WATER_TEMPERATURE_RESOLUTIONS:
+            key = (resolution, get_rollup_bucket_start(temp.timestamp, resolution))
+            bucket = buckets.setdefault(key, [0, 0.0, temp.temperature, temp.temperature])
+            bucket[0] += 1
+            bucket[1] += temp.temperature
+            bucket[2] = min(bucket[2], temp.temperature)
+            bucket[3] = max(bucket[3], temp.temperature)
+    
+    WaterTemperatureRollup.query.delete()
+    if buckets:
+        db.session.execute(db.insert(WaterTemperatureRollup), [{
+            'resolution': resolution,
+            'bucket_start': bucket_start,
+            'count': count,
+            'total': total,
+            'min_temperature': minimum,
+            'max_temperature': maximum
+        } for (resolution, bucket_start), (count, total, minimum, maximum) in buckets.items()])
+    db.session.commit()
+    return len(buckets)
+
+def get_water_temperature_series(start_datetime, end_datetime, resolution='auto'):
+    """
+    Get water temperature readings in a range for charting.
+    
+    Args:
+        start_datetime: Range start
+        end_datetime: Range end (inclusive)
+        resolution: 'raw', 'hour', 'day', 'week' or 'auto' - auto returns raw readings
+                    if there are few enough, otherwise the finest rollup giving at most
+                    WATER_TEMPERATURE_MAX_POINTS points
+    
+    Returns:
+        Tuple of (resolution used, list of point dicts oldest first)
+    """
+    if resolution == 'auto':
+        raw_count = WaterTemperature.query.filter(
+            WaterTemperature.timestamp >= start_datetime,
+            WaterTemperature.timestamp <= end_datetime
+        ).count()
+        span = end_datetime - start_datetime
+        # (archived readings aren't in the count, so ranges reaching the archive use rollups)
+        archive_horizon = datetime.now() - timedelta(days=ARCHIVE_POLICY['water_temperature'][1])
+        if raw_count <= WATER_TEMPERATURE_MAX_POINTS and start_datetime >= archive_horizon:
+            resolution = 'raw'
+        elif span <= timedelta(hours=WATER_TEMPERATURE_MAX_POINTS):
+            resolution = 'hour'
+        elif span <= timedelta(days=WATER_TEMPERATURE_MAX_POINTS):
+            resolution = 'day'
+        else:
+            resolution = 'week'
+    
+    if resolution == 'raw':
+        return resolution, [{
+            'timestamp': t.timestamp.isoformat(),
+            'mean': t.temperature,
+            'min': t.temperature,
+            'max': t.temperature,
+            'count': 1
+        } for t in get_water_temperatures(start_datetime, end_datetime)]
+    
+    rollups = WaterTemperatureRollup.query.filter(
+        WaterTemperatureRollup.resolution == resolution,
+        WaterTemperatureRollup.bucket_start >= get_rollup_bucket_start(start_datetime, resolution),
+        WaterTemperatureRollup.bucket_start <= end_datetime
+    ).order_by(WaterTemperatureRollup.bucket_start).all()
+    return resolution, [{
+        'timestamp': rollup.bucket_start.isoformat(),
+        'mean': round(rollup.total / rollup.count, 2),
+        'min': rollup.min_temperature,
+        'max': rollup.max_temperature,
+        'count': rollup.count
+    } for rollup in rollups]
+
+# ===== WATER TEMPERATURE COMPLIANCE =====
+
+# UK hot water safety thresholds (same as the Water Temperature tab)
+LEGIONELLA_MIN_TEMPERATURE = 50.0  # Below this, Legionella risk
+SCALD_WARNING_TEMPERATURE = 65.0  # Above this, scalding risk
+SCALD_DANGER_TEMPERATURE = 70.0
+MAX_READING_GAP_HOURS = 12  # Longer gaps between readings count as missed checks
+
+COMPLIANCE_STAT_FIELDS = ('count', 'total', 'total_squares', 'min_temperature', 'max_temperature',
+                          'below_count', 'warning_count', 'danger_count', 'time_below_seconds',
+                          'monitored_seconds', 'gap_count', 'longest_gap_seconds', 'first_reading', 'last_reading')
+
+def get_compliance_thresholds_key():
+    """Get a string identifying the thresholds, stored with cached daily statistics"""
+    return f"{LEGIONELLA_MIN_TEMPERATURE}/{SCALD_WARNING_TEMPERATURE}/{SCALD_DANGER_TEMPERATURE}/{MAX_READING_GAP_HOURS}"
+
+def compute_daily_compliance(day, readings):
+    """
+    Compute compliance statistics for one day's readings in a single pass.
+    
+    Each reading is assumed to hold until the next one (at most MAX_READING_GAP_HOURS,
+    and not past midnight - or, for today, not past now), which gives the time spent
+    below the Legionella minimum.
     
-    # Find shift leader by name
-    leader = ShiftLeader.query.filter(
-        db.func.lower(ShiftLeader.name) == name.lower(),
-        ShiftLeader.active == True
-    ).first()
+    Args:
+        day: The date
+        readings: That day's readings, oldest first
     
-    if not leader:
-        return jsonify({'success': False, 'error': 'Shift leader not found'}), 401
+    Returns:
+        Dict of COMPLIANCE_STAT_FIELDS values
+    """
+    max_gap = MAX_READING_GAP_HOURS * 3600
+    # Hours of today that haven't happened yet are not monitored time
+    day_end = min(datetime.combine(day + timedelta(days=1), datetime.min.time()), datetime.now())
+    stats = dict.fromkeys(COMPLIANCE_STAT_FIELDS, 0)
+    stats.update(min_temperature=None, max_temperature=None, first_reading=None, last_reading=None)
+    
+    for index, reading in enumerate(readings):
+        temperature = reading.temperature
+        stats['count'] += 1
+        stats['total'] += temperature
+        stats['total_squares'] += temperature * temperature
+        stats['min_temperature'] = temperature if stats['min_temperature'] is None else min(stats['min_temperature'], temperature)
+        stats['max_temperature'] = temperature if stats['max_temperature'] is None else max(stats['max_temperature'], temperature)
+        stats['below_count'] += temperature < LEGIONELLA_MIN_TEMPERATURE
+        stats['warning_count'] += temperature > SCALD_WARNING_TEMPERATURE
+        stats['danger_count'] += temperature > SCALD_DANGER_TEMPERATURE
+        
+        is_last = index + 1 == len(readings)
+        gap = max(((day_end if is_last else readings[index + 1].timestamp) - reading.timestamp).total_seconds(), 0)
+        interval = min(gap, max_gap)
+        stats['monitored_seconds'] += interval
+        if temperature < LEGIONELLA_MIN_TEMPERATURE:
+            stats['time_below_seconds'] += interval
+        if not is_last:
+            stats['longest_gap_seconds'] = max(stats['longest_gap_seconds'], gap)
+            stats['gap_count'] += gap > max_gap
+    
+    if readings:
+        stats['first_reading'] = readings[0].timestamp
+        stats['last_reading'] = readings[-1].timestamp
+    return stats
+
+def get_daily_compliance(start_date, end_date):
+    """
+    Get compliance statistics for each day in a range.
     
-    # Verify old PIN using secure comparison
-    if not verify_pin_hash(old_pin, leader.pin):
-        return jsonify({'success': False, 'error': 'Current PIN is incorrect'}), 401
+    Closed days (before today) are cached in WaterTemperatureDailyStats, so only
+    uncached days and today are computed from the readings.
     
-    # Update to new PIN using secure hashing
-    leader.pin = hash_pin(new_pin)
-    db.session.commit()
+    Returns:
+        List of (date, stats dict), oldest first
+    """
+    thresholds = get_compliance_thresholds_key()
+    today = datetime.now().date()
+    dates = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+    
+    cached = {
+        row.date: {field: getattr(row, field) for field in COMPLIANCE_STAT_FIELDS}
+        for row in WaterTemperatureDailyStats.query.filter(
+            WaterTemperatureDailyStats.date >= start_date,
+            WaterTemperatureDailyStats.date <= end_date,
+            WaterTemperatureDailyStats.thresholds == thresholds
+        )
+    }
+    missing = [day for day in dates if day not in cached]
     
-    # Log the PIN change
-    description = f"Changed PIN for shift leader: {leader.name}"
-    log_activity(leader.name, 'modify', 'pin', description, leader.id, request.remote_addr)
+    if missing:
+        readings_by_day = defaultdict(list)
+        for reading in get_water_temperatures(datetime.combine(missing[0], datetime.min.time()),
+                                              datetime.combine(missing[-1], datetime.max.time())):
+            readings_by_day[reading.timestamp.date()].append(reading)
+        
+        for day in missing:
+            cached[day] = compute_daily_compliance(day, readings_by_day.get(day, []))
+        cache_daily_compliance(thresholds, {day: cached[day] for day in missing if day < today})
     
-    return jsonify({'success': True, 'message': 'PIN changed successfully'})
+    return [(day, cached[day]) for day in dates]
 
-def initialize_shift_leaders():
-    """Initialize shift leaders with default PINs (default: 1234) and set super users"""
+def cache_daily_compliance(thresholds, days):
+    """
+    Save statistics for closed days {date: stats} to WaterTemperatureDailyStats.
+    
+    Runs in its own short transaction (not the caller's session, which may be part way
+    through a report) as one upsert, so concurrent callers caching the same day - or
+    rows computed with old thresholds - are simply overwritten. The cache is only an
+    optimisation, so a failed write is logged and otherwise ignored.
+    """
+    from sqlalchemy.dialects.sqlite import insert
+    
+    if not days:
+        return
+    now = datetime.now()
+    rows = [dict(stats, date=day, thresholds=thresholds, computed_at=now) for day, stats in days.items()]
+    statement = insert(WaterTemperatureDailyStats.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=['date'],
+        set_={column: statement.excluded[column] for column in ('thresholds', 'computed_at') + COMPLIANCE_STAT_FIELDS}
+    )
     try:
-        shift_leader_names = ['Ricardo', 'Arpad', 'Carlos', 'Brian', 'Kojo', 'Peter', 'Konrad']
-        super_users = ['Arpad', 'Carlos']  # Super users with special privileges
-        default_pin = '1234'
-        hashed_default_pin = hash_pin(default_pin)
-        
-        added_count = 0
-        updated_count = 0
-        for name in shift_leader_names:
-            # Check if leader already exists
-            existing = ShiftLeader.query.filter(
-                db.func.lower(ShiftLeader.name) == name.lower()
-            ).first()
-            
-            is_super = name in super_users
-            
-            if not existing:
-                leader = ShiftLeader(
-                    name=name,
-                    pin=hashed_default_pin,
-                    active=True,
-                    is_super_user=is_super
-                )
-                db.session.add(leader)
-                added_count += 1
-                user_type = "Super User" if is_super else "Shift Leader"
-                print(Fore.GREEN + f"✓ Added {user_type}: {name} (default PIN: {default_pin})")
-            else:
-                # Update existing leader if super user status changed
-                if existing.is_super_user != is_super:
-                    existing.is_super_user = is_super
-                    updated_count += 1
-                    user_type = "Super User" if is_super else "Shift Leader"
-                    print(Fore.CYAN + f"✓ Updated {existing.name} to {user_type}")
-        
-        if added_count > 0 or updated_count > 0:
-            db.session.commit()
-            if added_count > 0:
-                print(Fore.YELLOW + Style.BRIGHT + f"\n{'='*50}")
-                print(Fore.YELLOW + Style.BRIGHT + f"IMPORTANT: {added_count} user(s) created with default PIN: {default_pin}")
-                print(Fore.YELLOW + Style.BRIGHT + f"Please change PINs immediately for security!")
-                print(Fore.YELLOW + Style.BRIGHT + f"{'='*50}\n")
-            if updated_count > 0:
-                print(Fore.CYAN + f"✓ Updated {updated_count} user(s) with new privileges")
-        else:
-            print(Fore.GREEN + "All shift leaders already exist in database with correct privileges.")
-            
+        with db.engine.begin() as conn:
+            conn.execute(statement, rows)
     except Exception as e:
-        print(Fore.RED + f"Error initializing shift leaders: {e}")
-        db.session.rollback()
+        log.warning(f"Could not cache water temperature compliance for {len(rows)} day(s): {e}")
 
-def cleanup_old_leave_data():
-    """Delete holiday and sick leave records older than 2 years"""
-    try:
-        two_years_ago = datetime.now().date() - timedelta(days=730)  # 2 years = 730 days
-        
-        # Find old leave records (holiday, sick, off status)
-        old_records = StaffRota.query.filter(
-            StaffRota.date < two_years_ago,
-            StaffRota.status.in_(['holiday', 'sick', 'off'])
-        ).all()
-        
-        if old_records:
-            count = len(old_records)
-            for record in old_records:
-                db.session.delete(record)
-            db.session.commit()
-            print(Fore.GREEN + f"✓ Cleaned up {count} old leave record(s) from before {two_years_ago}")
-        else:
-            print(Fore.CYAN + f"No old leave records to clean up (older than {two_years_ago})")
-            
-    except Exception as e:
-        print(Fore.RED + f"Error cleaning up old leave data: {e}")
-        db.session.rollback()
+def invalidate_daily_compliance(day):
+    """Forget the cached statistics for a day whose readings changed (caller commits)"""
+    WaterTemperatureDailyStats.query.filter_by(date=day).delete(synchronize_session=False)
+
+def summarize_compliance(days):
+    """Combine daily statistics [(date, stats)] into one summary (gaps between days included)"""
+    summary = {field: 0 for field in ('count', 'below_count', 'warning_count', 'danger_count',
+                                      'time_below_seconds', 'monitored_seconds', 'gap_count')}
+    total = total_squares = 0.0
+    minimum = maximum = previous_last = None
+    longest_gap = 0
+    days_without_readings = []
+    
+    for day, stats in days:
+        if not stats['count']:
+            days_without_readings.append(day.isoformat())
+            continue
+        for field in summary:
+            summary[field] += stats[field]
+        total += stats['total']
+        total_squares += stats['total_squares']
+        minimum = stats['min_temperature'] if minimum is None else min(minimum, stats['min_temperature'])
+        maximum = stats['max_temperature'] if maximum is None else max(maximum, stats['max_temperature'])
+        longest_gap = max(longest_gap, stats['longest_gap_seconds'])
+        if previous_last is not None:
+            # Gap from the previous day with readings to this day's first reading
+            gap = (stats['first_reading'] - previous_last).total_seconds()
+            longest_gap = max(longest_gap, gap)
+            summary['gap_count'] += gap > MAX_READING_GAP_HOURS * 3600
+        previous_last = stats['last_reading']
+    
+    count = summary['count']
+    mean = total / count if count else None
+    return dict(
+        summary,
+        mean=round(mean, 2) if mean is not None else None,
+        std_dev=round(max(total_squares / count - mean * mean, 0) ** 0.5, 2) if count else None,
+        min=minimum,
+        max=maximum,
+        time_below_seconds=round(summary['time_below_seconds']),
+        monitored_seconds=round(summary['monitored_seconds']),
+        # Share of the monitored time spent below the Legionella minimum
+        time_below_percent=round(summary['time_below_seconds'] / summary['monitored_seconds'] * 100, 2)
+            if summary['monitored_seconds'] else None,
+        longest_gap_hours=round(longest_gap / 3600, 2),
+        days_without_readings=days_without_readings
+    )
+
+def get_water_temperature_compliance(start_date, end_date, rolling_days=7):
+    """
+    Get water temperature compliance analytics for a date range.
+    
+    Returns:
+        Dict with the thresholds, a summary for the whole range, and per-day statistics
+        including rolling mean/min/max and breach counts over the previous rolling_days days
+    """
+    days = get_daily_compliance(start_date - timedelta(days=rolling_days - 1), end_date)
+    
+    daily = []
+    for index in range(rolling_days - 1, len(days)):
+        day, stats = days[index]
+        window = [window_stats for _, window_stats in days[index - rolling_days + 1:index + 1] if window_stats['count']]
+        window_count = sum(window_stats['count'] for window_stats in window)
+        daily.append({
+            'date': day.isoformat(),
+            'count': stats['count'],
+            'mean': round(stats['total'] / stats['count'], 2) if stats['count'] else None,
+            'min': stats['min_temperature'],
+            'max': stats['max_temperature'],
+            'below_count': stats['below_count'],
+            'warning_count': stats['warning_count'],
+            'danger_count': stats['danger_count'],
+            'time_below_hours': round(stats['time_below_seconds'] / 3600, 2),
+            'gap_count': stats['gap_count'],
+            'rolling': {
+                'mean': round(sum(window_stats['total'] for window_stats in window) / window_count, 2) if window_count else None,
+                'min': min((window_stats['min_temperature'] for window_stats in window), default=None),
+                'max': max((window_stats['max_temperature'] for window_stats in window), default=None),
+                'below_count': sum(window_stats['below_count'] for window_stats in window)
+            }
+        })
+    
+    return {
+        'thresholds': {
+            'legionella_min': LEGIONELLA_MIN_TEMPERATURE,
+            'scald_warning': SCALD_WARNING_TEMPERATURE,
+            'scald_danger': SCALD_DANGER_TEMPERATURE,
+            'max_gap_hours': MAX_READING_GAP_HOURS
+        },
+        'summary': summarize_compliance(days[rolling_days - 1:]),
+        'rolling_days': rolling_days,
+        'days': daily
+    }
+
+def format_compliance_summary(summary):
+    """One-line compliance summary for the daily report"""
+    if not summary['count']:
+        return "Compliance: no readings recorded."
+    parts = [
+        f"{summary['count']} reading{'s' if summary['count'] != 1 else ''}",
+        f"mean {summary['mean']:.1f}°C (min {summary['min']:.1f}°C, max {summary['max']:.1f}°C)",
+        f"{summary['below_count']} below {LEGIONELLA_MIN_TEMPERATURE:g}°C"
+        + (f" ({summary['time_below_seconds'] / 3600:.1f} h)" if summary['time_below_seconds'] else ""),
+        f"{summary['warning_count']} above {SCALD_WARNING_TEMPERATURE:g}°C"
+    ]
+    if summary['gap_count']:
+        parts.append(f"{summary['gap_count']} gap{'s' if summary['gap_count'] != 1 else ''} over {MAX_READING_GAP_HOURS} h")
+    status = "OK" if not (summary['below_count'] or summary['warning_count'] or summary['gap_count']) else "ATTENTION"
+    return f"Compliance {status}: " + ", ".join(parts)
+
+def get_occurrences_for_range(start_datetime, end_datetime):
+    """Get daily occurrences in a range, including archived years, oldest first"""
+    occurrences = DailyOccurrence.query.filter(
+        DailyOccurrence.timestamp >= start_datetime,
+        DailyOccurrence.timestamp <= end_datetime
+    ).all()
+    occurrences.extend(query_archived_rows(DailyOccurrence, 'timestamp', start_datetime, end_datetime))
+    return sorted(occurrences, key=lambda o: o.timestamp)
 
 def get_google_drive_credentials():
     """Get OAuth2 credentials for Google Drive, handling token refresh and authorization"""
@@ -2891,38 +6460,38 @@ def get_google_drive_credentials():
             with open(token_path, 'rb') as token:
                 creds = pickle.load(token)
         except Exception as e:
-            print(Fore.YELLOW + f"  Could not load existing token: {e}")
+            backup_log.warning(f"  Could not load existing token: {e}")
     
     # If no valid credentials, try to refresh or get new ones
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
             try:
                 creds.refresh(Request())
-                print(Fore.GREEN + "✓ Refreshed Google Drive credentials")
+                backup_log.info("✓ Refreshed Google Drive credentials")
             except Exception as e:
-                print(Fore.YELLOW + f"  Could not refresh token: {e}")
+                backup_log.warning(f"  Could not refresh token: {e}")
                 creds = None
         
         # If still no credentials, need user authorization
         if not creds:
             if not os.path.exists(credentials_path):
-                print(Fore.RED + "✗ Google Drive backup failed: credentials.json not found")
-                print(Fore.YELLOW + f"  Expected location: {credentials_path}")
-                print(Fore.YELLOW + "  Please follow instructions in GOOGLE_DRIVE_SETUP.md")
-                print(Fore.YELLOW + "  You need to create OAuth2 Client ID credentials (not service account)")
+                backup_log.error("✗ Google Drive backup failed: credentials.json not found")
+                backup_log.warning(f"  Expected location: {credentials_path}")
+                backup_log.warning("  Please follow instructions in GOOGLE_DRIVE_SETUP.md")
+                backup_log.warning("  You need to create OAuth2 Client ID credentials (not service account)")
                 return None
             
             try:
                 flow = InstalledAppFlow.from_client_secrets_file(credentials_path, SCOPES)
                 creds = flow.run_local_server(port=0, open_browser=True)
-                print(Fore.GREEN + "✓ Google Drive authorization successful!")
+                backup_log.info("✓ Google Drive authorization successful!")
                 
                 # Save credentials for next time (in same directory as .exe)
                 with open(token_path, 'wb') as token:
                     pickle.dump(creds, token)
-                print(Fore.GREEN + "✓ Credentials saved for future use")
+                backup_log.info("✓ Credentials saved for future use")
             except Exception as e:
-                print(Fore.RED + f"✗ Authorization failed: {e}")
+                backup_log.error(f"✗ Authorization failed: {e}")
                 return None
     
     return creds
@@ -2959,17 +6528,17 @@ def upload_to_google_drive(file_path, file_name='diary_latest.db'):
         
         if not folders:
             # Create folder if it doesn't exist (OAuth2 user credentials can create folders)
-            print(Fore.CYAN + f"  Creating '{folder_name}' folder in Google Drive...")
+            backup_log.info(f"  Creating '{folder_name}' folder in Google Drive...")
             folder_metadata = {
                 'name': folder_name,
                 'mimeType': 'application/vnd.google-apps.folder'
             }
             folder = service.files().create(body=folder_metadata, fields='id, name').execute()
             folder_id = folder.get('id')
-            print(Fore.GREEN + f"✓ Created '{folder_name}' folder in Google Drive")
+            backup_log.info(f"✓ Created '{folder_name}' folder in Google Drive")
         else:
             folder_id = folders[0]['id']
-            print(Fore.GREEN + f"✓ Found '{folder_name}' folder in Google Drive (ID: {folder_id})")
+            backup_log.info(f"✓ Found '{folder_name}' folder in Google Drive (ID: {folder_id})")
         
         # Search for existing backup file with the same name
         file_query = f"name='{file_name}' and '{folder_id}' in parents and trashed=false"
@@ -2984,7 +6553,7 @@ def upload_to_google_drive(file_path, file_name='diary_latest.db'):
         if existing_files:
             for existing_file in existing_files:
                 service.files().delete(fileId=existing_file['id']).execute()
-                print(Fore.CYAN + f"  Deleted old backup: {existing_file['name']}")
+                backup_log.info(f"  Deleted old backup: {existing_file['name']}")
         
         # Upload new backup file
         file_metadata = {
@@ -2998,17 +6567,18 @@ def upload_to_google_drive(file_path, file_name='diary_latest.db'):
             fields='id, name, size'
         ).execute()
         
+        add_job_metrics(bytes_written=int(uploaded_file.get('size', 0)))
         file_size_kb = int(uploaded_file.get('size', 0)) / 1024
-        print(Fore.GREEN + f"✓ Database backed up to Google Drive successfully!")
-        print(Fore.CYAN + f"  File: {uploaded_file.get('name')}")
-        print(Fore.CYAN + f"  Size: {file_size_kb:.2f} KB")
-        print(Fore.CYAN + f"  Folder: {folder_name}")
-        print(Fore.GREEN + f"  Only latest backup kept (old backups deleted)")
+        backup_log.info("✓ Database backed up to Google Drive successfully!")
+        backup_log.info(f"  File: {uploaded_file.get('name')}")
+        backup_log.info(f"  Size: {file_size_kb:.2f} KB")
+        backup_log.info(f"  Folder: {folder_name}")
+        backup_log.info("  Only latest backup kept (old backups deleted)")
         
         return True
         
     except Exception as e:
-        print(Fore.RED + f"✗ Error uploading to Google Drive: {e}")
+        backup_log.error(f"✗ Error uploading to Google Drive: {e}")
         import traceback
         traceback.print_exc()
         return False
@@ -3021,60 +6591,75 @@ def upload_to_google_drive(file_path, file_name='diary_latest.db'):
         service = None
         media = None
 
-def backup_database_to_gdrive():
-    """Create backup of database and upload to Google Drive"""
+def create_database_snapshot():
+    """
+    Copy the database to a temporary file for backup.
+    
+    Commits pending transactions and closes all connections first so the copy is
+    consistent. The caller must delete the returned file.
+    
+    Returns:
+        Path of the temporary copy, or None if the database file doesn't exist
+    """
     import shutil
     import tempfile
     
+    # Source database file - ensure instance directory exists
+    instance_dir = os.path.join(BASE_PATH, 'instance')
+    os.makedirs(instance_dir, exist_ok=True)
+    db_path = os.path.join(instance_dir, 'diary.db')
+    
+    if not os.path.exists(db_path):
+        backup_log.error("✗ Database file not found, skipping Google Drive backup")
+        return None
+    
+    # Ensure all database transactions are committed before backup
+    try:
+        db.session.commit()
+        backup_log.info("✓ Committed pending database transactions")
+    except Exception as commit_error:
+        backup_log.warning(f"Warning: Error committing database transactions: {commit_error}")
+        db.session.rollback()
+    
+    # Close database connections to ensure file is not locked during copy
+    # For SQLite, we need to dispose the engine to close ALL connections
+    try:
+        db.session.remove()  # Close current session
+        db.engine.dispose()  # Dispose engine to close all connections (SQLite specific)
+        backup_log.info("✓ Database connections closed")
+    except Exception as close_error:
+        backup_log.warning(f"Warning: Error closing database connections: {close_error}")
+        try:
+            db.engine.dispose()
+        except:
+            pass
+    
+    # Get file size for reporting
+    file_size_kb = os.path.getsize(db_path) / 1024
+    backup_log.info("Starting Google Drive backup...")
+    backup_log.info(f"  Database size: {file_size_kb:.2f} KB")
+    
+    # Create temporary copy (in case upload takes time and db is being used)
+    with tempfile.NamedTemporaryFile(mode='w+b', suffix='.db', delete=False) as tmp_file:
+        tmp_path = tmp_file.name
+        shutil.copy2(db_path, tmp_path)
+    return tmp_path
+
+def backup_database_to_gdrive():
+    """Create backup of database and upload to Google Drive"""
     tmp_path = None
     try:
-        # Source database file - ensure instance directory exists
-        instance_dir = os.path.join(BASE_PATH, 'instance')
-        os.makedirs(instance_dir, exist_ok=True)
-        db_path = os.path.join(instance_dir, 'diary.db')
-        
-        if not os.path.exists(db_path):
-            print(Fore.RED + "✗ Database file not found, skipping Google Drive backup")
+        tmp_path = create_database_snapshot()
+        if not tmp_path:
             return False
         
-        # Ensure all database transactions are committed before backup
-        try:
-            db.session.commit()
-            print(Fore.CYAN + "✓ Committed pending database transactions")
-        except Exception as commit_error:
-            print(Fore.YELLOW + f"Warning: Error committing database transactions: {commit_error}")
-            db.session.rollback()
-        
-        # Close database connections to ensure file is not locked during copy
-        # For SQLite, we need to dispose the engine to close ALL connections
-        try:
-            db.session.remove()  # Close current session
-            db.engine.dispose()  # Dispose engine to close all connections (SQLite specific)
-            print(Fore.CYAN + "✓ Database connections closed")
-        except Exception as close_error:
-            print(Fore.YELLOW + f"Warning: Error closing database connections: {close_error}")
-            try:
-                db.engine.dispose()
-            except:
-                pass
-        
-        # Get file size for reporting
-        file_size_kb = os.path.getsize(db_path) / 1024
-        print(Fore.CYAN + f"Starting Google Drive backup...")
-        print(Fore.CYAN + f"  Database size: {file_size_kb:.2f} KB")
-        
-        # Create temporary copy (in case upload takes time and db is being used)
-        with tempfile.NamedTemporaryFile(mode='w+b', suffix='.db', delete=False) as tmp_file:
-            tmp_path = tmp_file.name
-            shutil.copy2(db_path, tmp_path)
-        
         # Upload to Google Drive
         success = upload_to_google_drive(tmp_path, 'diary_latest.db')
         
         return success
         
     except Exception as e:
-        print(Fore.RED + f"✗ Error backing up database to Google Drive: {e}")
+        backup_log.error(f"✗ Error backing up database to Google Drive: {e}")
         return False
     finally:
         # Clean up temporary file - ensure it's always deleted
@@ -3082,92 +6667,221 @@ def backup_database_to_gdrive():
             try:
                 os.unlink(tmp_path)
             except Exception as cleanup_error:
-                print(Fore.YELLOW + f"Warning: Could not delete temporary backup file: {cleanup_error}")
+                backup_log.warning(f"Warning: Could not delete temporary backup file: {cleanup_error}")
+
+# Number of days back (before today) checked for missed daily reports on startup
+MISSED_REPORT_WINDOW_DAYS = 7
+# Report emails are archived after ARCHIVE_POLICY['email_log'] days - an older sent day would look unreported
+MISSED_REPORT_MAX_WINDOW_DAYS = ARCHIVE_POLICY['email_log'][1] - 1
+
+def find_missed_report_dates(days=None):
+    """
+    Find days in the window that have report data but no daily report email logged.
+    
+    Days already reported are also returned if they have unsent occurrences - entries
+    saved after the report went out (e.g. sent late from a browser outbox), which
+    send_daily_report() sends as a follow-up report. Uses one grouped query per table for the whole window, so checking 90 days
+    costs the same number of queries as checking 7.
+    
+    Args:
+        days: Number of days before today to check (default: MISSED_REPORT_WINDOW_DAYS)
+    
+    Returns:
+        List of dicts with 'date', 'unsent_occurrences', 'water_temperatures' and
+        'already_reported', oldest first
+    """
+    days = days or MISSED_REPORT_WINDOW_DAYS
+    today = datetime.now().date()
+    window_start = datetime.combine(today - timedelta(days=days), datetime.min.time())
+    window_end = datetime.combine(today, datetime.min.time())
+    
+    # Reports are identified by subject, not send date (a missed report is sent late)
+    check_dates = [today - timedelta(days=days_ago) for days_ago in range(days, 0, -1)]
+    subjects = {f"Daily Report - {check_date}": check_date for check_date in check_dates}
+    sent_dates = {
+        subjects[subject] for (subject,) in db.session.query(EmailLog.subject).filter(
+            EmailLog.subject.in_(list(subjects))
+        ).distinct()
+    }
+    
+    day = db.func.date(DailyOccurrence.timestamp)
+    unsent_by_day = dict(db.session.query(day, db.func.count(DailyOccurrence.id)).filter(
+        DailyOccurrence.timestamp >= window_start,
+        DailyOccurrence.timestamp < window_end,
+        DailyOccurrence.sent == False
+    ).group_by(day).all())
+    
+    day = db.func.date(WaterTemperature.timestamp)
+    temps_by_day = dict(db.session.query(day, db.func.count(WaterTemperature.id)).filter(
+        WaterTemperature.timestamp >= window_start,
+        WaterTemperature.timestamp < window_end
+    ).group_by(day).all())
+    
+    missed = []
+    for check_date in check_dates:
+        already_reported = check_date in sent_dates
+        unsent_occurrences = unsent_by_day.get(check_date.isoformat(), 0)
+        water_temps = temps_by_day.get(check_date.isoformat(), 0)
+        if unsent_occurrences > 0 or (water_temps > 0 and not already_reported):
+            missed.append({
+                'date': check_date,
+                'unsent_occurrences': unsent_occurrences,
+                'water_temperatures': water_temps,
+                'already_reported': already_reported
+            })
+    return missed
 
-def check_missed_reports():
-    """Check for missed daily reports and send them on startup"""
+def check_missed_reports(days=None):
+    """
+    Check for missed daily reports and send them (on startup or on request)
+    
+    Args:
+        days: Number of days before today to check (default: MISSED_REPORT_WINDOW_DAYS)
+    
+    Returns:
+        List of dicts for each missed report found, with 'sent' set to whether it was sent
+    """
     try:
         settings = ScheduleSettings.query.first()
         if not settings or not settings.email_enabled:
-            print(Fore.YELLOW + "Email not enabled, skipping missed report check")
-            return
-        
-        # Check the last 7 days for missed reports
-        today = datetime.now().date()
-        
-        for days_ago in range(1, 8):  # Check last 7 days
-            check_date = today - timedelta(days=days_ago)
-            
-            # Check if report was already sent for this date (check by subject, not send date)
-            expected_subject = f"Daily Report - {check_date}"
-            existing_log = EmailLog.query.filter(
-                EmailLog.subject == expected_subject
-            ).first()
-            
-            if existing_log:
-                # Report was already sent for this date
-                continue
+            report_log.warning("Email not enabled, skipping missed report check")
+            return []
+        
+        missed = find_missed_report_dates(days)
+        for report in missed:
+            # There's data (occurrences or water temps) and no email was sent, or occurrences
+            # were added after the day's report - send it now
+            check_date = report['date']
+            if report['already_reported']:
+                report_log.warning(f"⚠️ LATE ENTRIES for {check_date}, already reported - sending a follow-up report")
+            else:
+                report_log.warning(f"⚠️ MISSED REPORT DETECTED for {check_date}")
+            report_log.warning(f"   - Unsent occurrences: {report['unsent_occurrences']}")
+            report_log.warning(f"   - Water temperature readings: {report['water_temperatures']}")
+            report_log.warning("   - Sending report now...")
             
-            # Check if there are any unsent occurrences for this date
-            next_day = check_date + timedelta(days=1)
-            unsent_occurrences = DailyOccurrence.query.filter(
-                DailyOccurrence.timestamp >= check_date,
-                DailyOccurrence.timestamp < next_day,
-                DailyOccurrence.sent == False
-            ).count()
-            
-            # Check if there are water temperatures for this date (even if no occurrences)
-            temp_start = datetime.combine(check_date, datetime.min.time())
-            temp_end = datetime.combine(check_date, datetime.max.time())
-            water_temps = WaterTemperature.query.filter(
-                WaterTemperature.timestamp >= temp_start,
-                WaterTemperature.timestamp <= temp_end
-            ).count()
-            
-            # If there's data (occurrences or water temps) and no email was sent, send it now
-            if unsent_occurrences > 0 or water_temps > 0:
-                print(Fore.YELLOW + Style.BRIGHT + f"⚠️ MISSED REPORT DETECTED for {check_date}")
-                print(Fore.YELLOW + f"   - Unsent occurrences: {unsent_occurrences}")
-                print(Fore.YELLOW + f"   - Water temperature readings: {water_temps}")
-                print(Fore.YELLOW + f"   - Sending report now...")
-                
-                success = send_daily_report(check_date)
-                if success:
-                    print(Fore.GREEN + f"✓ Missed report for {check_date} sent successfully!")
-                else:
-                    print(Fore.RED + f"✗ Failed to send missed report for {check_date}")
+            report['sent'] = bool(send_daily_report(check_date))
+            if report['sent']:
+                report_log.info(f"✓ Missed report for {check_date} sent successfully!")
+            else:
+                report_log.error(f"✗ Failed to send missed report for {check_date}")
         
-        print(Fore.GREEN + "Missed report check completed")
+        report_log.info(f"Missed report check completed ({days or MISSED_REPORT_WINDOW_DAYS} days checked, {len(missed)} missed)")
+        return missed
         
     except Exception as e:
-        print(Fore.RED + f"Error checking for missed reports: {e}")
+        report_log.error(f"Error checking for missed reports: {e}")
+        return []
 
 def update_scheduler():
     """Update the scheduler with new time settings"""
     try:
-        # Remove existing job if it exists
-        try:
-            scheduler.remove_job('daily_report')
-        except Exception:
-            pass  # Job doesn't exist yet, that's fine
-        
         # Get new settings
         settings = ScheduleSettings.query.first()
         if settings and settings.email_enabled:
             # Parse time
             hour, minute = map(int, settings.email_time.split(':'))
             
-            # Add new job
-            scheduler.add_job(
-                func=send_daily_report_with_context,
-                trigger="cron",
-                hour=hour,
-                minute=minute,
-                id='daily_report'
-            )
-            print(Fore.GREEN + f"Scheduler updated to send emails at {settings.email_time}")
+            # Add the job, or move it to the new time
+            schedule_daily_job('daily_report', send_daily_report_with_context, hour, minute)
+            scheduler_log.info(f"Scheduler updated to send emails at {settings.email_time}")
+        else:
+            # Remove existing job if it exists
+            try:
+                get_scheduler().remove_job('daily_report')
+            except Exception:
+                pass  # Job doesn't exist, that's fine
     except Exception as e:
-        print(Fore.RED + f"Error updating scheduler: {e}")
+        scheduler_log.error(f"Error updating scheduler: {e}")
+
+# ===== STARTUP =====
+
+# Maintenance and catch-up work that runs in the background once the server is
+# already serving requests, in this order: (name, description, function)
+STARTUP_TASKS = [
+    ('shift_leaders', 'Initializing shift leaders', initialize_shift_leaders),
+    ('missed_reports', 'Checking for missed reports', check_missed_reports),
+]
+
+# Progress of the background startup tasks, reported by /api/startup-status
+startup_state = {'started': None, 'finished': None, 'tasks': []}
+startup_state_lock = threading.Lock()
+
+def run_startup_tasks(tasks=None):
+    """Run startup tasks one after another (each with app context), recording progress in startup_state"""
+    tasks = tasks or STARTUP_TASKS
+    with startup_state_lock:
+        startup_state['started'] = datetime.now().isoformat(timespec='seconds')
+        startup_state['finished'] = None
+        startup_state['tasks'] = [{
+            'name': name,
+            'description': description,
+            'status': 'pending',
+            'started': None,
+            'finished': None,
+            'duration_seconds': None,
+            'error': None
+        } for name, description, _ in tasks]
+    
+    for task, (_, description, func) in zip(startup_state['tasks'], tasks):
+        with startup_state_lock:
+            task['status'] = 'running'
+            task['started'] = datetime.now().isoformat(timespec='seconds')
+        log.info(f"{description}...")
+        
+        started = time.perf_counter()
+        status, error = 'done', None
+        try:
+            with app.app_context():
+                func()
+        except Exception as e:
+            status, error = 'failed', str(e)
+            log.error(f"Startup task '{task['name']}' failed: {e}")
+        
+        with startup_state_lock:
+            task['status'] = status
+            task['error'] = error
+            task['finished'] = datetime.now().isoformat(timespec='seconds')
+            task['duration_seconds'] = round(time.perf_counter() - started, 2)
+    
+    with startup_state_lock:
+        startup_state['finished'] = datetime.now().isoformat(timespec='seconds')
+    log.info("✓ Background startup tasks completed")
+
+def start_background_startup_tasks():
+    """Start the startup tasks on a background thread so HTTP can be served immediately"""
+    thread = threading.Thread(target=run_startup_tasks, name='startup-tasks', daemon=True)
+    thread.start()
+    return thread
+
+@app.route('/api/startup-status', methods=['GET'])
+def startup_status():
+    """Get progress of the background startup tasks (missed reports, cleanup, etc.)"""
+    with startup_state_lock:
+        tasks = [dict(task) for task in startup_state['tasks']]
+        started = startup_state['started']
+        finished = startup_state['finished']
+    
+    if started is None:
+        state = 'not_started'
+    elif finished is None:
+        state = 'running'
+    else:
+        state = 'complete'
+    
+    return jsonify({
+        'success': True,
+        'state': state,
+        'ready': state == 'complete',
+        'started': started,
+        'finished': finished,
+        'completed_count': sum(1 for task in tasks if task['status'] in ('done', 'failed')),
+        'total_count': len(tasks),
+        'tasks': tasks,
+        # With several server processes, startup tasks only run in the scheduler process
+        'scheduler_process': is_scheduler_process(),
+        'pid': os.getpid()
+    })
 
 def migrate_database():
     """Migrate database to handle schema changes safely"""
@@ -3177,12 +6891,19 @@ def migrate_database():
         # Create inspector to check table structure
         inspector = inspect(db.engine)
         
+        # New (empty) databases use incremental auto-vacuum so maintenance jobs can
+        # release free pages cheaply (existing databases would need a full VACUUM to switch)
+        if not inspector.get_table_names():
+            with db.engine.connect() as conn:
+                conn.execute(text("PRAGMA auto_vacuum = INCREMENTAL"))
+                conn.commit()
+        
         # Check if water_temperature table has the old structure
         if 'water_temperature' in inspector.get_table_names():
             columns = [col['name'] for col in inspector.get_columns('water_temperature')]
             
             if 'notes' in columns and 'time_recorded' not in columns:
-                print("Migrating water_temperature table...")
+                log.info("Migrating water_temperature table...")
                 with db.engine.connect() as conn:
                     # Create new table with correct structure
                     conn.execute(text("""
@@ -3207,28 +6928,28 @@ def migrate_database():
                     conn.execute(text("DROP TABLE water_temperature"))
                     conn.execute(text("ALTER TABLE water_temperature_new RENAME TO water_temperature"))
                     conn.commit()
-                print(Fore.GREEN + "✓ water_temperature table migrated successfully!")
+                log.info("✓ water_temperature table migrated successfully!")
         
         # Check if schedule_settings table needs new sender email columns
         if 'schedule_settings' in inspector.get_table_names():
             columns = [col['name'] for col in inspector.get_columns('schedule_settings')]
             
             if 'sender_email' not in columns:
-                print(Fore.CYAN + "Adding sender email configuration columns to schedule_settings...")
+                log.info("Adding sender email configuration columns to schedule_settings...")
                 with db.engine.connect() as conn:
                     conn.execute(text("ALTER TABLE schedule_settings ADD COLUMN sender_email VARCHAR(200) DEFAULT ''"))
                     conn.execute(text("ALTER TABLE schedule_settings ADD COLUMN sender_password VARCHAR(200) DEFAULT ''"))
                     conn.execute(text("ALTER TABLE schedule_settings ADD COLUMN smtp_server VARCHAR(200) DEFAULT 'smtp.gmail.com'"))
                     conn.execute(text("ALTER TABLE schedule_settings ADD COLUMN smtp_port INTEGER DEFAULT 587"))
                     conn.commit()
-                print(Fore.GREEN + "✓ Sender email columns added successfully!")
+                log.info("✓ Sender email columns added successfully!")
         
         # Check if shift_leader table needs is_super_user column
         if 'shift_leader' in inspector.get_table_names():
             columns = [col['name'] for col in inspector.get_columns('shift_leader')]
             
             if 'is_super_user' not in columns:
-                print(Fore.CYAN + "Adding is_super_user column to shift_leader table...")
+                log.info("Adding is_super_user column to shift_leader table...")
                 with db.engine.connect() as conn:
                     conn.execute(text("ALTER TABLE shift_leader ADD COLUMN is_super_user BOOLEAN DEFAULT 0"))
                     conn.commit()
@@ -3237,14 +6958,14 @@ def migrate_database():
                 with db.engine.connect() as conn:
                     conn.execute(text("UPDATE shift_leader SET is_super_user = 1 WHERE LOWER(name) IN ('arpad', 'carlos')"))
                     conn.commit()
-                print(Fore.GREEN + "✓ Super user column added and Arpad/Carlos set as super users!")
+                log.info("✓ Super user column added and Arpad/Carlos set as super users!")
         
         # Check if cctv_fault table needs new detailed fields
         if 'cctv_fault' in inspector.get_table_names():
             columns = [col['name'] for col in inspector.get_columns('cctv_fault')]
             
             if 'flat_number' not in columns:
-                print(Fore.CYAN + "Adding detailed fields to cctv_fault table...")
+                log.info("Adding detailed fields to cctv_fault table...")
                 with db.engine.connect() as conn:
                     conn.execute(text("ALTER TABLE cctv_fault ADD COLUMN flat_number VARCHAR(20) DEFAULT ''"))
                     conn.execute(text("ALTER TABLE cctv_fault ADD COLUMN block_number VARCHAR(20) DEFAULT ''"))
@@ -3252,18 +6973,68 @@ def migrate_database():
                     conn.execute(text("ALTER TABLE cctv_fault ADD COLUMN contact_details VARCHAR(200) DEFAULT ''"))
                     conn.execute(text("ALTER TABLE cctv_fault ADD COLUMN additional_notes TEXT DEFAULT ''"))
                     conn.commit()
-                print(Fore.GREEN + "✓ CCTV/Intercom fault detailed fields added successfully!")
+                log.info("✓ CCTV/Intercom fault detailed fields added successfully!")
+        
+        # Occurrences and faults link to their Flat (filled in by rebuild_flats() below)
+        for table in ('daily_occurrence', 'cctv_fault'):
+            if table in inspector.get_table_names():
+                columns = [col['name'] for col in inspector.get_columns(table)]
+                
+                if 'flat_id' not in columns:
+                    log.info(f"Adding flat_id column to {table} table...")
+                    with db.engine.connect() as conn:
+                        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN flat_id INTEGER"))
+                        conn.commit()
+                    log.info(f"✓ flat_id column added to {table}!")
+        
+        # Check if job_run table needs the metrics columns
+        if 'job_run' in inspector.get_table_names():
+            columns = [col['name'] for col in inspector.get_columns('job_run')]
+            
+            if 'query_count' not in columns:
+                log.info("Adding metrics columns to job_run table...")
+                with db.engine.connect() as conn:
+                    conn.execute(text("ALTER TABLE job_run ADD COLUMN rows_processed INTEGER DEFAULT 0"))
+                    conn.execute(text("ALTER TABLE job_run ADD COLUMN bytes_written INTEGER DEFAULT 0"))
+                    conn.execute(text("ALTER TABLE job_run ADD COLUMN query_count INTEGER DEFAULT 0"))
+                    conn.execute(text("ALTER TABLE job_run ADD COLUMN query_seconds FLOAT DEFAULT 0"))
+                    conn.commit()
+                log.info("✓ Job run metrics columns added successfully!")
         
         # Create all tables if they don't exist (includes ActivityLog and any new models)
         db.create_all()
-        print(Fore.GREEN + "✓ Tables created/verified successfully!")
+        log.info("✓ Tables created/verified successfully!")
+        
+        # create_all() skips tables that already exist, so add any declared indexes they are missing
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=db.engine, checkfirst=True)
+        log.info("✓ Indexes created/verified successfully!")
+        
+        # Full-text search indexes and the triggers keeping them in sync
+        if create_search_indexes():
+            log.info("Building full-text search index...")
+            indexed = rebuild_search_index()
+            log.info(f"✓ Full-text search index built ({sum(indexed.values())} rows)")
+        
+        # Link occurrences and faults recorded before flats existed to their flats
+        if not Flat.query.first() and (DailyOccurrence.query.first() or CCTVFault.query.first() or get_archive_years()):
+            log.info("Building flat history index...")
+            flat_count = rebuild_flats()
+            log.info(f"✓ {flat_count} flats indexed")
+        
+        # Build water temperature rollups for readings recorded before they existed
+        if not WaterTemperatureRollup.query.first() and WaterTemperature.query.first():
+            log.info("Building water temperature rollups...")
+            rollup_count = rebuild_water_temperature_rollups()
+            log.info(f"✓ {rollup_count} water temperature rollups built")
         
         # Refresh inspector after create_all to check for new tables
         inspector = inspect(db.engine)
         
         # Check if overtime table exists and has correct schema
         if 'overtime' not in inspector.get_table_names():
-            print(Fore.CYAN + "Creating overtime table...")
+            log.info("Creating overtime table...")
             with db.engine.connect() as conn:
                 conn.execute(text("""
                     CREATE TABLE overtime (
@@ -3278,7 +7049,7 @@ def migrate_database():
                     )
                 """))
                 conn.commit()
-            print(Fore.GREEN + "✓ Overtime table created successfully!")
+            log.info("✓ Overtime table created successfully!")
         else:
             # Check if overtime table has required columns (especially staff_name)
             columns = [col['name'] for col in inspector.get_columns('overtime')]
@@ -3287,8 +7058,8 @@ def migrate_database():
             missing_columns = [col for col in required_columns if col not in columns]
             
             if missing_columns:
-                print(Fore.CYAN + f"Overtime table missing required columns: {missing_columns}")
-                print(Fore.CYAN + "Recreating overtime table with correct schema...")
+                log.info(f"Overtime table missing required columns: {missing_columns}")
+                log.info("Recreating overtime table with correct schema...")
                 try:
                     # Try to backup existing data if we can read it
                     with db.engine.connect() as conn:
@@ -3302,9 +7073,9 @@ def migrate_database():
                                 if select_cols:
                                     result = conn.execute(text(f"SELECT {select_cols} FROM overtime"))
                                     backup_data = [dict(row._mapping) for row in result]
-                                    print(Fore.CYAN + f"Found {len(backup_data)} existing overtime entries to preserve")
+                                    log.info(f"Found {len(backup_data)} existing overtime entries to preserve")
                         except Exception as backup_error:
-                            print(Fore.YELLOW + f"⚠ Could not backup existing data: {backup_error}")
+                            log.warning(f"⚠ Could not backup existing data: {backup_error}")
                             backup_data = []
                     
                     # Drop and recreate table
@@ -3323,42 +7094,219 @@ def migrate_database():
                             )
                         """))
                         conn.commit()
-                    print(Fore.GREEN + "✓ Overtime table recreated successfully!")
+                    log.info("✓ Overtime table recreated successfully!")
                     
                     if backup_data:
-                        print(Fore.YELLOW + "⚠ Note: Existing overtime entries were not automatically migrated due to schema change.")
-                        print(Fore.YELLOW + "   Please re-enter any lost entries manually.")
+                        log.warning("⚠ Note: Existing overtime entries were not automatically migrated due to schema change.")
+                        log.warning("   Please re-enter any lost entries manually.")
                 except Exception as recreate_error:
-                    print(Fore.RED + f"✗ Error recreating overtime table: {recreate_error}")
-                    print(Fore.YELLOW + "   You may need to manually fix the database schema.")
+                    log.error(f"✗ Error recreating overtime table: {recreate_error}")
+                    log.warning("   You may need to manually fix the database schema.")
             else:
-                print(Fore.GREEN + "✓ Overtime table already exists with correct schema")
+                log.info("✓ Overtime table already exists with correct schema")
         
         # Verify ActivityLog table was created
         if 'activity_log' in inspector.get_table_names():
-            print(Fore.GREEN + "✓ ActivityLog table ready for user activity tracking")
+            log.info("✓ ActivityLog table ready for user activity tracking")
         
     except Exception as e:
-        print(Fore.RED + f"Migration error: {e}")
+        log.error(f"Migration error: {e}")
         # Only create tables if they don't exist - NEVER drop existing data
         try:
             db.create_all()
-            print("Tables created/verified successfully!")
+            log.info("Tables created/verified successfully!")
         except Exception as create_error:
-            print(Fore.RED + f"Error creating tables: {create_error}")
+            log.error(f"Error creating tables: {create_error}")
+
+# ===== SERVING =====
+
+# python app.py runs the single-process development server. With --serve the app runs
+# under waitress (threads) or gunicorn (--processes, Linux only); any number of
+# processes may serve requests, but only the one holding the scheduler lock runs
+# scheduled jobs and the startup tasks - the others take over if it exits.
+SERVE_DEFAULT_THREADS = 8
+SERVE_DEFAULT_PORT = 5000
+SCHEDULER_LOCK_PATH = os.path.join(instance_dir, 'scheduler.lock')
+MIGRATION_LOCK_PATH = os.path.join(instance_dir, 'migrate.lock')
+SCHEDULER_LEADER_RETRY_SECONDS = 30
+SCHEDULE_SETTINGS_POLL_SECONDS = 60
+
+scheduler_lock_file = None  # Held open for the life of the process that runs the scheduler
+
+def is_scheduler_process():
+    """True if this process runs the scheduled jobs"""
+    return scheduler is not None and scheduler.running
+
+def start_scheduler():
+    """Start the scheduler and (re)register the daily jobs (needs app context)"""
+    sched = get_scheduler()
+    
+    # Start paused so stored jobs can be checked before any misfired runs are processed
+    sched.start(paused=True)
+    
+    # Schedule daily report using settings
+    update_scheduler()
+    
+    # Schedule daily cleanup of old leave data (runs at 3 AM every day)
+    schedule_daily_job('cleanup_old_leave', cleanup_old_leave_data_with_context, 3, 0)
+    
+    # Schedule daily archive of old activity/email/temperature/occurrence rows (runs at 3:30 AM every day)
+    schedule_daily_job('archive_old_data', archive_old_data_with_context, 3, 30)
+    
+    # Schedule daily Google Drive backup (runs at 2 AM every day)
+    schedule_daily_job('daily_gdrive_backup', backup_database_to_gdrive_with_context, 2, 0)
+    
+    # Runs missed while the app was closed fire now (once each) if within their grace time
+    sched.resume()
+
+def watch_schedule_settings():
+    """Re-apply the report time when another process changes it (scheduler process only)"""
+    last_settings = None
+    while True:
+        time.sleep(SCHEDULE_SETTINGS_POLL_SECONDS)
+        try:
+            with app.app_context():
+                settings = ScheduleSettings.query.first()
+                current = (settings.email_enabled, settings.email_time) if settings else None
+                if last_settings is not None and current != last_settings:
+                    update_scheduler()
+                last_settings = current
+        except Exception as e:
+            scheduler_log.error(f"Error checking schedule settings: {e}")
+
+def try_become_scheduler_process():
+    """Run the scheduler and startup tasks in this process if no other process is (leader election)"""
+    global scheduler_lock_file
+    lock_file = acquire_file_lock(SCHEDULER_LOCK_PATH)
+    if lock_file is None:
+        return False
+    scheduler_lock_file = lock_file
+    
+    with app.app_context():
+        start_background_startup_tasks()
+        start_scheduler()
+    start_report_workers(report_worker_count)
+    threading.Thread(target=watch_schedule_settings, name='schedule-settings', daemon=True).start()
+    scheduler_log.info(f"✓ Scheduler running in process {os.getpid()}")
+    return True
+
+def wait_to_become_scheduler_process():
+    """Take over the scheduler if the process running it exits"""
+    while not try_become_scheduler_process():
+        time.sleep(SCHEDULER_LEADER_RETRY_SECONDS)
+
+def init_server_process(report_workers=REPORT_WORKERS_DEFAULT):
+    """
+    Prepare a --serve (or wsgi.py) process: migrate the database, then run the
+    scheduler and report workers here if no other process already is.
+    """
+    global report_worker_count
+    report_worker_count = report_workers
+    
+    # Several processes may start at once - only one migrates at a time
+    migration_lock = acquire_file_lock(MIGRATION_LOCK_PATH, wait=True)
+    try:
+        with app.app_context():
+            migrate_database()
+            if not ScheduleSettings.query.first():
+                db.session.add(ScheduleSettings())
+                db.session.commit()
+    finally:
+        release_file_lock(migration_lock)
+    
+    if not try_become_scheduler_process():
+        log.info(f"Scheduler is running in another process - process {os.getpid()} will take over if it stops")
+        threading.Thread(target=wait_to_become_scheduler_process, name='scheduler-standby', daemon=True).start()
+    
+    def cleanup_on_exit():
+        if is_scheduler_process():
+            scheduler.shutdown()
+        log_shutdown(f"Server process {os.getpid()} stopped")
+    
+    atexit.register(cleanup_on_exit)
+    log_startup()
+    
+    # Load the libraries deferred at startup without delaying the first requests
+    threading.Thread(target=warm_up_deferred_imports, name='warm-up-imports', daemon=True).start()
+
+def serve(host='0.0.0.0', port=SERVE_DEFAULT_PORT, threads=SERVE_DEFAULT_THREADS, processes=1,
+          report_workers=REPORT_WORKERS_DEFAULT):
+    """
+    Run the app under a production WSGI server.
+    
+    Args:
+        host: Interface to listen on
+        port: Port to listen on
+        threads: Worker threads per process
+        processes: Worker processes - more than one needs gunicorn (not available on Windows)
+        report_workers: Report worker processes (0 runs report jobs on a thread of the scheduler process)
+    """
+    if processes > 1:
+        # gunicorn forks the workers; each one imports wsgi.py, which calls init_server_process()
+        import subprocess
+        log.info(f"Starting gunicorn with {processes} processes x {threads} threads on {host}:{port}")
+        try:
+            return subprocess.call([sys.executable, '-m', 'gunicorn', '--workers', str(processes), '--threads', str(threads),
+                                    '--bind', f'{host}:{port}', 'wsgi:app'], cwd=BASE_PATH)
+        except KeyboardInterrupt:
+            return 0
+    
+    init_server_process(report_workers)
+    try:
+        from waitress import serve as waitress_serve
+    except ImportError:
+        log.warning("⚠️ waitress not installed (pip install waitress) - using the threaded development server")
+        app.run(debug=False, host=host, port=port, threaded=True)
+        return 0
+    
+    log.info(f"Serving with waitress on {host}:{port} ({threads} threads)")
+    waitress_serve(app, host=host, port=port, threads=threads)
+    return 0
+
+def get_command_line_option(name, default):
+    """Value following --name on the command line, converted to the default's type"""
+    if name in sys.argv[:-1]:
+        return type(default)(sys.argv[sys.argv.index(name) + 1])
+    return default
 
 if __name__ == '__main__':
+    # Report workers are started with multiprocessing - needed when running as a frozen .exe
+    import multiprocessing
+    multiprocessing.freeze_support()
+    
+    # Opt-in request profiling (see /api/metrics)
+    if '--profile' in sys.argv or '--cprofile' in sys.argv:
+        request_profiling['enabled'] = True
+        request_profiling['cprofile'] = '--cprofile' in sys.argv
+        request_profiling['since'] = datetime.now().isoformat(timespec='seconds')
+        log.info(f"Request profiling enabled{' (with cProfile)' if request_profiling['cprofile'] else ''} - see /api/metrics")
+    
+    # Rebuild the full-text search index from existing data and exit: python app.py --rebuild-search-index
+    if '--rebuild-search-index' in sys.argv:
+        with app.app_context():
+            migrate_database()
+            for table, count in rebuild_search_index().items():
+                log.info(f"  {table}: {count} rows indexed")
+        log.info("✓ Full-text search index rebuilt")
+        sys.exit(0)
+    
+    # Report worker pool size (both modes): --report-workers N
+    report_worker_count = get_command_line_option('--report-workers', REPORT_WORKERS_DEFAULT)
+    
+    # Production serving: python app.py --serve [--threads 8] [--processes 1] [--host 0.0.0.0] [--port 5000]
+    if '--serve' in sys.argv:
+        sys.exit(serve(
+            host=get_command_line_option('--host', '0.0.0.0'),
+            port=get_command_line_option('--port', SERVE_DEFAULT_PORT),
+            threads=get_command_line_option('--threads', SERVE_DEFAULT_THREADS),
+            processes=get_command_line_option('--processes', 1),
+            report_workers=report_worker_count
+        ))
+    
     with app.app_context():
-        # Migrate database if needed
+        # Migrate database if needed (must finish before serving requests)
         migrate_database()
         
-        # Initialize shift leaders
-        print(Fore.CYAN + Style.BRIGHT + "=" * 50)
-        print(Fore.CYAN + Style.BRIGHT + "INITIALIZING SHIFT LEADERS...")
-        print(Fore.CYAN + Style.BRIGHT + "=" * 50)
-        initialize_shift_leaders()
-        print(Fore.CYAN + Style.BRIGHT + "=" * 50)
-        
         # Initialize scheduler with default settings
         settings = ScheduleSettings.query.first()
         if not settings:
@@ -3366,50 +7314,21 @@ if __name__ == '__main__':
             db.session.add(settings)
             db.session.commit()
         
-        # Check for missed reports on startup (last 7 days)
-        print(Fore.CYAN + Style.BRIGHT + "=" * 50)
-        print(Fore.CYAN + Style.BRIGHT + "CHECKING FOR MISSED REPORTS...")
-        print(Fore.CYAN + Style.BRIGHT + "=" * 50)
-        check_missed_reports()
-        print(Fore.CYAN + Style.BRIGHT + "=" * 50)
-        
-        # Clean up old leave data (older than 2 years)
-        print(Fore.CYAN + Style.BRIGHT + "=" * 50)
-        print(Fore.CYAN + Style.BRIGHT + "CLEANING UP OLD LEAVE DATA...")
-        print(Fore.CYAN + Style.BRIGHT + "=" * 50)
-        cleanup_old_leave_data()
-        print(Fore.CYAN + Style.BRIGHT + "=" * 50)
-        
-        # Schedule daily report using settings
-        if settings.email_enabled:
-            hour, minute = map(int, settings.email_time.split(':'))
-            scheduler.add_job(
-                func=send_daily_report_with_context,
-                trigger="cron",
-                hour=hour,
-                minute=minute,
-                id='daily_report'
-            )
-        
-        # Schedule daily cleanup of old leave data (runs at 3 AM every day)
-        scheduler.add_job(
-            func=cleanup_old_leave_data_with_context,
-            trigger="cron",
-            hour=3,
-            minute=0,
-            id='cleanup_old_leave'
-        )
-        
-        # Schedule daily Google Drive backup (runs at 2 AM every day)
-        scheduler.add_job(
-            func=backup_database_to_gdrive_with_context,
-            trigger="cron",
-            hour=2,
-            minute=0,
-            id='daily_gdrive_backup'
-        )
-        
-        scheduler.start()
+        # Never run scheduled jobs twice - e.g. if a --serve instance is already running
+        scheduler_lock_file = acquire_file_lock(SCHEDULER_LOCK_PATH)
+        if scheduler_lock_file:
+            # Shift leader setup and missed report catch-up (which may
+            # generate and email several reports) run in the background - progress is
+            # reported by /api/startup-status while the web interface is already usable
+            start_background_startup_tasks()
+            
+            # Start the scheduler with the daily report, cleanup, archive and backup jobs
+            start_scheduler()
+            
+            # PDF/CSV exports and test emails requested from the web interface run here
+            start_report_workers(report_worker_count)
+        else:
+            scheduler_log.warning("⚠️ Scheduler is already running in another process - scheduled jobs will run there")
         
         # Log application startup
         log_startup()
@@ -3417,7 +7336,8 @@ if __name__ == '__main__':
         # Shut down the scheduler and log shutdown when exiting the app
         def cleanup_on_exit():
             log_shutdown("Normal shutdown")
-            scheduler.shutdown()
+            if is_scheduler_process():
+                scheduler.shutdown()
         
         atexit.register(cleanup_on_exit)
         
@@ -3425,7 +7345,8 @@ if __name__ == '__main__':
         def handle_shutdown_signal(signum, frame):
             signal_name = signal.Signals(signum).name if hasattr(signal, 'Signals') else str(signum)
             log_shutdown(f"Signal received: {signal_name}")
-            scheduler.shutdown()
+            if is_scheduler_process():
+                scheduler.shutdown()
             sys.exit(0)
         
         # Register signal handlers for graceful shutdown
@@ -3438,7 +7359,7 @@ if __name__ == '__main__':
     def open_browser():
         """Wait for server to start, then open default browser"""
         import urllib.request
-        import time
+        import webbrowser
         
         url = 'http://127.0.0.1:5000'
         max_attempts = 30  # Try for 15 seconds (30 * 0.5s)
@@ -3449,14 +7370,17 @@ if __name__ == '__main__':
                 urllib.request.urlopen(url, timeout=1)
                 # Server is ready!
                 webbrowser.open(url)
-                print(Fore.GREEN + "✓ Browser opened automatically")
-                return
+                log.info("✓ Browser opened automatically")
+                break
             except:
                 time.sleep(0.5)  # Wait 500ms before next attempt
+        else:
+            # Server didn't start in time
+            log.warning("⚠️ Could not verify server is ready, opening browser anyway...")
+            webbrowser.open(url)
         
-        # Server didn't start in time
-        print(Fore.YELLOW + f"⚠️ Could not verify server is ready, opening browser anyway...")
-        webbrowser.open(url)
+        # Server is serving - now load the libraries deferred at startup
+        warm_up_deferred_imports()
     
     # Start browser in background thread
     threading.Thread(target=open_browser, daemon=True).start()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Application benchmark for the Diary application
+
+Builds a scratch copy of the app with a synthetic multi-year dataset (see
+synthetic_data.py), then times the hot endpoints through Flask's test client and
+the daily report pieces (PDF, CSV, email HTML) and the backup snapshot.
+Use --json to save results and --baseline to fail when anything has regressed.
+
+Usage:
+    python benchmarks/app_benchmark.py
+    python benchmarks/app_benchmark.py --years 5 --staff 40 --json results.json
+    python benchmarks/app_benchmark.py --baseline results.json --max-regression 0.20
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from synthetic_data import create_workspace, generate_dataset
+
+def get_benchmarks(A, today):
+    """
+    Get the benchmarks to run.
+
+    Returns:
+        List of (name, callable, is_request) - requests also report query count and response size
+    """
+    client = A.app.test_client()
+    year_ago = (today - timedelta(days=365)).isoformat()
+    days_90_ago = (today - timedelta(days=90)).isoformat()
+
+    def get(url):
+        return lambda: client.get(url)
+
+    def post(url, body):
+        return lambda: client.post(url, json=body)
+
+    # A night shift's catch-up: writes go last so they don't change what the reads see
+    batch = {'operations': [
+        {'type': 'occurrence', 'time': f'{i % 24:02d}:00', 'flat_number': str(100 + i), 'reported_by': 'Benchmark',
+         'description': 'Benchmark entry'} if i % 5 else
+        {'type': 'water_temperature', 'temperature': 55.0 + i % 10, 'time': f'{i % 24:02d}:00'}
+        for i in range(50)
+    ]}
+
+    def report_occurrences():
+        start = datetime.combine(today, datetime.min.time())
+        return A.DailyOccurrence.query.filter(A.DailyOccurrence.timestamp >= start).all()
+
+    def backup_snapshot():
+        path = A.create_database_snapshot()
+        os.unlink(path)
+
+    return [
+        ('GET /', get('/'), True),
+        ('GET /api/daily-occurrences', get('/api/daily-occurrences'), True),
+        ('GET /api/daily-occurrences/history (90 days)', get(f'/api/daily-occurrences/history?start_date={days_90_ago}&end_date={today}'), True),
+        ('GET /api/staff-rota (90 days)', get(f'/api/staff-rota?start_date={days_90_ago}&end_date={today}'), True),
+        ('GET /api/porter-rota (365 days)', get('/api/porter-rota'), True),
+        ('GET /api/rota-calendar (180 days)', get('/api/rota-calendar'), True),
+        ('GET /api/cctv-faults', get('/api/cctv-faults'), True),
+        ('GET /api/water-temperature (1 year)', get(f'/api/water-temperature?date_from={year_ago}&date_to={today}'), True),
+        ('GET /api/water-temperature/series (1 year)', get(f'/api/water-temperature/series?date_from={year_ago}&date_to={today}'), True),
+        ('GET /api/water-temperature/compliance (1 year)', get(f'/api/water-temperature/compliance?date_from={year_ago}&date_to={today}'), True),
+        ('GET /api/overtime (1 year)', get(f'/api/overtime?start_date={year_ago}&end_date={today}'), True),
+        ('GET /api/overtime/summary (1 year)', get(f'/api/overtime/summary?period=month&start_date={year_ago}&end_date={today}'), True),
+        ('GET /api/activity-logs', get('/api/activity-logs?days=30'), True),
+        ('GET /api/activity-logs (summary)', get('/api/activity-logs?days=365&summary=user,action,day'), True),
+        ('GET /api/email-logs', get('/api/email-logs'), True),
+        ('GET /api/missed-reports (90 days)', get('/api/missed-reports?days=90'), True),
+        ('GET /api/search (text)', get('/api/search?q=water+leak'), True),
+        ('GET /api/search (flat)', get('/api/search?flat=120&sort=newest'), True),
+        ('GET /api/flats', get('/api/flats'), True),
+        ('GET /api/flats/<id>/history', get('/api/flats/1/history'), True),
+        ('generate_daily_pdf', lambda: A.generate_daily_pdf(report_occurrences(), today), False),
+        ('generate_daily_csv', lambda: A.generate_daily_csv(report_occurrences(), today), False),
+        ('generate_email_html', lambda: A.generate_email_html(report_occurrences(), today), False),
+        ('backup snapshot', backup_snapshot, False),
+        ('POST /api/batch (50 entries)', post('/api/batch', batch), True),
+    ]
+
+def time_benchmark(A, func, is_request, repeat):
+    """Run a benchmark once to warm up, then `repeat` times - returns timing stats in ms"""
+    func()
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - started) * 1000)
+    durations.sort()
+
+    result = {
+        'runs': repeat,
+        'median_ms': round(statistics.median(durations), 2),
+        'min_ms': round(durations[0], 2),
+        'p95_ms': round(A.percentile(durations, 95), 2),
+        'max_ms': round(durations[-1], 2)
+    }
+    if is_request and A.request_metrics:
+        # Request profiling is on, so the last request's SQL count and size were recorded
+        last = A.request_metrics[-1]
+        result['status'] = last['status']
+        result['query_count'] = last['query_count']
+        result['response_bytes'] = last['response_bytes']
+    return result
+
+def run(args):
+    """Build the dataset, run every benchmark and return the results"""
+    workspace, A = create_workspace()
+    if not args.verbose:
+        logging.getLogger('diary').setLevel(logging.WARNING)
+    try:
+        today = datetime.now().date()
+        with A.app.app_context():
+            A.migrate_database()
+            started = time.perf_counter()
+            counts = generate_dataset(A, args.years, args.staff, args.seed, today)
+            print(f"✓ Generated {sum(counts.values()):,} rows in {time.perf_counter() - started:.1f}s")
+
+            A.request_profiling['enabled'] = True
+            results = {}
+            for name, func, is_request in get_benchmarks(A, today):
+                if args.only and args.only not in name:
+                    continue
+                results[name] = time_benchmark(A, func, is_request, args.repeat)
+                print(f"  {name:<40} {results[name]['median_ms']:>9.2f} ms")
+
+        return {
+            'python': sys.version.split()[0],
+            'dataset': {
+                'years': args.years,
+                'staff': args.staff,
+                'seed': args.seed,
+                'rows': counts,
+                'db_size_kb': round(os.path.getsize(os.path.join(workspace, 'instance', 'diary.db')) / 1024, 1)
+            },
+            'benchmarks': results
+        }
+    finally:
+        if args.keep:
+            print(f"Workspace kept at {workspace}")
+        else:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+def print_report(results):
+    """Print a human-readable summary"""
+    dataset = results['dataset']
+    print()
+    print("=" * 78)
+    print(f"Diary benchmark - {dataset['years']} years, {dataset['staff']} staff, "
+          f"{sum(dataset['rows'].values()):,} rows ({dataset['db_size_kb'] / 1024:.1f} MB), Python {results['python']}")
+    print("=" * 78)
+    print(f"{'Benchmark':<40} {'median':>9} {'p95':>9} {'queries':>8} {'bytes':>9}")
+    for name, result in results['benchmarks'].items():
+        print(f"{name:<40} {result['median_ms']:>7.2f}ms {result['p95_ms']:>7.2f}ms "
+              f"{result.get('query_count', ''):>8} {result.get('response_bytes', ''):>9}")
+    print()
+
+def compare_to_baseline(results, baseline_path, max_regression, min_delta_ms):
+    """Compare medians against a saved baseline - returns False if anything regressed more than allowed"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    regressed = []
+    print(f"Compared with {baseline_path}:")
+    for name, result in results['benchmarks'].items():
+        before = baseline.get('benchmarks', {}).get(name)
+        if not before:
+            print(f"  {name:<40} (new)")
+            continue
+        change = (result['median_ms'] - before['median_ms']) / before['median_ms'] if before['median_ms'] else 0
+        # Ignore tiny absolute differences - they're noise for fast benchmarks
+        is_regression = change > max_regression and result['median_ms'] - before['median_ms'] > min_delta_ms
+        print(f"  {name:<40} {before['median_ms']:>9.2f} -> {result['median_ms']:>9.2f} ms ({change:+.1%})"
+              f"{'  ✗' if is_regression else ''}")
+        if is_regression:
+            regressed.append(name)
+
+    if regressed:
+        print(f"✗ {len(regressed)} benchmark(s) regressed by more than {max_regression:.0%}")
+        return False
+    print("✓ All benchmarks within allowed regression")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Diary application endpoints and reports on synthetic data')
+    parser.add_argument('--years', type=int, default=3, help='Years of synthetic history (default: 3)')
+    parser.add_argument('--staff', type=int, default=24, help='Number of porters (default: 24)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the dataset (default: 42)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per benchmark after one warm-up (default: 5)')
+    parser.add_argument('--only', help='Only run benchmarks whose name contains this text')
+    parser.add_argument('--json', help='Write results to this JSON file')
+    parser.add_argument('--baseline', help='Compare with results previously saved with --json')
+    parser.add_argument('--max-regression', type=float, default=0.20,
+                        help='Allowed slowdown vs baseline as a fraction (default: 0.20)')
+    parser.add_argument('--min-delta-ms', type=float, default=2.0,
+                        help='Ignore slowdowns smaller than this many ms (default: 2.0)')
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch copy of the app and its database')
+    parser.add_argument('--verbose', action='store_true', help='Show application log output')
+    args = parser.parse_args()
+
+    results = run(args)
+    print_report(results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Results written to {args.json}")
+
+    if args.baseline and not compare_to_baseline(results, args.baseline, args.max_regression, args.min_delta_ms):
+        return False
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    if not success:
+        sys.exit(1)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Response size and JSON serialization benchmark for the Diary application
+
+Builds a scratch copy of the app with a synthetic dataset (see synthetic_data.py)
+and, for each collection endpoint, reports the payload size as plain JSON, in the
+columnar layout (?format=columns) and gzip/brotli compressed, plus how long the
+payload takes to serialize with the standard json module and with orjson.
+Use --json to save results.
+
+Usage:
+    python benchmarks/response_size.py
+    python benchmarks/response_size.py --years 3 --staff 24 --json sizes.json
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import shutil
+import sys
+import time
+from datetime import datetime, timedelta
+
+from synthetic_data import create_workspace, generate_dataset
+
+def get_endpoints(today):
+    """Get the (name, URL) of the collection endpoints to measure"""
+    year_ago = (today - timedelta(days=365)).isoformat()
+    days_90_ago = (today - timedelta(days=90)).isoformat()
+    return [
+        ('porter-rota (365 days)', '/api/porter-rota'),
+        ('rota-calendar (180 days)', '/api/rota-calendar'),
+        ('staff-rota (90 days)', f'/api/staff-rota?start_date={days_90_ago}&end_date={today}'),
+        ('daily-occurrences', '/api/daily-occurrences'),
+        ('cctv-faults', '/api/cctv-faults'),
+        ('water-temperature (1 year)', f'/api/water-temperature?date_from={year_ago}&date_to={today}'),
+        ('overtime (1 year)', f'/api/overtime?start_date={year_ago}&end_date={today}'),
+        ('overtime/summary (1 year)', f'/api/overtime/summary?start_date={year_ago}&end_date={today}'),
+        ('activity-logs (30 days)', '/api/activity-logs?days=30'),
+        ('email-logs', '/api/email-logs'),
+    ]
+
+def time_call(func, repeat):
+    """Best of `repeat` runs of func, in ms"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 3)
+
+def measure(A, client, url, repeat):
+    """Measure one endpoint's payload sizes and serialization times"""
+    plain = client.get(url).get_data()
+    separator = '&' if '?' in url else '?'
+    columns = client.get(f'{url}{separator}format=columns').get_data()
+    payload = json.loads(plain)
+
+    result = {
+        'json_bytes': len(plain),
+        'columns_bytes': len(columns),
+        'gzip_bytes': len(gzip.compress(plain, compresslevel=A.GZIP_LEVEL)),
+        'columns_gzip_bytes': len(gzip.compress(columns, compresslevel=A.GZIP_LEVEL)),
+        'json_ms': time_call(lambda: json.dumps(payload, separators=(',', ':'), sort_keys=True), repeat)
+    }
+    brotli = A.get_brotli()
+    if brotli:
+        result['brotli_bytes'] = len(brotli.compress(plain, quality=A.BROTLI_QUALITY))
+    orjson = A.get_orjson()
+    if orjson:
+        result['orjson_ms'] = time_call(lambda: orjson.dumps(payload, option=orjson.OPT_SORT_KEYS), repeat)
+    return result
+
+def run(args):
+    """Build the dataset and measure every endpoint"""
+    workspace, A = create_workspace()
+    logging.getLogger('diary').setLevel(logging.WARNING)
+    try:
+        today = datetime.now().date()
+        with A.app.app_context():
+            A.migrate_database()
+            counts = generate_dataset(A, args.years, args.staff, args.seed, today)
+            client = A.app.test_client()
+            results = {name: measure(A, client, url, args.repeat) for name, url in get_endpoints(today)}
+        return {
+            'python': sys.version.split()[0],
+            'dataset': {'years': args.years, 'staff': args.staff, 'seed': args.seed, 'rows': sum(counts.values())},
+            'brotli': A.get_brotli() is not None,
+            'orjson': A.get_orjson() is not None,
+            'endpoints': results
+        }
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+def print_report(results):
+    """Print a human-readable summary"""
+    dataset = results['dataset']
+    print("=" * 100)
+    print(f"Response sizes - {dataset['years']} years, {dataset['staff']} staff, {dataset['rows']:,} rows, Python {results['python']}")
+    print("=" * 100)
+    print(f"{'Endpoint':<28} {'json':>10} {'columns':>10} {'gzip':>9} {'cols+gz':>9} {'brotli':>9} {'json ms':>9} {'orjson ms':>10}")
+    for name, result in results['endpoints'].items():
+        print(f"{name:<28} {result['json_bytes']:>10,} {result['columns_bytes']:>10,} {result['gzip_bytes']:>9,} "
+              f"{result['columns_gzip_bytes']:>9,} {result.get('brotli_bytes', '-'):>9} "
+              f"{result['json_ms']:>9.3f} {result.get('orjson_ms', '-'):>10}")
+    if not results['brotli']:
+        print("(brotli not installed - pip install Brotli)")
+    if not results['orjson']:
+        print("(orjson not installed - pip install orjson)")
+    print()
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure Diary API payload sizes and JSON serialization time')
+    parser.add_argument('--years', type=int, default=3, help='Years of synthetic history (default: 3)')
+    parser.add_argument('--staff', type=int, default=24, help='Number of porters (default: 24)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the dataset (default: 42)')
+    parser.add_argument('--repeat', type=int, default=5, help='Serialization runs per endpoint, best is kept (default: 5)')
+    parser.add_argument('--json', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    results = run(args)
+    print_report(results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Results written to {args.json}")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    if not success:
+        sys.exit(1)
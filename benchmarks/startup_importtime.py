@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Startup import-time benchmark for the Diary application
+
+Runs `python -X importtime -c "import app"` in a fresh interpreter several times,
+parses the import timings and reports the total and the slowest modules app.py imports.
+The app is imported from a scratch copy, so the instance/ and logs/ files created on
+import never land in the checkout being measured.
+Use --json to save results and --baseline to fail when startup has regressed.
+
+Usage:
+    python benchmarks/startup_importtime.py
+    python benchmarks/startup_importtime.py --runs 5 --json startup.json
+    python benchmarks/startup_importtime.py --baseline startup.json --max-regression 0.20
+"""
+
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+
+from synthetic_data import copy_application
+
+def run_importtime(workspace):
+    """
+    Import app.py once in a fresh interpreter, from a copy made by copy_application().
+    
+    Returns:
+        Tuple of (app cumulative import time in us, {module: cumulative us} for modules imported directly by app)
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=workspace,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing app failed:\n{result.stderr[-2000:]}")
+
+    # Lines look like: "import time:      1234 |      56789 |   reportlab.platypus"
+    # The module name is indented two spaces per nesting level, and a module is
+    # printed after everything it imports - so app's direct imports come just before it
+    direct_imports = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        module = name.strip()
+        if depth == 0:
+            if module == 'app':
+                return int(cumulative_us), direct_imports
+            direct_imports = {}
+        elif depth == 1:
+            direct_imports[module] = int(cumulative_us)
+    raise RuntimeError("No import timing found for app")
+
+def benchmark(runs):
+    """Run the import benchmark several times and return median timings"""
+    workspace = copy_application()
+    try:
+        all_runs = [run_importtime(workspace) for _ in range(runs)]
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+    modules = set().union(*(imports for _, imports in all_runs))
+    median_us = {
+        module: statistics.median(imports.get(module, 0) for _, imports in all_runs)
+        for module in modules
+    }
+    return {
+        'runs': runs,
+        'python': sys.version.split()[0],
+        'app_ms': round(statistics.median(app_us for app_us, _ in all_runs) / 1000, 1),
+        'modules_ms': {module: round(us / 1000, 1) for module, us in sorted(median_us.items(), key=lambda item: -item[1])}
+    }
+
+def print_report(results, top):
+    """Print a human-readable summary"""
+    print("=" * 60)
+    print("Startup import time (median of {} run(s), Python {})".format(results['runs'], results['python']))
+    print("=" * 60)
+    print(f"import app: {results['app_ms']:.1f} ms")
+    print()
+    print("Slowest modules imported by app.py:")
+    for module, ms in list(results['modules_ms'].items())[:top]:
+        print(f"  {ms:8.1f} ms  {module}")
+    print()
+
+def compare_to_baseline(results, baseline_path, max_regression):
+    """Compare against a saved baseline - returns False if startup regressed more than allowed"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    change = (results['app_ms'] - baseline['app_ms']) / baseline['app_ms'] if baseline['app_ms'] else 0
+    print(f"Baseline import app: {baseline['app_ms']:.1f} ms -> {results['app_ms']:.1f} ms ({change:+.1%})")
+
+    if change > max_regression:
+        print(f"✗ Startup regressed by more than {max_regression:.0%}")
+        return False
+    print("✓ Startup time within allowed regression")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Diary application import/startup time')
+    parser.add_argument('--runs', type=int, default=3, help='Number of fresh interpreter runs (default: 3)')
+    parser.add_argument('--top', type=int, default=15, help='Number of slowest imports to show (default: 15)')
+    parser.add_argument('--json', help='Write results to this JSON file')
+    parser.add_argument('--baseline', help='Compare with results previously saved with --json')
+    parser.add_argument('--max-regression', type=float, default=0.20,
+                        help='Allowed slowdown vs baseline as a fraction (default: 0.20)')
+    args = parser.parse_args()
+
+    results = benchmark(args.runs)
+    print_report(results, args.top)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Results written to {args.json}")
+
+    if args.baseline and not compare_to_baseline(results, args.baseline, args.max_regression):
+        return False
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    if not success:
+        sys.exit(1)
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Synthetic dataset generator for the Diary application
+
+Creates a scratch copy of the application (so the real instance/diary.db is never
+touched) and fills its database with several years of realistic data: daily
+occurrences, water temperature readings, staff leave, overtime, activity logs,
+email logs and CCTV/intercom faults for a configurable headcount.
+
+Used by app_benchmark.py, and can be run directly to get a populated copy of the
+app to try out (python app.py in the output directory).
+
+Usage:
+    python benchmarks/synthetic_data.py --output /tmp/diary_synthetic
+    python benchmarks/synthetic_data.py --output /tmp/diary_synthetic --years 5 --staff 40 --seed 7
+"""
+
+import argparse
+import importlib
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta, time as dt_time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Staff colours per shift (see StaffMember.color)
+DAY_SHIFT_COLORS = ['red', 'yellow', 'green', 'blue']
+NIGHT_SHIFT_COLORS = ['purple', 'darkred', 'darkgreen', 'brownishyellow']
+
+LEADER_NAMES = ['Ricardo', 'Arpad', 'Carlos', 'Brian', 'Kojo', 'Peter', 'Konrad']
+ACTIONS = [('add', 'occurrence'), ('delete', 'occurrence'), ('add', 'staff_rota'), ('delete', 'staff_rota'),
+           ('modify', 'settings'), ('add', 'overtime'), ('modify', 'staff_member'), ('modify', 'pin')]
+OCCURRENCE_TEXTS = [
+    'Resident reported noise from the flat above',
+    'Lift out of service, engineer called',
+    'Parcel delivered and stored in the concierge office',
+    'Water leak reported in the bathroom ceiling',
+    'Fire alarm test completed, no faults',
+    'Visitor parking permit issued',
+    'Communal door left open, secured on patrol',
+    'Refuse store cleaned and bins rotated',
+]
+
+# Rows are inserted in chunks to keep memory use flat for large datasets
+INSERT_CHUNK_SIZE = 5000
+
+def copy_application(output_dir=None):
+    """
+    Copy the application into a scratch directory (app.py creates instance/ and logs/ next to itself).
+
+    Args:
+        output_dir: Directory to use (default: a new temporary directory)
+
+    Returns:
+        Workspace directory
+    """
+    workspace = output_dir or tempfile.mkdtemp(prefix='diary_bench_')
+    os.makedirs(workspace, exist_ok=True)
+    for file_name in ['app.py', 'config.example.py']:
+        shutil.copy2(os.path.join(APP_DIR, file_name), workspace)
+    for dir_name in ['templates', 'static']:
+        source = os.path.join(APP_DIR, dir_name)
+        if os.path.isdir(source):
+            shutil.copytree(source, os.path.join(workspace, dir_name), dirs_exist_ok=True)
+    return workspace
+
+def create_workspace(output_dir=None):
+    """
+    Copy the application into a scratch directory and import it from there.
+
+    Args:
+        output_dir: Directory to use (default: a new temporary directory)
+
+    Returns:
+        Tuple of (workspace directory, imported app module)
+    """
+    workspace = copy_application(output_dir)
+    sys.path.insert(0, workspace)
+    app_module = importlib.import_module('app')
+    return workspace, app_module
+
+def insert_rows(app_module, model, rows):
+    """Bulk insert row dicts for a model in chunks"""
+    db = app_module.db
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        db.session.execute(db.insert(model), rows[start:start + INSERT_CHUNK_SIZE])
+    db.session.commit()
+    return len(rows)
+
+def generate_dataset(app_module, years=3, staff=24, seed=42, end_date=None):
+    """
+    Fill the app's (empty) database with synthetic data.
+
+    Must be called inside an app context.
+
+    Args:
+        app_module: The imported app module
+        years: Number of years of history to generate
+        staff: Number of porters (spread across Shift 1, Shift 2 and Night Shift)
+        seed: Random seed, so the same arguments always produce the same data
+        end_date: Last day of data (default: today - today's occurrences stay unsent)
+
+    Returns:
+        Dict of table name -> rows inserted
+    """
+    A = app_module
+    rng = random.Random(seed)
+    end_date = end_date or datetime.now().date()
+    start_date = end_date - timedelta(days=365 * years)
+    days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+    counts = {}
+
+    # Staff members and shift leaders
+    staff_rows = []
+    for number in range(staff):
+        shift = number % 3 + 1
+        colors = NIGHT_SHIFT_COLORS if shift == 3 else DAY_SHIFT_COLORS
+        staff_rows.append({'name': f'Porter {number + 1:03d}', 'color': colors[(number // 3) % 4],
+                           'shift': shift, 'active': True})
+    counts['staff_member'] = insert_rows(A, A.StaffMember, staff_rows)
+    staff_names = [row['name'] for row in staff_rows]
+
+    pin_hash = A.hash_pin('1234')
+    counts['shift_leader'] = insert_rows(A, A.ShiftLeader, [
+        {'name': name, 'pin': pin_hash, 'active': True, 'is_super_user': name in ('Arpad', 'Carlos'),
+         'created_date': datetime.combine(start_date, dt_time(9))}
+        for name in LEADER_NAMES
+    ])
+
+    if not A.ScheduleSettings.query.first():
+        A.db.session.add(A.ScheduleSettings(email_enabled=False))
+        A.db.session.commit()
+
+    occurrences, temperatures, emails, activity = [], [], [], []
+    for day in days:
+        is_today = day == end_date
+
+        # 3-12 occurrences a day, reported when the daily email went out
+        for _ in range(rng.randint(3, 12)):
+            at = datetime.combine(day, dt_time(rng.randint(0, 23), rng.randint(0, 59)))
+            occurrences.append({
+                'timestamp': at,
+                'time': at.strftime('%H:%M'),
+                'flat_number': str(rng.randint(1, 240)),
+                'reported_by': rng.choice(staff_names),
+                'description': rng.choice(OCCURRENCE_TEXTS),
+                'sent': not is_today
+            })
+
+        # Three water temperature checks a day
+        for hour in (8, 14, 20):
+            at = datetime.combine(day, dt_time(hour, rng.randint(0, 15)))
+            temperatures.append({'timestamp': at, 'time_recorded': at.strftime('%H:%M'),
+                                 'temperature': round(rng.uniform(48, 62), 1)})
+
+        if not is_today:
+            emails.append({'sent_date': datetime.combine(day, dt_time(18, 0, rng.randint(0, 59))),
+                           'recipient': 'manager@example.com', 'subject': f'Daily Report - {day}',
+                           'pdf_path': f"reports/PDF/daily_report_{day.strftime('%Y%m%d')}.pdf"})
+
+        # 20-40 user actions a day
+        for _ in range(rng.randint(20, 40)):
+            action_type, entity_type = rng.choice(ACTIONS)
+            activity.append({
+                'timestamp': datetime.combine(day, dt_time(rng.randint(6, 23), rng.randint(0, 59), rng.randint(0, 59))),
+                'user_name': rng.choice(LEADER_NAMES),
+                'action_type': action_type,
+                'entity_type': entity_type,
+                'entity_id': str(rng.randint(1, 50000)),
+                'description': f'{action_type.title()} {entity_type.replace("_", " ")}',
+                'ip_address': f'192.168.1.{rng.randint(2, 60)}'
+            })
+
+    counts['daily_occurrence'] = insert_rows(A, A.DailyOccurrence, occurrences)
+    counts['water_temperature'] = insert_rows(A, A.WaterTemperature, temperatures)
+    counts['water_temperature_rollup'] = A.rebuild_water_temperature_rollups()
+    counts['email_log'] = insert_rows(A, A.EmailLog, emails)
+    counts['activity_log'] = insert_rows(A, A.ActivityLog, activity)
+
+    # Leave: ~25 holiday days (in 1-2 week blocks) and ~5 sick days per porter per year
+    leave, overtime = [], []
+    for name in staff_names:
+        for year in range(years):
+            for _ in range(rng.randint(2, 3)):
+                first = start_date + timedelta(days=365 * year + rng.randint(0, 350))
+                for offset in range(rng.randint(5, 12)):
+                    leave.append({'date': first + timedelta(days=offset), 'staff_name': name,
+                                  'status': 'holiday', 'notes': 'Annual leave'})
+            for _ in range(rng.randint(2, 8)):
+                leave.append({'date': start_date + timedelta(days=365 * year + rng.randint(0, 364)),
+                              'staff_name': name, 'status': 'sick', 'notes': None})
+            # ~2 overtime entries a month
+            for _ in range(rng.randint(18, 30)):
+                when = start_date + timedelta(days=365 * year + rng.randint(0, 364))
+                overtime.append({'staff_name': name, 'date': when, 'hours': rng.choice([2, 4, 6, 7, 8, 12]),
+                                 'description': 'Cover', 'created_by': rng.choice(['Arpad', 'Carlos']),
+                                 'created_date': datetime.combine(when, dt_time(12)),
+                                 'updated_date': datetime.combine(when, dt_time(12))})
+    counts['staff_rota'] = insert_rows(A, A.StaffRota, leave)
+    counts['overtime'] = insert_rows(A, A.Overtime, overtime)
+
+    # A CCTV or intercom fault every few days, most of them closed
+    faults = []
+    for day in days[::3]:
+        status = rng.choices(['closed', 'in_progress', 'open'], weights=[85, 10, 5])[0]
+        flat = str(rng.randint(1, 240))
+        faults.append({
+            'timestamp': datetime.combine(day, dt_time(rng.randint(7, 21), rng.randint(0, 59))),
+            'fault_type': rng.choice(['CCTV', 'Intercom']),
+            'flat_number': flat,
+            'block_number': str(rng.randint(1, 4)),
+            'floor_number': str(rng.randint(0, 12)),
+            'location': f'Flat {flat}',
+            'description': 'Camera offline' if rng.random() < 0.5 else 'Intercom not ringing',
+            'contact_details': '',
+            'additional_notes': '',
+            'status': status,
+            'resolved_date': datetime.combine(day + timedelta(days=rng.randint(1, 14)), dt_time(12)) if status == 'closed' else None
+        })
+    counts['cctv_fault'] = insert_rows(A, A.CCTVFault, faults)
+    counts['flat'] = A.rebuild_flats()
+
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description='Create a copy of the Diary application filled with synthetic data')
+    parser.add_argument('--output', required=True, help='Directory to create the populated copy in')
+    parser.add_argument('--years', type=int, default=3, help='Years of history to generate (default: 3)')
+    parser.add_argument('--staff', type=int, default=24, help='Number of porters (default: 24)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    args = parser.parse_args()
+
+    if os.path.exists(os.path.join(args.output, 'instance', 'diary.db')):
+        print(f"✗ {args.output} already has a database - choose an empty directory")
+        return False
+
+    workspace, A = create_workspace(args.output)
+    logging.getLogger('diary').setLevel(logging.WARNING)
+    with A.app.app_context():
+        A.migrate_database()
+        counts = generate_dataset(A, args.years, args.staff, args.seed)
+
+    for table, count in counts.items():
+        print(f"  {table:<20} {count:>10,}")
+    print(f"✓ Synthetic data written to {os.path.join(workspace, 'instance', 'diary.db')}")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    if not success:
+        sys.exit(1)
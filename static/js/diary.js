@@ -0,0 +1,3244 @@
+// Global variables
+let currentTab = 'daily';
+let allFaults = [];
+let currentFaultFilter = 'all';
+let currentSearchText = '';
+let settingsUnlockedStaff = null; // Track who unlocked settings
+let currentAuthenticatedUser = null; // Track authenticated user for all tabs (for activity logging)
+
+// Dark Mode Functions
+function toggleDarkMode() {
+    const isDarkMode = document.getElementById('darkModeToggle').checked;
+    if (isDarkMode) {
+        document.body.classList.add('dark-mode');
+        localStorage.setItem('darkMode', 'enabled');
+    } else {
+        document.body.classList.remove('dark-mode');
+        localStorage.setItem('darkMode', 'disabled');
+    }
+}
+
+function loadDarkModePreference() {
+    const darkMode = localStorage.getItem('darkMode');
+    if (darkMode === 'enabled') {
+        document.body.classList.add('dark-mode');
+        document.getElementById('darkModeToggle').checked = true;
+    }
+}
+
+// Load dark mode preference on page load
+document.addEventListener('DOMContentLoaded', function() {
+    loadDarkModePreference();
+});
+
+// Settings PIN Authentication
+function verifySettingsPin(event) {
+    event.preventDefault();
+
+    const pin = document.getElementById('settings_pin_code').value;
+
+    fetch('/api/verify-settings-pin', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ pin })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            // Success - unlock settings
+            settingsUnlockedStaff = data.name;
+            currentAuthenticatedUser = data.name; // Set global authenticated user
+            document.getElementById('settingsPinOverlay').style.display = 'none';
+            document.getElementById('settingsContent').style.display = 'block';
+            document.getElementById('settingsUnlockedBy').textContent = data.name;
+
+            // Clear form
+            document.getElementById('settings_pin_code').value = '';
+
+            showAlert(`Settings unlocked by ${data.name}`, 'success');
+        } else {
+            // Failed - show error
+            const errorDiv = document.getElementById('settingsPinError');
+            errorDiv.textContent = '❌ ' + (data.error || 'Invalid PIN');
+            errorDiv.style.display = 'block';
+
+            // Clear PIN field and refocus
+            document.getElementById('settings_pin_code').value = '';
+            document.getElementById('settings_pin_code').focus();
+
+            // Hide error after 4 seconds
+            setTimeout(() => {
+                errorDiv.style.display = 'none';
+            }, 4000);
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        showAlert('Error verifying PIN', 'danger');
+    });
+}
+
+function lockSettings() {
+    // Lock settings
+    document.getElementById('settingsPinOverlay').style.display = 'block';
+    document.getElementById('settingsContent').style.display = 'none';
+    settingsUnlockedStaff = null;
+    currentAuthenticatedUser = null; // Clear global authenticated user
+
+    // Clear PIN form
+    document.getElementById('settings_pin_code').value = '';
+
+    showAlert('Settings locked', 'info');
+}
+
+function toggleEmailSettings() {
+    const content = document.getElementById('emailSettingsContent');
+    const icon = document.getElementById('emailSettingsToggleIcon');
+
+    if (content.classList.contains('collapsed')) {
+        content.classList.remove('collapsed');
+        icon.style.transform = 'rotate(0deg)';
+        icon.textContent = '▼';
+    } else {
+        content.classList.add('collapsed');
+        icon.style.transform = 'rotate(-90deg)';
+        icon.textContent = '▶';
+    }
+}
+
+function loadSettingsAccessLogs() {
+    // Load and display settings access logs
+    const container = document.getElementById('settingsAccessLogs');
+    container.innerHTML = '<p style="text-align: center; padding: 20px;">Loading logs...</p>';
+
+    fetch('/api/settings-access-logs')
+        .then(response => response.json())
+        .then(data => {
+            if (data.logs && data.logs.length > 0) {
+                let html = `<div style="margin-bottom: 10px; color: #666;">
+                    <strong>Recent Access Attempts</strong> (showing ${data.logs.length} of ${data.total_count} total)
+                </div>`;
+
+                data.logs.forEach(log => {
+                    // Color code based on success/failure
+                    let color = '#28a745'; // green for success
+                    let bgColor = '#d4edda';
+                    let icon = '✅';
+
+                    if (log.includes('FAILED') || log.includes('Wrong PIN') || log.includes('Invalid User')) {
+                        color = '#dc3545'; // red for failed
+                        bgColor = '#f8d7da';
+                        icon = '❌';
+                    }
+
+                    html += `<div style="padding: 8px; margin-bottom: 5px; background: ${bgColor}; border-left: 3px solid ${color}; border-radius: 3px; color: #333;">
+                        ${icon} ${log}
+                    </div>`;
+                });
+
+                container.innerHTML = html;
+            } else {
+                container.innerHTML = '<p style="text-align: center; color: #666; padding: 20px;">No access logs yet. Logs are saved to: <strong>logs/settings_access.log</strong></p>';
+            }
+        })
+        .catch(error => {
+            console.error('Error loading logs:', error);
+            container.innerHTML = '<p style="color: #dc3545; padding: 20px;">Error loading logs. Check console for details.</p>';
+        });
+}
+
+function loadActivityLogs() {
+    const days = document.getElementById('activityLogDays').value;
+    const action = document.getElementById('activityLogAction').value;
+    const container = document.getElementById('activityLogsContainer');
+
+    container.innerHTML = '<p style="text-align: center; padding: 20px;">Loading activity logs...</p>';
+
+    let url = `/api/activity-logs?days=${days}`;
+    if (action) url += `&action=${action}`;
+
+    fetch(url)
+        .then(response => response.json())
+        .then(data => {
+            if (data.success && data.logs && data.logs.length > 0) {
+                // Display logs in a table
+                let html = `
+                <div style="margin-bottom: 10px; color: #666;">
+                    <strong>Activity Records</strong> (showing ${data.logs.length} of ${data.total} entries)
+                </div>
+                <table class="table" style="font-size: 0.9em;">
+                    <thead>
+                        <tr>
+                            <th style="width: 140px;">Timestamp</th>
+                            <th style="width: 100px;">User</th>
+                            <th style="width: 90px;">Action</th>
+                            <th style="width: 100px;">Type</th>
+                            <th>Description</th>
+                        </tr>
+                    </thead>
+                    <tbody>`;
+
+                data.logs.forEach(log => {
+                    const date = new Date(log.timestamp);
+                    const formattedDate = date.toLocaleString('en-GB', {
+                        day: '2-digit',
+                        month: '2-digit',
+                        year: 'numeric',
+                        hour: '2-digit',
+                        minute: '2-digit'
+                    });
+
+                    // Color code based on action type
+                    let badgeColor = '#6c757d';
+                    let badgeIcon = '•';
+                    if (log.action_type === 'delete') {
+                        badgeColor = '#dc3545';
+                        badgeIcon = '🗑️';
+                    } else if (log.action_type === 'modify') {
+                        badgeColor = '#ffc107';
+                        badgeIcon = '✏️';
+                    } else if (log.action_type === 'add') {
+                        badgeColor = '#28a745';
+                        badgeIcon = '➕';
+                    }
+
+                    html += `
+                    <tr>
+                        <td style="font-size: 0.85em; color: #666;">${formattedDate}</td>
+                        <td><strong>${log.user_name}</strong></td>
+                        <td>
+                            <span style="background: ${badgeColor}; color: white; padding: 3px 8px; border-radius: 4px; font-size: 0.8em; white-space: nowrap;">
+                                ${badgeIcon} ${log.action_type.toUpperCase()}
+                            </span>
+                        </td>
+                        <td style="color: #666;">${log.entity_type.replace('_', ' ')}</td>
+                        <td>${log.description}</td>
+                    </tr>`;
+                });
+
+                html += `
+                    </tbody>
+                </table>`;
+
+                container.innerHTML = html;
+            } else {
+                container.innerHTML = '<p style="text-align: center; color: #666; padding: 20px;">No activity logs found for the selected period.</p>';
+            }
+        })
+        .catch(error => {
+            console.error('Error loading activity logs:', error);
+            container.innerHTML = '<p style="color: #dc3545; padding: 20px;">Error loading activity logs.</p>';
+        });
+}
+
+function exportActivityLogs() {
+    const days = document.getElementById('activityLogDays').value;
+    const action = document.getElementById('activityLogAction').value;
+
+    let url = `/api/activity-logs?days=${days}&limit=1000`;
+    if (action) url += `&action=${action}`;
+
+    fetch(url)
+        .then(response => response.json())
+        .then(data => {
+            if (data.success && data.logs && data.logs.length > 0) {
+                // Create CSV content
+                let csv = 'Timestamp,User,Action,Type,Description,IP Address\n';
+
+                data.logs.forEach(log => {
+                    const timestamp = new Date(log.timestamp).toLocaleString('en-GB');
+                    const description = log.description.replace(/"/g, '""'); // Escape quotes
+                    csv += `"${timestamp}","${log.user_name}","${log.action_type}","${log.entity_type}","${description}","${log.ip_address || ''}"\n`;
+                });
+
+                // Download CSV
+                const blob = new Blob([csv], { type: 'text/csv' });
+                const url = window.URL.createObjectURL(blob);
+                const a = document.createElement('a');
+                a.href = url;
+                a.download = `activity_logs_${days}days_${new Date().toISOString().split('T')[0]}.csv`;
+                document.body.appendChild(a);
+                a.click();
+                document.body.removeChild(a);
+                window.URL.revokeObjectURL(url);
+
+                showAlert(`Exported ${data.logs.length} activity log entries to CSV`, 'success');
+            } else {
+                showAlert('No activity logs to export', 'warning');
+            }
+        })
+        .catch(error => {
+            console.error('Error exporting activity logs:', error);
+            showAlert('Error exporting activity logs', 'danger');
+        });
+}
+
+// Set today's date header
+function setTodayDateHeader() {
+    const today = new Date();
+    const options = { weekday: 'long', day: 'numeric', month: 'long', year: 'numeric' };
+    const dateString = today.toLocaleDateString('en-GB', options);
+    // Format: "Saturday, 23 October 2025" - remove the comma after weekday
+    const formattedDate = dateString.replace(',', '');
+    document.getElementById('todayDateHeader').textContent = formattedDate;
+}
+
+// Initialize the application
+document.addEventListener('DOMContentLoaded', function() {
+    setTodayDateHeader();
+    loadDailyOccurrences();
+    loadTodaySchedule();
+    loadStaffMembers();
+    loadPorterRota();
+    loadCCTVFaults();
+    loadWaterTemperature();
+    loadScheduleSettings();
+    loadEmailHistory();
+    loadLeaveData();
+    loadSettingsAccessLogs();
+    loadActivityLogs();
+
+    // Set up form handlers
+    document.getElementById('holidayForm').addEventListener('submit', handleHolidaySubmit);
+    document.getElementById('sickForm').addEventListener('submit', handleSickSubmit);
+
+    // Set up fault search handler
+    const faultSearchInput = document.getElementById('faultSearch');
+    if (faultSearchInput) {
+        faultSearchInput.addEventListener('input', function(e) {
+            currentSearchText = e.target.value;
+            displayFaults(currentFaultFilter);
+        });
+    }
+
+    // Reload occurrences on window resize to switch between mobile/desktop layout
+    let resizeTimer;
+    let lastWidth = window.innerWidth;
+    window.addEventListener('resize', function() {
+        clearTimeout(resizeTimer);
+        resizeTimer = setTimeout(function() {
+            const currentWidth = window.innerWidth;
+            // Only reload if crossing the 768px breakpoint
+            if ((lastWidth <= 768 && currentWidth > 768) || (lastWidth > 768 && currentWidth <= 768)) {
+                loadDailyOccurrences();
+                lastWidth = currentWidth;
+            }
+        }, 250);
+    });
+});
+
+// Staff Management Functions
+function loadStaffMembers() {
+    fetch('/api/staff-members')
+    .then(response => response.json())
+    .then(data => {
+        displayStaffLegend(data);
+        populateStaffDropdowns(data);
+    })
+    .catch(error => {
+        console.error('Error loading staff:', error);
+        document.getElementById('shift1Legend').innerHTML = '<p style="color: red;">Error loading staff</p>';
+        document.getElementById('shift2Legend').innerHTML = '<p style="color: red;">Error loading staff</p>';
+        document.getElementById('shift3Legend').innerHTML = '<p style="color: red;">Error loading staff</p>';
+    });
+}
+
+function populateStaffDropdowns(staffList) {
+    const holidaySelect = document.getElementById('holiday_staff');
+    const sickSelect = document.getElementById('sick_staff');
+    const printStaffSelect = document.getElementById('printStaffSelect');
+
+    if (!holidaySelect || !sickSelect) return;
+
+    const options = '<option value="">Select Staff Member</option>' + 
+        staffList.map(s => {
+            const shiftName = s.shift === 3 ? 'Night Shift' : `Shift ${s.shift}`;
+            return `<option value="${s.name}">${s.name} (${shiftName})</option>`;
+        }).join('');
+
+    holidaySelect.innerHTML = options;
+    sickSelect.innerHTML = options;
+
+    // Populate print staff dropdown with staff ID as value
+    if (printStaffSelect) {
+        const printOptions = '<option value="">Select staff member...</option>' + 
+            staffList.map(s => {
+                const shiftName = s.shift === 3 ? 'Night Shift' : `Shift ${s.shift}`;
+                return `<option value="${s.id}" data-shift="${s.shift}">${s.name} (${shiftName})</option>`;
+            }).join('');
+        printStaffSelect.innerHTML = printOptions;
+    }
+}
+
+function displayStaffLegend(staffList) {
+    const shift1Container = document.getElementById('shift1Legend');
+    const shift2Container = document.getElementById('shift2Legend');
+    const shift3Container = document.getElementById('shift3Legend');
+
+    const shift1Staff = staffList.filter(s => s.shift === 1);
+    const shift2Staff = staffList.filter(s => s.shift === 2);
+    const shift3Staff = staffList.filter(s => s.shift === 3);
+
+    shift1Container.innerHTML = '';
+    shift2Container.innerHTML = '';
+    shift3Container.innerHTML = '';
+
+    if (shift1Staff.length === 0) {
+        shift1Container.innerHTML = '<p style="color: #666; font-size: 0.9em;">No staff assigned</p>';
+    } else {
+        shift1Staff.forEach(staff => {
+            shift1Container.appendChild(createStaffLegendItem(staff));
+        });
+    }
+
+    if (shift2Staff.length === 0) {
+        shift2Container.innerHTML = '<p style="color: #666; font-size: 0.9em;">No staff assigned</p>';
+    } else {
+        shift2Staff.forEach(staff => {
+            shift2Container.appendChild(createStaffLegendItem(staff));
+        });
+    }
+
+    if (shift3Staff.length === 0) {
+        shift3Container.innerHTML = '<p style="color: #666; font-size: 0.9em;">No staff assigned</p>';
+    } else {
+        shift3Staff.forEach(staff => {
+            shift3Container.appendChild(createStaffLegendItem(staff));
+        });
+    }
+}
+
+function createStaffLegendItem(staff) {
+    const div = document.createElement('div');
+    div.className = 'legend-item';
+    div.id = `staff-${staff.id}`;
+    div.setAttribute('data-shift', staff.shift);
+    div.setAttribute('data-color', staff.color);
+
+    div.innerHTML = `
+        <div class="legend-item-content">
+            <div class="legend-color legend-color-${staff.color}"></div>
+            <span>${staff.name}</span>
+        </div>
+        <div class="legend-item-actions">
+            <button class="btn btn-sm btn-warning" onclick="editStaff(${staff.id})" style="padding: 2px 8px; font-size: 0.8em;">Edit</button>
+            <button class="btn btn-sm btn-danger" onclick="deleteStaff(${staff.id})" style="padding: 2px 8px; font-size: 0.8em;">Remove</button>
+        </div>
+    `;
+
+    return div;
+}
+
+function showAddStaffForm(shift) {
+    // Require PIN authentication first
+    requirePinAuth(() => {
+        const container = shift === 1 ? document.getElementById('shift1Legend') : 
+                         shift === 2 ? document.getElementById('shift2Legend') : 
+                         document.getElementById('shift3Legend');
+
+        // Check if form already exists
+        if (container.querySelector('.staff-edit-form')) {
+            return;
+        }
+
+        const formDiv = document.createElement('div');
+        formDiv.className = 'staff-edit-form';
+
+        // Different color options for Night Shift
+        let colorOptions = '';
+        if (shift === 3) {
+            colorOptions = `
+                <option value="">Select Color</option>
+                <option value="purple">Purple</option>
+                <option value="darkred">Dark Red</option>
+                <option value="darkgreen">Dark Green</option>
+                <option value="brownishyellow">Brownish Yellow</option>
+            `;
+        } else {
+            colorOptions = `
+                <option value="">Select Color</option>
+                <option value="red">Red</option>
+                <option value="yellow">Yellow</option>
+                <option value="green">Green</option>
+                <option value="blue">Blue</option>
+            `;
+        }
+
+        formDiv.innerHTML = `
+            <h5 style="margin: 0 0 5px 0;">Add New Staff</h5>
+            <input type="text" id="new-staff-name-${shift}" placeholder="Staff Name" required>
+            <select id="new-staff-color-${shift}" required>
+                ${colorOptions}
+            </select>
+            <div class="staff-edit-form-buttons">
+                <button class="btn btn-sm btn-success" onclick="saveNewStaff(${shift})">Save</button>
+                <button class="btn btn-sm btn-secondary" onclick="cancelAddStaff(${shift})">Cancel</button>
+            </div>
+        `;
+
+        container.insertBefore(formDiv, container.firstChild);
+    });
+}
+
+function saveNewStaff(shift) {
+    const name = document.getElementById(`new-staff-name-${shift}`).value.trim();
+    const color = document.getElementById(`new-staff-color-${shift}`).value;
+
+    if (!name || !color) {
+        showAlert('Please fill in all fields!', 'danger');
+        return;
+    }
+
+    const data = {
+        name: name,
+        color: color,
+        shift: shift,
+        active: true,
+        user_name: currentAuthenticatedUser || 'Unknown'
+    };
+
+    fetch('/api/staff-members', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(data)
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            showAlert('Staff member added successfully!', 'success');
+            loadStaffMembers();
+            loadPorterRota(); // Reload rota to reflect changes
+            loadTodaySchedule(); // Reload schedule
+        }
+    })
+    .catch(error => {
+        showAlert('Error adding staff: ' + error, 'danger');
+    });
+}
+
+function cancelAddStaff(shift) {
+    const container = shift === 1 ? document.getElementById('shift1Legend') : 
+                     shift === 2 ? document.getElementById('shift2Legend') : 
+                     document.getElementById('shift3Legend');
+    const form = container.querySelector('.staff-edit-form');
+    if (form) {
+        form.remove();
+    }
+}
+
+function editStaff(staffId) {
+    // Require PIN authentication first
+    requirePinAuth(() => {
+        const staffItem = document.getElementById(`staff-${staffId}`);
+        if (!staffItem) return;
+
+        // Get current values
+        const contentDiv = staffItem.querySelector('.legend-item-content span');
+        const currentName = contentDiv.textContent.trim();
+        const currentShift = parseInt(staffItem.getAttribute('data-shift'));
+        const currentColor = staffItem.getAttribute('data-color');
+
+        // Build color options based on shift
+        let colorOptions = '';
+        if (currentShift === 3) {
+            // Night shift colors
+            colorOptions = `
+                <option value="purple" ${currentColor === 'purple' ? 'selected' : ''}>Purple</option>
+                <option value="darkred" ${currentColor === 'darkred' ? 'selected' : ''}>Dark Red</option>
+                <option value="darkgreen" ${currentColor === 'darkgreen' ? 'selected' : ''}>Dark Green</option>
+                <option value="brownishyellow" ${currentColor === 'brownishyellow' ? 'selected' : ''}>Brownish Yellow</option>
+            `;
+        } else {
+            // Day shift colors
+            colorOptions = `
+                <option value="red" ${currentColor === 'red' ? 'selected' : ''}>Red</option>
+                <option value="yellow" ${currentColor === 'yellow' ? 'selected' : ''}>Yellow</option>
+                <option value="green" ${currentColor === 'green' ? 'selected' : ''}>Green</option>
+                <option value="blue" ${currentColor === 'blue' ? 'selected' : ''}>Blue</option>
+            `;
+        }
+
+        // Replace with edit form
+        staffItem.innerHTML = `
+            <div class="staff-edit-form">
+                <input type="text" id="edit-staff-name-${staffId}" value="${currentName}" required>
+                <select id="edit-staff-color-${staffId}" required>
+                    ${colorOptions}
+                </select>
+                <div class="staff-edit-form-buttons">
+                    <button class="btn btn-sm btn-success" onclick="saveStaffEdit(${staffId})">Save</button>
+                    <button class="btn btn-sm btn-secondary" onclick="loadStaffMembers()">Cancel</button>
+                </div>
+            </div>
+        `;
+    });
+}
+
+function saveStaffEdit(staffId) {
+    const name = document.getElementById(`edit-staff-name-${staffId}`).value.trim();
+    const color = document.getElementById(`edit-staff-color-${staffId}`).value;
+
+    if (!name || !color) {
+        showAlert('Please fill in all fields!', 'danger');
+        return;
+    }
+
+    const data = {
+        name: name,
+        color: color,
+        user_name: currentAuthenticatedUser || 'Unknown'
+    };
+
+    fetch(`/api/staff-members/${staffId}`, {
+        method: 'PUT',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(data)
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            showAlert('Staff member updated successfully!', 'success');
+            loadStaffMembers();
+            loadPorterRota(); // Reload rota to reflect changes
+            loadTodaySchedule(); // Reload schedule
+        }
+    })
+    .catch(error => {
+        showAlert('Error updating staff: ' + error, 'danger');
+    });
+}
+
+function deleteStaff(staffId) {
+    // Require PIN authentication first
+    requirePinAuth(() => {
+        if (!confirm('Are you sure you want to remove this staff member? They will be marked as inactive.')) {
+            return;
+        }
+
+        fetch(`/api/staff-members/${staffId}`, {
+            method: 'DELETE',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+                user_name: currentAuthenticatedUser || 'Unknown'
+            })
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                showAlert('Staff member removed successfully!', 'success');
+                loadStaffMembers();
+                loadPorterRota(); // Reload rota to reflect changes
+                loadTodaySchedule(); // Reload schedule
+            }
+        })
+        .catch(error => {
+            showAlert('Error removing staff: ' + error, 'danger');
+        });
+    });
+}
+
+// Individual Staff Schedule Functions
+function setScheduleRange(days) {
+    const today = new Date();
+    const endDate = new Date();
+    endDate.setDate(today.getDate() + days);
+
+    document.getElementById('printStartDate').valueAsDate = today;
+    document.getElementById('printEndDate').valueAsDate = endDate;
+}
+
+function generateStaffSchedule() {
+    const staffId = document.getElementById('printStaffSelect').value;
+    const startDate = document.getElementById('printStartDate').value;
+    const endDate = document.getElementById('printEndDate').value;
+
+    if (!staffId) {
+        showAlert('Please select a staff member', 'warning');
+        return;
+    }
+
+    if (!startDate || !endDate) {
+        showAlert('Please select start and end dates', 'warning');
+        return;
+    }
+
+    if (new Date(endDate) < new Date(startDate)) {
+        showAlert('End date must be after start date', 'warning');
+        return;
+    }
+
+    // Show loading
+    const resultsDiv = document.getElementById('staffScheduleResults');
+    resultsDiv.style.display = 'block';
+    document.getElementById('staffScheduleTable').innerHTML = '<div class="loading">Generating schedule...</div>';
+
+    // Fetch schedule
+    fetch(`/api/staff-schedule/${staffId}?start_date=${startDate}&end_date=${endDate}`)
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                displayStaffSchedule(data);
+            } else {
+                showAlert('Error generating schedule: ' + data.error, 'danger');
+                resultsDiv.style.display = 'none';
+            }
+        })
+        .catch(error => {
+            showAlert('Error generating schedule: ' + error, 'danger');
+            resultsDiv.style.display = 'none';
+        });
+}
+
+function displayStaffSchedule(data) {
+    const shiftName = data.staff.shift === 3 ? 'Night Shift' : `Shift ${data.staff.shift}`;
+
+    // Update header info
+    document.getElementById('scheduleStaffName').textContent = `${data.staff.name} - ${shiftName}`;
+
+    const startDateFormatted = new Date(data.start_date).toLocaleDateString('en-GB', { 
+        day: 'numeric', month: 'short', year: 'numeric' 
+    });
+    const endDateFormatted = new Date(data.end_date).toLocaleDateString('en-GB', { 
+        day: 'numeric', month: 'short', year: 'numeric' 
+    });
+    document.getElementById('scheduleDateRange').textContent = `${startDateFormatted} - ${endDateFormatted}`;
+
+    // Create table
+    let tableHTML = `
+        <table class="table" style="width: 100%; margin: 0;">
+            <thead style="background: #2c3e50; color: white; position: sticky; top: 0;">
+                <tr>
+                    <th style="padding: 12px; text-align: left; width: 15%;">Date</th>
+                    <th style="padding: 12px; text-align: left; width: 15%;">Day</th>
+                    <th style="padding: 12px; text-align: center; width: 15%;">Status</th>
+                    <th style="padding: 12px; text-align: center; width: 20%;">Shift Times</th>
+                    <th style="padding: 12px; text-align: left; width: 35%;">Notes</th>
+                </tr>
+            </thead>
+            <tbody>
+    `;
+
+    data.schedule.forEach((day, index) => {
+        const dateFormatted = new Date(day.date).toLocaleDateString('en-GB', { 
+            day: '2-digit', month: 'short', year: 'numeric' 
+        });
+
+        let statusClass = '';
+        let statusText = '';
+        let statusColor = '';
+
+        if (day.status === 'working') {
+            statusClass = 'badge badge-success';
+            statusText = 'Working';
+            statusColor = '#d4edda';
+        } else if (day.status === 'off') {
+            statusClass = 'badge badge-secondary';
+            statusText = 'Off';
+            statusColor = '#f8f9fa';
+        } else if (day.status === 'holiday') {
+            statusClass = 'badge badge-warning';
+            statusText = 'Holiday';
+            statusColor = '#fff3cd';
+        } else if (day.status === 'sick') {
+            statusClass = 'badge badge-danger';
+            statusText = 'Sick';
+            statusColor = '#f8d7da';
+        }
+
+        const shiftTimes = day.shift_start && day.shift_end ? 
+            `${day.shift_start} - ${day.shift_end}` : '-';
+
+        const rowStyle = `background: ${statusColor}; ${index % 2 === 0 ? '' : 'opacity: 0.9;'}`;
+
+        tableHTML += `
+            <tr style="${rowStyle}">
+                <td style="padding: 10px; border-bottom: 1px solid #ddd;">${dateFormatted}</td>
+                <td style="padding: 10px; border-bottom: 1px solid #ddd; font-weight: 600;">${day.day_of_week}</td>
+                <td style="padding: 10px; border-bottom: 1px solid #ddd; text-align: center;">
+                    <span class="${statusClass}" style="padding: 4px 12px; border-radius: 12px; font-size: 0.85em;">${statusText}</span>
+                </td>
+                <td style="padding: 10px; border-bottom: 1px solid #ddd; text-align: center; font-family: monospace;">${shiftTimes}</td>
+                <td style="padding: 10px; border-bottom: 1px solid #ddd; font-size: 0.9em;">${day.notes || '-'}</td>
+            </tr>
+        `;
+    });
+
+    tableHTML += `
+            </tbody>
+        </table>
+    `;
+
+    document.getElementById('staffScheduleTable').innerHTML = tableHTML;
+
+    // Store data for printing
+    window.currentScheduleData = data;
+}
+
+function printStaffSchedule() {
+    if (!window.currentScheduleData) {
+        showAlert('No schedule to print', 'warning');
+        return;
+    }
+
+    const data = window.currentScheduleData;
+    const shiftName = data.staff.shift === 3 ? 'Night Shift' : `Shift ${data.staff.shift}`;
+
+    const startDateFormatted = new Date(data.start_date).toLocaleDateString('en-GB', { 
+        day: 'numeric', month: 'long', year: 'numeric' 
+    });
+    const endDateFormatted = new Date(data.end_date).toLocaleDateString('en-GB', { 
+        day: 'numeric', month: 'long', year: 'numeric' 
+    });
+
+    // Create print-friendly content
+    let printHTML = `
+        <div class="print-schedule-header">
+            <h1>Staff Schedule</h1>
+            <h2>${data.staff.name} - ${shiftName}</h2>
+            <p>${startDateFormatted} to ${endDateFormatted}</p>
+        </div>
+        <table class="staff-schedule-print-table">
+            <thead>
+                <tr>
+                    <th>Date</th>
+                    <th>Day</th>
+                    <th>Status</th>
+                    <th>Shift Times</th>
+                    <th>Notes</th>
+                </tr>
+            </thead>
+            <tbody>
+    `;
+
+    data.schedule.forEach(day => {
+        const dateFormatted = new Date(day.date).toLocaleDateString('en-GB', { 
+            day: '2-digit', month: 'short', year: 'numeric' 
+        });
+
+        const shiftTimes = day.shift_start && day.shift_end ? 
+            `${day.shift_start} - ${day.shift_end}` : '-';
+
+        printHTML += `
+            <tr>
+                <td>${dateFormatted}</td>
+                <td>${day.day_of_week}</td>
+                <td style="text-align: center;">${day.status.charAt(0).toUpperCase() + day.status.slice(1)}</td>
+                <td style="text-align: center;">${shiftTimes}</td>
+                <td>${day.notes || '-'}</td>
+            </tr>
+        `;
+    });
+
+    printHTML += `
+            </tbody>
+        </table>
+    `;
+
+    document.getElementById('staffSchedulePrintContainer').innerHTML = printHTML;
+
+    // Trigger print
+    window.print();
+}
+
+// Initialize schedule date inputs
+document.addEventListener('DOMContentLoaded', function() {
+    const today = new Date();
+    const startInput = document.getElementById('printStartDate');
+    const endInput = document.getElementById('printEndDate');
+
+    if (startInput && endInput) {
+        startInput.valueAsDate = today;
+
+        const endDate = new Date();
+        endDate.setDate(today.getDate() + 30);
+        endInput.valueAsDate = endDate;
+    }
+});
+
+// Overtime Tracking Functions (Super User Only)
+let overtimeSuperUserPIN = null;
+let overtimeAuthenticatedUser = null;
+
+function unlockOvertimeTracking() {
+    requireSuperUserPin((pin) => {
+        overtimeSuperUserPIN = pin;
+        const response = fetch('/api/verify-leave-pin', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ pin: pin })
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                overtimeAuthenticatedUser = data.name;
+                document.getElementById('overtimeContent').style.display = 'block';
+                document.getElementById('unlockOvertimeBtn').style.display = 'none';
+                document.getElementById('lockOvertimeBtn').style.display = 'inline-block';
+                document.getElementById('overtimeTrackingBox').style.display = 'block';
+                populateOvertimeStaffDropdowns();
+                loadOvertimeEntries();
+                showAlert(`Overtime tracking unlocked by ${data.name}`, 'success');
+            } else {
+                showAlert(data.error || 'Failed to unlock overtime tracking', 'danger');
+            }
+        })
+        .catch(error => {
+            console.error('Error unlocking overtime:', error);
+            showAlert('Error unlocking overtime tracking', 'danger');
+        });
+    });
+}
+
+function lockOvertimeTracking() {
+    overtimeSuperUserPIN = null;
+    overtimeAuthenticatedUser = null;
+    document.getElementById('overtimeContent').style.display = 'none';
+    document.getElementById('unlockOvertimeBtn').style.display = 'inline-block';
+    document.getElementById('lockOvertimeBtn').style.display = 'none';
+    showAlert('Overtime tracking locked', 'info');
+}
+
+function requireSuperUserPin(callback) {
+    // Create or show super user PIN modal
+    let modal = document.getElementById('superUserPinModal');
+    if (!modal) {
+        modal = document.createElement('div');
+        modal.id = 'superUserPinModal';
+        modal.style.cssText = 'display: none; position: fixed; top: 0; left: 0; width: 100%; height: 100%; background: rgba(0,0,0,0.5); z-index: 9999; justify-content: center; align-items: center;';
+        modal.innerHTML = `
+            <div style="background: white; padding: 30px; border-radius: 10px; max-width: 400px; width: 90%; box-shadow: 0 4px 20px rgba(0,0,0,0.3);">
+                <h3 style="margin-bottom: 20px; color: #2c3e50;">🔐 Super User Authentication</h3>
+                <p style="color: #6c757d; margin-bottom: 20px; font-size: 0.95em;">Enter Super User PIN to access overtime tracking</p>
+                <div style="margin-bottom: 20px;">
+                    <label style="display: block; margin-bottom: 5px; font-weight: 600;">PIN:</label>
+                    <input type="password" id="superUserPinInput" placeholder="Enter Super User PIN" style="width: 100%; padding: 12px; border: 2px solid #ddd; border-radius: 5px; font-size: 1.1em; text-align: center; letter-spacing: 2px;" maxlength="10" autofocus>
+                </div>
+                <div id="superUserPinError" style="color: #dc3545; margin-bottom: 15px; display: none; text-align: center; font-weight: 500;"></div>
+                <div style="display: flex; gap: 10px; justify-content: flex-end;">
+                    <button onclick="closeSuperUserPinModal()" style="padding: 10px 20px; border: none; background: #6c757d; color: white; border-radius: 5px; cursor: pointer; font-size: 1em;">Cancel</button>
+                    <button onclick="submitSuperUserPin()" style="padding: 10px 20px; border: none; background: #16a085; color: white; border-radius: 5px; cursor: pointer; font-size: 1em;">Submit</button>
+                </div>
+            </div>
+        `;
+        document.body.appendChild(modal);
+
+        // Handle Enter key
+        const pinInput = document.getElementById('superUserPinInput');
+        pinInput.addEventListener('keypress', function(e) {
+            if (e.key === 'Enter') {
+                submitSuperUserPin();
+            }
+        });
+    }
+
+    window.superUserPinCallback = callback;
+    modal.style.display = 'flex';
+    document.getElementById('superUserPinInput').value = '';
+    document.getElementById('superUserPinError').style.display = 'none';
+    setTimeout(() => document.getElementById('superUserPinInput').focus(), 100);
+}
+
+function submitSuperUserPin() {
+    const pin = document.getElementById('superUserPinInput').value.trim();
+    const errorDiv = document.getElementById('superUserPinError');
+
+    if (!pin) {
+        errorDiv.textContent = 'Please enter your PIN';
+        errorDiv.style.display = 'block';
+        return;
+    }
+
+    if (window.superUserPinCallback) {
+        window.superUserPinCallback(pin);
+        closeSuperUserPinModal();
+    }
+}
+
+function closeSuperUserPinModal() {
+    const modal = document.getElementById('superUserPinModal');
+    if (modal) {
+        modal.style.display = 'none';
+    }
+    window.superUserPinCallback = null;
+}
+
+function populateOvertimeStaffDropdowns() {
+    fetch('/api/staff-members')
+        .then(response => response.json())
+        .then(staff => {
+            const activeStaff = staff.filter(s => s.active);
+
+            // Populate add form dropdown
+            const overtimeStaffSelect = document.getElementById('overtime_staff');
+            if (overtimeStaffSelect) {
+                overtimeStaffSelect.innerHTML = '<option value="">Select staff member...</option>';
+                activeStaff.forEach(s => {
+                    const option = document.createElement('option');
+                    option.value = s.name;
+                    option.textContent = s.name;
+                    overtimeStaffSelect.appendChild(option);
+                });
+            }
+
+            // Populate filter dropdown
+            const filterStaffSelect = document.getElementById('overtime_filter_staff');
+            if (filterStaffSelect) {
+                filterStaffSelect.innerHTML = '<option value="">All Staff</option>';
+                activeStaff.forEach(s => {
+                    const option = document.createElement('option');
+                    option.value = s.name;
+                    option.textContent = s.name;
+                    filterStaffSelect.appendChild(option);
+                });
+            }
+        })
+        .catch(error => console.error('Error loading staff:', error));
+}
+
+function loadOvertimeEntries() {
+    if (!overtimeSuperUserPIN) return;
+    loadOvertimeSummary();
+
+    const staffFilter = document.getElementById('overtime_filter_staff')?.value || '';
+    const startDate = document.getElementById('overtime_filter_start')?.value || '';
+    const endDate = document.getElementById('overtime_filter_end')?.value || '';
+
+    let url = '/api/overtime?';
+    const params = [];
+    if (staffFilter) params.push(`staff_name=${encodeURIComponent(staffFilter)}`);
+    if (startDate) params.push(`start_date=${startDate}`);
+    if (endDate) params.push(`end_date=${endDate}`);
+    url += params.join('&');
+
+    fetch(url)
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                displayOvertimeEntries(data.overtime);
+            } else {
+                document.getElementById('overtimeEntries').innerHTML = '<p style="color: #dc3545;">Error loading overtime entries</p>';
+            }
+        })
+        .catch(error => {
+            console.error('Error loading overtime:', error);
+            document.getElementById('overtimeEntries').innerHTML = '<p style="color: #dc3545;">Error loading overtime entries</p>';
+        });
+}
+
+function loadOvertimeSummary() {
+    if (!overtimeSuperUserPIN) return;
+
+    const params = [`period=${document.getElementById('overtime_summary_period').value}`];
+    const staffFilter = document.getElementById('overtime_filter_staff')?.value || '';
+    const startDate = document.getElementById('overtime_filter_start')?.value || '';
+    const endDate = document.getElementById('overtime_filter_end')?.value || '';
+    if (staffFilter) params.push(`staff_name=${encodeURIComponent(staffFilter)}`);
+    if (startDate) params.push(`start_date=${startDate}`);
+    if (endDate) params.push(`end_date=${endDate}`);
+
+    const container = document.getElementById('overtimeSummaryContent');
+    fetch('/api/overtime/summary?' + params.join('&'))
+        .then(response => response.json())
+        .then(data => {
+            if (!data.success) {
+                container.innerHTML = `<p style="color: #dc3545;">${data.error || 'Error loading overtime summary'}</p>`;
+                return;
+            }
+            const periods = data.periods.filter(period => period.staff.length > 0).reverse();
+            if (periods.length === 0) {
+                container.innerHTML = '<p style="color: #6c757d; text-align: center; padding: 20px;">No overtime in this range</p>';
+                return;
+            }
+
+            let html = `
+                <p style="margin-bottom: 10px; color: #666;">
+                    ${new Date(data.start_date).toLocaleDateString('en-GB')} - ${new Date(data.end_date).toLocaleDateString('en-GB')}:
+                    <strong>${data.hours.toFixed(1)} hours</strong>. Hours on rotation days off are shown in brackets.
+                </p>
+                <table style="width: 100%; border-collapse: collapse;">
+                    <thead>
+                        <tr style="background: #f8f9fa; border-bottom: 2px solid #dee2e6;">
+                            <th style="padding: 12px; text-align: left;">Period</th>
+                            <th style="padding: 12px; text-align: left;">Staff</th>
+                            <th style="padding: 12px; text-align: center;">Entries</th>
+                            <th style="padding: 12px; text-align: center;">Hours</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+            `;
+            periods.forEach(period => {
+                const label = `${new Date(period.period_start).toLocaleDateString('en-GB')} - ${new Date(period.period_end).toLocaleDateString('en-GB')}`;
+                period.staff.forEach((staff, index) => {
+                    html += `
+                        <tr style="border-bottom: 1px solid #dee2e6;">
+                            <td style="padding: 10px; color: #6c757d;">${index === 0 ? label : ''}</td>
+                            <td style="padding: 10px;"><strong>${staff.staff_name}</strong></td>
+                            <td style="padding: 10px; text-align: center;">${staff.entries}</td>
+                            <td style="padding: 10px; text-align: center;">${staff.hours}${staff.off_day_hours ? ` <span style="color: #e67e22;">(${staff.off_day_hours})</span>` : ''}</td>
+                        </tr>
+                    `;
+                });
+            });
+            html += '</tbody></table>';
+            container.innerHTML = html;
+        })
+        .catch(error => {
+            console.error('Error loading overtime summary:', error);
+            container.innerHTML = '<p style="color: #dc3545;">Error loading overtime summary</p>';
+        });
+}
+
+function displayOvertimeEntries(entries) {
+    const container = document.getElementById('overtimeEntries');
+
+    if (entries.length === 0) {
+        container.innerHTML = '<p style="color: #6c757d; text-align: center; padding: 20px;">No overtime entries found</p>';
+        return;
+    }
+
+    // Calculate total hours
+    const totalHours = entries.reduce((sum, entry) => sum + parseFloat(entry.hours || 0), 0);
+
+    let html = `
+        <div style="margin-bottom: 15px; padding: 10px; background: #e8f5e9; border-radius: 5px;">
+            <strong>Total Hours: ${totalHours.toFixed(1)}</strong>
+        </div>
+        <table style="width: 100%; border-collapse: collapse;">
+            <thead>
+                <tr style="background: #f8f9fa; border-bottom: 2px solid #dee2e6;">
+                    <th style="padding: 12px; text-align: left;">Staff</th>
+                    <th style="padding: 12px; text-align: left;">Date</th>
+                    <th style="padding: 12px; text-align: center;">Hours</th>
+                    <th style="padding: 12px; text-align: left;">Description</th>
+                    <th style="padding: 12px; text-align: left;">Created By</th>
+                    <th style="padding: 12px; text-align: center;">Actions</th>
+                </tr>
+            </thead>
+            <tbody>
+    `;
+
+    entries.forEach(entry => {
+        const date = new Date(entry.date).toLocaleDateString('en-GB');
+        html += `
+            <tr style="border-bottom: 1px solid #dee2e6;">
+                <td style="padding: 10px;"><strong>${entry.staff_name}</strong></td>
+                <td style="padding: 10px;">${date}</td>
+                <td style="padding: 10px; text-align: center;">${entry.hours}</td>
+                <td style="padding: 10px;">${entry.description || '-'}</td>
+                <td style="padding: 10px; font-size: 0.9em; color: #6c757d;">${entry.created_by || 'N/A'}</td>
+                <td style="padding: 10px; text-align: center;">
+                    <button onclick="editOvertimeEntry(${entry.id})" class="btn btn-sm btn-primary" style="padding: 5px 10px; margin-right: 5px;">Edit</button>
+                    <button onclick="deleteOvertimeEntry(${entry.id})" class="btn btn-sm btn-danger" style="padding: 5px 10px;">Delete</button>
+                </td>
+            </tr>
+        `;
+    });
+
+    html += '</tbody></table>';
+    container.innerHTML = html;
+}
+
+function editOvertimeEntry(id) {
+    if (!overtimeSuperUserPIN) {
+        showAlert('Please unlock overtime tracking first', 'warning');
+        return;
+    }
+
+    // Get entry details and populate form
+    fetch('/api/overtime')
+        .then(response => response.json())
+        .then(data => {
+            const entry = data.overtime.find(e => e.id === id);
+            if (entry) {
+                document.getElementById('overtime_staff').value = entry.staff_name;
+                document.getElementById('overtime_date').value = entry.date;
+                document.getElementById('overtime_hours').value = entry.hours;
+                document.getElementById('overtime_description').value = entry.description || '';
+
+                // Change form to update mode
+                const form = document.getElementById('overtimeForm');
+                form.dataset.editId = id;
+                form.querySelector('button[type="submit"]').textContent = 'Update Entry';
+
+                // Scroll to form
+                form.scrollIntoView({ behavior: 'smooth', block: 'nearest' });
+            }
+        })
+        .catch(error => console.error('Error loading entry:', error));
+}
+
+function deleteOvertimeEntry(id) {
+    if (!overtimeSuperUserPIN) {
+        showAlert('Please unlock overtime tracking first', 'warning');
+        return;
+    }
+
+    if (!confirm('Are you sure you want to delete this overtime entry?')) {
+        return;
+    }
+
+    fetch(`/api/overtime/${id}`, {
+        method: 'DELETE',
+        headers: {
+            'X-Super-User-PIN': overtimeSuperUserPIN
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            showAlert('Overtime entry deleted successfully', 'success');
+            loadOvertimeEntries();
+        } else {
+            showAlert(data.error || 'Failed to delete entry', 'danger');
+        }
+    })
+    .catch(error => {
+        console.error('Error deleting entry:', error);
+        showAlert('Error deleting overtime entry', 'danger');
+    });
+}
+
+// Handle overtime form submission
+document.addEventListener('DOMContentLoaded', function() {
+    const overtimeForm = document.getElementById('overtimeForm');
+    if (overtimeForm) {
+        overtimeForm.addEventListener('submit', function(e) {
+            e.preventDefault();
+
+            if (!overtimeSuperUserPIN) {
+                showAlert('Please unlock overtime tracking first', 'warning');
+                return;
+            }
+
+            const editId = overtimeForm.dataset.editId;
+            const isEdit = !!editId;
+
+            const data = {
+                staff_name: document.getElementById('overtime_staff').value,
+                date: document.getElementById('overtime_date').value,
+                hours: parseFloat(document.getElementById('overtime_hours').value),
+                description: document.getElementById('overtime_description').value
+            };
+
+            const url = isEdit ? `/api/overtime/${editId}` : '/api/overtime';
+            const method = isEdit ? 'PUT' : 'POST';
+
+            fetch(url, {
+                method: method,
+                headers: {
+                    'Content-Type': 'application/json',
+                    'X-Super-User-PIN': overtimeSuperUserPIN
+                },
+                body: JSON.stringify(data)
+            })
+            .then(response => response.json())
+            .then(result => {
+                if (result.success) {
+                    showAlert(isEdit ? 'Overtime entry updated successfully' : 'Overtime entry added successfully', 'success');
+                    overtimeForm.reset();
+                    delete overtimeForm.dataset.editId;
+                    overtimeForm.querySelector('button[type="submit"]').textContent = 'Add Entry';
+                    loadOvertimeEntries();
+                } else {
+                    showAlert(result.error || 'Failed to save entry', 'danger');
+                }
+            })
+            .catch(error => {
+                console.error('Error saving overtime:', error);
+                showAlert('Error saving overtime entry', 'danger');
+            });
+        });
+    }
+});
+
+// Tab switching
+function showTab(tabName) {
+    // Check if leaving settings tab - auto-lock it
+    if (currentTab === 'settings' && tabName !== 'settings') {
+        lockSettings();
+    }
+
+    // Lock overtime tracking when switching tabs (only lock if currently unlocked)
+    if (overtimeSuperUserPIN !== null) {
+        lockOvertimeTracking();
+    }
+
+    // Hide all tabs
+    document.querySelectorAll('.tab-content').forEach(tab => {
+        tab.classList.remove('active');
+    });
+    document.querySelectorAll('.nav-tab').forEach(tab => {
+        tab.classList.remove('active');
+    });
+
+    // Show selected tab
+    document.getElementById(tabName).classList.add('active');
+    event.target.classList.add('active');
+    currentTab = tabName;
+
+    // Show overtime tracking box only on rota tab
+    const overtimeBox = document.getElementById('overtimeTrackingBox');
+    if (overtimeBox) {
+        overtimeBox.style.display = tabName === 'rota' ? 'block' : 'none';
+    }
+
+    // Auto-focus PIN input when settings tab is opened
+    if (tabName === 'settings') {
+        setTimeout(() => {
+            const pinInput = document.getElementById('settings_pin_code');
+            if (pinInput && document.getElementById('settingsPinOverlay').style.display !== 'none') {
+                pinInput.focus();
+            }
+        }, 100);
+    }
+}
+
+
+function loadTodaySchedule() {
+    const today = new Date().toISOString().split('T')[0];
+
+    // Load staff members, today's schedule, and leave data
+    Promise.all([
+        fetch('/api/staff-members').then(r => r.json()),
+        fetch(`/api/porter-rota?start_date=${today}&end_date=${today}`).then(r => r.json()),
+        fetch(`/api/staff-rota?start_date=${today}&end_date=${today}`).then(r => r.json())
+    ])
+    .then(([staffMembers, rotaData, leaveData]) => {
+        const container = document.getElementById('todaySchedule');
+
+        if (rotaData.length === 0) {
+            container.innerHTML = '<p style="color: #666;">Unable to load staff schedule</p>';
+            return;
+        }
+
+        const todayData = rotaData[0];
+
+        // Group staff by shift
+        const allStaff = {
+            'Shift 1': staffMembers.filter(s => s.shift === 1),
+            'Shift 2': staffMembers.filter(s => s.shift === 2),
+            'Night Shift': staffMembers.filter(s => s.shift === 3)
+        };
+
+        // Get which staff are off today (regular rotation)
+        const staffOffNames = (todayData.staff_off || []).map(s => s.name);
+
+        // Create a map of leave status for today
+        const leaveMap = {};
+        leaveData.forEach(leave => {
+            leaveMap[leave.staff_name] = leave.status; // 'holiday' or 'sick'
+        });
+
+        let html = '<div class="schedule-container">';
+
+        // Create shift boxes - always show all three shifts
+        ['Shift 1', 'Shift 2', 'Night Shift'].forEach(shiftName => {
+            html += `<div class="shift-box"><div class="shift-title">${shiftName}</div>`;
+
+            if (!allStaff[shiftName] || allStaff[shiftName].length === 0) {
+                html += '<span style="font-size: 13px; color: #666;">No staff assigned</span>';
+            } else {
+                allStaff[shiftName].forEach(staff => {
+                    // Check if this staff member has leave or is off today
+                    let statusClass, statusText;
+
+                    if (leaveMap[staff.name] === 'holiday') {
+                        statusClass = 'status-holiday';
+                        statusText = 'HOLIDAY';
+                    } else if (leaveMap[staff.name] === 'sick') {
+                        statusClass = 'status-sick';
+                        statusText = 'SICK';
+                    } else if (staffOffNames.includes(staff.name)) {
+                        statusClass = 'status-off';
+                        statusText = 'OFF';
+                    } else {
+                        statusClass = 'status-working';
+                        statusText = 'ON';
+                    }
+
+                    html += `<div class="staff-member">
+                        <span class="staff-name">${staff.name}</span>
+                        <span class="staff-status ${statusClass}">${statusText}</span>
+                    </div>`;
+                });
+            }
+
+            html += '</div>';
+        });
+
+        html += '</div>';
+        container.innerHTML = html;
+    })
+    .catch(error => {
+        console.error('Error loading schedule:', error);
+        document.getElementById('todaySchedule').innerHTML = '<p style="color: #666;">Unable to load staff schedule</p>';
+    });
+}
+
+function getStatusClass(status) {
+    switch(status.toLowerCase()) {
+        case 'working': return 'status-working';
+        case 'off': return 'status-off';
+        case 'holiday': return 'status-holiday';
+        case 'sick': return 'status-sick';
+        default: return 'status-working';
+    }
+}
+
+function getStatusText(status) {
+    switch(status.toLowerCase()) {
+        case 'working': return 'ON';
+        case 'off': return 'OFF';
+        case 'holiday': return 'HOLIDAY';
+        case 'sick': return 'SICK';
+        default: return 'ON';
+    }
+}
+
+// Offline outbox - new occurrences, temperatures and faults are saved in IndexedDB
+// first and sent to /api/batch in the background, so nothing is lost while the
+// server restarts or Wi-Fi is down. Each write carries an idempotency key, so
+// sending it again after a lost response never creates a second entry. Writes the
+// server rejects stay in the outbox marked failed (write.error) and are listed at
+// the top of the page, to be corrected and retried or dismissed.
+const OUTBOX_DB_NAME = 'diary-outbox';
+const OUTBOX_STORE = 'writes';
+const OUTBOX_BATCH_SIZE = 50;
+const OUTBOX_RETRY_MS = 30000;
+const OUTBOX_TYPE_LABELS = { occurrence: 'Occurrence', water_temperature: 'Water temperature', fault: 'Fault' };
+let outboxDb = null;
+let outboxFlush = null;
+let failedWritesShown = '';
+
+function openOutbox() {
+    if (!outboxDb) {
+        outboxDb = new Promise((resolve, reject) => {
+            const request = indexedDB.open(OUTBOX_DB_NAME, 1);
+            request.onupgradeneeded = () => request.result.createObjectStore(OUTBOX_STORE, { keyPath: 'key' });
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => reject(request.error);
+        });
+    }
+    return outboxDb;
+}
+
+function outboxTransaction(mode, action) {
+    // Run action(store) in one transaction - resolves with the last request's result once committed
+    return openOutbox().then(db => new Promise((resolve, reject) => {
+        const transaction = db.transaction(OUTBOX_STORE, mode);
+        const request = action(transaction.objectStore(OUTBOX_STORE));
+        transaction.oncomplete = () => resolve(request ? request.result : undefined);
+        transaction.onerror = () => reject(transaction.error);
+    }));
+}
+
+function newIdempotencyKey() {
+    // crypto.randomUUID() needs HTTPS, getRandomValues() works on the plain HTTP LAN address too
+    const bytes = crypto.getRandomValues(new Uint8Array(16));
+    return Array.from(bytes, byte => byte.toString(16).padStart(2, '0')).join('');
+}
+
+function getOutboxWrites(type) {
+    // Queued and failed writes, oldest first (none if IndexedDB is unavailable)
+    return outboxTransaction('readonly', store => store.getAll())
+        .then(writes => writes.filter(write => !type || write.type === type).sort((a, b) => a.queued - b.queued))
+        .catch(() => []);
+}
+
+function queueWrite(type, data) {
+    // Resolves as soon as the write is stored - it is sent in the background
+    const write = { key: newIdempotencyKey(), type: type, data: data, queued: Date.now() };
+    return outboxTransaction('readwrite', store => store.put(write))
+        .then(() => {
+            updateOutboxStatus();
+            // A flush already running may have read the outbox before this write - flush again after it
+            Promise.resolve(outboxFlush).then(flushOutbox);
+        }, () => {
+            // No IndexedDB (e.g. private browsing) - send it straight away instead
+            return sendWrites([write]).then(results => {
+                if (!results[0].success) {
+                    throw new Error(results[0].error);
+                }
+                refreshOutboxViews([write]);
+            });
+        });
+}
+
+function sendWrites(writes) {
+    // POST writes to /api/batch - resolves with the per-write results (a 400 has errors on the invalid ones)
+    return fetch('/api/batch', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+            // recorded_at is when the entry was made, however late it is sent
+            operations: writes.map(write => Object.assign({
+                type: write.type,
+                idempotency_key: write.key,
+                recorded_at: new Date(write.queued).toISOString()
+            }, write.data))
+        })
+    })
+    .then(response => response.json().catch(() => ({})).then(data => {
+        if (!data.results) {
+            throw new Error(data.error || `Server returned ${response.status}`);
+        }
+        return data.results;
+    }));
+}
+
+function flushOutbox() {
+    // One flush at a time - calls made while one is running share it
+    if (!outboxFlush) {
+        outboxFlush = sendNextOutboxBatch()
+            .catch(error => console.warn('Outbox not sent, will retry:', error))
+            .finally(() => {
+                outboxFlush = null;
+                updateOutboxStatus();
+            });
+    }
+    return outboxFlush;
+}
+
+function sendNextOutboxBatch() {
+    return getOutboxWrites().then(writes => {
+        // Failed writes wait for the user to retry or dismiss them
+        const batch = writes.filter(write => !write.error).slice(0, OUTBOX_BATCH_SIZE);
+        if (batch.length === 0) {
+            return;
+        }
+        return sendWrites(batch).then(results => {
+            // Saved writes leave the outbox. Invalid ones stay, marked failed - sent unchanged they would fail every time
+            const saved = results.filter(result => result.success).map(result => batch[result.index].key);
+            const failed = results.filter(result => result.error)
+                .map(result => Object.assign({}, batch[result.index], { error: result.error }));
+            if (saved.length === 0 && failed.length === 0) {
+                throw new Error('Batch rejected');
+            }
+            if (failed.length > 0) {
+                showAlert(`${failed.length} ${failed.length === 1 ? 'entry' : 'entries'} could not be saved - see the top of the page to correct and retry`, 'danger');
+            }
+            // Entries queued too long ago are saved with the time they arrived instead
+            const retimed = results.filter(result => result.success && result.recorded_at_ignored).length;
+            if (retimed > 0) {
+                showAlert(`${retimed} ${retimed === 1 ? 'entry was' : 'entries were'} queued too long ago to keep ${retimed === 1 ? 'its' : 'their'} time and ${retimed === 1 ? 'was' : 'were'} saved with the current date and time`, 'warning');
+            }
+            return outboxTransaction('readwrite', store => {
+                saved.forEach(key => store.delete(key));
+                failed.forEach(write => store.put(write));
+            })
+            .then(() => {
+                refreshOutboxViews(batch);
+                return sendNextOutboxBatch();
+            });
+        });
+    });
+}
+
+function refreshOutboxViews(writes) {
+    // Reload the lists that sent writes appear in
+    const types = new Set(writes.map(write => write.type));
+    if (types.has('occurrence')) loadDailyOccurrences();
+    if (types.has('water_temperature')) loadWaterTemperature();
+    if (types.has('fault')) loadCCTVFaults();
+}
+
+function updateOutboxStatus() {
+    getOutboxWrites().then(writes => {
+        const status = document.getElementById('outboxStatus');
+        if (!status) return;
+        const queued = writes.filter(write => !write.error);
+        status.textContent = `⏳ ${queued.length} ${queued.length === 1 ? 'entry is' : 'entries are'} saved on this computer and will be sent when the server is reachable`;
+        status.style.display = queued.length > 0 ? 'block' : 'none';
+        showFailedWrites(writes.filter(write => write.error));
+    });
+}
+
+function showFailedWrites(failed) {
+    // List the writes the server rejected, with their fields to correct before retrying.
+    // Only redrawn when the list changes, so corrections being typed are kept.
+    const container = document.getElementById('outboxFailed');
+    const shown = JSON.stringify(failed.map(write => [write.key, write.error]));
+    if (!container || shown === failedWritesShown) return;
+    failedWritesShown = shown;
+
+    container.innerHTML = failed.map(write => `
+        <div class="outbox-failed-write" data-key="${write.key}">
+            <strong>⚠ ${OUTBOX_TYPE_LABELS[write.type] || write.type} entered ${new Date(write.queued).toLocaleString()} was not saved:</strong>
+            <span class="outbox-failed-error"></span>
+            <div class="outbox-failed-fields">
+                ${Object.keys(write.data).map(field => `
+                    <label>${field.replace(/_/g, ' ')}
+                        <input type="text" class="form-control" data-field="${field}">
+                    </label>
+                `).join('')}
+            </div>
+            <button class="btn btn-success btn-sm" onclick="retryFailedWrite('${write.key}')">Retry</button>
+            <button class="btn btn-danger btn-sm" onclick="dismissFailedWrite('${write.key}')">Dismiss</button>
+        </div>
+    `).join('');
+    // Error messages and values are set as text, never parsed as HTML
+    failed.forEach(write => {
+        const element = container.querySelector(`[data-key="${write.key}"]`);
+        element.querySelector('.outbox-failed-error').textContent = write.error;
+        element.querySelectorAll('[data-field]').forEach(input => {
+            input.value = write.data[input.dataset.field] ?? '';
+        });
+    });
+    container.style.display = failed.length > 0 ? 'block' : 'none';
+}
+
+function retryFailedWrite(key) {
+    // Save the corrected fields and queue the write again (same key and recorded time)
+    const element = document.querySelector(`#outboxFailed [data-key="${key}"]`);
+    getOutboxWrites().then(writes => {
+        const write = writes.find(write => write.key === key);
+        if (!write) return;
+        element.querySelectorAll('[data-field]').forEach(input => {
+            write.data[input.dataset.field] = input.value;
+        });
+        delete write.error;
+        return outboxTransaction('readwrite', store => store.put(write)).then(() => refreshOutboxViews([write]));
+    })
+    .then(() => {
+        updateOutboxStatus();
+        Promise.resolve(outboxFlush).then(flushOutbox);
+    });
+}
+
+function dismissFailedWrite(key) {
+    if (!confirm('Discard this entry? It has not been saved and will be lost.')) {
+        return;
+    }
+    getOutboxWrites().then(writes => {
+        const write = writes.find(write => write.key === key);
+        return outboxTransaction('readwrite', store => store.delete(key))
+            .then(() => write && refreshOutboxViews([write]));
+    })
+    .then(updateOutboxStatus);
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    // Send anything left from before a restart or reload, then keep retrying
+    flushOutbox();
+    window.addEventListener('online', flushOutbox);
+    setInterval(flushOutbox, OUTBOX_RETRY_MS);
+});
+
+let lastDailyOccurrences = [];
+let dailyOccurrencesLoad = 0;
+
+function loadDailyOccurrences() {
+    // Entries still in the outbox are listed (as pending) until the server has them.
+    // If the server can't be reached, the last list fetched is shown.
+    const load = ++dailyOccurrencesLoad;
+    Promise.all([
+        fetch('/api/daily-occurrences')
+            .then(response => response.json())
+            .then(data => Array.isArray(data) ? (lastDailyOccurrences = data) : lastDailyOccurrences)
+            .catch(() => lastDailyOccurrences),
+        getOutboxWrites('occurrence')
+    ])
+    .then(([saved, pending]) => {
+        if (load !== dailyOccurrencesLoad) {
+            return;  // A newer load has started
+        }
+        const data = pending.reverse().map(write => Object.assign({ pending: true, error: write.error }, write.data)).concat(saved);
+        const container = document.getElementById('dailyList');
+        const isMobile = window.innerWidth <= 768;
+
+        // Keep anything typed into the new entry form across the reload
+        const newEntryFields = ['new_time', 'new_flat', 'new_reported_by', 'new_description'];
+        const typed = newEntryFields.map(id => document.getElementById(id) ? document.getElementById(id).value : '');
+        const focusedId = document.activeElement ? document.activeElement.id : null;
+
+        if (isMobile) {
+            // Mobile card layout
+            let html = '<div class="mobile-occurrence-container">';
+
+            // Add form for new entry
+            html += `
+                <div class="mobile-occurrence-form">
+                    <h4 style="margin-bottom: 15px; color: #495057;">Add New Entry</h4>
+                    <div class="form-group">
+                        <label>Time</label>
+                        <input type="time" id="new_time" class="form-control">
+                    </div>
+                    <div class="form-group">
+                        <label>Flat</label>
+                        <input type="text" id="new_flat" placeholder="Flat number (optional)" class="form-control">
+                    </div>
+                    <div class="form-group">
+                        <label>Reported By *</label>
+                        <input type="text" id="new_reported_by" placeholder="Name" class="form-control">
+                    </div>
+                    <div class="form-group">
+                        <label>Incident Details *</label>
+                        <input type="text" id="new_description" placeholder="Enter incident details..." class="form-control">
+                    </div>
+                    <button class="btn btn-success" style="width: 100%;" onclick="addNewOccurrence()">Add Entry</button>
+                </div>
+            `;
+
+            // Add existing occurrences as cards
+            if (data.length > 0) {
+                html += '<div class="mobile-occurrence-list">';
+                data.forEach(occurrence => {
+                    html += `
+                        <div class="mobile-occurrence-card" ${occurrence.pending ? '' : `id="row_${occurrence.id}"`}>
+                            <div class="mobile-occurrence-header">
+                                <span class="mobile-occurrence-time">${occurrence.time}</span>
+                                ${getOccurrenceAction(occurrence)}
+                            </div>
+                            <div class="mobile-occurrence-body">
+                                <div class="mobile-occurrence-field">
+                                    <strong>Flat:</strong> ${occurrence.flat_number}
+                                </div>
+                                <div class="mobile-occurrence-field">
+                                    <strong>Reported By:</strong> ${occurrence.reported_by}
+                                </div>
+                                <div class="mobile-occurrence-field">
+                                    <strong>Incident:</strong> ${occurrence.description}
+                                </div>
+                            </div>
+                        </div>
+                    `;
+                });
+                html += '</div>';
+            } else {
+                html += '<p style="text-align: center; color: #666; padding: 20px;">No entries for today</p>';
+            }
+
+            html += '</div>';
+            container.innerHTML = html;
+        } else {
+            // Desktop table layout
+            let html = '<table class="incident-table"><thead><tr><th>TIME</th><th>FLAT</th><th>BY</th><th>INCIDENT REPORT</th><th>ACTIONS</th></tr></thead><tbody>';
+
+            // Add empty row for new entry
+            html += `<tr id="newRow">
+                <td><input type="time" id="new_time" placeholder="Time"></td>
+                <td><input type="text" id="new_flat" placeholder="Flat (optional)"></td>
+                <td><input type="text" id="new_reported_by" placeholder="Name *"></td>
+                <td><input type="text" id="new_description" placeholder="Incident details... *"></td>
+                <td><button class="btn btn-success btn-sm" onclick="addNewOccurrence()">Add</button></td>
+            </tr>`;
+
+            // Add existing occurrences
+            data.forEach(occurrence => {
+                html += `<tr ${occurrence.pending ? '' : `id="row_${occurrence.id}"`}>
+                    <td>${occurrence.time}</td>
+                    <td>${occurrence.flat_number}</td>
+                    <td>${occurrence.reported_by}</td>
+                    <td>${occurrence.description}</td>
+                    <td>${getOccurrenceAction(occurrence)}</td>
+                </tr>`;
+            });
+
+            html += '</tbody></table>';
+            container.innerHTML = html;
+        }
+
+        newEntryFields.forEach((id, index) => {
+            document.getElementById(id).value = typed[index];
+        });
+        if (newEntryFields.includes(focusedId)) {
+            document.getElementById(focusedId).focus();
+        }
+
+        // Setup auto-time fill for new row
+        setupNewRowAutoTime();
+    });
+}
+
+function getOccurrenceAction(occurrence) {
+    // Entries waiting in the outbox have no id yet, so they can't be deleted
+    if (occurrence.error) {
+        return '<span class="failed-entry" title="Rejected by the server - correct and retry it, or dismiss it, at the top of the page">⚠ Not saved</span>';
+    }
+    if (occurrence.pending) {
+        return '<span class="pending-entry" title="Saved on this computer - will be sent when the server is reachable">⏳ Pending</span>';
+    }
+    return `<button class="btn btn-danger btn-sm" onclick="deleteOccurrence(${occurrence.id})">Delete</button>`;
+}
+
+function setupNewRowAutoTime() {
+    const timeField = document.getElementById('new_time');
+    const flatField = document.getElementById('new_flat');
+    const reportedByField = document.getElementById('new_reported_by');
+
+    function autoFillTime() {
+        if (!timeField.value) {
+            const now = new Date();
+            const hours = now.getHours().toString().padStart(2, '0');
+            const minutes = now.getMinutes().toString().padStart(2, '0');
+            timeField.value = `${hours}:${minutes}`;
+        }
+    }
+
+    if (flatField) flatField.addEventListener('input', autoFillTime);
+    if (reportedByField) reportedByField.addEventListener('input', autoFillTime);
+}
+
+function addNewOccurrence() {
+    const time = document.getElementById('new_time').value;
+    const flat = document.getElementById('new_flat').value;
+    const reportedBy = document.getElementById('new_reported_by').value;
+    const description = document.getElementById('new_description').value;
+
+    if (!time || !reportedBy || !description) {
+        showAlert('Please fill in the required fields (Time, By, and Incident Report)!', 'danger');
+        return;
+    }
+
+    const data = {
+        time: time,
+        flat_number: flat || '',  // Allow empty flat number
+        reported_by: reportedBy,
+        description: description
+    };
+
+    // Saved to the outbox straight away and sent in the background
+    queueWrite('occurrence', data)
+    .then(() => {
+        // Clear the form
+        document.getElementById('new_time').value = '';
+        document.getElementById('new_flat').value = '';
+        document.getElementById('new_reported_by').value = '';
+        document.getElementById('new_description').value = '';
+        loadDailyOccurrences();
+    })
+    .catch(error => {
+        showAlert('Error adding occurrence: ' + error, 'danger');
+    });
+}
+
+function deleteOccurrence(id) {
+    if (confirm('Are you sure you want to delete this occurrence?')) {
+        fetch(`/api/daily-occurrences/${id}`, {
+            method: 'DELETE',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+                user_name: currentAuthenticatedUser || 'Unknown'
+            })
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                showAlert('Occurrence deleted successfully!', 'success');
+                loadDailyOccurrences();
+            }
+        })
+        .catch(error => {
+            showAlert('Error deleting occurrence: ' + error, 'danger');
+        });
+    }
+}
+
+// Porter Rota - Global variables for navigation
+let currentRotaStartDate = null;
+let currentRotaEndDate = null;
+
+function loadPorterRota(startDate = null, endDate = null) {
+    // If no dates provided, load 6 months from today
+    if (!startDate || !endDate) {
+        const today = new Date();
+        startDate = today.toISOString().split('T')[0];
+        endDate = new Date(today.getTime() + 180 * 24 * 60 * 60 * 1000).toISOString().split('T')[0];
+    }
+
+    // Store current viewing range
+    currentRotaStartDate = startDate;
+    currentRotaEndDate = endDate;
+
+    // Update date range display
+    const startDateObj = new Date(startDate);
+    const endDateObj = new Date(endDate);
+    const dateRangeText = `${startDateObj.toLocaleDateString('en-US', { month: 'long', day: 'numeric', year: 'numeric' })} - ${endDateObj.toLocaleDateString('en-US', { month: 'long', day: 'numeric', year: 'numeric' })}`;
+    document.getElementById('rotaDateRange').textContent = dateRangeText;
+
+    // Rota with leave already merged, grouped by month
+    fetch(`/api/rota-calendar?start_date=${startDate}&end_date=${endDate}`)
+    .then(r => r.json())
+    .then(data => {
+        const container = document.getElementById('rotaCalendar');
+
+        if (!data.success || data.months.length === 0) {
+            container.innerHTML = '<p>No rota data available.</p>';
+            return;
+        }
+
+        // Build HTML
+        let html = '<div class="rota-calendar">';
+
+        data.months.forEach(month => {
+            const [year, monthNumber] = month.month.split('-').map(Number);
+            const monthName = new Date(year, monthNumber - 1, 1).toLocaleDateString('en-US', { month: 'long', year: 'numeric' });
+
+            html += `<div class="month-section">
+                <div class="month-header">${monthName}</div>
+                <table class="rota-table">
+                    <thead>
+                        <tr>
+                            <th>Date</th>
+                            <th>Day</th>
+                            <th>Week</th>
+                            <th>Staff Off</th>
+                        </tr>
+                    </thead>
+                    <tbody>`;
+
+            month.day.forEach((dayOfMonth, i) => {
+                const date = new Date(year, monthNumber - 1, dayOfMonth);
+                const dateKey = `${month.month}-${String(dayOfMonth).padStart(2, '0')}`;
+                const isToday = dateKey === data.today;
+                const dateStr = date.toLocaleDateString('en-US', { month: 'short', day: 'numeric' });
+                const rowClass = isToday ? 'today-row' : '';
+                const todayIndicator = isToday ? '<span class="today-indicator">TODAY</span>' : '';
+                const colorClass = month.color_off[i] ? `color-${month.color_off[i]}` : '';
+                const [shift1Badge, shift2Badge, shift3Badge] = data.shift_times[month.week[i]];
+
+                // Build staff cell content with shift information and leave status
+                let staffContent = '';
+                const dayLeave = {};
+                month.leave[i].forEach(([staffIndex, status]) => {
+                    dayLeave[data.staff[staffIndex][0]] = status;
+                });
+
+                if (month.off[i].length > 0) {
+                    staffContent = '<div class="staff-shift-info">';
+                    month.off[i].forEach(staffIndex => {
+                        const [staffName, shift] = data.staff[staffIndex];
+                        const timeBadge = shift === 1 ? shift1Badge : shift === 2 ? shift2Badge : shift3Badge;
+
+                        // Check if this staff has leave
+                        const leaveStatus = dayLeave[staffName];
+                        let statusBadge = '';
+                        if (leaveStatus === 'holiday') {
+                            statusBadge = ' <span style="background: #fff3cd; color: #856404; padding: 2px 6px; border-radius: 3px; font-size: 0.75em; font-weight: 600;">HOLIDAY</span>';
+                        } else if (leaveStatus === 'sick') {
+                            statusBadge = ' <span style="background: #e2e3e5; color: #383d41; padding: 2px 6px; border-radius: 3px; font-size: 0.75em; font-weight: 600;">SICK</span>';
+                        }
+
+                        staffContent += `<div class="shift-row">
+                            <span class="staff-name-text">${staffName}${statusBadge}</span>
+                            <span class="shift-badge">${timeBadge}</span>
+                        </div>`;
+                    });
+                    staffContent += '</div>';
+                } else if (month.leave[i].length > 0) {
+                    // No regular day off but someone has leave
+                    staffContent = '<div class="staff-shift-info">';
+                    Object.keys(dayLeave).forEach(staffName => {
+                        const leaveStatus = dayLeave[staffName];
+                        let statusText = leaveStatus === 'holiday' ? 'HOLIDAY' : 'SICK';
+                        let statusColor = leaveStatus === 'holiday' ? '#fff3cd' : '#e2e3e5';
+                        let textColor = leaveStatus === 'holiday' ? '#856404' : '#383d41';
+
+                        staffContent += `<div class="shift-row" style="background: ${statusColor}; color: ${textColor}; padding: 5px;">
+                            <span class="staff-name-text" style="font-weight: 600;">${staffName}</span>
+                            <span style="padding: 2px 6px; border-radius: 3px; font-size: 0.75em; font-weight: 600;">${statusText}</span>
+                        </div>`;
+                    });
+                    staffContent += '</div>';
+                } else {
+                    staffContent = `All working<br><small style="font-size: 0.8em; color: #666;">
+                        Shift 1: ${shift1Badge} | Shift 2: ${shift2Badge} | Night: ${shift3Badge}
+                    </small>`;
+                }
+
+                html += `<tr class="${rowClass}">
+                    <td class="rota-date-cell">${dateStr}${todayIndicator}</td>
+                    <td class="rota-day-cell">${date.toLocaleDateString('en-US', { weekday: 'long' })}</td>
+                    <td class="rota-week-cell">Week ${month.week[i]}</td>
+                    <td class="rota-staff-cell ${colorClass}">${staffContent}</td>
+                </tr>`;
+            });
+
+            html += `</tbody>
+                </table>
+            </div>`;
+        });
+
+        html += '</div>';
+        container.innerHTML = html;
+
+        // Scroll to today's row
+        setTimeout(() => {
+            const todayRow = document.querySelector('.today-row');
+            if (todayRow) {
+                todayRow.scrollIntoView({ behavior: 'smooth', block: 'center' });
+            }
+        }, 100);
+    })
+    .catch(error => {
+        console.error('Error loading porter rota:', error);
+        document.getElementById('rotaCalendar').innerHTML = '<p style="color: red;">Error loading rota data</p>';
+    });
+}
+
+// Porter Rota Navigation Functions
+function navigateRotaPrevious() {
+    if (!currentRotaStartDate) return;
+
+    // Go back 6 months (180 days)
+    const startDateObj = new Date(currentRotaStartDate);
+    const newStartDate = new Date(startDateObj.getTime() - 180 * 24 * 60 * 60 * 1000);
+    const newEndDate = new Date(startDateObj.getTime() - 1 * 24 * 60 * 60 * 1000); // Day before current start
+
+    loadPorterRota(newStartDate.toISOString().split('T')[0], newEndDate.toISOString().split('T')[0]);
+    loadLeaveData(); // Update leave data to match new date range
+}
+
+function navigateRotaNext() {
+    if (!currentRotaEndDate) return;
+
+    // Go forward 6 months (180 days)
+    const endDateObj = new Date(currentRotaEndDate);
+    const newStartDate = new Date(endDateObj.getTime() + 1 * 24 * 60 * 60 * 1000); // Day after current end
+    const newEndDate = new Date(endDateObj.getTime() + 180 * 24 * 60 * 60 * 1000);
+
+    loadPorterRota(newStartDate.toISOString().split('T')[0], newEndDate.toISOString().split('T')[0]);
+    loadLeaveData(); // Update leave data to match new date range
+}
+
+function navigateRotaToday() {
+    // Jump back to today and load 3 months forward
+    const today = new Date();
+    const startDate = today.toISOString().split('T')[0];
+    const endDate = new Date(today.getTime() + 90 * 24 * 60 * 60 * 1000).toISOString().split('T')[0];
+
+    loadPorterRota(startDate, endDate);
+    loadLeaveData(); // Update leave data to match new date range
+}
+
+// CCTV/Intercom Faults
+document.getElementById('faultForm').addEventListener('submit', function(e) {
+    e.preventDefault();
+    const data = {
+        fault_type: document.getElementById('fault_type').value,
+        flat_number: document.getElementById('flat_number').value,
+        block_number: document.getElementById('block_number').value || '',
+        floor_number: document.getElementById('floor_number').value || '',
+        description: document.getElementById('fault_description_type').value,
+        contact_details: document.getElementById('contact_details').value || '',
+        additional_notes: document.getElementById('additional_notes').value || ''
+    };
+
+    queueWrite('fault', data)
+    .then(() => {
+        showAlert('Fault reported successfully!', 'success');
+        document.getElementById('faultForm').reset();
+        loadCCTVFaults();
+    })
+    .catch(error => {
+        showAlert('Error reporting fault: ' + error, 'danger');
+    });
+});
+
+function loadCCTVFaults() {
+    fetch('/api/cctv-faults')
+    .then(response => response.json())
+    .then(data => {
+        allFaults = data;
+        displayFaults(currentFaultFilter);
+    })
+    .catch(error => {
+        console.error('Error loading faults:', error);
+        document.getElementById('faultList').innerHTML = '<p style="color: red;">Error loading fault data</p>';
+    });
+}
+
+function displayFaults(filter) {
+    const container = document.getElementById('faultList');
+    const statsContainer = document.getElementById('faultStats');
+
+    // Filter faults based on current filter
+    let filteredFaults = allFaults;
+    if (filter !== 'all') {
+        filteredFaults = allFaults.filter(f => f.fault_type === filter);
+    }
+
+    // Apply search filter
+    if (currentSearchText.trim() !== '') {
+        const searchLower = currentSearchText.toLowerCase();
+        filteredFaults = filteredFaults.filter(f => {
+            return f.id.toString().includes(searchLower) ||
+                   (f.flat_number && f.flat_number.toLowerCase().includes(searchLower)) ||
+                   (f.block_number && f.block_number.toLowerCase().includes(searchLower)) ||
+                   (f.floor_number && f.floor_number.toLowerCase().includes(searchLower)) ||
+                   (f.location && f.location.toLowerCase().includes(searchLower)) ||
+                   (f.description && f.description.toLowerCase().includes(searchLower)) ||
+                   (f.contact_details && f.contact_details.toLowerCase().includes(searchLower)) ||
+                   (f.additional_notes && f.additional_notes.toLowerCase().includes(searchLower)) ||
+                   f.fault_type.toLowerCase().includes(searchLower);
+        });
+    }
+
+    // Update stats based on filtered data
+    const openCount = filteredFaults.filter(f => f.status === 'open').length;
+    const inProgressCount = filteredFaults.filter(f => f.status === 'in_progress').length;
+    const closedCount = filteredFaults.filter(f => f.status === 'closed').length;
+
+    statsContainer.innerHTML = `
+        <div class="fault-stat-item">🔴 ${openCount} Open</div>
+        <div class="fault-stat-item">🔵 ${inProgressCount} In Progress</div>
+        <div class="fault-stat-item">🟢 ${closedCount} Closed</div>
+    `;
+
+    // Update fault list
+    if (filteredFaults.length === 0) {
+        const filterName = filter === 'all' ? '' : ` (${filter})`;
+        container.innerHTML = `
+            <div class="fault-empty-state">
+                <div class="fault-empty-state-icon">✅</div>
+                <h4>No Faults Reported${filterName}</h4>
+                <p>All systems are operating normally</p>
+            </div>
+        `;
+        return;
+    }
+
+    let html = '';
+    filteredFaults.forEach(fault => {
+        const timestamp = new Date(fault.timestamp);
+        const timeStr = timestamp.toLocaleString('en-US', { 
+            month: 'short', 
+            day: 'numeric', 
+            hour: '2-digit', 
+            minute: '2-digit' 
+        });
+
+        const typeIcon = fault.fault_type === 'CCTV' ? '📹' : '📞';
+        const typeBadgeClass = fault.fault_type === 'Intercom' ? 'intercom' : '';
+
+        let actionButtons = '';
+        if (fault.status === 'open') {
+            actionButtons = `
+                <button class="btn-fault-action btn-fault-progress" onclick="updateFaultStatus(${fault.id}, 'in_progress')">
+                    🔄 In Progress
+                </button>
+                <button class="btn-fault-action btn-fault-close" onclick="updateFaultStatus(${fault.id}, 'closed')">
+                    ✓ Resolve
+                </button>
+            `;
+        } else if (fault.status === 'in_progress') {
+            actionButtons = `
+                <button class="btn-fault-action btn-fault-close" onclick="updateFaultStatus(${fault.id}, 'closed')">
+                    ✓ Resolve
+                </button>
+                <button class="btn-fault-action btn-fault-reopen" onclick="updateFaultStatus(${fault.id}, 'open')">
+                    ↩ Reopen
+                </button>
+            `;
+        } else if (fault.status === 'closed') {
+            actionButtons = `
+                <button class="btn-fault-action btn-fault-reopen" onclick="updateFaultStatus(${fault.id}, 'open')">
+                    ↩ Reopen
+                </button>
+                <button class="btn-fault-action btn-fault-delete" onclick="deleteFault(${fault.id})">
+                    🗑️ Delete
+                </button>
+            `;
+        }
+
+        // Build location string from flat, block, floor
+        const locationParts = [];
+        if (fault.flat_number) locationParts.push(`Flat ${fault.flat_number}`);
+        if (fault.block_number) locationParts.push(`Block ${fault.block_number}`);
+        if (fault.floor_number) locationParts.push(`Floor ${fault.floor_number}`);
+        const locationStr = locationParts.length > 0 ? locationParts.join(' | ') : (fault.location || 'N/A');
+
+        const contactInfo = fault.contact_details ? `<div class="fault-contact">📞 Contact: ${fault.contact_details}</div>` : '';
+        const additionalNotes = fault.additional_notes ? `<div class="fault-notes">📝 ${fault.additional_notes}</div>` : '';
+
+        html += `
+            <div class="fault-item" data-fault-type="${fault.fault_type}">
+                <div class="fault-item-header">
+                    <span class="fault-type-badge ${typeBadgeClass}">${typeIcon} ${fault.fault_type}</span>
+                    <span class="fault-timestamp">⏰ ${timeStr}</span>
+                </div>
+                <div class="fault-location"><span class="screen-only">📍 </span>${locationStr}</div>
+                <div class="fault-description"><strong>Fault:</strong> ${fault.description}</div>
+                ${contactInfo}
+                ${additionalNotes}
+                <div class="fault-actions">
+                    <span class="fault-status-badge status-${fault.status.replace('_', '-')}">${fault.status.replace('_', ' ')}</span>
+                    ${actionButtons}
+                </div>
+            </div>
+        `;
+    });
+
+    container.innerHTML = html;
+}
+
+function filterFaults(filter) {
+    currentFaultFilter = filter;
+
+    // Update active button
+    document.querySelectorAll('.fault-filter-btn').forEach(btn => {
+        btn.classList.remove('active');
+    });
+    document.querySelector(`[data-filter="${filter}"]`).classList.add('active');
+
+    // Display filtered faults
+    displayFaults(filter);
+}
+
+function printFaults() {
+    const faultList = document.getElementById('faultList');
+    const filterName = currentFaultFilter === 'all' ? 'All Faults' : `${currentFaultFilter} Faults`;
+    const printDate = new Date().toLocaleDateString('en-US', { 
+        weekday: 'long', 
+        year: 'numeric', 
+        month: 'long', 
+        day: 'numeric' 
+    });
+
+    // Filter faults based on current filter ONLY (ignore search for printing all)
+    let faultsToDisplay = allFaults;
+    if (currentFaultFilter !== 'all') {
+        faultsToDisplay = allFaults.filter(f => f.fault_type === currentFaultFilter);
+    }
+    // Note: We're NOT applying search filter here so ALL faults print
+    // If you want to respect search, uncomment the block below:
+    /*
+    if (currentSearchText.trim() !== '') {
+        const searchLower = currentSearchText.toLowerCase();
+        faultsToDisplay = faultsToDisplay.filter(fault => {
+            const locationParts = [];
+            if (fault.flat_number) locationParts.push(`Flat ${fault.flat_number}`);
+            if (fault.block_number) locationParts.push(`Block ${fault.block_number}`);
+            if (fault.floor_number) locationParts.push(`Floor ${fault.floor_number}`);
+            const locationStr = locationParts.join(' | ').toLowerCase();
+
+            return fault.id.toString().includes(searchLower) ||
+                   locationStr.includes(searchLower) ||
+                   fault.description.toLowerCase().includes(searchLower) ||
+                   (fault.contact_details && fault.contact_details.toLowerCase().includes(searchLower)) ||
+                   (fault.additional_notes && fault.additional_notes.toLowerCase().includes(searchLower));
+        });
+    }
+    */
+
+    console.log(`Printing ${faultsToDisplay.length} faults (Total in system: ${allFaults.length})`)
+
+    // Create Excel-style table
+    let tableHTML = `
+        <div class="print-table-container">
+            <div class="print-title">CCTV & Intercom Fault Report - ${filterName}</div>
+            <div class="print-date">${printDate}</div>
+            <table class="fault-print-table">
+                <thead>
+                    <tr>
+                        <th style="width: 5%;">ID</th>
+                        <th style="width: 8%;">Type</th>
+                        <th style="width: 12%;">Date/Time</th>
+                        <th style="width: 18%;">Location</th>
+                        <th style="width: 15%;">Fault</th>
+                        <th style="width: 12%;">Contact</th>
+                        <th style="width: 20%;">Notes</th>
+                        <th style="width: 10%;">Status</th>
+                    </tr>
+                </thead>
+                <tbody>
+    `;
+
+    // Add rows for each fault
+    faultsToDisplay.forEach(fault => {
+        const timestamp = new Date(fault.timestamp);
+        const dateStr = timestamp.toLocaleDateString('en-US', { 
+            month: 'short', 
+            day: 'numeric',
+            year: 'numeric'
+        });
+        const timeStr = timestamp.toLocaleTimeString('en-US', { 
+            hour: '2-digit', 
+            minute: '2-digit'
+        });
+
+        // Build location string
+        const locationParts = [];
+        if (fault.flat_number) locationParts.push(`Flat ${fault.flat_number}`);
+        if (fault.block_number) locationParts.push(`Blk ${fault.block_number}`);
+        if (fault.floor_number) locationParts.push(`Flr ${fault.floor_number}`);
+        const locationStr = locationParts.join(', ') || 'N/A';
+
+        const contact = fault.contact_details || '-';
+        const notes = fault.additional_notes || '-';
+        const status = fault.status.replace('_', ' ').toUpperCase();
+
+        tableHTML += `
+            <tr>
+                <td>${fault.id}</td>
+                <td>${fault.fault_type}</td>
+                <td>${dateStr}<br>${timeStr}</td>
+                <td>${locationStr}</td>
+                <td>${fault.description}</td>
+                <td>${contact}</td>
+                <td>${notes}</td>
+                <td style="font-weight: bold;">${status}</td>
+            </tr>
+        `;
+    });
+
+    tableHTML += `
+                </tbody>
+            </table>
+            <div style="margin-top: 20px; font-size: 9pt; text-align: center; color: #666;">
+                Total Faults: ${faultsToDisplay.length}
+            </div>
+        </div>
+    `;
+
+    // Insert table directly in document body to avoid container restrictions
+    const printContainer = document.createElement('div');
+    printContainer.id = 'faultPrintContainer';
+    printContainer.style.display = 'none'; // Hidden on screen
+    printContainer.innerHTML = tableHTML;
+    document.body.appendChild(printContainer);
+
+    // Trigger print
+    window.print();
+
+    // Remove print table after print dialog closes
+    setTimeout(() => {
+        printContainer.remove();
+    }, 500);
+}
+
+function updateFaultStatus(faultId, status) {
+    fetch('/api/update-fault-status', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({id: faultId, status: status})
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            showAlert('Fault status updated!', 'success');
+            loadCCTVFaults();
+        }
+    });
+}
+
+function deleteFault(faultId) {
+    if (confirm('Are you sure you want to permanently delete this closed fault?')) {
+        fetch(`/api/delete-fault/${faultId}`, {
+            method: 'DELETE',
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                showAlert('Fault deleted successfully!', 'success');
+                loadCCTVFaults();
+            } else {
+                showAlert(data.error || 'Failed to delete fault', 'danger');
+            }
+        })
+        .catch(error => {
+            console.error('Error deleting fault:', error);
+            showAlert('Error deleting fault', 'danger');
+        });
+    }
+}
+
+// Water Temperature
+document.getElementById('tempForm').addEventListener('submit', function(e) {
+    e.preventDefault();
+    const temperatureValue = document.getElementById('temp_input').value;
+    const timeValue = document.getElementById('temp_time').value;
+
+    if (!temperatureValue || temperatureValue.trim() === '') {
+        showAlert('Please enter a temperature value!', 'danger');
+        return;
+    }
+
+    if (isNaN(parseFloat(temperatureValue))) {
+        showAlert('Please enter a valid temperature!', 'danger');
+        return;
+    }
+
+    if (!timeValue) {
+        showAlert('Please select a time!', 'danger');
+        return;
+    }
+
+    const data = {
+        temperature: temperatureValue,
+        time: timeValue
+    };
+
+    queueWrite('water_temperature', data)
+    .then(() => {
+        showAlert('Temperature recorded successfully!', 'success');
+        document.getElementById('tempForm').reset();
+        loadWaterTemperature();
+    })
+    .catch(error => {
+        showAlert('Error recording temperature: ' + error, 'danger');
+    });
+});
+
+// Water Temperature - Global variables
+let currentTempPeriod = 'today';
+
+function loadWaterTemperature() {
+    // Load latest temperature for the "Latest Reading" card
+    fetch('/api/water-temperature')
+    .then(response => response.json())
+    .then(data => {
+        const currentTempContainer = document.getElementById('currentTemp');
+        if (data.length > 0) {
+            const latest = data[0];
+            const temp = parseFloat(latest.temperature);
+
+            // Determine color class based on UK hot water safety regulations
+            let tempClass = '';
+            let safetyMessage = '';
+
+            if (temp < 50) {
+                tempClass = 'temp-danger-cold';
+                safetyMessage = '⚠️ Below safe temperature - Legionella risk';
+            } else if (temp >= 50 && temp <= 65) {
+                tempClass = 'temp-safe';
+                safetyMessage = '✓ Safe temperature range';
+            } else if (temp > 65 && temp <= 70) {
+                tempClass = 'temp-warning-hot';
+                safetyMessage = '⚠️ High temperature - scalding risk';
+            } else {
+                tempClass = 'temp-danger-hot';
+                safetyMessage = '⚠️ Danger - Very high scalding risk';
+            }
+
+            // Apply color class to container
+            currentTempContainer.className = `temperature-display ${tempClass}`;
+
+            currentTempContainer.innerHTML = `
+                <div class="temperature-value">${latest.temperature}°C</div>
+                <div class="temperature-time">Last recorded: ${new Date(latest.timestamp).toLocaleString()}</div>
+                <div style="margin-top: 10px; font-size: 0.9em; font-weight: 500;">${safetyMessage}</div>
+            `;
+        } else {
+            currentTempContainer.className = 'temperature-display';
+            currentTempContainer.innerHTML = '<div class="loading">No temperature data available</div>';
+        }
+    });
+
+    // Load today's temperatures by default
+    loadTempPeriod('today');
+}
+
+function loadTempPeriod(period) {
+    currentTempPeriod = period;
+
+    // Update button styles
+    document.querySelectorAll('#btnToday, #btnWeek, #btnLastWeek, #btnMonth, #btnCustom').forEach(btn => {
+        btn.className = 'btn btn-secondary';
+    });
+
+    let dateFrom, dateTo;
+    const today = new Date();
+
+    if (period === 'custom') {
+        document.getElementById('btnCustom').className = 'btn btn-primary';
+        document.getElementById('customDateRange').style.display = 'block';
+        return;
+    } else {
+        document.getElementById('customDateRange').style.display = 'none';
+    }
+
+    switch(period) {
+        case 'today':
+            document.getElementById('btnToday').className = 'btn btn-primary';
+            dateFrom = dateTo = today.toISOString().split('T')[0];
+            break;
+        case 'week':
+            document.getElementById('btnWeek').className = 'btn btn-primary';
+            const weekStart = new Date(today);
+            weekStart.setDate(today.getDate() - today.getDay()); // Sunday
+            dateFrom = weekStart.toISOString().split('T')[0];
+            dateTo = today.toISOString().split('T')[0];
+            break;
+        case 'lastweek':
+            document.getElementById('btnLastWeek').className = 'btn btn-primary';
+            const lastWeekEnd = new Date(today);
+            lastWeekEnd.setDate(today.getDate() - today.getDay() - 1); // Last Saturday
+            const lastWeekStart = new Date(lastWeekEnd);
+            lastWeekStart.setDate(lastWeekEnd.getDate() - 6); // Sunday of last week
+            dateFrom = lastWeekStart.toISOString().split('T')[0];
+            dateTo = lastWeekEnd.toISOString().split('T')[0];
+            break;
+        case 'month':
+            document.getElementById('btnMonth').className = 'btn btn-primary';
+            const monthStart = new Date(today.getFullYear(), today.getMonth(), 1);
+            dateFrom = monthStart.toISOString().split('T')[0];
+            dateTo = today.toISOString().split('T')[0];
+            break;
+    }
+
+    loadTempData(dateFrom, dateTo, period);
+}
+
+function loadCustomTempRange() {
+    const dateFrom = document.getElementById('temp_date_from').value;
+    const dateTo = document.getElementById('temp_date_to').value;
+
+    if (!dateFrom || !dateTo) {
+        showAlert('Please select both from and to dates', 'danger');
+        return;
+    }
+
+    if (dateFrom > dateTo) {
+        showAlert('From date must be before or equal to To date', 'danger');
+        return;
+    }
+
+    loadTempData(dateFrom, dateTo, 'custom');
+}
+
+function loadTempData(dateFrom, dateTo, periodName) {
+    const url = `/api/water-temperature?date_from=${dateFrom}&date_to=${dateTo}`;
+
+    fetch(url)
+    .then(response => response.json())
+    .then(data => {
+        displayTempStats(data, dateFrom, dateTo, periodName);
+        displayTempHistory(data);
+    })
+    .catch(error => {
+        console.error('Error loading temperature data:', error);
+        document.getElementById('tempHistory').innerHTML = '<p style="color: red;">Error loading temperature data</p>';
+    });
+}
+
+function displayTempStats(data, dateFrom, dateTo, periodName) {
+    const statsContainer = document.getElementById('tempStats');
+
+    if (data.length === 0) {
+        statsContainer.innerHTML = '<p style="grid-column: 1/-1; text-align: center; color: #666;">No temperature data for this period</p>';
+        return;
+    }
+
+    // Calculate statistics
+    const temps = data.map(t => t.temperature);
+    const average = (temps.reduce((a, b) => a + b, 0) / temps.length).toFixed(1);
+    const min = Math.min(...temps).toFixed(1);
+    const max = Math.max(...temps).toFixed(1);
+    const count = temps.length;
+
+    // Calculate date range string
+    let rangeStr = '';
+    if (dateFrom === dateTo) {
+        rangeStr = new Date(dateFrom).toLocaleDateString();
+    } else {
+        rangeStr = `${new Date(dateFrom).toLocaleDateString()} - ${new Date(dateTo).toLocaleDateString()}`;
+    }
+
+    statsContainer.innerHTML = `
+        <div style="background: linear-gradient(135deg, #4a5568 0%, #2d3748 100%); color: white; padding: 20px; border-radius: 10px; text-align: center;">
+            <div style="font-size: 0.9em; opacity: 0.9; margin-bottom: 5px;">Period</div>
+            <div style="font-size: 1.1em; font-weight: 600;">${periodName === 'custom' ? 'Custom' : periodName.charAt(0).toUpperCase() + periodName.slice(1)}</div>
+            <div style="font-size: 0.8em; opacity: 0.8; margin-top: 5px;">${rangeStr}</div>
+        </div>
+        <div style="background: #28a745; color: white; padding: 20px; border-radius: 10px; text-align: center;">
+            <div style="font-size: 0.9em; opacity: 0.9; margin-bottom: 5px;">Average</div>
+            <div style="font-size: 2em; font-weight: bold;">${average}°C</div>
+        </div>
+        <div style="background: #17a2b8; color: white; padding: 20px; border-radius: 10px; text-align: center;">
+            <div style="font-size: 0.9em; opacity: 0.9; margin-bottom: 5px;">Minimum</div>
+            <div style="font-size: 2em; font-weight: bold;">${min}°C</div>
+        </div>
+        <div style="background: #dc3545; color: white; padding: 20px; border-radius: 10px; text-align: center;">
+            <div style="font-size: 0.9em; opacity: 0.9; margin-bottom: 5px;">Maximum</div>
+            <div style="font-size: 2em; font-weight: bold;">${max}°C</div>
+        </div>
+        <div style="background: #ffc107; color: #333; padding: 20px; border-radius: 10px; text-align: center;">
+            <div style="font-size: 0.9em; opacity: 0.8; margin-bottom: 5px;">Readings</div>
+            <div style="font-size: 2em; font-weight: bold;">${count}</div>
+        </div>
+    `;
+}
+
+function displayTempHistory(data) {
+    const historyContainer = document.getElementById('tempHistory');
+
+    if (data.length === 0) {
+        historyContainer.innerHTML = '<p style="text-align: center; color: #666; padding: 20px;">No temperature data for this period</p>';
+        return;
+    }
+
+    let html = '<table class="table"><thead style="position: sticky; top: 0; background: #f8f9fa; z-index: 1;"><tr><th>Date</th><th>Time</th><th>Temperature</th></tr></thead><tbody>';
+    data.forEach(temp => {
+        const date = new Date(temp.timestamp);
+        html += `<tr>
+            <td style="white-space: nowrap;">${date.toLocaleDateString()}</td>
+            <td style="font-weight: 600;">${temp.time_recorded}</td>
+            <td style="font-size: 1.1em; color: #007bff; cursor: pointer; user-select: none;" 
+                onclick="deleteWaterTemp(${temp.id}, '${temp.temperature}°C', '${date.toLocaleDateString()}', '${temp.time_recorded}')" 
+                title="Click to delete this entry">
+                <strong>${temp.temperature}°C</strong>
+            </td>
+        </tr>`;
+    });
+    html += '</tbody></table>';
+    historyContainer.innerHTML = html;
+}
+
+function deleteWaterTemp(id, temperature, date, time) {
+    if (!confirm(`Delete this water temperature reading?\n\n${temperature} recorded on ${date} at ${time}\n\nThis action cannot be undone.`)) {
+        return;
+    }
+
+    fetch(`/api/water-temperature/${id}`, {
+        method: 'DELETE'
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            showAlert('Temperature record deleted successfully', 'success');
+            loadWaterTemperature();
+        } else {
+            showAlert('Error: ' + (data.error || 'Failed to delete temperature record'), 'danger');
+        }
+    })
+    .catch(error => {
+        showAlert('Error deleting temperature record: ' + error, 'danger');
+    });
+}
+
+// Settings Management
+document.getElementById('settingsForm').addEventListener('submit', function(e) {
+    e.preventDefault();
+
+    // Validate recipient email addresses
+    const recipientEmails = document.getElementById('recipient_email').value;
+    const emailList = recipientEmails.split(',').map(e => e.trim()).filter(e => e.length > 0);
+
+    // Simple email validation regex
+    const emailRegex = /^[^\s@]+@[^\s@]+\.[^\s@]+$/;
+    const invalidEmails = emailList.filter(email => !emailRegex.test(email));
+
+    if (invalidEmails.length > 0) {
+        showAlert('Invalid email address(es): ' + invalidEmails.join(', '), 'danger');
+        return;
+    }
+
+    if (emailList.length === 0) {
+        showAlert('Please enter at least one recipient email address', 'danger');
+        return;
+    }
+
+    // Validate sender email
+    const senderEmail = document.getElementById('sender_email').value;
+    if (!emailRegex.test(senderEmail)) {
+        showAlert('Invalid sender email address', 'danger');
+        return;
+    }
+
+    const data = {
+        email_time: document.getElementById('email_time').value,
+        email_enabled: document.getElementById('email_enabled').checked,
+        recipient_email: document.getElementById('recipient_email').value,
+        sender_email: document.getElementById('sender_email').value,
+        sender_password: document.getElementById('sender_password').value,
+        smtp_server: document.getElementById('smtp_server').value,
+        smtp_port: document.getElementById('smtp_port').value,
+        staff_name: settingsUnlockedStaff || 'Unknown'
+    };
+
+    fetch('/api/schedule-settings', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(data)
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            const emailCount = emailList.length;
+            const message = emailCount > 1 
+                ? `Settings saved successfully! Reports will be sent to ${emailCount} recipients.`
+                : 'Settings saved successfully!';
+            showAlert(message, 'success');
+            loadScheduleSettings();
+        }
+    })
+    .catch(error => {
+        showAlert('Error saving settings: ' + error, 'danger');
+    });
+});
+
+function loadScheduleSettings() {
+    fetch('/api/schedule-settings')
+    .then(response => response.json())
+    .then(data => {
+        // Populate form
+        document.getElementById('email_time').value = data.email_time;
+        document.getElementById('email_enabled').checked = data.email_enabled;
+        document.getElementById('recipient_email').value = data.recipient_email;
+
+        // Populate sender email settings
+        document.getElementById('sender_email').value = data.sender_email || '';
+        document.getElementById('sender_password').value = data.sender_password || '';
+        document.getElementById('smtp_server').value = data.smtp_server || 'smtp.gmail.com';
+        document.getElementById('smtp_port').value = data.smtp_port || 587;
+
+        // Update current settings display
+        const container = document.getElementById('currentSettings');
+        const statusText = data.email_enabled ? 'Enabled' : 'Disabled';
+        const statusClass = data.email_enabled ? 'status-working' : 'status-off';
+
+        // Mask the password for display (show only first 2 and last 2 chars)
+        const maskedPassword = data.sender_password ? 
+            data.sender_password.substring(0, 2) + '****' + data.sender_password.substring(data.sender_password.length - 2) :
+            'Not set';
+
+        container.innerHTML = `
+            <div class="card">
+                <p><strong>Email Time:</strong> ${data.email_time}</p>
+                <p><strong>Status:</strong> <span class="status-badge ${statusClass}">${statusText}</span></p>
+                <p><strong>Recipient:</strong> ${data.recipient_email}</p>
+                <p><strong>Sender Email:</strong> ${data.sender_email || 'Not configured'}</p>
+                <p><strong>Sender Password:</strong> ${maskedPassword}</p>
+                <p><strong>SMTP Server:</strong> ${data.smtp_server}:${data.smtp_port}</p>
+                <p><strong>Last Updated:</strong> ${new Date(data.last_updated).toLocaleString()}</p>
+            </div>
+        `;
+    });
+}
+
+
+function loadEmailHistory() {
+    fetch('/api/email-logs')
+    .then(response => response.json())
+    .then(data => {
+        const container = document.getElementById('emailHistory');
+
+        if (data.length === 0) {
+            container.innerHTML = '<p style="text-align: center; color: #666;">No emails sent yet.</p>';
+            return;
+        }
+
+        // Add count badge
+        const countBadge = data.length > 5 ? 
+            `<div style="background: #007bff; color: white; padding: 5px 12px; border-radius: 15px; display: inline-block; font-size: 0.85em; margin-bottom: 10px;">
+                Total: ${data.length} emails sent
+            </div>` : '';
+
+        let html = countBadge + '<table class="table" style="margin-bottom: 0;"><thead style="position: sticky; top: 0; background: #f8f9fa; z-index: 1;"><tr><th>Date & Time</th><th>Recipient(s)</th><th>Subject</th><th>PDF File</th></tr></thead><tbody>';
+        data.forEach((log, index) => {
+            const sentDate = new Date(log.sent_date);
+            const dateStr = sentDate.toLocaleDateString();
+            const timeStr = sentDate.toLocaleTimeString();
+            const fileName = log.pdf_path.split('\\').pop().split('/').pop();
+
+            // Highlight recent emails (first 5)
+            const rowStyle = index < 5 ? 'background: #f0f8ff;' : '';
+
+            html += `<tr style="${rowStyle}">
+                <td style="white-space: nowrap;">${dateStr}<br/><small style="color: #666;">${timeStr}</small></td>
+                <td style="max-width: 200px; overflow: hidden; text-overflow: ellipsis;" title="${log.recipient}">${log.recipient}</td>
+                <td>${log.subject}</td>
+                <td><small style="font-family: monospace;">${fileName}</small></td>
+            </tr>`;
+        });
+        html += '</tbody></table>';
+        container.innerHTML = html;
+    })
+    .catch(error => {
+        document.getElementById('emailHistory').innerHTML = '<p style="color: red;">Error loading email history</p>';
+    });
+}
+
+function testEmail() {
+    if (!document.getElementById('email_enabled').checked) {
+        showAlert('Please enable email sending first!', 'danger');
+        return;
+    }
+
+    const recipient = document.getElementById('recipient_email').value;
+    if (!recipient) {
+        showAlert('Please enter a recipient email address!', 'danger');
+        return;
+    }
+
+    if (!confirm('Send a test email now with today\'s data to:\n' + recipient + '\n\nNote: This will include all unsent occurrences and water temperature readings.')) {
+        return;
+    }
+
+    // Show loading state
+    showAlert('Sending test email... Please wait.', 'success');
+
+    submitReportJob('/api/test-email')
+    .then(data => {
+        if (data.success) {
+            showAlert(data.message, 'success');
+        } else {
+            showAlert('Error: ' + data.error, 'danger');
+        }
+    })
+    .catch(error => {
+        showAlert('Error sending test email: ' + error, 'danger');
+    });
+}
+
+// Report jobs run in a report worker process - submit, then wait for the result
+function submitReportJob(url, body) {
+    return fetch(url, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: body ? JSON.stringify(body) : undefined
+    })
+    .then(response => response.json())
+    .then(data => data.queued ? waitForReportJob(data.status_url) : data);
+}
+
+const REPORT_JOB_POLL_MS = 1000;
+
+function waitForReportJob(statusUrl) {
+    // Poll the job's status until it finishes - each check is answered straight away
+    return fetch(statusUrl)
+        .then(response => response.json())
+        .then(data => {
+            if (!data.success) {
+                return data;
+            }
+            if (data.job.status === 'done' || data.job.status === 'failed') {
+                return data.job.result || { success: false, error: data.job.error || 'Report job failed' };
+            }
+            return new Promise(resolve => setTimeout(resolve, REPORT_JOB_POLL_MS))
+                .then(() => waitForReportJob(statusUrl));
+        });
+}
+
+function testExport() {
+    submitReportJob('/api/test-export')
+    .then(data => {
+        if (data.success) {
+            showAlert('PDF exported successfully! Check the reports folder.', 'success');
+        } else {
+            showAlert('Export failed: ' + (data.error || 'Unknown error'), 'danger');
+        }
+    })
+    .catch(error => {
+        showAlert('Export error: ' + error, 'danger');
+    });
+}
+
+function testClear() {
+    if (confirm('Are you sure you want to clear all today\'s diary entries? This action cannot be undone!')) {
+        fetch('/api/test-clear', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            }
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                showAlert('Diary cleared successfully! ' + data.count + ' entries removed.', 'success');
+                // Reload the daily occurrences to show empty table
+                loadDailyOccurrences();
+            } else {
+                showAlert('Clear failed: ' + (data.error || 'Unknown error'), 'danger');
+            }
+        })
+        .catch(error => {
+            showAlert('Clear error: ' + error, 'danger');
+        });
+    }
+}
+
+function reprintReport() {
+    const dateInput = document.getElementById('reprint_date');
+    const date = dateInput.value;
+
+    if (!date) {
+        showAlert('Please select a date', 'danger');
+        return;
+    }
+
+    // Show loading message
+    const statusDiv = document.getElementById('reprintStatus');
+    statusDiv.innerHTML = '<div class="alert alert-info">⏳ Generating PDF report... This may take a few seconds.</div>';
+
+    submitReportJob('/api/reprint-report', { date: date })
+    .then(data => {
+        if (data.success) {
+            statusDiv.innerHTML = `
+                <div class="alert alert-success">
+                    ✅ <strong>PDF Generated Successfully!</strong><br><br>
+                    <strong>Filename:</strong> ${data.pdf_filename}<br>
+                    <strong>Location:</strong> <code>${data.pdf_path}</code><br>
+                    <strong>Occurrences:</strong> ${data.occurrences_count}<br>
+                    <strong>Water Temps:</strong> ${data.water_temps_count}<br><br>
+                    <small>PDF saved to: reports/PDF/</small>
+                </div>
+            `;
+        } else {
+            statusDiv.innerHTML = `<div class="alert alert-danger">❌ ${data.error}</div>`;
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        statusDiv.innerHTML = `<div class="alert alert-danger">❌ Error generating PDF: ${error.message}</div>`;
+    });
+}
+
+// Show a past day's entries without generating a PDF
+function viewOccurrencesForDate() {
+    const date = document.getElementById('reprint_date').value;
+
+    if (!date) {
+        showAlert('Please select a date', 'danger');
+        return;
+    }
+
+    const statusDiv = document.getElementById('reprintStatus');
+    fetch(`/api/daily-occurrences/history?start_date=${date}&end_date=${date}&limit=1000`)
+    .then(response => response.json())
+    .then(data => {
+        if (!data.success) {
+            statusDiv.innerHTML = `<div class="alert alert-danger">❌ ${data.error}</div>`;
+            return;
+        }
+        if (data.occurrences.length === 0) {
+            statusDiv.innerHTML = `<div class="alert alert-info">No entries recorded on ${date}</div>`;
+            return;
+        }
+
+        // Oldest first, as in the report
+        let html = `<p><strong>${data.total}</strong> entr${data.total === 1 ? 'y' : 'ies'} on ${date}</p>`;
+        html += '<table class="incident-table"><thead><tr><th>TIME</th><th>FLAT</th><th>BY</th><th>INCIDENT REPORT</th></tr></thead><tbody>';
+        data.occurrences.slice().reverse().forEach(occurrence => {
+            html += `<tr>
+                <td>${occurrence.time}</td>
+                <td>${occurrence.flat_number}</td>
+                <td>${occurrence.reported_by}</td>
+                <td>${occurrence.description}</td>
+            </tr>`;
+        });
+        html += '</tbody></table>';
+        statusDiv.innerHTML = html;
+    })
+    .catch(error => {
+        statusDiv.innerHTML = `<div class="alert alert-danger">❌ Error loading entries: ${error.message}</div>`;
+    });
+}
+
+// Holiday and Sick Leave Management
+function handleHolidaySubmit(e) {
+    e.preventDefault();
+    const staffName = document.getElementById('holiday_staff').value;
+    const dateFrom = document.getElementById('holiday_date_from').value;
+    const dateTo = document.getElementById('holiday_date_to').value;
+    const notes = document.getElementById('holiday_notes').value;
+
+    if (!staffName || !dateFrom || !dateTo) {
+        showAlert('Please fill in all required fields!', 'danger');
+        return;
+    }
+
+    // Validate date range
+    if (new Date(dateTo) < new Date(dateFrom)) {
+        showAlert('To Date must be after or equal to From Date!', 'danger');
+        return;
+    }
+
+    const data = {
+        staff_name: staffName,
+        date_from: dateFrom,
+        date_to: dateTo,
+        status: 'holiday',
+        notes: notes
+    };
+
+    fetch('/api/staff-rota-range', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(data)
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            const workingDays = data.working_days_count || data.days_added || 1;
+            const totalDays = data.days_added || 1;
+            let message = `Holiday added successfully! ${workingDays} working day(s) booked.`;
+            if (workingDays !== totalDays) {
+                message += ` (${totalDays - workingDays} scheduled off day(s) excluded)`;
+            }
+            showAlert(message, 'success');
+            document.getElementById('holidayForm').reset();
+            loadLeaveData();
+            loadTodaySchedule(); // Refresh today's schedule
+            loadPorterRota(); // Refresh calendar
+        }
+    })
+    .catch(error => {
+        showAlert('Error adding holiday: ' + error, 'danger');
+    });
+}
+
+function handleSickSubmit(e) {
+    e.preventDefault();
+    const staffName = document.getElementById('sick_staff').value;
+    const dateFrom = document.getElementById('sick_date_from').value;
+    const dateTo = document.getElementById('sick_date_to').value;
+    const notes = document.getElementById('sick_notes').value;
+
+    if (!staffName || !dateFrom || !dateTo) {
+        showAlert('Please fill in all required fields!', 'danger');
+        return;
+    }
+
+    // Validate date range
+    if (new Date(dateTo) < new Date(dateFrom)) {
+        showAlert('To Date must be after or equal to From Date!', 'danger');
+        return;
+    }
+
+    const data = {
+        staff_name: staffName,
+        date_from: dateFrom,
+        date_to: dateTo,
+        status: 'sick',
+        notes: notes
+    };
+
+    fetch('/api/staff-rota-range', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(data)
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            const workingDays = data.working_days_count || data.days_added || 1;
+            const totalDays = data.days_added || 1;
+            let message = `Sick leave added successfully! ${workingDays} working day(s) booked.`;
+            if (workingDays !== totalDays) {
+                message += ` (${totalDays - workingDays} scheduled off day(s) excluded)`;
+            }
+            showAlert(message, 'success');
+            document.getElementById('sickForm').reset();
+            loadLeaveData();
+            loadTodaySchedule(); // Refresh today's schedule
+            loadPorterRota(); // Refresh calendar
+        }
+    })
+    .catch(error => {
+        showAlert('Error adding sick leave: ' + error, 'danger');
+    });
+}
+
+function loadLeaveData() {
+    // Use current rota viewing range if available, otherwise default to today + 180 days
+    let startDate, endDate;
+    if (currentRotaStartDate && currentRotaEndDate) {
+        startDate = currentRotaStartDate;
+        endDate = currentRotaEndDate;
+    } else {
+        const today = new Date().toISOString().split('T')[0];
+        const futureDate = new Date();
+        futureDate.setDate(futureDate.getDate() + 180);
+        startDate = today;
+        endDate = futureDate.toISOString().split('T')[0];
+    }
+
+    fetch(`/api/staff-rota?start_date=${startDate}&end_date=${endDate}`)
+    .then(response => response.json())
+    .then(data => {
+        const container = document.getElementById('leaveList');
+
+        if (data.length === 0) {
+            const startDateObj = new Date(startDate);
+            const endDateObj = new Date(endDate);
+            const rangeText = `${startDateObj.toLocaleDateString('en-US', { month: 'short', day: 'numeric', year: 'numeric' })} - ${endDateObj.toLocaleDateString('en-US', { month: 'short', day: 'numeric', year: 'numeric' })}`;
+            container.innerHTML = `<p style="color: #666; font-size: 0.95em;">No leave entries for ${rangeText}.</p>`;
+            return;
+        }
+
+        // Group consecutive days into ranges
+        const grouped = groupLeaveRanges(data);
+
+        // Wrap table in scrollable container (max height for 5 rows)
+        let html = '<div style="max-height: 350px; overflow-y: auto; overflow-x: auto; border: 1px solid #dee2e6; border-radius: 8px;">';
+        html += '<table class="table" style="font-size: 0.9em; margin-bottom: 0;"><thead style="position: sticky; top: 0; background: #f8f9fa; z-index: 10;"><tr><th>Date Range</th><th>Days</th><th>Staff Member</th><th>Status</th><th>Notes</th><th>Actions</th></tr></thead><tbody>';
+
+        grouped.forEach(group => {
+            const statusClass = group.status === 'holiday' ? 'status-holiday' : 'status-sick';
+            const statusText = group.status === 'holiday' ? 'HOLIDAY' : 'SICK';
+            const deleteIds = group.ids.join(',');
+
+            html += `<tr>
+                <td style="white-space: nowrap;"><strong>${group.dateRange}</strong></td>
+                <td style="text-align: center;">${group.days}</td>
+                <td><strong>${group.staff_name}</strong></td>
+                <td><span class="status-badge ${statusClass}">${statusText}</span></td>
+                <td>${group.notes || '-'}</td>
+                <td><button class="btn btn-sm btn-danger" onclick="deleteLeaveRange('${deleteIds}')">Delete</button></td>
+            </tr>`;
+        });
+
+        html += '</tbody></table></div>';
+        container.innerHTML = html;
+    })
+    .catch(error => {
+        console.error('Error loading leave data:', error);
+        document.getElementById('leaveList').innerHTML = '<p style="color: red;">Error loading leave data</p>';
+    });
+}
+
+function groupLeaveRanges(data) {
+    // Sort by staff, status, and date
+    data.sort((a, b) => {
+        if (a.staff_name !== b.staff_name) return a.staff_name.localeCompare(b.staff_name);
+        if (a.status !== b.status) return a.status.localeCompare(b.status);
+        return new Date(a.date) - new Date(b.date);
+    });
+
+    const groups = [];
+    let currentGroup = null;
+
+    data.forEach(leave => {
+        const leaveDate = new Date(leave.date);
+
+        if (!currentGroup || 
+            currentGroup.staff_name !== leave.staff_name || 
+            currentGroup.status !== leave.status ||
+            currentGroup.notes !== leave.notes ||
+            (leaveDate - currentGroup.lastDate) > 86400000) { // More than 1 day gap
+
+            // Start new group
+            if (currentGroup) {
+                groups.push(formatGroup(currentGroup));
+            }
+
+            currentGroup = {
+                staff_name: leave.staff_name,
+                status: leave.status,
+                notes: leave.notes,
+                dates: [leaveDate],
+                ids: [leave.id],
+                working_days: leave.is_working_day ? 1 : 0,
+                lastDate: leaveDate
+            };
+        } else {
+            // Add to current group
+            currentGroup.dates.push(leaveDate);
+            currentGroup.ids.push(leave.id);
+            if (leave.is_working_day) {
+                currentGroup.working_days++;
+            }
+            currentGroup.lastDate = leaveDate;
+        }
+    });
+
+    // Add last group
+    if (currentGroup) {
+        groups.push(formatGroup(currentGroup));
+    }
+
+    return groups;
+}
+
+function formatGroup(group) {
+    const dates = group.dates.sort((a, b) => a - b);
+    const firstDate = dates[0];
+    const lastDate = dates[dates.length - 1];
+
+    let dateRange;
+    if (dates.length === 1) {
+        dateRange = firstDate.toLocaleDateString('en-US', { month: 'short', day: 'numeric', year: 'numeric' });
+    } else {
+        const firstStr = firstDate.toLocaleDateString('en-US', { month: 'short', day: 'numeric' });
+        const lastStr = lastDate.toLocaleDateString('en-US', { month: 'short', day: 'numeric', year: 'numeric' });
+        dateRange = `${firstStr} - ${lastStr}`;
+    }
+
+    return {
+        staff_name: group.staff_name,
+        status: group.status,
+        notes: group.notes,
+        dateRange: dateRange,
+        days: group.working_days,  // Show only working days
+        ids: group.ids
+    };
+}
+
+function deleteLeaveRange(idsString) {
+    // Require PIN authentication before deletion
+    requirePinAuth(() => {
+        const ids = idsString.split(',').map(id => parseInt(id));
+        const days = ids.length;
+
+        if (!confirm(`Are you sure you want to delete this leave entry (${days} day(s))?`)) {
+            return;
+        }
+
+        // Delete all entries in the range
+        Promise.all(ids.map(id => 
+            fetch(`/api/staff-rota/${id}`, { 
+                method: 'DELETE',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({
+                    user_name: currentAuthenticatedUser || 'Unknown'
+                })
+            })
+                .then(r => r.json())
+        ))
+        .then(results => {
+            const allSuccess = results.every(r => r.success);
+            if (allSuccess) {
+                showAlert(`Leave entries deleted successfully! (${days} day(s))`, 'success');
+                loadLeaveData();
+                loadTodaySchedule();
+                loadPorterRota();
+            } else {
+                showAlert('Some entries failed to delete', 'danger');
+            }
+        })
+        .catch(error => {
+            showAlert('Error deleting leave: ' + error, 'danger');
+        });
+    });
+}
+
+
+// Utility functions
+function showAlert(message, type) {
+    const alertDiv = document.createElement('div');
+    alertDiv.className = `alert alert-${type}`;
+    alertDiv.textContent = message;
+
+    const container = document.querySelector('.tab-content.active');
+    container.insertBefore(alertDiv, container.firstChild);
+
+    setTimeout(() => {
+        alertDiv.remove();
+    }, 5000);
+}
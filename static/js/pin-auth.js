@@ -0,0 +1,156 @@
+// PIN Authentication System
+let pinAuthCallback = null;
+let shiftLeaders = [];
+
+// Load shift leaders on page load
+fetch('/api/shift-leaders')
+    .then(response => response.json())
+    .then(data => {
+        shiftLeaders = data;
+
+        // Populate Change PIN form dropdown
+        const changePinSelect = document.getElementById('change_pin_name');
+        if (changePinSelect) {
+            data.forEach(leader => {
+                const option = document.createElement('option');
+                option.value = leader.name;
+                option.textContent = leader.name;
+                changePinSelect.appendChild(option);
+            });
+        }
+    })
+    .catch(error => console.error('Error loading shift leaders:', error));
+
+function requirePinAuth(callback) {
+    pinAuthCallback = callback;
+    const modal = document.getElementById('pinModal');
+    modal.style.display = 'flex';
+    document.getElementById('pinInput').value = '';
+    document.getElementById('pinError').style.display = 'none';
+
+    // Focus on the PIN input
+    setTimeout(() => document.getElementById('pinInput').focus(), 100);
+}
+
+function submitPin() {
+    const pin = document.getElementById('pinInput').value.trim();
+    const errorDiv = document.getElementById('pinError');
+
+    if (!pin) {
+        errorDiv.textContent = 'Please enter your PIN';
+        errorDiv.style.display = 'block';
+        return;
+    }
+
+    // Verify PIN with server (only send PIN, server will identify the user)
+    fetch('/api/verify-pin', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ pin: pin })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            // PIN verified, close modal and execute callback
+            document.getElementById('pinModal').style.display = 'none';
+
+            // Set authenticated user for activity logging
+            if (data.leader && data.leader.name) {
+                currentAuthenticatedUser = data.leader.name;
+                console.log('Authenticated as:', data.leader.name);
+            }
+
+            if (pinAuthCallback) {
+                pinAuthCallback();
+                pinAuthCallback = null;
+            }
+        } else {
+            errorDiv.textContent = data.error || 'Invalid PIN';
+            errorDiv.style.display = 'block';
+            // Shake animation for wrong PIN
+            const input = document.getElementById('pinInput');
+            input.style.animation = 'shake 0.5s';
+            setTimeout(() => { input.style.animation = ''; }, 500);
+        }
+    })
+    .catch(error => {
+        errorDiv.textContent = 'Error verifying PIN';
+        errorDiv.style.display = 'block';
+    });
+}
+
+function cancelPinAuth() {
+    document.getElementById('pinModal').style.display = 'none';
+    pinAuthCallback = null;
+}
+
+// Handle Enter key in PIN input
+document.addEventListener('DOMContentLoaded', function() {
+    const pinInput = document.getElementById('pinInput');
+    if (pinInput) {
+        pinInput.addEventListener('keypress', function(e) {
+            if (e.key === 'Enter') {
+                submitPin();
+            }
+        });
+    }
+});
+
+// PIN Change Functionality
+function handleChangePinSubmit(event) {
+    event.preventDefault();
+
+    const name = document.getElementById('change_pin_name').value.trim();
+    const oldPin = document.getElementById('change_pin_old').value.trim();
+    const newPin = document.getElementById('change_pin_new').value.trim();
+    const confirmPin = document.getElementById('change_pin_confirm').value.trim();
+
+    // Validation
+    if (!name) {
+        showAlert('Please select your name', 'danger');
+        return;
+    }
+
+    if (!oldPin || !newPin || !confirmPin) {
+        showAlert('All fields are required', 'danger');
+        return;
+    }
+
+    if (newPin.length < 4) {
+        showAlert('New PIN must be at least 4 digits', 'danger');
+        return;
+    }
+
+    if (newPin !== confirmPin) {
+        showAlert('New PIN and confirmation do not match', 'danger');
+        return;
+    }
+
+    // Send request to change PIN
+    fetch('/api/change-pin', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+            name: name,
+            old_pin: oldPin,
+            new_pin: newPin
+        })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            showAlert('PIN changed successfully! Please remember your new PIN.', 'success');
+            // Clear the form
+            document.getElementById('changePinForm').reset();
+        } else {
+            showAlert('Error: ' + (data.error || 'Failed to change PIN'), 'danger');
+        }
+    })
+    .catch(error => {
+        showAlert('Error changing PIN: ' + error, 'danger');
+    });
+}
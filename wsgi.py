@@ -0,0 +1,14 @@
+"""
+WSGI entry point for production servers
+
+    gunicorn --workers 4 --threads 8 --bind 0.0.0.0:5000 wsgi:app
+    waitress-serve --threads 8 --port 5000 wsgi:app
+
+Each server process migrates the database (one at a time) and the first one to
+take the scheduler lock runs the scheduled jobs - see init_server_process().
+python app.py --serve starts either of these for you.
+"""
+
+from app import app, init_server_process
+
+init_server_process()